@@ -10,7 +10,17 @@ if there is no TATA-box or upstream/downstream region).
 Programmer: Nathan Morse
     
 INPUT: A FASTA formatted input file with the DNA of an organism; could be
-a specific gene.
+a specific gene. The file name may be followed by a region, samtools-style
+(e.g. "genome.fna chrI:1000-2000", counted from 1), to search only that region;
+it is read straight from the file through its .fai index. With --packed the
+genome (its first record, or the record of the region) is read from a packed
+2-bit copy of it instead, made the first time and then only memory-mapped, so
+a region of a genome larger than the memory of the machine costs no more than
+the region itself. With --all every TATA-box on both strands of the file (or of
+the region) is listed instead, one CSV row per box with its upstream and
+downstream windows, streamed out as the genome is scanned (give the file name
+on the command line, e.g. "morse_a4.py --all genome.fna > boxes.csv", to keep
+the prompt for it out of the CSV).
 
 OUTPUT: The size of the entire DNA strand given in base pairs along with the actual
 DNA given lined up with its according index numbers. The location of the upstream, 
@@ -26,221 +36,66 @@ exist, an error message will be printed appropriately.
 -------------------------------------------------------------------------------
 """
 
-import re, os # import regex library and os for checking file inputs
-# ------------------------------------------------------------------------
-
-def getDNA(filename):
-    """ Open a FASTA file of DNA read it, and return the DNA as one string.
-    
-    Function to open a FASTA formatted file of DNA sequence, remove
-    first (header) line and newline characters, and return as one (long) string.
-    
-    Argument:  one(1) string with the name of a FASTA-formtted file of DNA.
-    Returns:   entire sequence of DNA as one string
- 
-    A sample of how you might "call" this funciton from your program
-    to 'get' the DNA for chromosome III of the worm, C.elegans.
- 
-    sequence = getDNA("worm_III.fna")
+import os, sys # import os for checking file inputs and sys for the exit status
+import argparse # for the command line options
 
-    Note: This function (sometimes called a subroutine) is ready for you
-    to use in your program. Think of this routine as a "button on your
-    calculator" ... this is ready for to use. When you "use" this
-    routine, we say "your program is CALLING" for the use of that routine.
-    -----------------------------------------------------------------------
-    
-    """
-    # make sure there really *is* a filename with this name
-    if (not os.path.isfile(filename)):
-        print("No file found in current directory named: ", filename)
-        return ""
-    else:
-        DNA = ""
-        with open(filename) as INPUT:
-            next(INPUT)  # skip the header line
-            # now read all the other lines in the file
-            for nextLine in INPUT: 
-                nextLine = nextLine.strip()  # remove the newline
-                DNA = DNA + nextLine
-            # end for each line
-                
-            return DNA.lower() # make DNA lowercase
-    # end else
-#-------------------(end of getDNA())--------------------------------------
-
-def printIndexing(string):
-    """ This function prints the indexing (by tens) based on the length of the
-    region to help the reader verify locations (bp) of motifs.
-    -----------------------------------------------------------------------
-    
-    """    
-    nucleotideCount = 1 # start reading position 1 rather than 0
-    
-    for nucleotide in string: # for each A, T, G, or C
-        if (nucleotideCount == 10): # if count gets to 10,
-            nucleotideCount = 0 # set back to 0
-        if (nucleotideCount != 10):
-            print(nucleotideCount, end="") # don't print on a new line each time
-            nucleotideCount += 1 # advance the count
-    # end of for loop
-#--------------------(end of printIndexing(string)-------------------------
-
-def TATAbox(retrievedDNA):
-    """ This function finds the first TATA box it finds starting from the front
-    of the sequence as well as executes all other functions of the program accordingly 
-    (other than getDNA(filename)) based on if there is an upstream region to the
-    TATA-box or not.
-    -----------------------------------------------------------------------
-    
-    """   
-    if (retrievedDNA != ""): # if there is DNA   
-        TATAregex = re.compile(r"tata[at]a[at][ag]") # regex for TATA-box
-    
-        if (TATAregex.search(retrievedDNA)): # if the TATA-box exists:
-            TATAstart = (TATAregex.search(retrievedDNA)).start() # start of TATA-box
-            TATAend = (TATAregex.search(retrievedDNA)).end() # end of TATA-box
-            # the next line puts only the TATA-box in uppercase (all in a stored variable):
-            retrievedDNA = retrievedDNA[:TATAstart] + retrievedDNA[TATAstart:TATAend].upper() + retrievedDNA[TATAend:]
-            
-            print("\nThe size of the region being searched is", len(retrievedDNA), "bp")
-            print("=========================================================")
-            print(retrievedDNA) # print the sequence with the TATA-box in uppercase
-            
-            printIndexing(retrievedDNA) # call to printIndexing function on retrievedDNA
-                    
-            if (TATAstart != 0): # if there is an upstream region
-                print("\n\nUpstream:   [ 1 :", TATAstart, "]") # print location
-                upstream = retrievedDNA[:TATAstart] # store location of upstream
-                ''' 
-                the next 2 lines calculate the percentage of the upstream
-                region and make that public for use in outside functions
-                
-                '''
-                global percentageUpstream
-                percentageUpstream = (len(upstream)/len(retrievedDNA)*100)
-            else: # otherwise there is no upstream region to the TATA-box!
-                print("\n\nThere is no upstream region prior to TATA-box!")
-            
-            # now print the location (start to end) of TATA-box    
-            print("TATA-box:   [", TATAstart+1, ":", TATAend, "]")
-            
-            if (TATAend != len(retrievedDNA)): # if there is a downstream, print
-                print("Downstream: [", TATAend+1, ":", len(retrievedDNA), "]")
-            else: # if the end of TATA-box is at the end of the sequence also:
-                print("There is no downstream region after the TATA-box!")
-            
-            print("---------------------------------------------------------")
-            
-            # call to regex functions on upstream:
-            if ("upstream" in locals()): # if upstream variable exists locally
-                findDirectRepeats(upstream)
-                findMirrorRepeats(upstream)
-                findATRepeats(upstream)
-        else: # outtermost else statement in case there is no TATA-box:
-            print("There is no TATA box to locate.")
-#-------------------(end of TATAbox())-------------------------------------
+# the shared FASTA readers (getDNA, fetchRegion) and the TATA-box analysis with its
+# repeat searches (TATAboxAnalysis, findDirectRepeats, findMirrorRepeats, findATRepeats)
+# live in BioDNA.py of the genomic-signature project (installed once with
+# "pip install -e ../genomic-signature"); they return records, and formatReport()
+# prints them the way this program always has:
+from BioDNA import (getDNA, fetchRegion, openPacked, parseRegion, TATAboxAnalysis, formatReport,
+                    findTATAboxes, scanTATAboxes, writeReportCSV)
+# ------------------------------------------------------------------------
 
-def findDirectRepeats(upstream):
-    """ This function finds all direct repeat motifs with a total length 
-    between 4 to 12 bp and their location within the substring. It also reports
-    the percentage of the sum of all direct repeats as compared to the entire 
-    substring (to the left of the TATA-box).
-    -----------------------------------------------------------------------
-    
-    """       
-    print("\n\nUPSTREAM of TATA-box")
-    print("---------------------------------------------------------")
-    print(upstream) # print everything before the TATA-box
-    printIndexing(upstream) # call to printIndexing on upstream
-    print("\n\nThe size of the upstream region is", len(upstream), "bp")
-    # the next line prints the percentage of the upstream region by accessing the public variable
-    print("The percentage of upstream region is:{:5.1f}%".format(percentageUpstream))
-    print("---------------------------------------------------------")
-    print("-Searching for Direct Repeats (DR) in the upstream region-\n")
-    
-    DRregex = re.compile(r"(.{2,6})\1") # regex for finding direct repeats
-    DRiterator = DRregex.finditer(upstream) # find all matches
-    
-    DRlengths = 0 # counter for lengths of direct repeats
+def main():
     
-    for nextDR in DRiterator: # loop through list of matches
-        DR = nextDR.group() # get the actual regex match
-        DRstart = nextDR.start() # where match begins
-        DRend = nextDR.end() # where match ends
-        DRlengths = DRlengths + (DRend - DRstart) # length of current match added to DRlengths
-        print("Found DR:", DR)
-        print("     at upstream location: [", DRstart+1, ":", DRend, "]")
-    # end of for loop
-        
-    percentageDR = (DRlengths / len(upstream)) * 100 # calculate % of direct repeat
-    print("\n\nPercent of DR's in the upstream region is:{:5.1f}%".format(percentageDR))
-    print("---------------------------------------------------------")
-    print("---------------------------------------------------------")
-#-----------------(end of findDirectRepeats(upstream))---------------------
+    parser = argparse.ArgumentParser(description="TATA-box analysis")
+    parser.add_argument("inputFile", nargs="?",
+                        help="FASTA file, optionally followed by a region (asked for when not given)")
+    parser.add_argument("--packed", action="store_true",
+                        help="read the genome from a packed 2-bit copy of it (kept beside it)")
+    parser.add_argument("--all", action="store_true",
+                        help="list every TATA-box on both strands as CSV instead of analyzing the first one")
+    parser.add_argument("--upstream", type=int, default=100, help="bases upstream of each box with --all")
+    parser.add_argument("--downstream", type=int, default=100, help="bases downstream of each box with --all")
+    parser.add_argument("-o", "--output", help="CSV file of --all (default: the standard output)")
+    arguments = parser.parse_args()
 
-def findMirrorRepeats(upstream):
-    """ This function works exactly the same way as the previous 
-    (findDirectRepeats(upstream)) except it reports all mirror repeats of
-    length 6 bp and their location within the substring.
-    -----------------------------------------------------------------------
-    
-    """ 
-    print("-Searching for Mirror Repeats (MR) in the upstream region-\n")
-        
-    MRregex = re.compile(r"(.)(.)(.)\3\2\1") # regex for mirror repeats of length 6
-    MRiterator = MRregex.finditer(upstream)
-        
-    MRlengths = 0
-        
-    for nextMR in MRiterator:
-        MR = nextMR.group()
-        MRstart = nextMR.start()
-        MRend = nextMR.end()
-        MRlengths = MRlengths + (MRend - MRstart)
-        print("Found MR:", MR)
-        print("     at upstream location: [", MRstart+1, ":", MRend, "]")
-    # end of for loop
-            
-    percentageMR = (MRlengths / len(upstream)) * 100
-    print("\n\nPercent of MR's in the upstream region is:{:5.1f}%".format(percentageMR))
-    print("---------------------------------------------------------")
-    print("---------------------------------------------------------")    
-#-----------------(end of findMirrorRepeats(upstream))---------------------
+    inputFile = arguments.inputFile or input("Enter a file name: ") # user input file name (and region)
+    fileName, region = (inputFile.rsplit(None, 1) + [""])[:2]
+    if (not (region and not os.path.isfile(inputFile) and os.path.isfile(fileName))):
+        region = "" # the whole file
+    else: # only read the region
+        try:
+            name, start, end = parseRegion(region)
+            retrievedDNA = fetchRegion(fileName, region, arguments.packed)
+        except (KeyError, ValueError) as error:
+            sys.exit("Can't read the region %s of %s: %s" % (region, fileName, error.args[0]))
 
-def findATRepeats(upstream):
-    """ This function works exactly the same way as the previous two except it 
-    reports all occurences of a favorite motif and their location within the
-    substring. The motif is any a or t followed by another a or t, repeated
-    1 to 8 times.
-    -----------------------------------------------------------------------
-    
-    """ 
-    print("-Searching for AT/TA/AA/TT runs in the upstream region-\n")
-        
-    ATregex = re.compile(r"([at][at]){1,8}") # regex for favorite motif as described
-    ATiterator = ATregex.finditer(upstream)
-        
-    ATlengths = 0
-        
-    for nextAT in ATiterator:
-        AT = nextAT.group()
-        ATstart = nextAT.start()
-        ATend = nextAT.end()
-        ATlengths = ATlengths + (ATend - ATstart)
-        print("Found favorite motif:", AT)
-        print("     at upstream location: [", ATstart+1, ":", ATend, "]")
-    # end of for loop
-            
-    percentageAT = (ATlengths / len(upstream)) * 100
-    print("\n\nPercent of AT/TA/AA/TT runs in the upstream region is:{:5.1f}%".format(percentageAT))
-    print("---------------------------------------------------------")
-#-----------------(end of findCATRepeats(upstream))---------------------
+    if (arguments.all):
+        if (region): # only the region is scanned
+            sites = findTATAboxes(retrievedDNA, arguments.upstream, arguments.downstream,
+                                  record=name, offset=start)
+        elif (not os.path.isfile(inputFile)):
+            sys.exit("No file found in current directory named: %s" % inputFile)
+        else:
+            sites = scanTATAboxes(openPacked(inputFile) if arguments.packed else inputFile,
+                                  arguments.upstream, arguments.downstream)
+        OUTPUT = open(arguments.output, "w") if arguments.output else sys.stdout
+        writeReportCSV(sites, OUTPUT) # each box is written as soon as it is found
+        if (arguments.output):
+            OUTPUT.close()
+        return
 
-def main():
-    
-    inputFile = input("Enter a file name: ") # user input file name
-    retrievedDNA = getDNA(inputFile) # call to getDNA on inputted file
-    TATAbox(retrievedDNA) # call to TATAbox function on the retrievedDNA.
+    if (region):
+        retrievedDNA = retrievedDNA.lower()
+    elif (arguments.packed and os.path.isfile(inputFile)):
+        retrievedDNA = openPacked(inputFile) # (TATAboxAnalysis() takes it as it is)
+    else:
+        retrievedDNA = getDNA(inputFile) # call to getDNA on inputted file
+    report = TATAboxAnalysis(retrievedDNA) # analyze the retrievedDNA ...
+    print(formatReport(report), end="") # ... and print the report
     
 
 #---------------------(end of main)-----------------------
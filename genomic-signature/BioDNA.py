@@ -1,8 +1,55 @@
 """BioDNA : a module of DNA processing functions """
 
- # libraries for use of regex, glob, counter, and checking file inputs:
+ # libraries for use of regex, glob, and checking file inputs:
 import re, glob, os
+ # library for the log-odds scores of position weight matrices:
+import math
+ # libraries for the memory-mapped packed sequences:
+import mmap, struct, bisect
+ # libraries for counting the symbols of genomes (the base composition itself, and
+ # the opening of compressed files that it shares, is in DNAcomposition.py):
+import array
 from collections import Counter
+from DNAcomposition import (compressionOf, openCompressed, headerLineSpans, Composition,
+                            BaseComposition, sequenceComposition, GZIP_MAGIC, XZ_MAGIC, ZSTD_MAGIC)
+import DNAcomposition
+ # library for the records of a FASTA index (and other results), and to write them as JSON:
+from collections import namedtuple
+import json
+ # library for the content hashes of the L-mer count cache:
+import hashlib
+ # libraries for writing tidy results and full count tables:
+import csv, zipfile, tempfile
+ # libraries for the optional instrumentation of the stages of an analysis:
+import sys, time, atexit, cProfile, tracemalloc
+try:
+    import resource
+except ImportError: # (not on Windows)
+    resource = None
+ # libraries for running the analysis of many genomes in parallel:
+import itertools
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+ # libraries for reading BGZF files (their blocks are inflated by threads):
+import io, zlib
+from concurrent.futures import ThreadPoolExecutor
+ # libraries for the pipeline that overlaps the stages of a batch of files:
+import threading, queue
+ # library for merging the open reading frames of the six frames in order:
+import heapq
+
+# NumPy is optional; when it is installed the heavy loops below are vectorized
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Arrow is optional too; with it the full count tables are written as Parquet
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
 
 # ******* THESE FUNCTIONS WERE ORIGINALLY MADE FOR PROGRAM ASSIGNMENT 3 ********
 
@@ -87,63 +134,37 @@ def translate( mRNA, AAtable ):
     the corresponding mRNA.
     -----------------------------------------------------------------------
     """
-    protein = ""
-    
-    startBP = 0
-    endBP   = len(mRNA)
-    
-    nextCodonStart = startBP
-    # while we don't run off the end of the sequence of mRNA, snag nucleotide codons
-    #       and build a sequence of amino acid symbols (uses the 3-letter symbols)
-    while ( nextCodonStart+3 <= endBP):
-        
-        # slice out the new RNA nucleotide triple
-        nextCodon = mRNA[nextCodonStart:nextCodonStart+3]
-        
-        # play RIBOSOME: convert an RNA nucleotide-triple to an amino acid symbol
-        nextAA = AAtable[ nextCodon ]
-        
-        # amino acid symbols come as two types of symbols (3 letter and 1 letter);
-        # in general:  triple:<one letter code>|<three letter code>
-        # e.g.,  "GAG":"E|Glu" ... thus we need to parse out which type of symbol we want
-        
-        # we want the 3-letter 'Glu' version here, so slice out from location 2 to the end
-        AAsymbol = nextAA[2:]
-        
-        # add this AA onto the end of the growing amino-acid (protein) chain
-        protein = protein + AAsymbol
-        
-        # move down to next triple
-        nextCodonStart = nextCodonStart + 3
-        
-    # end while more triples to check
+    # play RIBOSOME: convert each RNA nucleotide-triple to an amino acid symbol;
+    # amino acid symbols come as two types of symbols (3 letter and 1 letter);
+    # in general:  triple:<one letter code>|<three letter code>
+    # e.g.,  "GAG":"E|Glu" ... we want the 3-letter 'Glu' version here, so slice
+    # out from location 2 to the end. A codon that isn't in the table (one with an
+    # N, say) becomes "Xaa" instead of stopping the translation with a KeyError.
+    # The symbols are collected in a list and joined once (linear time); for
+    # whole genomes and all six frames at once see translateSixFrames().
+    protein = "".join([AAtable.get(mRNA[nextCodonStart:nextCodonStart+3], "X|Xaa")[2:]
+                       for nextCodonStart in range(0, len(mRNA) - 2, 3)])
     
     return protein
 # -------------------------(end of translate())----------------------------
 
+# the checks of a reading frame: is there a Met at the start, a stop at the end,
+# a Met somewhere other than the start, and a stop interrupting the gene?
+FrameReport = namedtuple("FrameReport", "startMet endStop innerMet interruptingStop")
+
 #--------------------------------------------------------------------------
 def readingFrameChecks ( proteins ):
-    """ This function simply checks conditions of start/stop amino acids and
-    generates output for reading frames
+    """ This function simply checks conditions of start/stop amino acids of a
+    reading frame and returns them as a FrameReport; formatReport() turns it
+    into the printout of the original program.
     -----------------------------------------------------------------------
     """
-    if (proteins[:3] == "Met"): # if there is a Met at the first 3 characters
-        print ("There is a Met at the start site.")
-    else:
-        print ("There is no Met at the start.")
-    if (proteins[-3:] == "***"): # if there is stop amino acid at the last 3 characters
-        print ("There is a stop at the end.")
-    else:
-        print ("There is no stop at the end.")
-    if (proteins.find("Met", 3) != -1): # if there is Met somehwere else after the start
-        print ("There is at least one Met somewhere other than start.")
-    else:
-        print ("There are no Mets in positions outside of the start site.")
-    # and lastly if there is not a stop amino acid at the end and there is one elsewhere:
-    if (proteins.find("***") != (len(proteins) - 3) and proteins.find("***") != -1):
-        print ("There is at least one STOP interrupting the gene.")
-    else:
-        print ("There are no interrupting STOPS.")
+    firstStop = proteins.find("***")
+    return FrameReport(proteins[:3] == "Met", # if there is a Met at the first 3 characters
+                       proteins[-3:] == "***", # if there is stop amino acid at the last 3 characters
+                       proteins.find("Met", 3) != -1, # if there is Met somehwere else after the start
+                       # and lastly if there is not a stop amino acid at the end and there is one elsewhere:
+                       firstStop != (len(proteins) - 3) and firstStop != -1)
 #-------------------(end of readingFrameChecks())--------------------------
 
 # ********* END OF FUNCTIONS ORIGINALLY MADE FOR PROGRAM ASSIGNMENT 3 **********
@@ -176,91 +197,105 @@ def getDNA(filename):
         print("No file found in current directory named: ", filename)
         return ""
     else:
-        DNA = ""
-        with open(filename) as INPUT:
-            next(INPUT)  # skip the header line
-            # now read all the other lines in the file
-            for nextLine in INPUT: 
-                nextLine = nextLine.strip()  # remove the newline
-                DNA = DNA + nextLine
-            # end for each line
+        # the records are streamed by readFASTA() (defined below) and joined once,
+        # so the time to build the string grows linearly with the size of the file;
+        # a multi-record file gives back all of its records one after another
+        DNA = "".join(sequence for header, sequence in readFASTA(filename))
                 
-            return DNA.lower() # make DNA lowercase
+        return DNA.lower() # make DNA lowercase
     # end else
 #-------------------(end of getDNA())--------------------------------------
 
+# the results of the analysis functions below are records (named tuples) rather than
+# printouts, so they can be kept, sorted or written in any format (see the renderers
+# formatReport(), writeReportCSV() and reportToJSON() further down):
+
+# one repeat motif found in a region, at the 0-based positions [start, end)
+RepeatMatch = namedtuple("RepeatMatch", "motif start end")
+# all the repeats of one kind ("DR", "MR" or "AT") in a region and the percentage
+# of the region they cover
+RepeatReport = namedtuple("RepeatReport", "kind matches percentage")
+# the first TATA-box of a region: the region, the 0-based start and end of the box
+# (both None if there is no TATA-box), the percentage of the region upstream of the
+# box (None if there is no upstream region) and the RepeatReports of the upstream
+TATAreport = namedtuple("TATAreport", "sequence start end percentageUpstream repeats")
+
+TATA_REGEX = re.compile(r"tata[at]a[at][ag]") # regex for TATA-box
+
+# the regular expressions of the repeats searched for upstream of a TATA-box
+REPEAT_PATTERNS = {"DR": re.compile(r"(.{2,6})\1"), # direct repeats of 4 to 12 bp
+                   "MR": re.compile(r"(.)(.)(.)\3\2\1"), # mirror repeats of 6 bp
+                   "AT": re.compile(r"([at][at]){1,8}")} # runs of AT/TA/AA/TT
+
 #--------------------------------------------------------------------------
 def TATAboxAnalysis(retrievedDNA):
     """ This function finds the first TATA box it finds starting from the front
-    of the sequence as well as executes all other functions of the program accordingly 
-    (other than getDNA(filename)) based on if there is an upstream region to the
-    TATA-box or not.
+    of the sequence as well as runs the repeat searches (findDirectRepeats(),
+    findMirrorRepeats() and findATRepeats()) on the upstream region of the
+    TATA-box if there is one. The results come back as a TATAreport (None if
+    there is no DNA); print(formatReport(report), end="") gives the printout of
+    the original program. To find every TATA box of a genome (on both strands)
+    use scanTATAboxes() instead. retrievedDNA is lower case (as getDNA() gives
+    it back) or a PackedSequence.
     -----------------------------------------------------------------------
     """   
-    if (retrievedDNA != ""): # if there is DNA   
-        TATAregex = re.compile(r"tata[at]a[at][ag]") # regex for TATA-box
-    
-        if (TATAregex.search(retrievedDNA)): # if the TATA-box exists:
-            TATAstart = (TATAregex.search(retrievedDNA)).start() # start of TATA-box
-            TATAend = (TATAregex.search(retrievedDNA)).end() # end of TATA-box
-            # the next line puts only the TATA-box in uppercase (all in a stored variable):
-            retrievedDNA = retrievedDNA[:TATAstart] + retrievedDNA[TATAstart:TATAend].upper() + retrievedDNA[TATAend:]
-            
-            print("\nThe size of the region being searched is", len(retrievedDNA), "bp")
-            print("=========================================================")
-            print(retrievedDNA) # print the sequence with the TATA-box in uppercase
-            
-            printIndexing(retrievedDNA) # call to printIndexing function on retrievedDNA
-                    
-            if (TATAstart != 0): # if there is an upstream region
-                print("\n\nUpstream:   [ 1 :", TATAstart, "]") # print location
-                upstream = retrievedDNA[:TATAstart] # store location of upstream
-                ''' 
-                the next 2 lines calculate the percentage of the upstream
-                region and make that public for use in outside functions
-                
-                '''
-                global percentageUpstream
-                percentageUpstream = (len(upstream)/len(retrievedDNA)*100)
-            else: # otherwise there is no upstream region to the TATA-box!
-                print("\n\nThere is no upstream region prior to TATA-box!")
-            
-            # now print the location (start to end) of TATA-box    
-            print("TATA-box:   [", TATAstart+1, ":", TATAend, "]")
-            
-            if (TATAend != len(retrievedDNA)): # if there is a downstream, print
-                print("Downstream: [", TATAend+1, ":", len(retrievedDNA), "]")
-            else: # if the end of TATA-box is at the end of the sequence also:
-                print("There is no downstream region after the TATA-box!")
-            
-            print("---------------------------------------------------------")
-            
-            # call to regex functions on upstream (these are defined below):
-            if ("upstream" in locals()): # if upstream variable exists locally
-                findDirectRepeats(upstream)
-                findMirrorRepeats(upstream)
-                findATRepeats(upstream)
-        else: # outtermost else statement in case there is no TATA-box:
-            print("There is no TATA box to locate.")
+    if (isinstance(retrievedDNA, PackedSequence)): # (the report holds the whole region)
+        retrievedDNA = str(retrievedDNA).lower()
+    if (retrievedDNA == ""): # if there is no DNA
+        return None
+
+    TATAmatch = TATA_REGEX.search(retrievedDNA) # search only once
+    if (not TATAmatch): # in case there is no TATA-box:
+        return TATAreport(retrievedDNA, None, None, None, ())
+
+    TATAstart = TATAmatch.start() # start of TATA-box
+    TATAend = TATAmatch.end() # end of TATA-box
+
+    if (TATAstart == 0): # there is no upstream region to the TATA-box!
+        return TATAreport(retrievedDNA, TATAstart, TATAend, None, ())
+
+    upstream = retrievedDNA[:TATAstart] # store location of upstream
+    percentageUpstream = (len(upstream)/len(retrievedDNA)*100)
+    # call to regex functions on upstream (these are defined below):
+    repeats = (findDirectRepeats(upstream), findMirrorRepeats(upstream), findATRepeats(upstream))
+
+    return TATAreport(retrievedDNA, TATAstart, TATAend, percentageUpstream, repeats)
 #-------------------(end of TATAboxAnalysis())-----------------------------
 
+#--------------------------------------------------------------------------
+def indexingLine(length):
+    """ This function returns the indexing (by tens) for a region of the given
+    length to help the reader verify locations (bp) of motifs: 1234567890123...
+    -----------------------------------------------------------------------
+    """    
+    return ("1234567890" * (length // 10 + 1))[:length]
+#--------------------(end of indexingLine())-------------------------------
+
 #--------------------------------------------------------------------------
 def printIndexing(string):
     """ This function prints the indexing (by tens) based on the length of the
     region to help the reader verify locations (bp) of motifs.
     -----------------------------------------------------------------------
     """    
-    nucleotideCount = 1 # start reading position 1 rather than 0
-    
-    for nucleotide in string: # for each A, T, G, or C
-        if (nucleotideCount == 10): # if count gets to 10,
-            nucleotideCount = 0 # set back to 0
-        if (nucleotideCount != 10):
-            print(nucleotideCount, end="") # don't print on a new line each time
-            nucleotideCount += 1 # advance the count
-    # end of for loop
+    print(indexingLine(len(string)), end="") # don't print on a new line
 #--------------------(end of printIndexing()-------------------------------
 
+#--------------------------------------------------------------------------
+def findRepeats(upstream, kind):
+    """ This function finds all repeat motifs of a kind ("DR", "MR" or "AT", see
+    REPEAT_PATTERNS) and their location within the substring, and returns them
+    as a RepeatReport along with the percentage of the substring they cover.
+    -----------------------------------------------------------------------
+    """       
+    matches = [RepeatMatch(nextMatch.group(), nextMatch.start(), nextMatch.end())
+               for nextMatch in REPEAT_PATTERNS[kind].finditer(upstream)]
+
+    lengths = sum(match.end - match.start for match in matches) # total length of the repeats
+    percentage = (lengths / len(upstream)) * 100 if upstream else 0.0
+
+    return RepeatReport(kind, matches, percentage)
+#-----------------(end of findRepeats())-----------------------------------
+
 #--------------------------------------------------------------------------
 def findDirectRepeats(upstream):
     """ This function finds all direct repeat motifs with a total length 
@@ -269,63 +304,19 @@ def findDirectRepeats(upstream):
     substring (to the left of the TATA-box).
     -----------------------------------------------------------------------
     """       
-    print("\n\nUPSTREAM of TATA-box")
-    print("---------------------------------------------------------")
-    print(upstream) # print everything before the TATA-box
-    printIndexing(upstream) # call to printIndexing on upstream
-    print("\n\nThe size of the upstream region is", len(upstream), "bp")
-    # the next line prints the percentage of the upstream region by accessing the public variable
-    print("The percentage of upstream region is:{:5.1f}%".format(percentageUpstream))
-    print("---------------------------------------------------------")
-    print("-Searching for Direct Repeats (DR) in the upstream region-\n")
-    
-    DRregex = re.compile(r"(.{2,6})\1") # regex for finding direct repeats
-    DRiterator = DRregex.finditer(upstream) # find all matches
-    
-    DRlengths = 0 # counter for lengths of direct repeats
-    
-    for nextDR in DRiterator: # loop through list of matches
-        DR = nextDR.group() # get the actual regex match
-        DRstart = nextDR.start() # where match begins
-        DRend = nextDR.end() # where match ends
-        DRlengths = DRlengths + (DRend - DRstart) # length of current match added to DRlengths
-        print("Found DR:", DR)
-        print("     at upstream location: [", DRstart+1, ":", DRend, "]")
-    # end of for loop
-        
-    percentageDR = (DRlengths / len(upstream)) * 100 # calculate % of direct repeat
-    print("\n\nPercent of DR's in the upstream region is:{:5.1f}%".format(percentageDR))
-    print("---------------------------------------------------------")
-    print("---------------------------------------------------------")
+    return findRepeats(upstream, "DR")
 #-----------------(end of findDirectRepeats())-----------------------------
 
 #--------------------------------------------------------------------------
 def findMirrorRepeats(upstream):
     """ This function works exactly the same way as the previous 
     (findDirectRepeats(upstream)) except it reports all mirror repeats of
-    length 6 bp and their location within the substring.
+    length 6 bp and their location within the substring. (For every repeat,
+    overlapping ones too, on whole chromosomes see findTandemRepeats() and
+    findSymmetricRepeats().)
     -----------------------------------------------------------------------
     """ 
-    print("-Searching for Mirror Repeats (MR) in the upstream region-\n")
-        
-    MRregex = re.compile(r"(.)(.)(.)\3\2\1") # regex for mirror repeats of length 6
-    MRiterator = MRregex.finditer(upstream)
-        
-    MRlengths = 0
-        
-    for nextMR in MRiterator:
-        MR = nextMR.group()
-        MRstart = nextMR.start()
-        MRend = nextMR.end()
-        MRlengths = MRlengths + (MRend - MRstart)
-        print("Found MR:", MR)
-        print("     at upstream location: [", MRstart+1, ":", MRend, "]")
-    # end of for loop
-            
-    percentageMR = (MRlengths / len(upstream)) * 100
-    print("\n\nPercent of MR's in the upstream region is:{:5.1f}%".format(percentageMR))
-    print("---------------------------------------------------------")
-    print("---------------------------------------------------------")    
+    return findRepeats(upstream, "MR")
 #-----------------(end of findMirrorRepeats())-----------------------------
 
 #--------------------------------------------------------------------------
@@ -336,154 +327,4178 @@ def findATRepeats(upstream):
     1 to 8 times.
     -----------------------------------------------------------------------
     """ 
-    print("-Searching for AT/TA/AA/TT runs in the upstream region-\n")
-        
-    ATregex = re.compile(r"([at][at]){1,8}") # regex for favorite motif as described
-    ATiterator = ATregex.finditer(upstream)
-        
-    ATlengths = 0
-        
-    for nextAT in ATiterator:
-        AT = nextAT.group()
-        ATstart = nextAT.start()
-        ATend = nextAT.end()
-        ATlengths = ATlengths + (ATend - ATstart)
-        print("Found favorite motif:", AT)
-        print("     at upstream location: [", ATstart+1, ":", ATend, "]")
-    # end of for loop
-            
-    percentageAT = (ATlengths / len(upstream)) * 100
-    print("\n\nPercent of AT/TA/AA/TT runs in the upstream region is:{:5.1f}%".format(percentageAT))
-    print("---------------------------------------------------------")
-#-----------------(end of findCATRepeats())--------------------------------
+    return findRepeats(upstream, "AT")
+#-----------------(end of findATRepeats())---------------------------------
 
 # ********* END OF FUNCTIONS ORIGINALLY MADE FOR PROGRAM ASSIGNMENT 4 **********
 
 # ******* THESE FUNCTIONS WERE ORIGINALLY MADE FOR PROGRAM ASSIGNMENT 5 ********
 
+#--------------------------------------------------------------------------
+def listFASTAfiles(inputPaths):
+    """ Returns the FASTA files (*.fna, and compressed ones such as *.fna.gz, see
+    FASTA_SUFFIXES) to analyze from a directory, a FASTA file, or a list of
+    both: the files of each directory are in alphabetical order, and paths
+    that don't exist are left out.
+    -----------------------------------------------------------------------
+    """
+    if (isinstance(inputPaths, str)):
+        inputPaths = [inputPaths]
+
+    fileList = []
+    for inputPath in inputPaths:
+        if (os.path.isdir(inputPath)): # only get the FASTA files of a directory
+            fileList += sorted(nextFile for suffix in FASTA_SUFFIXES
+                               for nextFile in glob.glob(os.path.join(glob.escape(inputPath), "*" + suffix))
+                               if os.path.isfile(nextFile))
+        elif (os.path.isfile(inputPath)):
+            fileList.append(inputPath)
+    # end for each input path
+
+    return fileList
+#-----------------------(end of listFASTAfiles())--------------------------
+
 #--------------------------------------------------------------------------
 def inputDirectoryLengths(inputDirectory):
     """ The following function goes through a given input directory and prints
-    the length of DNA found in each file (using the getDNA()) function in 
-    addition to printing the name of each file. All non-FASTA formatted files
-    are ignored.
+    the length of DNA found in each file (using the fastaRecordLengths()) function
+    in addition to printing the name of each file. All non-FASTA formatted files
+    are ignored. A single FASTA file may be given instead of a directory. The
+    lengths come from a quick count of the bases in the raw file, so the files
+    are only parsed once, by the motif stage (breakIntoMotifs()). A list of
+    (file name, length) pairs for the files found is returned, so the directory
+    doesn't have to be searched again.
     -----------------------------------------------------------------------
     """
-    if (os.path.isdir(inputDirectory)): # if the directory does exist
-        fullPath = os.path.join(inputDirectory, "*.fna") # only get .fna files
+    genomes = [] # (file name, DNA length) of each file listed
 
+    if (os.path.isfile(inputDirectory)): # just one file
+        genomes.append((inputDirectory, fastaLength(inputDirectory)))
+        print(inputDirectory, "with DNA length:", genomes[-1][1], "bp.")
+    elif (os.path.isdir(inputDirectory)): # if the directory does exist
         # put all FASTA files (*.fna) in the test directory in a list called fileList
-        fileList = glob.glob(fullPath)
+        fileList = listFASTAfiles(inputDirectory)
         
         if (fileList == []): # if the fileList is empty
             print("The directory does not contain any FASTA formatted files!")
         else:
-            fileList.sort() # put the file names in alphabetical order; easier to see
             print("The files within", inputDirectory, "are as follows:")
 
             for nextFile in fileList:
-                if (os.path.isfile(nextFile)):
-                    # ok, it is SAFE to open the file
-                    INPUT = open(nextFile, 'r')
-                    currentFile_DNALength = len(getDNA(nextFile)) # length of DNA sequence in file
-                    print(nextFile, "with DNA length:", currentFile_DNALength, "bp.")
-                    
-                    INPUT.close() # close input file
-                    
-                else:
-                    print("Sorry, there is no file called: ", nextFile)
+                currentFile_DNALength = fastaLength(nextFile) # length of DNA sequence in file
+                print(nextFile, "with DNA length:", currentFile_DNALength, "bp.")
+                genomes.append((nextFile, currentFile_DNALength))
             # end for each file in fileList
     else: # the directory does not exist
         print("The directory", inputDirectory, "does not exist!")
+
+    return genomes
 #-----------------------(end of inputDirectoryLengths())-------------------
 
 #--------------------------------------------------------------------------
-def breakIntoMotifs(inputDirectory, LmerSize, numberOfTopRankings):
+def breakIntoMotifs(inputDirectory, LmerSize, numberOfTopRankings, workers=1, outputFilename="Results.csv",
+                    canonical=False, cache=None, tidy=False, tablesFilename=None, pipelineDepth=None,
+                    manifest=None):
     """ The following function goes through a given input directory and its files
     and uses the LmerSize given through user input as well as the numberOfTopRankings
     to write the file name, total number of motifs, the given number of top ranking
     motifs with their motif name, frequency, and propotion to an output file (.csv).
+
+    inputDirectory may also be a FASTA file or a list of directories and files, and
+    LmerSize may be a list of L-mer sizes: every size is counted in the same scan
+    of each file (see countKmerSizes()) and each file then gets one block per size,
+    headed by its "L-mer size:". With more than one worker (None means one per CPU)
+    the files, and the chunks of large files, are counted in parallel processes
+    (see countFilesInParallel()); the output file is exactly the same either way.
+    With canonical set, each motif is counted together with its reverse complement
+    and listed as the first of the two in alphabetical order (both strands at once).
+    With a KmerCache, the counts of files seen before are read back from it
+    instead of being counted again (see countFiles()).
+
+    With tidy set the output file is written in long form instead, one row per
+    ranked motif (see TidyResultsWriter), and with a tablesFilename the full
+    count tables of every file are written there too (see CountTableWriter).
+
+    The files go through a pipeline (see countFiles() and prefetch()): while
+    the motifs of one file are written, those of the next are ranked, the one
+    after that is counted and the next windows of sequence are read, each stage
+    in its own thread with at most pipelineDepth (PIPELINE_DEPTH by default; 0
+    turns the pipeline off) items waiting between two stages.
+
+    With a ResultsManifest, only the files that are new or have changed since
+    the last run are analyzed; the results of the others are read back from
+    the manifest, which is then saved with the files of this run only. The
+    output file is still written whole, the same as without a manifest. (The
+    full count tables of a tablesFilename are not in the manifest, so with one
+    every file is counted again; a KmerCache spares that.)
     -----------------------------------------------------------------------
     """    
-    motifDictionary = {} # dictionary of motifs with number of occurrences
-    AllLmers = [] # list containing ALL motifs based on LmerSize given
-    
-    if (os.path.isdir(inputDirectory)): # if the directory does exist
-        fullPath = os.path.join(inputDirectory, "*.fna") # only get .fna files
+    LmerSizes = [LmerSize] if isinstance(LmerSize, int) else sorted(set(LmerSize))
 
-        # put all FASTA files (*.fna) in the test directory in a list called fileList
-        fileList = glob.glob(fullPath)
+    # put all FASTA files (*.fna) of the input directories in a list called fileList
+    fileList = listFASTAfiles(inputDirectory)
         
-        if (fileList != []): # if the fileList is not empty
-            fileList.sort() # put the file names in alphabetical order; easier to see
-
-            OUTPUT = open("Results.csv", 'w') # open file for output
-            COMMA = "," # define COMMMA for comma separated values
-
-            for nextFile in fileList: # for each file in the fileList
-                if (os.path.isfile(nextFile)):
-                    # ok, it is SAFE to open the file
-                    INPUT = open(nextFile, 'r')
-                    DNASequence = getDNA(nextFile) # use getDNA to put DNA sequence from file in variable
-                    startOfmotif = 0 # start of motif starts at the first nucleotide in DNA strand
-                    endOfmotif = LmerSize # end of motif is the size of the L-mer
-                    Lmer = DNASequence[startOfmotif:endOfmotif] # the first motif in DNA strand
-                    numberOfmotifs = len(DNASequence) - (LmerSize - 1) # the total number of motifs
-                    
-                    INPUT.close() # close input file; no longer needs to be open
-                    
-                    iterator = 0 # used for keeping track of shifting the motif in the DNA strand
-                    while (iterator != numberOfmotifs): # while the iterator isn't at the last motif
-                        AllLmers.append(Lmer.upper()) # add the uppercase motif to AllLmers list
-                        iterator += 1 # advance the iterator
-                        startOfmotif += 1 # shift the start position of the motif over one
-                        endOfmotif += 1 # shift the end position of the motif over one
-                        Lmer = DNASequence[startOfmotif:endOfmotif] # the L-mer is shifted
-                    
-                    for motif in AllLmers: # for each motif in AllLmers
-                        if (motif in motifDictionary): # if the motif is already in the dictionary:
-                            motifDictionary[motif] = motifDictionary[motif] + 1 # increment that motif's count
-                        else: # first time this motif is spotted
-                            motifDictionary[motif] = 1 # the count for that motif is 1
-                    # end for each motif in AllLmers
+    if (fileList != []): # if the fileList is not empty
+        # the results of the files that have not changed since the last run
+        unchangedFiles = {}
+        if (manifest is not None and tablesFilename is None):
+            for nextFile in fileList:
+                results = manifest.results(nextFile)
+                if (results is not None):
+                    unchangedFiles[nextFile] = results
+            print(len(fileList) - len(unchangedFiles), "of", len(fileList), "files are new or have changed")
+
+        # count every L-mer of every record in each file (see countKmerSizes() below); the
+        # files are hashed for the manifest as they are read
+        digests = {} if (manifest is not None) else None
+        countedFiles = countFiles([nextFile for nextFile in fileList if nextFile not in unchangedFiles],
+                                  LmerSizes, workers, canonical, cache, pipelineDepth, digests)
+        if (pipelineDepth is None):
+            pipelineDepth = PIPELINE_DEPTH
+
+        def rankFiles():
+            """ The next lines get the given top number of counts (indicated by the variable
+            numberOfTopRankings) from the table of counts of each L-mer size, along with their
+            according motif names. Motifs with the same count are ranked in the order in which
+            they first appear in the DNA (the order Counter.most_common gave the old dictionary
+            of motifs). The rankings are lists of (motif, count) pairs.
+            """
+            for nextFile in fileList:
+                if (nextFile in unchangedFiles): # (ranked in an earlier run)
+                    yield (nextFile,) + unchangedFiles[nextFile]
+                    continue
+                nextFile, motifTables = next(countedFiles)
+                instrumentFile(nextFile)
+                with InstrumentedStage("rank"):
+                    rankings = {LmerSize: motifTables[LmerSize].topRanked(numberOfTopRankings)
+                                for LmerSize in LmerSizes}
+                if (manifest is not None):
+                    manifest.record(nextFile, motifTables, rankings, digests.pop(nextFile, None))
+                yield nextFile, motifTables, rankings
+        # end of rankFiles()
+        rankedFiles = prefetch(rankFiles(), pipelineDepth) if pipelineDepth else rankFiles()
+
+        tablesOutput = None if tablesFilename is None else CountTableWriter(tablesFilename)
+        OUTPUT = TidyResultsWriter(outputFilename) if tidy else open(outputFilename, 'w') # open file for output
+        COMMA = "," # define COMMMA for comma separated values
+
+        for nextFile, motifTables, rankings in rankedFiles: # for each file in the fileList
+            instrumentFile(nextFile)
+            with InstrumentedStage("write"):
+                if (tablesOutput is not None):
+                    tablesOutput.add(nextFile, [motifTables[LmerSize] for LmerSize in LmerSizes])
+                for LmerSize in LmerSizes:
+                    motifTable = motifTables[LmerSize]
+                    numberOfmotifs = motifTable.total # the total number of motifs
+                    orderedDictionary = rankings[LmerSize] # (not actually a dictionary but of type list)
+                    if (tidy): # one row per ranked motif
+                        OUTPUT.add(nextFile, motifTable, numberOfTopRankings, orderedDictionary)
+                        continue
                     
-                    """ The next line "simulates" an ordered dictionary by using the built in function Counter from
-                    the collections library to collect the counts from the values in the motifDictionary and then
-                    uses the built in function .most_common to get the given top number of counts (indicated by the
-                    variable numberOfTopRankings) from the collected counts. By using this method, the top number
-                    of motif occurrences (values in the motifDictionary) along with their according motif names 
-                    (keys in the motifDictionary) can be put into the variable orderedDictionary. The variable
-                    orderedDictionary is not actually a dictionary but is of type list.
-                    """
-                    orderedDictionary = Counter(motifDictionary).most_common(numberOfTopRankings)
-                        
                     # write headers for output in output file (all cells are separated using commas)
-                    OUTPUT.write("%s%s\n%s%i\n" % ("FILE: ", nextFile, "Number of motifs: ", numberOfmotifs))
+                    OUTPUT.write("%s%s\n" % ("FILE: ", nextFile))
+                    if (len(LmerSizes) > 1): # say which L-mer size this block is for
+                        OUTPUT.write("%s%i\n" % ("L-mer size: ", LmerSize))
+                    OUTPUT.write("%s%i\n" % ("Number of motifs: ", numberOfmotifs))
                     OUTPUT.write("%s%c%s%c%s%c%s\n" % ("Rank:", COMMA, "Motif:", COMMA, "Frequency:", COMMA, "Proportion:"))
-                    
+                
                     # write dictionary contents in output file
                     currentRanking = 1 # counter used to keep track of printing ranking
                     for k, v in orderedDictionary: # for the "keys" and "values" in orderedDictionary
                         motifProportion = v / numberOfmotifs # calculate proportion of motif
                         OUTPUT.write("%i%c%s%c%i%c%f\n" % (currentRanking, COMMA, k, COMMA, v, COMMA, motifProportion))
                         currentRanking += 1 # advance the current ranking
-                            
+                        
                     OUTPUT.write("\n") # separate each file with a newline
-                    
-                    motifDictionary.clear() # clear the motif dictionary for use in the next file
-                    del AllLmers[:] # clear the AllLmers list for use in the next file
-                    
-                # end of for nextFile in fileList                       
-                    
-                else:
-                    print("Sorry, there is no file called: ", nextFile)
-            # end for each file in fileList
-        
+                # end for each L-mer size
+        # end for each file in fileList
+    
         OUTPUT.close() # close the output file 
+        if (manifest is not None):
+            manifest.save(fileList)
+        if (tablesOutput is not None):
+            tablesOutput.close()
+            print("The count tables were written to", tablesOutput.filename)
         print("The output file has been successfully created!")         
-        
-    else: # the file directory given does not exist
-        return  
 #-----------------------(end of breakIntoMotifs())------------------------
 
-# ********* END OF FUNCTIONS ORIGINALLY MADE FOR PROGRAM ASSIGNMENT 5 **********
\ No newline at end of file
+# ********* END OF FUNCTIONS ORIGINALLY MADE FOR PROGRAM ASSIGNMENT 5 **********
+
+# ********* THESE FUNCTIONS OPEN COMPRESSED FASTA FILES **************************
+
+# the names of the FASTA files found in directories: *.fna, plain or compressed
+FASTA_SUFFIXES = tuple(".fna" + compression for compression in ("", ".gz", ".bgz", ".xz", ".zst"))
+
+BGZF_THREADS = min(os.cpu_count() or 1, 8) # threads inflating the blocks of a BGZF file
+BGZF_BLOCK_DATA = 0xff00 # bases and line ends in each block written by compressBGZF()
+# the last block of a BGZF file: an empty block that marks the end of the file
+BGZF_EOF = bytes.fromhex("1f8b08040000000000ff0600424302001b0003000000000000000000")
+
+#--------------------------------------------------------------------------
+def openFASTA(filename, text=False, threads=None):
+    """ Opens a FASTA file for reading, plain or compressed (gzip, bgzip, xz,
+    or Zstandard when compression.zstd or the zstandard package is there),
+    which is told from the first bytes of the file rather than its name. The
+    file is given back as binary (or, with text set, as text) and reads like
+    the uncompressed file, seeks included; a BGZF file is inflated by
+    "threads" threads (BGZF_THREADS by default, see BgzfReader). Every reader
+    of this module opens FASTA files with it, so no genome ever has to be
+    decompressed to disk first.
+    -----------------------------------------------------------------------
+    """
+    compression = compressionOf(filename)
+    if (compression is None):
+        return open(filename) if text else open(filename, "rb")
+
+    if (compression == "bgzf"):
+        INPUT = io.BufferedReader(BgzfReader(filename, threads), 1 << 20)
+    else: # (see DNAcomposition.openCompressed())
+        INPUT = openCompressed(filename, compression)
+    return io.TextIOWrapper(INPUT) if text else INPUT
+#-------------------(end of openFASTA())-----------------------------------
+
+#--------------------------------------------------------------------------
+def readBgzfBlock(INPUT):
+    """ Reads the next block of a BGZF file as raw (still compressed) bytes;
+    b"" at the end of the file. """
+    header = INPUT.read(12)
+    if (not header):
+        return b""
+    if (len(header) < 12 or not header.startswith(GZIP_MAGIC) or not header[3] & 4):
+        raise ValueError("not a BGZF block")
+    extraLength = struct.unpack_from("<H", header, 10)[0]
+    extra = INPUT.read(extraLength)
+
+    blockSize = None # the "BC" extra field holds the size of the whole block less 1
+    position = 0
+    while (position + 4 <= len(extra)):
+        fieldLength = struct.unpack_from("<H", extra, position + 2)[0]
+        if (extra[position:position + 2] == b"BC" and fieldLength == 2):
+            blockSize = struct.unpack_from("<H", extra, position + 4)[0] + 1
+        position += 4 + fieldLength
+    if (blockSize is None):
+        raise ValueError("not a BGZF block")
+    return header + extra + INPUT.read(blockSize - 12 - extraLength)
+#-------------------(end of readBgzfBlock())-------------------------------
+
+#--------------------------------------------------------------------------
+def inflateBgzfBlock(block):
+    """ Returns the uncompressed bytes of a raw BGZF block, checking its CRC-32
+    and size (zlib works outside the GIL, so blocks inflate in parallel). """
+    extraLength = struct.unpack_from("<H", block, 10)[0]
+    data = zlib.decompress(block[12 + extraLength:-8], -15)
+    crc, size = struct.unpack_from("<II", block, len(block) - 8)
+    if (size != len(data) or crc != zlib.crc32(data)):
+        raise ValueError("corrupt BGZF block")
+    return data
+#-------------------(end of inflateBgzfBlock())----------------------------
+
+#--------------------------------------------------------------------------
+def buildGziIndex(filename, indexFilename=None):
+    """ Builds the bgzip-compatible index (.gzi) of a BGZF file: the compressed
+    and uncompressed offsets of the start of every block but the first (a count
+    and then pairs of little-endian uint64), written as filename + ".gzi".
+    Only the sizes of the blocks are read, nothing is inflated. Returns the
+    (compressed offsets, uncompressed offsets) of every block, the first too.
+    -----------------------------------------------------------------------
+    """
+    if (indexFilename is None):
+        indexFilename = filename + ".gzi"
+    compressedStarts, uncompressedStarts = [0], [0]
+    with open(filename, "rb") as INPUT:
+        while (True):
+            block = readBgzfBlock(INPUT)
+            if (not block):
+                break
+            compressedStarts.append(compressedStarts[-1] + len(block))
+            uncompressedStarts.append(uncompressedStarts[-1] + struct.unpack_from("<I", block, len(block) - 4)[0])
+    # the offsets past the last block are not the start of a block
+    compressedStarts.pop()
+    uncompressedStarts.pop()
+
+    with open(indexFilename, "wb") as OUTPUT:
+        OUTPUT.write(struct.pack("<Q", len(compressedStarts) - 1))
+        for compressedStart, uncompressedStart in zip(compressedStarts[1:], uncompressedStarts[1:]):
+            OUTPUT.write(struct.pack("<QQ", compressedStart, uncompressedStart))
+    return compressedStarts, uncompressedStarts
+#-------------------(end of buildGziIndex())-------------------------------
+
+#--------------------------------------------------------------------------
+def loadGziIndex(filename):
+    """ Returns the (compressed offsets, uncompressed offsets) of the blocks of a
+    BGZF file from its .gzi index, building the index first if there is none
+    or the file has changed since it was built.
+    -----------------------------------------------------------------------
+    """
+    indexFilename = filename + ".gzi"
+    if (not os.path.isfile(indexFilename) or os.path.getmtime(indexFilename) < os.path.getmtime(filename)):
+        return buildGziIndex(filename)
+    with open(indexFilename, "rb") as INPUT:
+        count = struct.unpack("<Q", INPUT.read(8))[0]
+        offsets = struct.unpack("<%iQ" % (2 * count), INPUT.read(16 * count))
+    return [0] + list(offsets[0::2]), [0] + list(offsets[1::2])
+#-------------------(end of loadGziIndex())--------------------------------
+
+#--------------------------------------------------------------------------
+class BgzfReader(io.RawIOBase):
+    """ Reads a BGZF (bgzip) file as its uncompressed bytes.
+
+    A BGZF file is a series of gzip blocks of at most 64 KB each, so the blocks
+    can be inflated apart: the raw blocks are read ahead in order and inflated
+    by a pool of threads (up to four blocks per thread are in flight), then
+    given back in order. Seeking (to an uncompressed offset) uses the .gzi index
+    of the file (see loadGziIndex()) to jump straight to the block holding it.
+    Wrap it in io.BufferedReader for readline() and iteration (openFASTA()
+    does).
+    -----------------------------------------------------------------------
+    """
+
+    def __init__(self, filename, threads=None):
+        super().__init__()
+        self.filename = filename
+        self.threads = threads or BGZF_THREADS
+        self.index = None # (compressed, uncompressed offsets) of the blocks, read on the first seek
+        self._file = open(filename, "rb")
+        self._pool = ThreadPoolExecutor(self.threads) if (self.threads > 1) else None
+        self._pending = deque() # the blocks read ahead (futures, or bytes without a pool)
+        self._atEnd = False # have all the raw blocks been read?
+        self._block = b"" # the uncompressed block being read
+        self._blockPosition = 0 # where the next byte is in _block
+        self._position = 0 # uncompressed offset of the next byte
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def _nextBlock(self):
+        # read more raw blocks ahead, then make the next one the current block;
+        # returns False at the end of the file
+        while (not self._atEnd and len(self._pending) < 4 * self.threads):
+            block = readBgzfBlock(self._file)
+            if (not block):
+                self._atEnd = True
+            elif (self._pool is not None):
+                self._pending.append(self._pool.submit(inflateBgzfBlock, block))
+            else:
+                self._pending.append(inflateBgzfBlock(block))
+        if (not self._pending):
+            return False
+        block = self._pending.popleft()
+        self._block = block if isinstance(block, bytes) else block.result()
+        self._blockPosition = 0
+        return True
+
+    def readinto(self, buffer):
+        while (self._blockPosition >= len(self._block)): # (blocks may be empty)
+            if (not self._nextBlock()):
+                return 0
+        size = min(len(buffer), len(self._block) - self._blockPosition)
+        buffer[:size] = self._block[self._blockPosition:self._blockPosition + size]
+        self._blockPosition += size
+        self._position += size
+        return size
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if (whence == io.SEEK_CUR):
+            offset += self._position
+        elif (whence != io.SEEK_SET):
+            raise io.UnsupportedOperation("BGZF files can only be seeked from the start")
+        if (self.index is None):
+            self.index = loadGziIndex(self.filename)
+        compressedStarts, uncompressedStarts = self.index
+
+        block = max(bisect.bisect_right(uncompressedStarts, offset) - 1, 0)
+        for pending in self._pending: # (the blocks read ahead are dropped)
+            if (not isinstance(pending, bytes)):
+                pending.cancel()
+        self._pending.clear()
+        self._file.seek(compressedStarts[block])
+        self._atEnd = False
+        self._block, self._blockPosition = b"", 0
+        skip = offset - uncompressedStarts[block] # bytes of the block before the offset
+        while (skip > 0 and self._nextBlock()): # (past the end, the offset is the end)
+            self._blockPosition = min(skip, len(self._block))
+            skip -= self._blockPosition
+        self._position = offset - skip
+        return self._position
+
+    def tell(self):
+        return self._position
+
+    def close(self):
+        if (not self.closed):
+            if (self._pool is not None):
+                for pending in self._pending:
+                    pending.cancel()
+                self._pool.shutdown(wait=True)
+            self._file.close()
+        super().close()
+#-------------------(end of class BgzfReader)------------------------------
+
+#--------------------------------------------------------------------------
+def deflateBgzfBlock(data, level=6):
+    """ Returns the raw BGZF block of up to 64 KB of data. """
+    compressor = zlib.compressobj(level, zlib.DEFLATED, -15)
+    deflated = compressor.compress(data) + compressor.flush()
+    # a gzip header with the "BC" extra field holding the block size less 1
+    return (struct.pack("<4BI2BH2sHH", 0x1f, 0x8b, 8, 4, 0, 0, 0xff, 6, b"BC", 2, len(deflated) + 25) +
+            deflated + struct.pack("<II", zlib.crc32(data), len(data)))
+#-------------------(end of deflateBgzfBlock())----------------------------
+
+#--------------------------------------------------------------------------
+def compressBGZF(filename, outputFilename=None, level=6, threads=None):
+    """ Compresses a file with BGZF, like bgzip (to filename + ".gz" by default),
+    and writes its .gzi index, so that the file can be read in parallel and
+    fetched from at random (see openFASTA() and fetch()). The blocks are
+    deflated by "threads" threads (BGZF_THREADS by default). Returns the name
+    of the compressed file.
+    -----------------------------------------------------------------------
+    """
+    if (outputFilename is None):
+        outputFilename = filename + ".gz"
+    threads = threads or BGZF_THREADS
+    with open(filename, "rb") as INPUT, open(outputFilename, "wb") as OUTPUT, \
+         ThreadPoolExecutor(threads) as pool:
+        while (True):
+            batch = [data for data in (INPUT.read(BGZF_BLOCK_DATA) for block in range(4 * threads)) if data]
+            if (not batch):
+                break
+            OUTPUT.writelines(pool.map(deflateBgzfBlock, batch, [level] * len(batch)))
+        OUTPUT.write(BGZF_EOF)
+    buildGziIndex(outputFilename)
+    return outputFilename
+#-------------------(end of compressBGZF())--------------------------------
+
+# ********* END OF FUNCTIONS THAT OPEN COMPRESSED FASTA FILES ********************
+
+# ********* THESE FUNCTIONS READ LARGE (AND MULTI-RECORD) FASTA FILES **********
+
+#--------------------------------------------------------------------------
+def removeWhitespace(text):
+    """ Returns text without its newlines (and any other spaces or tabs). """
+    text = text.replace("\n", "")
+    if ("\r" in text or " " in text or "\t" in text):
+        text = text.replace("\r", "").replace(" ", "").replace("\t", "")
+    return text
+#-------------------(end of removeWhitespace())----------------------------
+
+#--------------------------------------------------------------------------
+def readFASTApieces(filename, blockSize=1 << 20, digest=None):
+    """ Generator that streams a FASTA file as (header, piece) pairs: a header
+    line gives back (header, None) and the sequence that follows it is given back
+    as one or more (None, piece) pairs with the newlines removed.
+
+    The file is read in blocks of about blockSize characters that always end on
+    a line, so almost all of the file never has to be split into lines. Blank
+    lines and ";" comment lines are skipped and the case of the sequence is kept.
+    Compressed files are read as they are (see openFASTA()). A hashlib digest
+    given is updated with the text of the file as it is read (see textHash()).
+    -----------------------------------------------------------------------
+    """
+    with openFASTA(filename, text=True) as INPUT:
+        while (True):
+            block = INPUT.read(blockSize)
+            if (not block):
+                break
+            if (not block.endswith("\n")):
+                block += INPUT.readline() # finish the last line of the block
+            if (digest is not None):
+                digest.update(block.encode("utf-8", "surrogatepass"))
+
+            # the sequence between the header (and comment) lines of the block has
+            # its line ends removed in one go instead of line by line
+            position = 0
+            for lineStart, lineEnd in headerLineSpans(block):
+                piece = removeWhitespace(block[position:lineStart])
+                if (piece):
+                    yield None, piece
+                if (block[lineStart] == ">"): # a new record starts here
+                    yield block[lineStart + 1:lineEnd].strip(), None
+                position = lineEnd
+            piece = removeWhitespace(block[position:])
+            if (piece):
+                yield None, piece
+        # end while there are blocks to read
+#-------------------(end of readFASTApieces())-----------------------------
+
+#--------------------------------------------------------------------------
+def readFASTAbytes(filename, blockSize=1 << 22):
+    """ Generator that streams the sequence of all records of a FASTA file as
+    raw bytes, about blockSize at a time, with the header, comment and blank
+    lines and the line ends left out (case kept); see
+    DNAcomposition.readFASTAbytes(). The file is opened with openFASTA().
+    -----------------------------------------------------------------------
+    """
+    return DNAcomposition.readFASTAbytes(filename, blockSize, openFASTA)
+#-------------------(end of readFASTAbytes())------------------------------
+
+#--------------------------------------------------------------------------
+def fastaRecordLengths(filename, blockSize=1 << 20):
+    """ Returns a list of (name, length) pairs, one for each record of a FASTA
+    file, where name is the first word of the header.
+
+    If the file has an up-to-date FASTA index (.fai, see buildFastaIndex()) the
+    lengths are simply read from it. Otherwise this is a quick pass that never
+    builds the sequence: the raw bytes of the file are read in blocks and the
+    bases between the header lines are counted as the size of the block less
+    its line ends (and any spaces or tabs).
+    -----------------------------------------------------------------------
+    """
+    if (isIndexCurrent(filename)):
+        return [(record.name, record.length) for record in loadFastaIndex(filename).values()]
+
+    records = [] # [name, length] of each record
+
+    with openFASTA(filename) as INPUT:
+        while (True):
+            block = INPUT.read(blockSize)
+            if (not block):
+                break
+            if (not block.endswith(b"\n")):
+                block += INPUT.readline() # finish the last line of the block
+
+            position = 0
+            for lineStart, lineEnd in headerLineSpans(block):
+                if (records or lineStart > position):
+                    if (not records): # sequence before the first header
+                        records.append(["", 0])
+                    records[-1][1] += countBases(block[position:lineStart])
+                if (block[lineStart] == ord(">")): # a new record starts here
+                    header = block[lineStart + 1:lineEnd].decode("latin-1").split()
+                    records.append([header[0] if header else "", 0])
+                position = lineEnd
+            if (position < len(block)):
+                if (not records):
+                    records.append(["", 0])
+                records[-1][1] += countBases(block[position:])
+        # end while there are blocks to read
+
+    return [tuple(record) for record in records]
+#-------------------(end of fastaRecordLengths())--------------------------
+
+#--------------------------------------------------------------------------
+def fastaLength(filename):
+    """ Returns the total number of bases in all records of a FASTA file. """
+    return sum(length for name, length in fastaRecordLengths(filename))
+#-------------------(end of fastaLength())---------------------------------
+
+#--------------------------------------------------------------------------
+def countBases(rawBytes):
+    """ Returns the number of bases in raw sequence lines (their size less the
+    line ends, spaces and tabs).
+    """
+    bases = len(rawBytes) - rawBytes.count(b"\n")
+    for whitespace in (b"\r", b" ", b"\t"): # (rare, so only counted when they are there)
+        if (whitespace in rawBytes):
+            bases -= rawBytes.count(whitespace)
+    return bases
+#-------------------(end of countBases())----------------------------------
+
+#--------------------------------------------------------------------------
+def readFASTA(filename):
+    """ Generator that streams the records of a FASTA file one at a time.
+
+    Each record is given back as a (header, sequence) pair, where header is the
+    text of the ">" line (without the ">") and sequence is all of the lines up
+    to the next header joined together. The pieces of a record are collected in
+    a list and joined once, so reading a record takes linear time. Blank lines
+    and ";" comment lines are skipped and the case of the sequence is kept.
+
+    for header, sequence in readFASTA("assembly.fna"):
+        print(header, len(sequence))
+    -----------------------------------------------------------------------
+    """
+    header = None # header of the record being read (None before the first one)
+    pieces = [] # pieces of sequence of the record being read
+
+    for nextHeader, piece in readFASTApieces(filename):
+        if (nextHeader is not None): # a new record starts here
+            if (header is not None or pieces): # give back the previous record
+                yield (header or ""), "".join(pieces)
+            header = nextHeader
+            pieces = []
+        else:
+            pieces.append(piece)
+    # end for each piece
+
+    if (header is not None or pieces): # give back the last record
+        yield (header or ""), "".join(pieces)
+#-------------------(end of readFASTA())-----------------------------------
+
+#--------------------------------------------------------------------------
+def readFASTAwindows(filename, windowSize, overlap=0, digest=None):
+    """ Generator that streams fixed-size windows of every record in a FASTA file.
+
+    Each window is given back as a (header, start, window) triple, where start is
+    the 0-based position of the window within its record. Consecutive windows of
+    a record share "overlap" bases (use L-1 when counting L-mers so that no L-mer
+    is lost or counted twice); the last window of a record may be shorter. At most
+    about two windows of sequence are held in memory at once, so this works on
+    chromosomes that are much larger than the memory of the machine. digest is
+    that of readFASTApieces().
+    -----------------------------------------------------------------------
+    """
+    if (windowSize <= overlap):
+        raise ValueError("windowSize must be larger than the overlap")
+
+    step = windowSize - overlap # distance between the starts of two windows
+
+    header = None
+    pieces = [] # pieces not yet given back in a window
+    buffered = 0 # number of bases in pieces
+    start = 0 # position in the record of pieces[0]
+    emitted = False # has the current record given back a window yet?
+
+    for nextHeader, piece in readFASTApieces(filename, max(windowSize, 1 << 16), digest):
+        if (nextHeader is not None):
+            # give back what is left of the previous record
+            if (pieces and (not emitted or buffered > overlap)):
+                yield (header or ""), start, "".join(pieces)
+            header = nextHeader
+            pieces, buffered, start, emitted = [], 0, 0, False
+            continue
+
+        pieces.append(piece)
+        buffered += len(piece)
+
+        if (buffered >= windowSize): # enough bases for at least one window
+            buffer = "".join(pieces)
+            offset = 0 # where the next window starts within buffer
+            while (buffered - offset >= windowSize):
+                yield (header or ""), start, buffer[offset:offset+windowSize]
+                emitted = True
+                offset += step
+                start += step
+            pieces = [buffer[offset:]]
+            buffered = buffered - offset
+    # end for each piece
+
+    if (pieces and (not emitted or buffered > overlap)):
+        yield (header or ""), start, "".join(pieces)
+#-------------------(end of readFASTAwindows())----------------------------
+
+# ********* END OF FUNCTIONS THAT READ LARGE (AND MULTI-RECORD) FASTA FILES ******
+
+# ********* THESE FUNCTIONS STORE GENOMES AS PACKED 2-BIT SEQUENCES **************
+
+PACKED_MAGIC = b"BioDNA2b" # first 8 bytes of every packed sequence file
+PACKED_HEADER = struct.Struct("<8sQQQ") # magic, length, number of masked runs, offset of the runs
+PACKED_RUN = struct.Struct("<QQQ") # start, length and symbol of one masked run
+PACKED_CHUNK_SIZE = 1 << 22 # bases decoded at a time when a whole packed sequence is analyzed
+# where packed files go when the directory of the FASTA file can't be written to
+PACKED_CACHE = os.path.join(os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"), "BioDNA")
+
+# A, C, G and T become the 2-bit codes 0, 1, 2 and 3; anything else is stored as
+# a 0 in the packed bases and restored from the masked runs
+BASE_CODES = str.maketrans({chr(i): "\x00" for i in range(256)})
+BASE_CODES.update(str.maketrans("ACGTacgt", "\x00\x01\x02\x03\x00\x01\x02\x03"))
+# every possible byte of packed bases turned back into its four bases
+PACKED_BYTES = ["".join("ACGT"[(byte >> shift) & 3] for shift in (6, 4, 2, 0)) for byte in range(256)]
+# every string of four 2-bit codes turned into its packed byte
+PACKING_TABLE = {"".join(map(chr, (a, b, c, d))): (a << 6) | (b << 4) | (c << 2) | d
+                 for a in range(4) for b in range(4) for c in range(4) for d in range(4)}
+# complements of the IUPAC symbols (used for the reverse complement)
+IUPAC_COMPLEMENT = str.maketrans("ACGTUMRWSYKVHDBNacgtumrwsykvhdbn", "TGCAAKYWSRMBDHVNtgcaakywsrmbdhvn")
+
+#--------------------------------------------------------------------------
+def packBases(bases):
+    """ Packs a string of bases (its length a multiple of 4 unless it is the last
+    piece of a sequence) into bytes holding four 2-bit codes each; the first base
+    is kept in the two highest bits.
+    -----------------------------------------------------------------------
+    """
+    codes = bases.translate(BASE_CODES)
+    if (len(codes) % 4): # pad the last byte with A's
+        codes += "\x00" * (4 - len(codes) % 4)
+
+    if (np is not None):
+        quads = np.frombuffer(codes.encode("latin-1"), dtype=np.uint8).reshape(-1, 4)
+        return ((quads[:, 0] << 6) | (quads[:, 1] << 4) | (quads[:, 2] << 2) | quads[:, 3]).tobytes()
+    return bytes(map(PACKING_TABLE.__getitem__, (codes[i:i+4] for i in range(0, len(codes), 4))))
+#-------------------(end of packBases())-----------------------------------
+
+#--------------------------------------------------------------------------
+def packFASTA(filename, packedFilename=None, recordName=None, chunkSize=1 << 22):
+    """ Streams one record of a FASTA file into a packed 2-bit sequence file and
+    returns the name of the packed file.
+
+    The record is the first one in the file unless recordName (the first word of
+    its header) is given. Bases are stored four to a byte, and every run of
+    symbols other than A, C, G or T (N's, IUPAC codes, gaps) is kept in a small
+    run-length mask after the bases, so nothing about the sequence is lost except
+    its case. The name of the record (the first word of its header) is kept
+    after the mask. The default packed file name is the FASTA file name plus
+    ".pk2".
+    -----------------------------------------------------------------------
+    """
+    if (packedFilename is None):
+        packedFilename = filename + ".pk2"
+    chunkSize -= chunkSize % 4 # keep every chunk a whole number of packed bytes
+
+    ambiguousRegex = re.compile(r"([^ACGTacgt])\1*") # runs of one symbol that isn't A, C, G or T
+    runs = [] # [start, length, symbol] of each masked run
+    length = 0 # number of bases packed so far
+    found = False # has the record been found yet?
+    name = "" # of the record packed
+
+    with open(packedFilename, "wb") as OUTPUT:
+        OUTPUT.write(PACKED_HEADER.pack(PACKED_MAGIC, 0, 0, 0)) # filled in at the end
+
+        for header, start, window in readFASTAwindows(filename, chunkSize):
+            if (start == 0): # the first window of a record
+                if (found): # the wanted record is finished
+                    break
+                name = header.split()[0] if header.split() else ""
+                found = (recordName is None or name == recordName)
+            if (not found):
+                continue
+
+            for nextRun in ambiguousRegex.finditer(window):
+                symbol = ord(nextRun.group(1).upper())
+                runStart = start + nextRun.start()
+                if (runs and runs[-1][0] + runs[-1][1] == runStart and runs[-1][2] == symbol):
+                    runs[-1][1] += nextRun.end() - nextRun.start() # run continues from the last chunk
+                else:
+                    runs.append([runStart, nextRun.end() - nextRun.start(), symbol])
+
+            OUTPUT.write(packBases(window))
+            length += len(window)
+        # end for each window
+
+        if (recordName is not None and not found):
+            OUTPUT.close()
+            os.remove(packedFilename) # (or the next openPacked() would take it for the record)
+            raise KeyError("no record named %s in %s" % (recordName, filename))
+
+        runsOffset = OUTPUT.tell()
+        for run in runs:
+            OUTPUT.write(PACKED_RUN.pack(*run))
+        OUTPUT.write(name.encode("utf-8"))
+        OUTPUT.seek(0)
+        OUTPUT.write(PACKED_HEADER.pack(PACKED_MAGIC, length, len(runs), runsOffset))
+
+    return packedFilename
+#-------------------(end of packFASTA())-----------------------------------
+
+#--------------------------------------------------------------------------
+def openPacked(filename, recordName=None, packedDirectory=None):
+    """ Returns a PackedSequence for a FASTA file, packing it first only if there
+    is no packed file yet or the FASTA file has changed since it was packed.
+    Reopening an already packed genome only maps the file, so it costs nothing.
+
+    The packed file is kept in packedDirectory when it is given. Otherwise it
+    goes beside the FASTA file, or, when that directory can't be written to,
+    in PACKED_CACHE under a name that holds a hash of the full path of the
+    FASTA file (so genomes of the same name in different directories don't
+    share it).
+    -----------------------------------------------------------------------
+    """
+    packedName = os.path.basename(filename) + ("" if recordName is None else "." + recordName) + ".pk2"
+    directory = os.path.dirname(os.path.abspath(filename))
+    if (packedDirectory is None and not os.access(directory, os.W_OK)):
+        packedDirectory = PACKED_CACHE
+        packedName = "%s.%s" % (hashlib.sha1(os.path.abspath(filename).encode("utf-8")).hexdigest()[:16], packedName)
+    if (packedDirectory is not None):
+        os.makedirs(packedDirectory, exist_ok=True)
+        directory = packedDirectory
+    packedFilename = os.path.join(directory, packedName)
+
+    if (not os.path.isfile(packedFilename) or
+            os.path.getmtime(packedFilename) < os.path.getmtime(filename)):
+        packFASTA(filename, packedFilename, recordName)
+    return PackedSequence(packedFilename)
+#-------------------(end of openPacked())----------------------------------
+
+#--------------------------------------------------------------------------
+class PackedSequence:
+    """ A DNA sequence stored four bases to a byte in a memory-mapped file.
+
+    Only the pages that are actually read are brought into memory, so genomes
+    several times larger than the memory of the machine can be sliced and
+    scanned. len(), indexing and slicing (which give back upper-case strings),
+    str(), reverseComplement() and chunks() are supported. name is the name
+    of the record that was packed.
+
+    A PackedSequence can be given wherever a whole sequence is analyzed:
+    countKmers(), countKmerSizes(), sequenceComposition(), TATAboxAnalysis()
+    and scanTATAboxes() go through it PACKED_CHUNK_SIZE bases at a time.
+
+    genome = BioDNA.openPacked("megavirus_chiliensis.fna")
+    promoter = genome[1000:1100]
+    table = BioDNA.countKmers(genome, 8)
+    -----------------------------------------------------------------------
+    """
+    __slots__ = ("filename", "name", "length", "runStarts", "runs", "_file", "_map")
+
+    def __init__(self, filename):
+        self.filename = filename
+        self._file = open(filename, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, self.length, numberOfRuns, runsOffset = PACKED_HEADER.unpack_from(self._map, 0)
+        if (magic != PACKED_MAGIC):
+            self.close()
+            raise ValueError("%s is not a packed sequence file" % filename)
+
+        self.runs = [PACKED_RUN.unpack_from(self._map, runsOffset + i * PACKED_RUN.size)
+                     for i in range(numberOfRuns)]
+        self.runStarts = [run[0] for run in self.runs] # for binary searches of the runs
+        self.name = self._map[runsOffset + numberOfRuns * PACKED_RUN.size:].decode("utf-8")
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exception):
+        self.close()
+
+    def __len__(self):
+        return self.length
+
+    def __str__(self):
+        return self.bases(0, self.length)
+
+    def __repr__(self):
+        return "PackedSequence(%r, length=%i)" % (self.filename, self.length)
+
+    def __getitem__(self, index):
+        if (isinstance(index, slice)):
+            start, end, step = index.indices(self.length)
+            if (step == 1):
+                return self.bases(start, end)
+            positions = range(start, end, step)
+            if (not positions):
+                return ""
+            low = min(positions[0], positions[-1]) # region that holds every position
+            region = self.bases(low, max(positions[0], positions[-1]) + 1)
+            return region[positions[0] - low::step][:len(positions)]
+        if (index < 0):
+            index += self.length
+        if (not 0 <= index < self.length):
+            raise IndexError("PackedSequence index out of range")
+        return self.bases(index, index + 1)
+
+    def bases(self, start, end):
+        """ Returns the bases from start up to (not including) end as an
+        upper-case string, with the masked runs put back in.
+        """
+        start, end = max(start, 0), min(end, self.length)
+        if (start >= end):
+            return ""
+
+        firstByte, lastByte = start // 4, (end + 3) // 4
+        dataOffset = PACKED_HEADER.size
+        packed = self._map[dataOffset + firstByte:dataOffset + lastByte]
+        if (np is not None):
+            unpacked = PACKED_ARRAY[np.frombuffer(packed, dtype=np.uint8)].tobytes().decode("ascii")
+        else:
+            unpacked = "".join(map(PACKED_BYTES.__getitem__, packed))
+        bases = unpacked[start - 4 * firstByte:end - 4 * firstByte]
+
+        # put back any masked runs that overlap the region
+        runIndex = max(bisect.bisect_right(self.runStarts, start) - 1, 0)
+        if (runIndex < len(self.runs) and self.runs[runIndex][0] < end):
+            pieces = []
+            position = start
+            while (runIndex < len(self.runs) and self.runs[runIndex][0] < end):
+                runStart, runLength, symbol = self.runs[runIndex]
+                runStart, runEnd = max(runStart, start), min(runStart + runLength, end)
+                if (runStart < runEnd):
+                    pieces.append(bases[position - start:runStart - start])
+                    pieces.append(chr(symbol) * (runEnd - runStart))
+                    position = runEnd
+                runIndex += 1
+            pieces.append(bases[position - start:])
+            bases = "".join(pieces)
+
+        return bases
+
+    def reverseComplement(self, start=0, end=None):
+        """ Returns the reverse complement of the bases from start to end. """
+        if (end is None):
+            end = self.length
+        return self.bases(start, end).translate(IUPAC_COMPLEMENT)[::-1]
+
+    def chunks(self, chunkSize, overlap=0):
+        """ Generator of (start, bases) chunks that covers the whole sequence,
+        consecutive chunks sharing "overlap" bases (like readFASTAwindows()).
+        """
+        if (chunkSize <= overlap):
+            raise ValueError("chunkSize must be larger than the overlap")
+        start = 0
+        while (True):
+            yield start, self.bases(start, start + chunkSize)
+            if (start + chunkSize >= self.length):
+                break
+            start += chunkSize - overlap
+#-------------------(end of class PackedSequence)--------------------------
+
+if (np is not None):
+    # the same table as PACKED_BYTES, as an array that NumPy can index with packed bytes
+    PACKED_ARRAY = np.array([list(quad.encode("ascii")) for quad in PACKED_BYTES], dtype=np.uint8)
+
+# ********* END OF FUNCTIONS THAT STORE GENOMES AS PACKED 2-BIT SEQUENCES ********
+
+# ********* THESE FUNCTIONS COUNT L-MERS WITH A ROLLING 2-BIT ENGINE *************
+
+DENSE_LMER_LIMIT = 10 # L-mers up to this size are counted in a flat 4**L table, larger ones in a dict
+FIRST_UNSEEN = 1 << 62 # "first position" of an L-mer that was never seen
+
+# every byte of a sequence turned into its 2-bit code; 4 marks anything that isn't A, C, G or T
+CODE_TABLE = bytes("ACGTacgt".index(chr(i)) % 4 if chr(i) in "ACGTacgt" else 4 for i in range(256))
+
+CANONICAL_TABLES = {} # L-mer size -> (canonical codes, slot of every code), see canonicalCodes()
+
+#--------------------------------------------------------------------------
+def canonicalMotif(motif):
+    """ Returns the canonical form of a motif: the smaller (in alphabetical order)
+    of the upper-case motif and its reverse complement, so that an L-mer and its
+    reverse complement, the same L-mer read on the two strands, count as one.
+    """
+    motif = motif.upper()
+    return min(motif, motif.translate(IUPAC_COMPLEMENT)[::-1])
+#-------------------(end of canonicalMotif())------------------------------
+
+#--------------------------------------------------------------------------
+def canonicalCodes(LmerSize):
+    """ Returns (codes, slots) for counting canonical L-mers in a dense table:
+    codes holds, in increasing order, the 2-bit code of every canonical L-mer
+    (one that is not larger than its reverse complement; with 2-bit codes the
+    order of the codes is the alphabetical order of the motifs), and slots
+    gives, for each of the 4**L codes, the index in codes of its canonical
+    form. There are (4**L + 4**(L/2)) / 2 canonical L-mers (the second term only
+    for even L, the reverse palindromes), a little over half of all L-mers. The
+    tables are built once per L-mer size (NumPy arrays, or lists).
+    -----------------------------------------------------------------------
+    """
+    if (LmerSize in CANONICAL_TABLES):
+        return CANONICAL_TABLES[LmerSize]
+
+    if (np is not None):
+        allCodes = np.arange(4 ** LmerSize, dtype=np.uint32)
+        reverseCodes = np.zeros(4 ** LmerSize, dtype=np.uint32)
+        for shift in range(LmerSize): # the first base of the L-mer becomes the last one
+            reverseCodes <<= 2
+            reverseCodes |= 3 - ((allCodes >> (2 * shift)) & 3)
+        codes = allCodes[allCodes <= reverseCodes]
+        slots = np.searchsorted(codes, np.minimum(allCodes, reverseCodes)).astype(np.uint32)
+    else:
+        # the reverse complement of code (prefix << 2) | base is the complement of
+        # base put in front of the reverse complement of prefix
+        reverseCodes = [0]
+        for size in range(1, LmerSize + 1):
+            reverseCodes = [((3 - base) << (2 * (size - 1))) | reverse
+                            for reverse in reverseCodes for base in range(4)]
+        codes = [code for code, reverse in enumerate(reverseCodes) if code <= reverse]
+        slots = [0] * len(reverseCodes)
+        for slot, code in enumerate(codes):
+            slots[code] = slots[reverseCodes[code]] = slot
+
+    CANONICAL_TABLES[LmerSize] = (codes, slots)
+    return codes, slots
+#-------------------(end of canonicalCodes())------------------------------
+
+#--------------------------------------------------------------------------
+class KmerTable:
+    """ The counts of every L-mer of a sequence (or of all records of a file).
+
+    L-mers made only of A, C, G and T are kept by their 2-bit code, in flat
+    arrays of 4**L counts and first positions (NumPy arrays when NumPy is
+    installed) or, for L-mers larger than DENSE_LMER_LIMIT, in dicts. The few
+    L-mers holding other symbols (N's and so on) are kept by their upper-case
+    string in "other". The first position of each L-mer is kept so that L-mers
+    with the same count are ranked by where they are first seen.
+
+    A canonical table counts each L-mer together with its reverse complement
+    (the signature of both strands at once) under the smaller of the two; its
+    dense arrays are indexed by the slots of canonicalCodes(), which makes
+    them about half as long.
+    -----------------------------------------------------------------------
+    """
+    __slots__ = ("LmerSize", "total", "counts", "first", "other", "canonical")
+
+    def __init__(self, LmerSize, canonical=False):
+        self.LmerSize = LmerSize
+        self.canonical = canonical
+        self.total = 0 # number of L-mers counted
+        self.other = {} # L-mer with a non-ACGT symbol -> [count, first position]
+        size = 4 ** LmerSize if (not canonical or LmerSize > DENSE_LMER_LIMIT) else len(canonicalCodes(LmerSize)[0])
+        if (LmerSize > DENSE_LMER_LIMIT):
+            self.counts, self.first = {}, {}
+        elif (np is not None):
+            self.counts = np.zeros(size, dtype=np.int64)
+            self.first = np.full(size, FIRST_UNSEEN, dtype=np.int64)
+        else:
+            self.counts = [0] * size
+            self.first = [FIRST_UNSEEN] * size
+
+    def isDense(self):
+        return not isinstance(self.counts, dict)
+
+    def motif(self, code):
+        """ Turns a 2-bit L-mer code back into its upper-case motif. """
+        return "".join("ACGT"[(code >> (2 * shift)) & 3] for shift in range(self.LmerSize - 1, -1, -1))
+
+    def code(self, motif):
+        """ Turns a motif of A, C, G and T into its 2-bit L-mer code. """
+        code = 0
+        for base in motif.encode("latin-1").translate(CODE_TABLE):
+            code = (code << 2) | base
+        return code
+
+    def slot(self, code):
+        """ Returns where the count of a 2-bit L-mer code is kept in a dense table. """
+        return canonicalCodes(self.LmerSize)[1][code] if self.canonical else code
+
+    def count(self, motif):
+        """ Returns how many times a motif (or, in a canonical table, the motif
+        and its reverse complement together) was counted.
+        """
+        motif = canonicalMotif(motif) if self.canonical else motif.upper()
+        if (motif in self.other):
+            return self.other[motif][0]
+        if (len(motif) != self.LmerSize or set(motif) - set("ACGT")):
+            return 0
+        if (self.isDense()):
+            return int(self.counts[self.slot(self.code(motif))])
+        return self.counts.get(self.code(motif), 0)
+
+    def addCodes(self, codes, offset=0, excluded=()):
+        """ Counts the L-mers of a NumPy array of their codes (slots, in a
+        canonical table) in a dense table (NumPy only), the L-mer at index i
+        starting at position offset + i, except those at the indexes excluded.
+
+        The counts come from one bincount. The first positions are found with
+        numpy.minimum.at over a prefix of the codes that doubles in length until
+        every L-mer new to the table has been seen; for small L that is usually
+        a small part of the sequence.
+        -----------------------------------------------------------------------
+        """
+        size = len(self.counts)
+        first = self.first
+        if (len(excluded)): # (a copy, where the excluded L-mers go to an extra slot)
+            codes = codes.astype(np.intp)
+            codes[excluded] = size
+            first = np.append(first, FIRST_UNSEEN)
+        counts = np.bincount(codes, minlength=size)[:size]
+        newCodes = (counts > 0) & (self.first == FIRST_UNSEEN) # L-mers not seen before
+        self.counts += counts
+
+        unseen = np.count_nonzero(newCodes)
+        start, prefixSize = 0, max(4 * size, 1 << 16)
+        while (unseen and start < len(codes)):
+            prefix = codes[start:start + prefixSize]
+            np.minimum.at(first, prefix, np.arange(offset + start, offset + start + len(prefix)))
+            start += len(prefix)
+            prefixSize *= 2
+            unseen = np.count_nonzero(newCodes & (first[:size] == FIRST_UNSEEN))
+        if (first is not self.first):
+            self.first[:] = first[:size]
+
+    def merge(self, table):
+        """ Adds the counts of another table of the same L-mer size to this one;
+        its first positions must already be relative to the same sequence.
+        """
+        self.total += table.total
+        if (not self.isDense()):
+            for code, count in table.counts.items():
+                self.counts[code] = self.counts.get(code, 0) + count
+                self.first[code] = min(self.first.get(code, FIRST_UNSEEN), table.first[code])
+        elif (np is not None):
+            self.counts += table.counts
+            np.minimum(self.first, table.first, out=self.first)
+        else:
+            self.counts = [a + b for a, b in zip(self.counts, table.counts)]
+            self.first = [min(a, b) for a, b in zip(self.first, table.first)]
+        for motif, (count, first) in table.other.items():
+            if (motif in self.other):
+                self.other[motif][0] += count
+                self.other[motif][1] = min(self.other[motif][1], first)
+            else:
+                self.other[motif] = [count, first]
+        return self
+
+    def topRanked(self, numberOfTopRankings):
+        """ Returns a list of (motif, count) pairs of the most frequent L-mers,
+        most frequent first; L-mers with the same count are listed in the order
+        they are first seen in the sequence (the order Counter.most_common() gave
+        the old dictionary of motifs).
+        -----------------------------------------------------------------------
+        """
+        if (numberOfTopRankings <= 0):
+            return []
+
+        if (not self.isDense()):
+            candidates = [(-count, self.first[code], code) for code, count in self.counts.items()]
+        elif (np is not None):
+            counts = self.counts
+            if (numberOfTopRankings < len(counts)):
+                # the counts of the top L-mers are found with a partial sort; every
+                # L-mer that ties with the last of them is kept for the final ordering
+                top = np.argpartition(counts, len(counts) - numberOfTopRankings)[len(counts) - numberOfTopRankings:]
+                codes = np.flatnonzero(counts >= max(counts[top].min(), 1))
+            else:
+                codes = np.flatnonzero(counts)
+            candidates = list(zip((-counts[codes]).tolist(), self.first[codes].tolist(), codes.tolist()))
+        else:
+            candidates = [(-count, self.first[code], code) for code, count in enumerate(self.counts) if count]
+
+        if (self.canonical and self.isDense()): # slots back to the codes of the canonical L-mers
+            codes = canonicalCodes(self.LmerSize)[0]
+            candidates = [(negativeCount, first, int(codes[slot])) for negativeCount, first, slot in candidates]
+        candidates += [(-count, first, motif) for motif, (count, first) in self.other.items()]
+        candidates.sort(key=lambda candidate: candidate[:2])
+
+        return [(code if isinstance(code, str) else self.motif(code), -negativeCount)
+                for negativeCount, first, code in candidates[:numberOfTopRankings]]
+#-------------------(end of class KmerTable)-------------------------------
+
+#--------------------------------------------------------------------------
+def rollKmerCodes(baseCodes, LmerSize, numberOfmotifs, reverse=False):
+    """ Returns (NumPy only) the 2-bit code of the L-mer starting at each of the
+    first numberOfmotifs positions of baseCodes, a NumPy array of the 2-bit
+    codes of bases (at least numberOfmotifs + L - 1 of them), or with reverse
+    set the code of its reverse complement.
+
+    The codes are built by doubling: the codes of the 2-mers come from those of
+    the bases, the codes of the 4-mers from those of the 2-mers, and so on, and
+    the L-mer joins the powers of 2 that L is made of, so an L-mer takes about
+    log2(L) passes over the sequence rather than L. The array is of the
+    smallest type that holds the codes (uint16 up to L = 8), which halves the
+    memory read by each pass.
+    -----------------------------------------------------------------------
+    """
+    dtype = np.uint16 if (LmerSize <= 8) else (np.uint32 if LmerSize <= 16 else np.int64)
+    power = (3 - baseCodes if reverse else baseCodes).astype(dtype) # codes of the "width"-mers
+    width = 1
+    codes, joined = None, 0 # codes of the first "joined" bases of each L-mer
+    while (True):
+        if (LmerSize & width): # join the next "width" bases to the L-mers
+            if (codes is None):
+                codes = power
+            else:
+                count = len(baseCodes) - (joined + width) + 1
+                if (reverse): # the reverse complement of the new bases comes first
+                    codes = (power[joined:joined + count] << (2 * joined)) | codes[:count]
+                else:
+                    codes = (codes[:count] << (2 * width)) | power[joined:joined + count]
+            joined += width
+        if (2 * width > LmerSize):
+            break
+        count = len(baseCodes) - 2 * width + 1
+        if (reverse):
+            power = (power[width:width + count] << (2 * width)) | power[:count]
+        else:
+            power = (power[:count] << (2 * width)) | power[width:width + count]
+        width *= 2
+    # end while there are powers of 2 left
+    return codes[:numberOfmotifs]
+#-------------------(end of rollKmerCodes())-------------------------------
+
+#--------------------------------------------------------------------------
+def countKmers(sequence, LmerSize, offset=0, table=None, canonical=False):
+    """ Counts every L-mer of a sequence (a string of any case) and returns them
+    in a KmerTable. offset is added to the positions and, when a table is given,
+    the counts are added to it (both are used for the chunks of a longer sequence).
+    See countKmerSizes() for how the counting is done.
+    -----------------------------------------------------------------------
+    """
+    tables = None if table is None else {LmerSize: table}
+    return countKmerSizes(sequence, [LmerSize], offset, tables, canonical=canonical)[LmerSize]
+#-------------------(end of countKmers())----------------------------------
+
+#--------------------------------------------------------------------------
+def countKmerSizes(sequence, LmerSizes, offset=0, tables=None, starts=None, canonical=False):
+    """ Counts the L-mers of a sequence for several L-mer sizes in one pass and
+    returns a dictionary of KmerTables keyed by L-mer size (added to "tables"
+    when it is given). offset is added to the positions, and when starts is given
+    only the L-mers starting in the first "starts" positions are counted (so that
+    overlapping chunks of a longer sequence count every L-mer exactly once).
+
+    Each base becomes a 2-bit code and the code of the largest L-mer is rolled
+    along the sequence (shifted left by 2, the new base added and masked to 2*L
+    bits), so no L-mer string is ever built. The code of each smaller L-mer comes
+    from the same rolling code: it is the low bits of the code ending at the same
+    base (or, with NumPy, the high bits of the code starting at the same base).
+    With NumPy the codes of all positions are built at once by doubling (see
+    rollKmerCodes()), the counts of each size come from a single bincount, and
+    the first positions are only looked for as far as the L-mers new to the
+    table first appear (see KmerTable.addCodes()).
+
+    With canonical set, every L-mer is counted together with its reverse
+    complement (see KmerTable). The code of the reverse complement is rolled in
+    the same pass (shifted right by 2, the complement of the new base added at
+    the top), so both strands are counted without a second scan; the smaller of
+    the two codes is the one counted.
+
+    A PackedSequence is counted in chunks of PACKED_CHUNK_SIZE bases that
+    overlap by L-1 bases, so it is never unpacked as a whole.
+    -----------------------------------------------------------------------
+    """
+    if (tables is None):
+        tables = {}
+    for LmerSize in LmerSizes:
+        if (LmerSize not in tables):
+            tables[LmerSize] = KmerTable(LmerSize, canonical)
+
+    length = len(sequence)
+    if (starts is None):
+        starts = length
+    largestSize = max(LmerSizes)
+    if (isinstance(sequence, PackedSequence)):
+        step = PACKED_CHUNK_SIZE - (largestSize - 1) # distance between two chunks
+        for start, chunk in sequence.chunks(PACKED_CHUNK_SIZE, largestSize - 1):
+            if (start >= starts):
+                break
+            countKmerSizes(chunk, LmerSizes, offset + start, tables, min(step, starts - start), canonical)
+        return tables
+    if (length - min(LmerSizes) + 1 <= 0 or starts <= 0):
+        return tables
+
+    with InstrumentedStage("extract", length):
+        data = sequence.encode("latin-1") if isinstance(sequence, str) else bytes(sequence)
+        codes = data.translate(CODE_TABLE) # 2-bit code of every base (4 if not A, C, G or T)
+        otherPositions = {} # L-mer size -> positions of the L-mers holding a 4
+
+        if (np is not None):
+            hasOtherSymbols = b"\x04" in codes
+            codes = np.frombuffer(codes, dtype=np.uint8)
+            # the code of the largest L-mer starting at every base, built at once; bases
+            # past the end of the sequence count as A's, which only matters for L-mers
+            # that are dropped anyway
+            baseCodes = np.concatenate((codes & 3, np.zeros(largestSize - 1, dtype=np.uint8)))
+            kmerCodes = rollKmerCodes(baseCodes, largestSize, length)
+            if (canonical):
+                # the reverse complement of the largest L-mer starting at every base; that
+                # of a smaller L-mer starting at the same base is in its low bits
+                reverseCodes = rollKmerCodes(baseCodes, largestSize, length, reverse=True)
+            badBases = np.flatnonzero(codes == 4) if (hasOtherSymbols) else None # (rare)
+
+    with InstrumentedStage("count", length):
+        if (np is not None):
+            for LmerSize in LmerSizes:
+                table = tables[LmerSize]
+                numberOfmotifs = min(length - (LmerSize - 1), starts)
+                if (numberOfmotifs <= 0):
+                    continue
+                table.total += numberOfmotifs
+
+                sizeCodes = kmerCodes[:numberOfmotifs]
+                if (LmerSize < largestSize):
+                    sizeCodes = sizeCodes >> (2 * (largestSize - LmerSize))
+                if (canonical):
+                    sizeCodes = np.minimum(sizeCodes, reverseCodes[:numberOfmotifs] & ((1 << (2 * LmerSize)) - 1))
+                    if (table.isDense()):
+                        sizeCodes = canonicalCodes(LmerSize)[1][sizeCodes]
+                otherStarts = () # the L-mers holding a 4 (they start up to L-1 bases before it)
+                if (badBases is not None):
+                    invalid = np.zeros(numberOfmotifs, dtype=bool)
+                    for shift in range(LmerSize):
+                        invalidStarts = badBases - shift
+                        invalid[invalidStarts[(invalidStarts >= 0) & (invalidStarts < numberOfmotifs)]] = True
+                    otherStarts = np.flatnonzero(invalid)
+                    otherPositions[LmerSize] = otherStarts.tolist()
+
+                if (table.isDense()):
+                    table.addCodes(sizeCodes, offset, otherStarts)
+                else:
+                    if (len(otherStarts)):
+                        positions = np.flatnonzero(~invalid)
+                        validCodes = sizeCodes[positions]
+                    else: # nothing but A, C, G and T (the usual case)
+                        positions = np.arange(numberOfmotifs)
+                        validCodes = sizeCodes
+                    positions += offset
+                    uniqueCodes, firstIndex, counts = np.unique(validCodes, return_index=True, return_counts=True)
+                    for code, count, first in zip(uniqueCodes.tolist(), counts.tolist(), positions[firstIndex].tolist()):
+                        if (code in table.counts):
+                            table.counts[code] += count
+                        else:
+                            table.counts[code] = count
+                            table.first[code] = first
+                # end if dense
+            # end for each L-mer size
+        else: # (the L-mers are extracted and counted in the same loop, all timed as "count")
+            sizes = [(LmerSize, tables[LmerSize], (1 << (2 * LmerSize)) - 1, tables[LmerSize].isDense(),
+                      min(length - (LmerSize - 1), starts),
+                      2 * (largestSize - LmerSize), # shift of the reverse complement of a smaller L-mer
+                      canonicalCodes(LmerSize)[1] if (canonical and tables[LmerSize].isDense()) else None)
+                     for LmerSize in LmerSizes]
+            for LmerSize, table, mask, dense, numberOfmotifs, reverseShift, slots in sizes:
+                table.total += max(numberOfmotifs, 0)
+                otherPositions[LmerSize] = []
+
+            rollingMask = (1 << (2 * largestSize)) - 1
+            topShift = 2 * (largestSize - 1) # where the complement of a new base goes
+            kmerCode = 0 # code of the largest L-mer ending at the current base
+            reverseCode = 0 # code of its reverse complement (only kept up when canonical)
+            run = 0 # number of valid bases ending at the current base
+            end = 0 # position just past the current base
+            for base in codes:
+                if (base < 4):
+                    kmerCode = ((kmerCode << 2) | base) & rollingMask
+                    if (canonical):
+                        reverseCode = (reverseCode >> 2) | ((3 - base) << topShift)
+                    run += 1
+                else:
+                    run = 0
+                end += 1
+
+                for LmerSize, table, mask, dense, numberOfmotifs, reverseShift, slots in sizes:
+                    start = end - LmerSize # start of the L-mer ending at the current base
+                    if (start < 0 or start >= numberOfmotifs):
+                        continue
+                    if (run >= LmerSize):
+                        code = kmerCode & mask
+                        if (canonical):
+                            code = min(code, reverseCode >> reverseShift)
+                            if (slots is not None):
+                                code = slots[code]
+                        if (dense):
+                            table.counts[code] += 1
+                            if (table.first[code] == FIRST_UNSEEN):
+                                table.first[code] = start + offset
+                        elif (code in table.counts):
+                            table.counts[code] += 1
+                        else:
+                            table.counts[code] = 1
+                            table.first[code] = start + offset
+                    else:
+                        otherPositions[LmerSize].append(start)
+                # end for each L-mer size
+            # end for each base
+
+        for LmerSize, positions in otherPositions.items(): # L-mers holding N's (and other symbols)
+            other = tables[LmerSize].other
+            for position in positions:
+                motif = data[position:position + LmerSize].upper().decode("latin-1")
+                if (canonical):
+                    motif = canonicalMotif(motif)
+                if (motif in other):
+                    other[motif][0] += 1
+                else:
+                    other[motif] = [1, position + offset]
+
+    return tables
+#-------------------(end of countKmerSizes())------------------------------
+
+#--------------------------------------------------------------------------
+def countKmersInChunks(chunks, LmerSize, canonical=False):
+    """ Counts the L-mers of a sequence given as (start, chunk) pieces that
+    overlap by L-1 bases (from PackedSequence.chunks() for example), so the
+    whole sequence never has to be in memory at once.
+    -----------------------------------------------------------------------
+    """
+    table = KmerTable(LmerSize, canonical)
+    for start, chunk in chunks:
+        countKmers(chunk, LmerSize, start, table, canonical)
+    return table
+#-------------------(end of countKmersInChunks())--------------------------
+
+#--------------------------------------------------------------------------
+def kmerChunks(filename, LmerSize, windowSize=1 << 22, digest=None):
+    """ Generator of the (position, window, starts) chunks of every record of a
+    FASTA file to count L-mers in (L-mers of up to LmerSize bases).
+
+    Windows of a record overlap by L-1 bases and none spans two records.
+    Positions (used to rank ties) run on from one record to the next, in the
+    order of the file. starts is the number of L-mer start positions that belong
+    to the window: None for the last window of a record, otherwise the distance
+    to the next window, so that smaller L-mers in the overlap are not counted
+    twice (see countKmerSizes()). digest is that of readFASTApieces().
+    -----------------------------------------------------------------------
+    """
+    windowSize = max(windowSize, LmerSize)
+    step = windowSize - (LmerSize - 1) # distance between two windows of a record
+    recordOffset = 0 # position of the current record within the whole file
+    previous = None # the window before the current one is held back for one step
+
+    for header, start, window in readFASTAwindows(filename, windowSize, LmerSize - 1, digest):
+        if (previous is not None):
+            previousStart, previousWindow = previous
+            if (start == 0): # the previous window was the last of its record
+                yield recordOffset + previousStart, previousWindow, None
+                recordOffset += previousStart + len(previousWindow)
+            else:
+                yield recordOffset + previousStart, previousWindow, step
+        previous = (start, window)
+    # end for each window
+
+    if (previous is not None):
+        yield recordOffset + previous[0], previous[1], None
+#-------------------(end of kmerChunks())----------------------------------
+
+#--------------------------------------------------------------------------
+def countFASTAkmers(filename, LmerSize, windowSize=1 << 22, canonical=False):
+    """ Counts the L-mers of every record of a FASTA file, streaming the file in
+    windows (see kmerChunks()), and returns them in a KmerTable.
+    -----------------------------------------------------------------------
+    """
+    return countFASTAkmerSizes(filename, [LmerSize], windowSize, canonical)[LmerSize]
+#-------------------(end of countFASTAkmers())-----------------------------
+
+#--------------------------------------------------------------------------
+def countFASTAkmerSizes(filename, LmerSizes, windowSize=1 << 22, canonical=False, digest=None):
+    """ Counts the L-mers of every record of a FASTA file for several L-mer
+    sizes in a single read and scan of the file; returns a dictionary of
+    KmerTables keyed by L-mer size (canonical tables when canonical is set).
+    digest is that of readFASTApieces().
+    -----------------------------------------------------------------------
+    """
+    tables = {}
+    for position, window, starts in instrumentedReads(filename, kmerChunks(filename, max(LmerSizes), windowSize, digest)):
+        countKmerSizes(window, LmerSizes, position, tables, starts, canonical)
+    for LmerSize in LmerSizes: # (a file without any sequence)
+        tables.setdefault(LmerSize, KmerTable(LmerSize, canonical))
+    return tables
+#-------------------(end of countFASTAkmerSizes())-------------------------
+
+#--------------------------------------------------------------------------
+def countFilesInParallel(fileList, LmerSizes, workers=None, chunkSize=1 << 22, canonical=False, digests=None):
+    """ Generator that counts the L-mers of many FASTA files with a pool of
+    worker processes and gives back a (filename, tables) pair for each file,
+    always in the order of fileList; tables is a dictionary of KmerTables keyed
+    by L-mer size.
+
+    Every file is cut into chunks of chunkSize bases that overlap by L-1 bases
+    (see kmerChunks()), so small genomes are spread over the workers one file
+    each while a single large genome keeps every worker busy. At most two chunks
+    per worker are waiting at any time, which keeps the memory bounded. The
+    tables of the chunks are merged in the order they were handed out, so the
+    results never depend on which worker finishes first. workers defaults to
+    the number of CPUs. With a dictionary of digests, the text of each file is
+    hashed as it is read, into digests[filename] (see readFASTApieces()).
+    -----------------------------------------------------------------------
+    """
+    jobs = ((fileIndex, chunk)
+            for fileIndex, nextFile in enumerate(fileList)
+            for chunk in kmerChunks(nextFile, max(LmerSizes), chunkSize, newDigest(digests, nextFile)))
+
+    workers = workers or os.cpu_count() or 1
+    maximumPending = 2 * workers # chunks that may wait for a worker at once
+
+    with ProcessPoolExecutor(workers, initializer=disableInstrumentation) as pool:
+        pending = deque() # (file index, future) of each chunk handed out, in order
+        currentIndex = 0 # index of the file whose tables are being merged
+        currentTables = {LmerSize: KmerTable(LmerSize, canonical) for LmerSize in LmerSizes}
+
+        for job in itertools.chain(jobs, [None]): # None: every chunk has been handed out
+            if (job is not None):
+                fileIndex, (position, window, starts) = job
+                future = pool.submit(countKmerSizes, window, LmerSizes, position, None, starts, canonical)
+                pending.append((fileIndex, future))
+
+            while (pending and (job is None or len(pending) >= maximumPending or pending[0][1].done())):
+                doneIndex, future = pending.popleft()
+                with InstrumentedStage("countWorkers"): # (the workers are not instrumented, only the wait for them)
+                    future.result()
+                # every file before doneIndex has had all of its chunks merged
+                while (currentIndex < doneIndex):
+                    yield fileList[currentIndex], currentTables
+                    currentIndex += 1
+                    currentTables = {LmerSize: KmerTable(LmerSize, canonical) for LmerSize in LmerSizes}
+                for LmerSize, table in future.result().items():
+                    currentTables[LmerSize].merge(table)
+        # end for each chunk
+
+        while (currentIndex < len(fileList)): # the last file (and any empty ones)
+            yield fileList[currentIndex], currentTables
+            currentIndex += 1
+            currentTables = {LmerSize: KmerTable(LmerSize, canonical) for LmerSize in LmerSizes}
+#-------------------(end of countFilesInParallel())------------------------
+
+# ********* END OF FUNCTIONS THAT COUNT L-MERS WITH A ROLLING 2-BIT ENGINE *******
+
+# ********* THESE FUNCTIONS INDEX FASTA FILES FOR RANDOM ACCESS ******************
+
+# one line of a samtools-style FASTA index (.fai): the name of a record, its length,
+# the byte offset of its first base, and the bases and bytes in each of its lines
+FaiRecord = namedtuple("FaiRecord", "name length offset lineBases lineWidth")
+
+#--------------------------------------------------------------------------
+def buildFastaIndex(filename, indexFilename=None):
+    """ Builds a samtools-compatible FASTA index (name, length, offset, line bases
+    and line width of every record) and writes it next to the FASTA file as
+    filename + ".fai"; returns the index as a dictionary of FaiRecords keyed by
+    record name (the first word of its header), in the order of the file.
+
+    Like samtools, every line of a record except the last must hold the same
+    number of bases, otherwise a ValueError is raised.
+    -----------------------------------------------------------------------
+    """
+    if (indexFilename is None):
+        indexFilename = filename + ".fai"
+
+    index = {}
+    record = None # [name, length, offset, line bases, line width, last line seen?]
+
+    def finishRecord(): # add the record being read to the index
+        if (record is not None):
+            index[record[0]] = FaiRecord(*record[:5])
+
+    with openFASTA(filename) as INPUT:
+        position = 0 # byte offset of the next line (in the uncompressed text)
+        for nextLine in INPUT:
+            lineStart, position = position, position + len(nextLine)
+            if (nextLine.startswith(b">")): # a new record starts here
+                finishRecord()
+                header = nextLine[1:].decode("latin-1").split()
+                record = [header[0] if header else "", 0, position, 0, 0, False]
+                continue
+            if (record is None):
+                raise ValueError("%s does not start with a FASTA header" % filename)
+
+            bases = len(nextLine.rstrip(b"\r\n"))
+            if (bases == 0): # a blank line can only end a record
+                record[5] = True
+                continue
+            if (record[5]): # a line after a short one
+                raise ValueError("record %s of %s has lines of different lengths" % (record[0], filename))
+            # the line width counts the line end ("\n" if the file ends without one)
+            width = len(nextLine) if nextLine.endswith(b"\n") else bases + 1
+            if (record[3] == 0): # first line of sequence sets the line length
+                record[3], record[4] = bases, width
+            elif (bases > record[3] or (bases == record[3] and width != record[4])):
+                raise ValueError("record %s of %s has lines of different lengths" % (record[0], filename))
+            if (bases < record[3]): # only the last line may be shorter
+                record[5] = True
+            record[1] += bases
+        # end for each line
+        finishRecord()
+
+    with open(indexFilename, "w") as OUTPUT:
+        for name, length, offset, lineBases, lineWidth in index.values():
+            OUTPUT.write("%s\t%i\t%i\t%i\t%i\n" % (name, length, offset, lineBases, lineWidth))
+
+    return index
+#-------------------(end of buildFastaIndex())-----------------------------
+
+#--------------------------------------------------------------------------
+def isIndexCurrent(filename):
+    """ Returns True if a FASTA file has an index that is newer than the file. """
+    indexFilename = filename + ".fai"
+    return (os.path.isfile(indexFilename) and
+            os.path.getmtime(indexFilename) >= os.path.getmtime(filename))
+#-------------------(end of isIndexCurrent())------------------------------
+
+#--------------------------------------------------------------------------
+def loadFastaIndex(filename):
+    """ Returns the FASTA index of a file as a dictionary of FaiRecords keyed by
+    record name, reading the .fai file next to it, or building one first if
+    there is none or the FASTA file has changed since it was built.
+    -----------------------------------------------------------------------
+    """
+    if (not isIndexCurrent(filename)):
+        return buildFastaIndex(filename)
+
+    index = {}
+    with open(filename + ".fai") as INPUT:
+        for nextLine in INPUT:
+            fields = nextLine.rstrip("\n").split("\t")
+            index[fields[0]] = FaiRecord(fields[0], *map(int, fields[1:5]))
+    return index
+#-------------------(end of loadFastaIndex())------------------------------
+
+#--------------------------------------------------------------------------
+def fetch(filename, record=None, start=0, end=None, index=None):
+    """ Returns the bases of record (its name; the first record if None) from
+    start up to (not including) end, counted from 0 like a Python slice, as
+    they are in the file (case kept); the region is clipped to the record.
+
+    The FASTA index (see loadFastaIndex()) gives the byte offset of every base,
+    so only the bytes of the region are read: a 1 kb promoter comes out of a
+    multi-gigabase file with one seek and one small read. A loaded index may be
+    passed in to save reading it again for many fetches. The offsets are those
+    of the uncompressed text, so a compressed file works too: a BGZF (bgzip)
+    file only inflates the blocks of the region (see BgzfReader), while other
+    compressions have to be read up to the region.
+
+    promoter = BioDNA.fetch("genome.fna", "chrIII", 10000, 11000)
+    -----------------------------------------------------------------------
+    """
+    if (index is None):
+        index = loadFastaIndex(filename)
+    if (record is None):
+        if (not index):
+            return ""
+        record = next(iter(index))
+    if (record not in index):
+        raise KeyError("no record named %s in %s" % (record, filename))
+
+    name, length, offset, lineBases, lineWidth = index[record]
+    start, end = max(start, 0), length if end is None else min(end, length)
+    if (start >= end):
+        return ""
+
+    # byte offsets of the first base and just past the last base of the region
+    firstByte = offset + (start // lineBases) * lineWidth + start % lineBases
+    lastByte = offset + ((end - 1) // lineBases) * lineWidth + (end - 1) % lineBases + 1
+
+    with openFASTA(filename) as INPUT:
+        INPUT.seek(firstByte)
+        region = INPUT.read(lastByte - firstByte)
+
+    return region.replace(b"\n", b"").replace(b"\r", b"").decode("latin-1")
+#-------------------(end of fetch())---------------------------------------
+
+#--------------------------------------------------------------------------
+def parseRegion(region):
+    """ Returns the (name, start, end) of a samtools-style region: "name",
+    "name:start" or "name:start-end", with start and end counted from 1 and end
+    included; start comes back counted from 0 like a Python slice, and end is
+    None for the end of the record.
+    -----------------------------------------------------------------------
+    """
+    name, colon, span = region.rpartition(":")
+    if (not colon or not re.fullmatch(r"[\d,]+(-[\d,]*)?", span)): # just a record name
+        return region, 0, None
+    start, dash, end = span.replace(",", "").partition("-")
+    return name, int(start) - 1, int(end) if end else None
+#-------------------(end of parseRegion())---------------------------------
+
+#--------------------------------------------------------------------------
+def fetchRegion(filename, region, packed=False):
+    """ Same as fetch() but for a samtools-style region (see parseRegion()).
+    With packed set, the region is sliced from the packed copy of its record
+    (see openPacked()) rather than read through the .fai index; the bases then
+    come back upper case.
+    -----------------------------------------------------------------------
+    """
+    name, start, end = parseRegion(region)
+    if (packed):
+        with openPacked(filename, name) as sequence:
+            return sequence[start:end]
+    return fetch(filename, name, start, end)
+#-------------------(end of fetchRegion())---------------------------------
+
+# ********* END OF FUNCTIONS THAT INDEX FASTA FILES FOR RANDOM ACCESS ************
+
+# ********* THESE FUNCTIONS SCAN WHOLE GENOMES FOR TATA BOXES ********************
+
+# one TATA box found on either strand: its record, strand ("+" or "-"), its 0-based
+# start and end on the forward strand, and the box with the upstream and downstream
+# windows around it, read 5' to 3' on its own strand
+TATAbox = namedtuple("TATAbox", "record strand start end box upstream downstream")
+
+# the TATA-box on the forward strand and the same box seen on the forward strand
+# when it lies on the reverse strand (its reverse complement); the lookaheads find
+# overlapping boxes too
+TATA_FORWARD = re.compile(r"(?=tata[at]a[at][ag])")
+TATA_REVERSE = re.compile(r"(?=[ct][at]t[at]tata)")
+TATA_LENGTH = 8 # every TATA-box is 8 bp long
+
+#--------------------------------------------------------------------------
+def findTATAboxes(sequence, upstreamSize=100, downstreamSize=100, strands="+-",
+                  record="", offset=0, low=0, high=None):
+    """ Generator of a TATAbox for every TATA-box of a sequence (a string, any
+    case) on the strands asked for, in order of position. The upstream and
+    downstream windows are clipped at the ends of the sequence.
+
+    offset is the position of the sequence within its record (added to the
+    positions given back), and only boxes starting from low up to (not
+    including) high are given back; scanTATAboxes() uses these to scan a
+    genome in overlapping windows without finding a box twice.
+    -----------------------------------------------------------------------
+    """
+    sequence = sequence.lower()
+    if (high is None):
+        high = len(sequence)
+
+    starts = [] # (start, strand) of every box
+    if ("+" in strands):
+        starts += [(match.start(), "+") for match in TATA_FORWARD.finditer(sequence, low)
+                   if match.start() < high]
+    if ("-" in strands):
+        starts += [(match.start(), "-") for match in TATA_REVERSE.finditer(sequence, low)
+                   if match.start() < high]
+    starts.sort()
+
+    for start, strand in starts:
+        end = start + TATA_LENGTH
+        before = sequence[max(start - upstreamSize, 0):start]
+        after = sequence[end:end + downstreamSize]
+        box = sequence[start:end]
+        if (strand == "+"):
+            yield TATAbox(record, strand, offset + start, offset + end, box, before, after)
+        else: # the reverse strand reads the other way: upstream is to the right
+            before = sequence[max(start - downstreamSize, 0):start]
+            after = sequence[end:end + upstreamSize]
+            yield TATAbox(record, strand, offset + start, offset + end,
+                          box.translate(IUPAC_COMPLEMENT)[::-1],
+                          after.translate(IUPAC_COMPLEMENT)[::-1],
+                          before.translate(IUPAC_COMPLEMENT)[::-1])
+    # end for each box
+#-------------------(end of findTATAboxes())-------------------------------
+
+#--------------------------------------------------------------------------
+def scanTATAboxes(filename, upstreamSize=100, downstreamSize=100, strands="+-", windowSize=1 << 20):
+    """ Generator of a TATAbox for every TATA-box on both strands of every record
+    of a FASTA file, in one streaming pass over the file (filename may also be
+    a PackedSequence, scanned the same way).
+
+    The records are read in windows that overlap by the box and the longest of
+    the two flanking windows on each side; each window only reports the boxes
+    in its own stretch of the record, so every box comes back once, with its
+    full upstream and downstream windows, however large the genome is.
+
+    for site in BioDNA.scanTATAboxes("genome.fna", upstreamSize=250):
+        print(site.record, site.strand, site.start, site.upstream)
+    -----------------------------------------------------------------------
+    """
+    margin = max(upstreamSize, downstreamSize) # bases needed on each side of a box
+    overlap = 2 * margin + TATA_LENGTH - 1
+    windowSize = max(windowSize, 2 * overlap)
+    step = windowSize - overlap
+
+    def findInWindow(window, isLast): # boxes owned by one window of a record
+        header, start, bases = window
+        low = 0 if start == 0 else margin # the first window owns its left edge
+        high = None if isLast else margin + step # the last window owns its right edge
+        return findTATAboxes(bases, upstreamSize, downstreamSize, strands,
+                             header.split()[0] if header.split() else "", start, low, high)
+
+    if (isinstance(filename, PackedSequence)):
+        windows = ((filename.name, start, bases) for start, bases in filename.chunks(windowSize, overlap))
+    else:
+        windows = readFASTAwindows(filename, windowSize, overlap)
+
+    previous = None # windows are held back one to know the last one of a record
+    for window in windows:
+        if (previous is not None):
+            yield from findInWindow(previous, window[1] == 0)
+        previous = window
+    if (previous is not None):
+        yield from findInWindow(previous, True)
+#-------------------(end of scanTATAboxes())-------------------------------
+
+# ********* END OF FUNCTIONS THAT SCAN WHOLE GENOMES FOR TATA BOXES **************
+
+# ********* THESE FUNCTIONS RENDER THE RECORDS OF THE ANALYSIS FUNCTIONS *********
+
+DASHES = "-" * 57 # the separator lines of the printouts
+
+# the printout of each kind of repeat: title, label of a match, label of the
+# percentage, and number of separator lines at the end
+REPEAT_TEXT = {"DR": ("-Searching for Direct Repeats (DR) in the upstream region-",
+                      "Found DR:", "Percent of DR's in the upstream region is:", 2),
+               "MR": ("-Searching for Mirror Repeats (MR) in the upstream region-",
+                      "Found MR:", "Percent of MR's in the upstream region is:", 2),
+               "AT": ("-Searching for AT/TA/AA/TT runs in the upstream region-",
+                      "Found favorite motif:", "Percent of AT/TA/AA/TT runs in the upstream region is:", 1)}
+
+# the printout of each check of a FrameReport: (text if True, text if False)
+FRAME_TEXT = (("There is a Met at the start site.", "There is no Met at the start."),
+              ("There is a stop at the end.", "There is no stop at the end."),
+              ("There is at least one Met somewhere other than start.",
+               "There are no Mets in positions outside of the start site."),
+              ("There is at least one STOP interrupting the gene.", "There are no interrupting STOPS."))
+
+#--------------------------------------------------------------------------
+def formatReport(report):
+    """ Returns the text printout of a TATAreport, RepeatReport or FrameReport,
+    the same as the original (print-only) programs gave, with the locations
+    counted from 1. A report of None (no DNA) gives an empty string.
+
+    print(BioDNA.formatReport(BioDNA.TATAboxAnalysis(DNA)), end="")
+    -----------------------------------------------------------------------
+    """
+    if (report is None):
+        return ""
+    if (isinstance(report, FrameReport)):
+        return "".join(FRAME_TEXT[i][0 if check else 1] + "\n" for i, check in enumerate(report))
+    if (isinstance(report, RepeatReport)):
+        title, label, percentLabel, separators = REPEAT_TEXT[report.kind]
+        lines = [title, ""]
+        for match in report.matches:
+            lines.append("%s %s" % (label, match.motif))
+            lines.append("     at upstream location: [ %i : %i ]" % (match.start + 1, match.end))
+        lines += ["", "", percentLabel + "{:5.1f}%".format(report.percentage)]
+        lines += [DASHES] * separators
+        return "\n".join(lines) + "\n"
+
+    # otherwise a TATAreport
+    sequence, TATAstart, TATAend = report.sequence, report.start, report.end
+    if (TATAstart is None):
+        return "There is no TATA box to locate.\n"
+
+    text = ["\nThe size of the region being searched is %i bp\n" % len(sequence),
+            "=" * 57 + "\n",
+            # the sequence with the TATA-box in uppercase
+            sequence[:TATAstart] + sequence[TATAstart:TATAend].upper() + sequence[TATAend:] + "\n",
+            indexingLine(len(sequence))]
+    if (TATAstart != 0): # if there is an upstream region
+        text.append("\n\nUpstream:   [ 1 : %i ]\n" % TATAstart)
+    else:
+        text.append("\n\nThere is no upstream region prior to TATA-box!\n")
+    text.append("TATA-box:   [ %i : %i ]\n" % (TATAstart + 1, TATAend))
+    if (TATAend != len(sequence)): # if there is a downstream
+        text.append("Downstream: [ %i : %i ]\n" % (TATAend + 1, len(sequence)))
+    else:
+        text.append("There is no downstream region after the TATA-box!\n")
+    text.append(DASHES + "\n")
+
+    if (report.percentageUpstream is not None): # the repeats of the upstream region
+        upstream = sequence[:TATAstart]
+        text += ["\n\nUPSTREAM of TATA-box\n", DASHES + "\n", upstream + "\n", indexingLine(len(upstream)),
+                 "\n\nThe size of the upstream region is %i bp\n" % len(upstream),
+                 "The percentage of upstream region is:{:5.1f}%\n".format(report.percentageUpstream),
+                 DASHES + "\n"]
+        text += [formatReport(repeats) for repeats in report.repeats]
+
+    return "".join(text)
+#-------------------(end of formatReport())--------------------------------
+
+#--------------------------------------------------------------------------
+def writeReportCSV(report, OUTPUT):
+    """ Writes a report to an open text file as CSV. The matches of a TATAreport
+    (its TATA-box and the repeats of its upstream) or of a RepeatReport are
+    written one per row as kind,motif,start,end with 0-based [start, end)
+    positions; a FrameReport is written as its checks with a header row.
+
+    A TATAbox, or any iterable of them (such as scanTATAboxes() gives), is
+    written one box per row under a header of the TATAbox fields, each row as
+    soon as it comes, so the boxes of a whole genome never have to be held:
+
+    BioDNA.writeReportCSV(BioDNA.scanTATAboxes("genome.fna"), sys.stdout)
+    -----------------------------------------------------------------------
+    """
+    writer = csv.writer(OUTPUT, lineterminator="\n")
+    if (isinstance(report, TATAbox) or
+            not (report is None or isinstance(report, (FrameReport, RepeatReport, TATAreport)))):
+        writer.writerow(TATAbox._fields)
+        writer.writerows([report] if isinstance(report, TATAbox) else report) # (row by row)
+        return
+
+    if (isinstance(report, FrameReport)):
+        writer.writerow(report._fields)
+        writer.writerow(report)
+        return
+
+    writer.writerow(("kind", "motif", "start", "end"))
+    if (report is None):
+        return
+    if (isinstance(report, RepeatReport)):
+        repeats = [report]
+    else:
+        repeats = report.repeats
+        if (report.start is not None):
+            writer.writerow(("TATA", report.sequence[report.start:report.end], report.start, report.end))
+    for nextRepeats in repeats:
+        for match in nextRepeats.matches:
+            writer.writerow((nextRepeats.kind, match.motif, match.start, match.end))
+#-------------------(end of writeReportCSV())------------------------------
+
+#--------------------------------------------------------------------------
+def reportAsDict(record):
+    """ Returns a record (and the records inside it) as plain dictionaries and
+    lists, ready for json or any other serializer.
+    -----------------------------------------------------------------------
+    """
+    if (hasattr(record, "_asdict")): # a named tuple
+        return {field: reportAsDict(value) for field, value in record._asdict().items()}
+    if (isinstance(record, (list, tuple))):
+        return [reportAsDict(value) for value in record]
+    return record
+#-------------------(end of reportAsDict())--------------------------------
+
+#--------------------------------------------------------------------------
+def reportToJSON(report, indent=None):
+    """ Returns a report (or a list of them) as a JSON string; positions are
+    0-based [start, end) as they are in the records.
+    -----------------------------------------------------------------------
+    """
+    return json.dumps(reportAsDict(report), indent=indent)
+#-------------------(end of reportToJSON())--------------------------------
+
+# ********* END OF FUNCTIONS THAT RENDER THE RECORDS OF THE ANALYSIS FUNCTIONS ***
+
+# ********* THESE FUNCTIONS MEASURE THE BASE COMPOSITION OF GENOMES **************
+
+# (Composition, BaseComposition and sequenceComposition() are in DNAcomposition.py)
+
+#--------------------------------------------------------------------------
+def fastaComposition(filename, windowSize=None, blockSize=1 << 22):
+    """ Returns the Composition of all records of a FASTA file taken as one
+    sequence (see DNAcomposition.fastaComposition()), read with openFASTA().
+
+    composition = BioDNA.fastaComposition("genome.fna", windowSize=1000)
+    print(composition.counts["N"], composition.GCskew, max(composition.windowGC))
+    -----------------------------------------------------------------------
+    """
+    return DNAcomposition.fastaComposition(filename, windowSize, blockSize, openFASTA)
+#-------------------(end of fastaComposition())----------------------------
+
+# ********* END OF FUNCTIONS THAT MEASURE THE BASE COMPOSITION OF GENOMES ********
+
+# ********* THESE FUNCTIONS TRANSLATE ALL SIX READING FRAMES *********************
+
+# one translated reading frame: its strand ("+", or "-" for the reverse complement),
+# the frame (0, 1 or 2: the bases skipped at the 5' end of the strand) and the protein
+TranslatedFrame = namedtuple("TranslatedFrame", "strand frame protein")
+
+# A, C, G and T (or U) become 0, 1, 2 and 3, anything else 4; a codon is then
+# 16*first + 4*second + third (0 to 63), or 64 when any of its bases is ambiguous
+CODON_BASES = bytes({"A": 0, "C": 1, "G": 2, "T": 3, "U": 3}.get(chr(i).upper(), 4) for i in range(256))
+
+#--------------------------------------------------------------------------
+def makeCodonTables():
+    """ Returns the one and three letter amino acid symbols of the 65 codon codes
+    (see CODON_BASES), built from makeAminoAcidTable(): a 65 character string
+    and a 195 character string; the ambiguous code 64 is "X" and "Xaa".
+    -----------------------------------------------------------------------
+    """
+    AAtable = makeAminoAcidTable()
+    oneLetter, threeLetter = [], []
+    for codon in itertools.product("ACGU", repeat=3): # in the order of the codes
+        AAsymbols = AAtable["".join(codon)]
+        oneLetter.append(AAsymbols[0])
+        threeLetter.append(AAsymbols[2:])
+    return "".join(oneLetter) + "X", "".join(threeLetter) + "Xaa"
+#-------------------(end of makeCodonTables())-----------------------------
+
+ONE_LETTER_AA, THREE_LETTER_AA = makeCodonTables()
+# the (one letter, three letter) symbols of the 64 codons, for the translation
+# without NumPy; any other codon is ambiguous
+CODON_AA = {"".join(codon): (ONE_LETTER_AA[code], THREE_LETTER_AA[3 * code:3 * code + 3])
+            for code, codon in enumerate(itertools.product("ACGU", repeat=3))}
+AMBIGUOUS_AA = ("X", "Xaa")
+if (np is not None):
+    CODON_BASES_ARRAY = np.frombuffer(CODON_BASES, dtype=np.uint8)
+    ONE_LETTER_ARRAY = np.frombuffer(ONE_LETTER_AA.encode(), dtype=np.uint8)
+    THREE_LETTER_ARRAY = np.frombuffer(THREE_LETTER_AA.encode(), dtype=np.uint8).reshape(65, 3)
+
+#--------------------------------------------------------------------------
+def baseCodes(sequence):
+    """ Returns the base codes (see CODON_BASES) of a sequence as a NumPy array. """
+    return CODON_BASES_ARRAY[np.frombuffer(sequence.encode("latin-1"), dtype=np.uint8)]
+#-------------------(end of baseCodes())-----------------------------------
+
+#--------------------------------------------------------------------------
+def reverseComplementCodes(codes):
+    """ Returns the base codes of the reverse complement of the base codes of a
+    strand: the complement of A/C/G/T is 3 - code and 4 stays 4. """
+    reverseCodes = codes[::-1].copy()
+    reverseCodes[reverseCodes < 4] = 3 - reverseCodes[reverseCodes < 4]
+    return reverseCodes
+#-------------------(end of reverseComplementCodes())----------------------
+
+#--------------------------------------------------------------------------
+def codonCodes(codes, frame):
+    """ Returns the codon codes (0 to 63, or 64 when ambiguous) of the whole
+    codons of the base codes of a strand read from frame on. """
+    codons = max((len(codes) - frame) // 3, 0) # number of whole codons
+    triples = codes[frame:frame + 3 * codons].reshape(-1, 3)
+    codonCodes = triples[:, 0] * 16 + triples[:, 1] * 4 + triples[:, 2]
+    codonCodes[(triples == 4).any(axis=1)] = 64 # codons with an ambiguous base
+    return codonCodes
+#-------------------(end of codonCodes())----------------------------------
+
+#--------------------------------------------------------------------------
+def translateCodes(codes, frame, threeLetter):
+    """ Returns the protein of the codes (NumPy array of base codes) of a strand
+    read from frame on. """
+    if (threeLetter):
+        return THREE_LETTER_ARRAY[codonCodes(codes, frame)].tobytes().decode("ascii")
+    return ONE_LETTER_ARRAY[codonCodes(codes, frame)].tobytes().decode("ascii")
+#-------------------(end of translateCodes())------------------------------
+
+#--------------------------------------------------------------------------
+def translateSequence(sequence, frame=0, threeLetter=False, reverse=False):
+    """ Returns the protein of one reading frame of a DNA (or RNA) sequence of
+    any case: frame is the number of bases skipped (0, 1 or 2) and reverse reads
+    the reverse complement strand instead. Amino acids are one letter symbols
+    ("*" for a stop), or three letter ones ("***" for a stop) with threeLetter;
+    a codon with an ambiguous base (N, R, Y, ...) becomes "X" (or "Xaa").
+    -----------------------------------------------------------------------
+    """
+    return translateSixFrames(sequence, threeLetter, [("-" if reverse else "+", frame)])[0].protein
+#-------------------(end of translateSequence())---------------------------
+
+#--------------------------------------------------------------------------
+def translateSixFrames(sequence, threeLetter=False, frames=None):
+    """ Translates all six reading frames of a DNA (or RNA) sequence of any case:
+    the three frames of the strand as given and the three of its reverse
+    complement, returned as TranslatedFrame records in the order +0, +1, +2,
+    -0, -1, -2 (or only the (strand, frame) pairs asked for in frames).
+
+    With NumPy the bases are turned into 2-bit codes once and every frame is a
+    lookup of the 64 (+1 ambiguous) entry codon table over a reshaped view of
+    them, so a bacterial genome is translated six ways in well under a second;
+    without it each codon is looked up in a dictionary of all codons.
+
+    for strand, frame, protein in BioDNA.translateSixFrames(genome):
+        print(strand, frame, protein.count("*"))
+    -----------------------------------------------------------------------
+    """
+    if (frames is None):
+        frames = [(strand, frame) for strand in "+-" for frame in range(3)]
+    if (isinstance(sequence, bytes)):
+        sequence = sequence.decode("latin-1")
+    index = 1 if threeLetter else 0 # which symbol of CODON_AA to take
+
+    translated = []
+    if (np is not None):
+        codes = baseCodes(sequence)
+        reverseCodes = None
+        for strand, frame in frames:
+            if (strand == "-"):
+                if (reverseCodes is None):
+                    reverseCodes = reverseComplementCodes(codes)
+                protein = translateCodes(reverseCodes, frame, threeLetter)
+            else:
+                protein = translateCodes(codes, frame, threeLetter)
+            translated.append(TranslatedFrame(strand, frame, protein))
+    else:
+        forward = sequence.upper().replace("T", "U")
+        reverse = None
+        for strand, frame in frames:
+            if (strand == "-"):
+                if (reverse is None):
+                    reverse = forward.translate(IUPAC_COMPLEMENT)[::-1].replace("T", "U")
+                bases = reverse
+            else:
+                bases = forward
+            protein = "".join([CODON_AA.get(bases[start:start + 3], AMBIGUOUS_AA)[index]
+                               for start in range(frame, len(bases) - 2, 3)])
+            translated.append(TranslatedFrame(strand, frame, protein))
+
+    return translated
+#-------------------(end of translateSixFrames())--------------------------
+
+# ********* END OF FUNCTIONS THAT TRANSLATE ALL SIX READING FRAMES ***************
+
+# ********* THESE FUNCTIONS FIND THE OPEN READING FRAMES OF GENOMES **************
+
+# one open reading frame (ORF), from a start codon to the stop codon that ends it:
+# its record, strand ("+" or "-"), frame (0, 1 or 2 on its own strand, as in
+# translateSixFrames()), 0-based [start, end) on the forward strand (stop codon
+# included), its length in amino acids (codons before the stop), start codon and
+# stop codon ("" for an ORF that runs off the end of the sequence, see findORFs())
+ORF = namedtuple("ORF", "record strand frame start end length startCodon stopCodon")
+
+STOP_CODONS = ("TAA", "TAG", "TGA") # the stops of the standard genetic code
+
+#--------------------------------------------------------------------------
+def codonCode(codon):
+    """ Returns the codon code (0 to 63) of a codon of A, C, G and T (or U). """
+    code = 0
+    for base in codon.upper():
+        code = code * 4 + "ACGU".index("U" if base == "T" else base)
+    return code
+#-------------------(end of codonCode())-----------------------------------
+
+#--------------------------------------------------------------------------
+def frameORFcodons(bases, frame, startCodons, minLength, partial):
+    """ Generator of the (first, last) codon numbers of the ORFs of one frame of
+    a strand (upper case DNA), in order: the first start codon after each stop
+    and the stop that closes it, or the number of whole codons in the frame
+    for the ORF that runs off the end when partial is set. """
+    codonCount = max((len(bases) - frame) // 3, 0)
+    openStart = None # codon number of the ORF open in this frame
+    for codonNumber in range(codonCount):
+        codon = bases[frame + 3 * codonNumber:frame + 3 * codonNumber + 3]
+        if (codon in STOP_CODONS):
+            if (openStart is not None and codonNumber - openStart >= minLength):
+                yield openStart, codonNumber
+            openStart = None
+        elif (openStart is None and codon in startCodons):
+            openStart = codonNumber
+    # end for each codon
+    if (partial and openStart is not None and codonCount - openStart >= minLength):
+        yield openStart, codonCount
+#-------------------(end of frameORFcodons())------------------------------
+
+#--------------------------------------------------------------------------
+def frameORFcodes(codes, frame, startCodes, stopCodes, minLength, partial):
+    """ Same as frameORFcodons() for the base codes (NumPy array) of a strand:
+    every stop is found at once, and the first start after the stop before each
+    stop with a search of the sorted starts. Returns the pairs as a list. """
+    codons = codonCodes(codes, frame)
+    stops = np.flatnonzero(np.isin(codons, stopCodes))
+    if (partial): # the end of the frame closes the ORF that runs off it
+        stops = np.append(stops, len(codons))
+    starts = np.flatnonzero(np.isin(codons, startCodes))
+    if (len(stops) == 0 or len(starts) == 0):
+        return []
+    # the first start after the stop before each stop (or after -1)
+    first = np.searchsorted(starts, np.concatenate(([0], stops[:-1] + 1)))
+    found = first < len(starts)
+    stops, first = stops[found], starts[first[found]]
+    found = (first < stops) & (stops - first >= minLength)
+    return list(zip(first[found].tolist(), stops[found].tolist()))
+#-------------------(end of frameORFcodes())-------------------------------
+
+#--------------------------------------------------------------------------
+def frameORFs(sequence, strand, frame, codonPairs, record):
+    """ Generator of the ORF records of the (first, last) codon number pairs of
+    one frame (see frameORFcodons()), in order of start on the forward strand:
+    the pairs of the reverse strand are taken from its end back. """
+    length = len(sequence)
+    codonCount = max((length - frame) // 3, 0)
+    if (strand == "-"):
+        codonPairs = reversed(list(codonPairs))
+    for first, last in codonPairs:
+        start, end = frame + 3 * first, frame + 3 * last + 3
+        if (last == codonCount): # it runs off the end, without a stop
+            end -= 3
+        if (strand == "+"):
+            startCodon = sequence[start:start + 3].upper()
+            stopCodon = sequence[end - 3:end].upper() if (last < codonCount) else ""
+        else:
+            start, end = length - end, length - start
+            startCodon = sequence[end - 3:end].upper().translate(IUPAC_COMPLEMENT)[::-1]
+            stopCodon = sequence[start:start + 3].upper().translate(IUPAC_COMPLEMENT)[::-1] \
+                if (last < codonCount) else ""
+        yield ORF(record, strand, frame, start, end, last - first, startCodon, stopCodon)
+#-------------------(end of frameORFs())-----------------------------------
+
+#--------------------------------------------------------------------------
+def findORFs(sequence, minLength=100, startCodons=("ATG",), record="", partial=False):
+    """ Generator of an ORF record for every open reading frame of a sequence
+    (any case) on all six frames, in order of start on the forward strand.
+
+    Each frame is scanned once: the first start codon after a stop opens an ORF
+    (so a Met-to-stop interval is as long as it can be, the way the first Met of
+    readingFrameChecks() starts the gene) and the next stop closes it. ORFs of
+    fewer than minLength amino acids are left out, and alternative start codons
+    can be given, e.g. startCodons=("ATG", "GTG", "TTG") for bacteria.
+
+    An ORF with no stop before the end of the sequence (a gene cut off by the
+    end of a contig, say) is only reported with partial set: it then ends at
+    the last whole codon of its frame, its length counts every codon and its
+    stopCodon is "". The six frames give their ORFs in order of start, and
+    heapq.merge() interleaves them, so the ORFs of a record are never sorted.
+    -----------------------------------------------------------------------
+    """
+    if (isinstance(sequence, bytes)):
+        sequence = sequence.decode("latin-1")
+    startCodons = [codon.upper().replace("U", "T") for codon in startCodons]
+
+    frames = []
+    if (np is not None):
+        startCodes = np.array([codonCode(codon) for codon in startCodons])
+        stopCodes = np.array([codonCode(codon) for codon in STOP_CODONS])
+        codes = baseCodes(sequence)
+        for strand, strandCodes in (("+", codes), ("-", reverseComplementCodes(codes))):
+            for frame in range(3):
+                codonPairs = frameORFcodes(strandCodes, frame, startCodes, stopCodes, minLength, partial)
+                frames.append(frameORFs(sequence, strand, frame, codonPairs, record))
+    else:
+        forward = sequence.upper().replace("U", "T")
+        for strand, bases in (("+", forward), ("-", forward.translate(IUPAC_COMPLEMENT)[::-1])):
+            for frame in range(3):
+                codonPairs = frameORFcodons(bases, frame, startCodons, minLength, partial)
+                frames.append(frameORFs(sequence, strand, frame, codonPairs, record))
+
+    yield from heapq.merge(*frames, key=lambda orf: (orf.start, orf.end, orf.strand))
+#-------------------(end of findORFs())------------------------------------
+
+#--------------------------------------------------------------------------
+def scanORFs(filename, minLength=100, startCodons=("ATG",), partial=False):
+    """ Generator of an ORF record for every open reading frame of every record
+    of a FASTA file (see findORFs()); the records are read one at a time, so
+    only one record (a chromosome, say) is in memory at once.
+
+    for orf in BioDNA.scanORFs("megavirus_chiliensis.fna", minLength=150):
+        print(orf.strand, orf.start + 1, orf.end, orf.length)
+    -----------------------------------------------------------------------
+    """
+    for header, sequence in readFASTA(filename):
+        name = header.split()[0] if header.split() else ""
+        yield from findORFs(sequence, minLength, startCodons, name, partial)
+#-------------------(end of scanORFs())------------------------------------
+
+# ********* END OF FUNCTIONS THAT FIND THE OPEN READING FRAMES OF GENOMES ********
+
+# ********* THESE FUNCTIONS FIND TANDEM AND MIRROR REPEATS IN WHOLE GENOMES *****
+
+# a tandem (direct) repeat: a unit of period bases repeated copies whole times from
+# start (0-based) to end, where the last copy may be partial; e.g. ACGACGACGAC is
+# unit ACG, period 3, 3 copies
+TandemRepeat = namedtuple("TandemRepeat", "record start end period unit copies")
+# a mirror repeat (an arm followed by itself backwards, e.g. ACGGCA) or a palindrome
+# (an arm followed by its reverse complement, e.g. ACGCGT) from start to end, with
+# the longest arm that fits around its center
+SymmetricRepeat = namedtuple("SymmetricRepeat", "record start end arm kind")
+
+#--------------------------------------------------------------------------
+def findTandemRepeats(sequence, minPeriod=2, maxPeriod=6, minCopies=2, record=""):
+    """ Returns a TandemRepeat for every maximal tandem repeat of a sequence (any
+    case) with a period from minPeriod to maxPeriod bases and at least minCopies
+    whole copies, in order of start. Repeats of different periods may overlap;
+    only the shortest period of a repeat is reported (ATATAT is period 2, not 4),
+    and ambiguous bases (N, ...) never match.
+
+    A stretch is a repeat of period p wherever each base equals the base p
+    further on, so each period is found by comparing the sequence with itself
+    shifted by p and taking the runs of matches at least (minCopies-1)*p long:
+    linear time for each period, with no backtracking.
+    -----------------------------------------------------------------------
+    """
+    if (isinstance(sequence, bytes)):
+        sequence = sequence.decode("latin-1")
+    upper = sequence.upper()
+    runs = [] # (start, length of the run of matches, period)
+
+    if (np is not None):
+        codes = baseCodes(upper)
+        for period in range(minPeriod, maxPeriod + 1):
+            matches = (codes[:-period] == codes[period:]) & (codes[:-period] != 4)
+            edges = np.flatnonzero(np.diff(np.concatenate(([0], matches.view(np.int8), [0]))))
+            starts, ends = edges[0::2], edges[1::2]
+            long = (ends - starts) >= (minCopies - 1) * period
+            runs += [(start, length, period) for start, length in
+                     zip(starts[long].tolist(), (ends - starts)[long].tolist())]
+    else:
+        bases = upper.replace("U", "T")
+        for period in range(minPeriod, maxPeriod + 1):
+            runStart = None # start of the run of matches being read
+            for index in range(len(bases) - period + 1):
+                if (index < len(bases) - period and bases[index] == bases[index + period] and bases[index] in "ACGT"):
+                    if (runStart is None):
+                        runStart = index
+                elif (runStart is not None):
+                    if (index - runStart >= (minCopies - 1) * period):
+                        runs.append((runStart, index - runStart, period))
+                    runStart = None
+            # end for each position
+
+    repeats = []
+    for start, length, period in runs:
+        unit = upper[start:start + period]
+        if ((unit + unit).find(unit, 1) < period): # the unit is itself a repeat
+            continue
+        repeats.append(TandemRepeat(record, start, start + length + period, period,
+                                    sequence[start:start + period], (length + period) // period))
+    repeats.sort(key=lambda repeat: (repeat.start, repeat.period))
+    return repeats
+#-------------------(end of findTandemRepeats())---------------------------
+
+#--------------------------------------------------------------------------
+def findSymmetricRepeats(sequence, minArm=3, maxArm=10, kind="mirror", record=""):
+    """ Returns a SymmetricRepeat for every center of a sequence (any case) with
+    at least minArm bases on each side that mirror each other: equal bases for
+    kind "mirror" (like (.)(.)(.)\\3\\2\\1 for arms of 3) or complementary
+    bases for kind "palindrome" (restriction sites, hairpins). Every center is
+    reported, so overlapping repeats all come back, each with its longest arm
+    (up to maxArm); ambiguous bases never match.
+
+    The arms of all centers are grown together one base at a time, so the
+    work is linear in the length of the sequence for a given maxArm.
+    -----------------------------------------------------------------------
+    """
+    if (kind not in ("mirror", "palindrome")):
+        raise ValueError("kind must be mirror or palindrome")
+    if (isinstance(sequence, bytes)):
+        sequence = sequence.decode("latin-1")
+    length = len(sequence)
+    repeats = []
+
+    if (np is not None):
+        if (length < 2):
+            return repeats
+        # the codes padded with maxArm ambiguous bases on each side, so arms that
+        # run off the ends stop there
+        padded = np.concatenate((np.full(maxArm, 4, np.uint8), baseCodes(sequence), np.full(maxArm, 4, np.uint8)))
+        centers = length - 1 # centers between the bases 0|1 ... n-2|n-1
+        growing = np.ones(centers, dtype=bool) # centers whose arms are still growing
+        arms = np.zeros(centers, dtype=np.int64)
+        for offset in range(maxArm):
+            left = padded[maxArm - offset:maxArm - offset + centers]
+            right = padded[maxArm + 1 + offset:maxArm + 1 + offset + centers]
+            if (kind == "mirror"):
+                growing &= (left == right) & (left != 4)
+            else:
+                growing &= (left + right == 3) & (left != 4) & (right != 4)
+            arms += growing
+            if (not growing.any()):
+                break
+        found = np.flatnonzero(arms >= minArm)
+        for center, arm in zip((found + 1).tolist(), arms[found].tolist()):
+            repeats.append(SymmetricRepeat(record, center - arm, center + arm, arm, kind))
+    else:
+        bases = sequence.upper().replace("U", "T")
+        other = bases if (kind == "mirror") else bases.translate(IUPAC_COMPLEMENT)
+        for center in range(1, length):
+            arm = 0
+            while (arm < maxArm and arm < center and center + arm < length and
+                   bases[center - 1 - arm] in "ACGT" and bases[center - 1 - arm] == other[center + arm]):
+                arm += 1
+            if (arm >= minArm):
+                repeats.append(SymmetricRepeat(record, center - arm, center + arm, arm, kind))
+
+    return repeats
+#-------------------(end of findSymmetricRepeats())------------------------
+
+#--------------------------------------------------------------------------
+def scanRepeats(filename, minPeriod=2, maxPeriod=6, minCopies=2, minArm=3, maxArm=10, kinds=("tandem", "mirror")):
+    """ Generator of the repeats of every record of a FASTA file, a record at a
+    time: TandemRepeats (kind "tandem", see findTandemRepeats()) and then
+    SymmetricRepeats of each of the other kinds asked for ("mirror",
+    "palindrome", see findSymmetricRepeats()).
+
+    for repeat in BioDNA.scanRepeats("genome.fna", kinds=("palindrome",), minArm=4):
+        print(repeat.record, repeat.start, repeat.end)
+    -----------------------------------------------------------------------
+    """
+    for header, sequence in readFASTA(filename):
+        name = header.split()[0] if header.split() else ""
+        if ("tandem" in kinds):
+            yield from findTandemRepeats(sequence, minPeriod, maxPeriod, minCopies, name)
+        for kind in ("mirror", "palindrome"):
+            if (kind in kinds):
+                yield from findSymmetricRepeats(sequence, minArm, maxArm, kind, name)
+#-------------------(end of scanRepeats())---------------------------------
+
+# ********* END OF FUNCTIONS THAT FIND TANDEM AND MIRROR REPEATS ***************
+
+# ********* THESE FUNCTIONS SCAN FOR MANY IUPAC MOTIFS IN ONE PASS ***************
+
+# one hit of a motif: its record, the motif (its name, if the motifs were given by
+# name), the strand it is on, the 0-based [start, end) of the hit on the forward
+# strand and the site as read on its own strand
+MotifHit = namedtuple("MotifHit", "record motif strand start end site")
+
+# the bases each IUPAC symbol stands for
+IUPAC_BASES = {"A": "A", "C": "C", "G": "G", "T": "T", "U": "T", "R": "AG", "Y": "CT",
+               "S": "CG", "W": "AT", "K": "GT", "M": "AC", "B": "CGT", "D": "AGT",
+               "H": "ACT", "V": "ACG", "N": "ACGT"}
+
+# a few common promoter motifs, by name
+PROMOTER_MOTIFS = {"TATA-box": "TATAWAWR", "CAAT-box": "GGCCAATCT", "GC-box": "GGGCGG"}
+
+IUPAC_EXPANSION_LIMIT = 4 ** 8 # most plain motifs an IUPAC motif may stand for (eight N's)
+
+#--------------------------------------------------------------------------
+def expandIUPAC(motif, limit=IUPAC_EXPANSION_LIMIT):
+    """ Returns every motif of A, C, G and T that an IUPAC motif stands for
+    (ValueError if that is more than limit motifs, as for a motif of many N's:
+    each N multiplies their number by 4). """
+    try:
+        choices = [IUPAC_BASES[symbol] for symbol in motif.upper()]
+    except KeyError as error:
+        raise ValueError("%s is not an IUPAC symbol (motif %s)" % (error.args[0], motif)) from None
+    if (math.prod(map(len, choices)) > limit):
+        raise ValueError("the motif %s stands for %i motifs of A, C, G and T, more than the %i allowed"
+                         % (motif, math.prod(map(len, choices)), limit))
+    return ["".join(bases) for bases in itertools.product(*choices)]
+#-------------------(end of expandIUPAC())---------------------------------
+
+#--------------------------------------------------------------------------
+class MotifScanner:
+    """ Many IUPAC motifs (and their reverse complements) compiled into one
+    Aho-Corasick automaton, so all of them are found on both strands in a
+    single pass over a sequence, whatever the number of motifs.
+
+    Each motif is expanded into the plain motifs it stands for, which make up a
+    trie of A/C/G/T; the failure links are then folded into a dense transition
+    table of 5 entries per state (A, C, G, T and "anything else", which goes
+    back to the start), so scanning is one table lookup per base (about 10 Mb
+    a second in Python). The automaton is built the first time it is walked.
+
+    With NumPy (and plain motifs of at most 31 bases) the automaton is not
+    walked (nor built): a hit of a plain motif of L bases is an L-mer whose 2-bit code is
+    that of the motif. The codes of the longest L-mers of a piece are built at
+    once (see rollKmerCodes()), those of the smaller ones are in their high
+    bits, and they are looked up among the codes of the motifs: in one table
+    of the motifs starting every longest L-mer when the motifs are at most
+    DENSE_LMER_LIMIT bases long, otherwise with a binary search for each
+    length. The hits come back in the same order as from the automaton (by
+    end, then longest first), at about 30 Mb a second for the PROMOTER_MOTIFS.
+
+    An IUPAC motif may stand for at most IUPAC_EXPANSION_LIMIT plain motifs
+    (ValueError otherwise, see expandIUPAC()).
+
+    scanner = BioDNA.MotifScanner(BioDNA.PROMOTER_MOTIFS)
+    for hit in scanner.scan(sequence):
+        print(hit.motif, hit.strand, hit.start, hit.site)
+    -----------------------------------------------------------------------
+    """
+    __slots__ = ("names", "plainMotifs", "transitions", "outputs", "longest", "codeHits", "prefixHits")
+
+    def __init__(self, motifs):
+        if (isinstance(motifs, dict)): # name -> motif
+            self.names, motifs = list(motifs), list(motifs.values())
+        else:
+            motifs = list(motifs)
+            self.names = motifs
+        self.longest = max([len(motif) for motif in motifs] or [0])
+
+        # the (motif number, strand, plain motif) of every plain motif on either strand,
+        # and the hits (motif number, strand, length) of each by length and 2-bit code
+        self.plainMotifs = []
+        plainHits = {}
+        for number, motif in enumerate(motifs):
+            plains = expandIUPAC(motif)
+            for strand, plain in [("+", plain) for plain in plains] + \
+                                 [("-", plain.translate(IUPAC_COMPLEMENT)[::-1]) for plain in plains]:
+                self.plainMotifs.append((number, strand, plain))
+                code = 0
+                for base in plain.encode("latin-1").translate(CODON_BASES):
+                    code = (code << 2) | base
+                hits = plainHits.setdefault(len(plain), {}).setdefault(code, [])
+                if ((number, strand, len(plain)) not in hits):
+                    hits.append((number, strand, len(plain)))
+        self.transitions = self.outputs = None # the automaton, built when first walked
+
+        # (length, sorted codes, hits of each code, lookup) of the plain motifs, longest
+        # first; up to DENSE_LMER_LIMIT bases, lookup gives the index of every code
+        # among the sorted codes (-1 for none), larger ones are binary searched
+        self.codeHits = None
+        if (np is not None and 0 < self.longest <= 31):
+            self.codeHits = []
+            for length in sorted(plainHits, reverse=True):
+                codes = sorted(plainHits[length])
+                lookup = None
+                if (length <= DENSE_LMER_LIMIT):
+                    lookup = np.full(4 ** length, -1, dtype=np.int32)
+                    lookup[codes] = np.arange(len(codes))
+                self.codeHits.append((length, np.array(codes, dtype=np.int64),
+                                      [tuple(plainHits[length][code]) for code in codes], lookup))
+
+        # up to DENSE_LMER_LIMIT bases, prefixHits has a bit for each length (its
+        # rank in codeHits) of the plain motifs that start every longest L-mer
+        self.prefixHits = None
+        if (self.codeHits is not None and self.longest <= DENSE_LMER_LIMIT):
+            self.prefixHits = np.zeros(4 ** self.longest, dtype=np.uint32)
+            for rank, (length, motifCodes, hits, lookup) in enumerate(self.codeHits):
+                width = 4 ** (self.longest - length) # longest L-mers starting with each motif
+                for code in motifCodes.tolist():
+                    self.prefixHits[code * width:(code + 1) * width] |= 1 << rank
+
+    def buildAutomaton(self):
+        """ Builds the Aho-Corasick automaton of the plain motifs (transitions and
+        outputs). """
+        # the trie: children[state][base] (-1 for none) and the hits ending at each
+        # state as (motif number, strand, length)
+        children, found = [[-1] * 4], [[]]
+        for number, strand, plain in self.plainMotifs:
+            state = 0
+            for base in plain.encode("latin-1").translate(CODON_BASES):
+                if (children[state][base] < 0):
+                    children[state][base] = len(children)
+                    children.append([-1] * 4)
+                    found.append([])
+                state = children[state][base]
+            if ((number, strand, len(plain)) not in found[state]):
+                found[state].append((number, strand, len(plain)))
+
+        # breadth first, every state gets the transitions of its failure state for
+        # the bases it has no child for, and the hits of its failure state
+        transitions = [0] * (5 * len(children))
+        failure = [0] * len(children)
+        queue = deque()
+        for base in range(4):
+            child = children[0][base]
+            if (child > 0):
+                transitions[base] = 5 * child
+                queue.append(child)
+        while (queue):
+            state = queue.popleft()
+            found[state] += [hit for hit in found[failure[state]] if hit not in found[state]]
+            for base in range(4):
+                child = children[state][base]
+                if (child > 0):
+                    failure[child] = transitions[5 * failure[state] + base] // 5
+                    transitions[5 * state + base] = 5 * child
+                    queue.append(child)
+                else:
+                    transitions[5 * state + base] = transitions[5 * failure[state] + base]
+        # (the fifth entry of every state, for ambiguous bases, stays 0: the start)
+
+        self.transitions = transitions # next state (times 5) for state*5 + base code
+        # the hits of each state, indexed the same way (by state times 5)
+        self.outputs = [tuple(found[index // 5]) if index % 5 == 0 else () for index in range(len(transitions))]
+
+    def scan(self, sequence, record="", offset=0):
+        """ Generator of a MotifHit for every hit of every motif on either strand
+        of a sequence (or an iterable of its pieces, e.g. from readFASTApieces()),
+        in order of where the hits end. """
+        if (isinstance(sequence, (str, bytes))): # scanned a megabase at a time
+            whole = sequence
+            sequence = (whole[start:start + (1 << 20)] for start in range(0, len(whole), 1 << 20))
+        if (self.codeHits is None and self.transitions is None):
+            self.buildAutomaton()
+        transitions, outputs, names = self.transitions, self.outputs, self.names
+        state = 0
+        tail = "" # the last bases before the piece, for the sites of hits across pieces
+        for piece in sequence:
+            if (isinstance(piece, bytes)):
+                piece = piece.decode("latin-1")
+            text = tail + piece
+            start = offset - len(tail) # position of text[0]
+            if (self.codeHits is not None):
+                for end, hits in self.findCodeHits(text, len(tail)):
+                    for number, strand, length in hits:
+                        site = text[end + 1 - length:end + 1]
+                        if (strand == "-"):
+                            site = site.translate(IUPAC_COMPLEMENT)[::-1]
+                        yield MotifHit(record, names[number], strand,
+                                       start + end + 1 - length, start + end + 1, site)
+                offset += len(piece)
+                tail = text[max(len(text) - self.longest + 1, 0):] if (self.longest > 1) else ""
+                continue
+
+            for index, base in enumerate(piece.encode("latin-1").translate(CODON_BASES), len(tail)):
+                state = transitions[state + base]
+                if (outputs[state]):
+                    for number, strand, length in outputs[state]:
+                        site = text[index + 1 - length:index + 1]
+                        if (strand == "-"):
+                            site = site.translate(IUPAC_COMPLEMENT)[::-1]
+                        yield MotifHit(record, names[number], strand,
+                                       start + index + 1 - length, start + index + 1, site)
+            offset += len(piece)
+            tail = text[max(len(text) - self.longest + 1, 0):] if (self.longest > 1) else ""
+        # end for each piece
+
+    def findCodeHits(self, text, tailLength):
+        """ Returns the (end, hits) of every L-mer of text (NumPy only) that ends
+        past its first tailLength bases and is a plain motif, in order of end
+        and longest first; hits are the (motif number, strand, length) of it.
+        """
+        codes = np.frombuffer(text.encode("latin-1").translate(CODON_BASES), dtype=np.uint8)
+        badBases = np.flatnonzero(codes == 4) # (an L-mer holding one is no hit)
+        # the codes of the longest L-mers from the first that ends past the tail (past
+        # the end of the text they are padded with A's); those of a smaller L-mer
+        # starting at the same base are in their high bits
+        longest = self.codeHits[0][0]
+        first = max(tailLength - longest + 1, 0)
+        if (len(codes) - first < self.codeHits[-1][0]):
+            return []
+        baseCodes = np.concatenate((codes[first:] & 3, np.zeros(longest - 1, dtype=np.uint8)))
+        longestCodes = rollKmerCodes(baseCodes, longest, len(codes) - first)
+        positions = masks = None
+        if (self.prefixHits is not None): # only the L-mers that start some hit are looked at
+            positions = np.flatnonzero(self.prefixHits[longestCodes])
+            longestCodes = longestCodes[positions]
+            masks = self.prefixHits[longestCodes]
+        ends, ranks, slots = [], [], []
+        for rank, (length, motifCodes, hits, lookup) in enumerate(self.codeHits):
+            kmerCodes = longestCodes >> (2 * (longest - length)) if (length < longest) else longestCodes
+            if (masks is not None):
+                index = np.flatnonzero(masks & (1 << rank))
+                starts = positions[index]
+                found = lookup[kmerCodes[index]]
+            elif (lookup is not None):
+                starts = np.flatnonzero(lookup[kmerCodes] >= 0)
+                found = lookup[kmerCodes[starts]]
+            else:
+                motifCodes = motifCodes.astype(kmerCodes.dtype)
+                found = np.minimum(np.searchsorted(motifCodes, kmerCodes), len(motifCodes) - 1)
+                starts = np.flatnonzero(motifCodes[found] == kmerCodes)
+                found = found[starts]
+            starts += first
+            # keep those that end past the tail, before the end of the text
+            kept = (starts + length - 1 >= tailLength) & (starts + length <= len(codes))
+            if (len(badBases) and len(starts)): # and without a bad base in [start, start + L)
+                nextBad = np.searchsorted(badBases, starts)
+                kept &= (nextBad == len(badBases)) | (badBases[np.minimum(nextBad, len(badBases) - 1)] >= starts + length)
+            starts, found = starts[kept], found[kept]
+            ends.append(starts + length - 1)
+            ranks.append(np.full(len(starts), rank))
+            slots.append(found)
+        # end for each length
+        if (not ends):
+            return []
+        ends, ranks, slots = np.concatenate(ends), np.concatenate(ranks), np.concatenate(slots)
+        order = np.lexsort((ranks, ends))
+        return [(end, self.codeHits[rank][2][slot])
+                for end, rank, slot in zip(ends[order].tolist(), ranks[order].tolist(), slots[order].tolist())]
+#-------------------(end of class MotifScanner)----------------------------
+
+#--------------------------------------------------------------------------
+def scanMotifs(filename, motifs=PROMOTER_MOTIFS):
+    """ Generator of a MotifHit for every hit of many IUPAC motifs (a list, or a
+    dictionary of name -> motif) on both strands of every record of a FASTA
+    file, in one streaming pass (see MotifScanner).
+
+    for hit in BioDNA.scanMotifs("genome.fna", {"TATA": "TATAWAWR", "CAAT": "GGCCAATCT"}):
+        print(hit.record, hit.motif, hit.strand, hit.start)
+    -----------------------------------------------------------------------
+    """
+    scanner = motifs if isinstance(motifs, MotifScanner) else MotifScanner(motifs)
+
+    def recordPieces(pieces): # the pieces of one record, up to the next header
+        for header, piece in pieces:
+            if (header is not None):
+                nextHeaders.append(header)
+                return
+            yield piece
+
+    # any sequence before the first header is a record without a name, as in readFASTA()
+    nextHeaders = [""]
+    pieces = readFASTApieces(filename)
+    while (nextHeaders):
+        header = nextHeaders.pop()
+        name = header.split()[0] if header.split() else ""
+        yield from scanner.scan(recordPieces(pieces), name)
+#-------------------(end of scanMotifs())----------------------------------
+
+# ********* END OF FUNCTIONS THAT SCAN FOR MANY IUPAC MOTIFS IN ONE PASS *********
+
+# ********* THESE FUNCTIONS SCORE SEQUENCES WITH POSITION WEIGHT MATRICES ********
+
+# one window of a sequence that scores above the threshold of a position weight
+# matrix: its record, strand, 0-based [start, end) on the forward strand, log-odds
+# score and site as read on its own strand
+PWMHit = namedtuple("PWMHit", "record strand start end score site")
+
+# the prefilter of the TATA-box: only windows where the TATA-box regex (or its
+# reverse complement, for the reverse strand) matches are scored (with a matrix
+# whose consensus it matches, see scorePWM())
+TATA_PREFILTER = {"+": TATA_FORWARD, "-": TATA_REVERSE}
+
+#--------------------------------------------------------------------------
+class PositionWeightMatrix:
+    """ A position weight matrix (PWM, or PSSM) made from a count matrix laid out
+    the JASPAR way: four rows (A, C, G, T) of counts, one column per position.
+
+    Each count becomes the log-odds score log2(frequency / background) of its
+    base at its position, with pseudocount added (spread by the background) so
+    that a base never seen at a position is unlikely rather than impossible.
+    -----------------------------------------------------------------------
+    """
+    __slots__ = ("name", "counts", "logOdds", "length", "minScore", "maxScore")
+
+    def __init__(self, counts, name="", background=(0.25, 0.25, 0.25, 0.25), pseudocount=1.0):
+        if (len(counts) != 4 or len(set(len(row) for row in counts)) != 1):
+            raise ValueError("a count matrix needs four rows (A, C, G, T) of the same length")
+        self.name = name
+        self.counts = [list(row) for row in counts]
+        self.length = len(counts[0])
+        self.logOdds = [] # [position][base] log-odds scores
+        for position in range(self.length):
+            total = sum(row[position] for row in counts)
+            self.logOdds.append([math.log2((counts[base][position] + pseudocount * background[base]) /
+                                           (total + pseudocount) / background[base]) for base in range(4)])
+        self.minScore = sum(min(scores) for scores in self.logOdds)
+        self.maxScore = sum(max(scores) for scores in self.logOdds)
+
+    @classmethod
+    def fromSites(cls, sites, name="", **options):
+        """ Makes the matrix of the counts of aligned sites of the same length
+        (e.g. the boxes found by scanTATAboxes()). """
+        sites = [site.upper().replace("U", "T") for site in sites]
+        counts = [[sum(1 for site in sites if site[position] == base) for position in range(len(sites[0]))]
+                  for base in "ACGT"]
+        return cls(counts, name, **options)
+
+    def score(self, site):
+        """ Returns the log-odds score of a site (-inf if it has an ambiguous base). """
+        codes = site.encode("latin-1").translate(CODON_BASES)
+        if (len(codes) != self.length or 4 in codes):
+            return -math.inf
+        return sum(self.logOdds[position][base] for position, base in enumerate(codes))
+
+    def consensus(self):
+        """ Returns the site of the highest score (the first best base of each
+        position). """
+        return "".join("ACGT"[scores.index(max(scores))] for scores in self.logOdds)
+
+    def relativeScore(self, score):
+        """ Returns a score as a fraction of the way from the lowest possible
+        score (0.0) to the highest (1.0). """
+        return (score - self.minScore) / (self.maxScore - self.minScore) if self.maxScore > self.minScore else 1.0
+
+    def __repr__(self):
+        return "PositionWeightMatrix(%r, length %i)" % (self.name, self.length)
+#-------------------(end of class PositionWeightMatrix)--------------------
+
+#--------------------------------------------------------------------------
+def readJASPAR(filename):
+    """ Returns the PositionWeightMatrix of every count matrix of a JASPAR file,
+    in the JASPAR format (">MA0108.2 TBP" followed by rows "A [ 61 16 ... ]")
+    or the plain one (four rows of counts, A, C, G and T, with no header).
+    -----------------------------------------------------------------------
+    """
+    matrices = []
+    name, rows = "", []
+    with open(filename) as INPUT:
+        for nextLine in INPUT:
+            nextLine = nextLine.strip()
+            if (nextLine.startswith(">")):
+                name = nextLine[1:].strip()
+                continue
+            numbers = re.findall(r"-?\d+(?:\.\d*)?(?:[eE][-+]?\d+)?", nextLine)
+            if (not numbers):
+                continue
+            rows.append([float(number) for number in numbers])
+            if (len(rows) == 4): # a whole matrix
+                matrices.append(PositionWeightMatrix(rows, name))
+                name, rows = "", []
+    return matrices
+#-------------------(end of readJASPAR())----------------------------------
+
+#--------------------------------------------------------------------------
+def scorePWM(sequence, matrix, threshold=None, relativeThreshold=0.8, strands="+-", prefilter=None, record=""):
+    """ Returns a PWMHit for every window of a sequence (any case) that scores at
+    least threshold (a log-odds score) with a PositionWeightMatrix, or, without
+    a threshold, at least relativeThreshold of the way from the lowest to the
+    highest possible score, on the strands asked for, in order of start.
+
+    With NumPy the sequence is turned into 2-bit codes once and the scores of
+    all windows are added up one matrix position at a time from the rows of a
+    lookup table (the reverse strand uses the matrix turned around and
+    complemented), so a genome is scored in seconds; windows with an ambiguous
+    base never score. Without NumPy each window is scored base by base and
+    given up as soon as even the best bases of the rest of the matrix can't
+    take it to the threshold.
+
+    A prefilter of regexes by strand (e.g. TATA_PREFILTER) keeps the fast exact
+    search: then only the windows where its regex matches the lower-case
+    sequence, at their start, are scored. That only holds for a matrix laid out
+    like the regex (a TATA-box matrix of 8 columns for TATA_PREFILTER), so the
+    prefilter is applied only when its regexes match the consensus of the
+    matrix (and its reverse complement) at their start; otherwise every window
+    is scored.
+    -----------------------------------------------------------------------
+    """
+    if (isinstance(sequence, bytes)):
+        sequence = sequence.decode("latin-1")
+    if (threshold is None):
+        threshold = matrix.minScore + relativeThreshold * (matrix.maxScore - matrix.minScore)
+    length, windows = matrix.length, len(sequence) - matrix.length + 1
+    if (windows <= 0):
+        return []
+    if (prefilter):
+        consensus = matrix.consensus().lower()
+        if (not (prefilter["+"].match(consensus) and prefilter["-"].match(consensus.translate(IUPAC_COMPLEMENT)[::-1]))):
+            prefilter = None # (it would leave out windows that score)
+    lower = sequence.lower() if prefilter else None
+
+    hits = [] # (start, strand, score)
+    if (np is not None):
+        codes = baseCodes(sequence)
+        table = np.full((length, 5), -np.inf) # [position][base code] scores, -inf for ambiguous
+        table[:, :4] = matrix.logOdds
+        for strand in strands:
+            scores = table if (strand == "+") else table[::-1, [3, 2, 1, 0, 4]] # reverse complement
+            if (prefilter):
+                starts = np.array([match.start() for match in prefilter[strand].finditer(lower)], dtype=np.int64)
+                starts = starts[starts < windows]
+                total = np.zeros(len(starts))
+                for position in range(length):
+                    total += scores[position][codes[starts + position]]
+            else:
+                starts = None
+                total = np.zeros(windows)
+                for position in range(length):
+                    total += scores[position][codes[position:position + windows]]
+            found = np.flatnonzero(total >= threshold)
+            for index, score in zip(found.tolist(), total[found].tolist()):
+                hits.append((index if starts is None else int(starts[index]), strand, score))
+    else:
+        codes = sequence.encode("latin-1").translate(CODON_BASES)
+        for strand in strands:
+            if (prefilter):
+                starts = [match.start() for match in prefilter[strand].finditer(lower) if match.start() < windows]
+            else:
+                starts = range(windows)
+            # the scores of each position by base code in the order the window is read (from its
+            # end, complemented, for the reverse strand), and the best score of the positions after each
+            if (strand == "+"):
+                scores = [row + [-math.inf] for row in matrix.logOdds]
+            else:
+                scores = [row[::-1] + [-math.inf] for row in reversed(matrix.logOdds)]
+            best = [0.0] * (length + 1)
+            for position in range(length - 1, -1, -1):
+                best[position] = best[position + 1] + max(scores[position][:4])
+            for start in starts:
+                score = 0.0
+                for position in range(length):
+                    score += scores[position][codes[start + position]]
+                    if (score + best[position + 1] < threshold): # (can't reach it any more)
+                        break
+                else:
+                    hits.append((start, strand, score))
+
+    hits.sort(key=lambda hit: (hit[0], hit[1]))
+    results = []
+    for start, strand, score in hits:
+        site = sequence[start:start + length]
+        if (strand == "-"):
+            site = site.translate(IUPAC_COMPLEMENT)[::-1]
+        results.append(PWMHit(record, strand, start, start + length, score, site))
+    return results
+#-------------------(end of scorePWM())------------------------------------
+
+#--------------------------------------------------------------------------
+def scanPWM(filename, matrix, threshold=None, relativeThreshold=0.8, strands="+-", prefilter=None):
+    """ Generator of the PWMHits of a PositionWeightMatrix (see scorePWM()) on
+    every record of a FASTA file, a record at a time.
+
+    TBP = BioDNA.readJASPAR("MA0108.2.jaspar")[0]
+    for hit in BioDNA.scanPWM("genome.fna", TBP, relativeThreshold=0.9):
+        print(hit.record, hit.strand, hit.start, round(hit.score, 2), hit.site)
+    -----------------------------------------------------------------------
+    """
+    for header, sequence in readFASTA(filename):
+        name = header.split()[0] if header.split() else ""
+        yield from scorePWM(sequence, matrix, threshold, relativeThreshold, strands, prefilter, name)
+#-------------------(end of scanPWM())-------------------------------------
+
+# ********* END OF FUNCTIONS THAT SCORE SEQUENCES WITH POSITION WEIGHT MATRICES **
+
+# ********* THESE FUNCTIONS PROFILE GENOMIC SIGNATURES IN SLIDING WINDOWS ********
+
+# the genomic signature of one window of a record: the 0-based [start, end) of the
+# window, the number of (valid) L-mers in it, the count of every L-mer (by 2-bit
+# code, as in a dense KmerTable) and the GC content and GC and AT skews of its bases
+WindowSignature = namedtuple("WindowSignature", "record start end total counts GCcontent GCskew ATskew")
+
+NPY_HEADER_SIZE = 128 # bytes of the fixed-size header of the .npy matrices written here
+
+#--------------------------------------------------------------------------
+def kmerCodeArray(sequence, LmerSize):
+    """ Returns the 2-bit code of the L-mer starting at every position of a
+    sequence that has a whole L-mer, and whether it is valid (made only of A, C,
+    G and T): two NumPy arrays, or without NumPy one list with -1 for invalid.
+    -----------------------------------------------------------------------
+    """
+    codes = (sequence.encode("latin-1") if isinstance(sequence, str) else bytes(sequence)).translate(CODE_TABLE)
+    numberOfmotifs = max(len(codes) - LmerSize + 1, 0)
+    if (np is not None):
+        bases = np.frombuffer(codes, dtype=np.uint8)
+        kmerCodes = np.zeros(numberOfmotifs, dtype=np.uint32 if LmerSize <= 16 else np.int64)
+        for shift in range(LmerSize):
+            kmerCodes <<= 2
+            kmerCodes |= bases[shift:shift + numberOfmotifs] & 3
+        badBases = np.concatenate(([0], np.cumsum(bases == 4)))
+        valid = (badBases[LmerSize:LmerSize + numberOfmotifs] - badBases[:numberOfmotifs]) == 0
+        return kmerCodes, valid
+
+    mask = (1 << (2 * LmerSize)) - 1
+    kmerCodes = [-1] * numberOfmotifs
+    kmerCode, run = 0, 0 # rolling code and number of valid bases ending at the base
+    for end, base in enumerate(codes, 1):
+        if (base < 4):
+            kmerCode = ((kmerCode << 2) | base) & mask
+            run += 1
+        else:
+            run = 0
+        if (run >= LmerSize):
+            kmerCodes[end - LmerSize] = kmerCode
+    return kmerCodes, None
+#-------------------(end of kmerCodeArray())-------------------------------
+
+#--------------------------------------------------------------------------
+class SlidingSignatures:
+    """ Makes the WindowSignature of every window of windowSize bases of a
+    sequence, one every step bases (windowSize if None, i.e. windows side by
+    side), from the pieces of the sequence given one after another with add(),
+    a generator of the windows that each piece finishes (to be used up before
+    the next piece is added). A sequence shorter than a window gives none.
+
+    The counts are kept up to date as the window slides: the L-mers (and bases)
+    leaving the window are taken off and those entering it are added, so moving
+    the window costs time in proportion to the step, not to the window. The
+    codes of the L-mers are worked out once per piece (see kmerCodeArray()),
+    with the last L-1 bases of the pieces before carried over, and only the
+    bases from the start of the last window on are kept, so memory grows with
+    the window and the pieces, not with the sequence. The counts given back
+    belong to the window (a copy), so they can be kept.
+    -----------------------------------------------------------------------
+    """
+    __slots__ = ("LmerSize", "windowSize", "step", "record", "counts", "baseCounts", "total", "start",
+                 "bufferStart", "skip", "buffer", "baseCodes", "kmerCodes", "valid")
+
+    def __init__(self, LmerSize, windowSize, step=None, record=""):
+        if (step is None):
+            step = windowSize
+        if (LmerSize > DENSE_LMER_LIMIT or LmerSize > windowSize or step <= 0):
+            raise ValueError("need 0 < step, and L-mers of at most %i bases fitting in a window" % DENSE_LMER_LIMIT)
+        self.LmerSize, self.windowSize, self.step, self.record = LmerSize, windowSize, step, record
+        if (np is not None):
+            self.counts = np.zeros(4 ** LmerSize, dtype=np.int64)
+            self.baseCounts = np.zeros(5, dtype=np.int64) # A, C, G, T and other bases of the window
+        else:
+            self.counts = [0] * (4 ** LmerSize)
+            self.baseCounts = [0] * 5
+        self.total = None # valid L-mers in the window (None before the first window)
+        self.start = 0 # start of the next window
+        self.bufferStart = 0 # position in the sequence of the first base kept
+        self.skip = 0 # bases still to be skipped before the next one kept (a step past a window)
+        self.buffer = b"" # the bases kept, as they are
+        self.baseCodes = b"" # their 2-bit codes (4 if not A, C, G or T)
+        self.kmerCodes, self.valid = kmerCodeArray(b"", LmerSize) # of the L-mers starting at each of them
+
+    def add(self, bases):
+        """ Generator of the WindowSignatures finished by the next piece of the sequence. """
+        if (isinstance(bases, str)):
+            bases = bases.encode("latin-1")
+        if (self.skip):
+            skipped = min(self.skip, len(bases))
+            bases = bases[skipped:]
+            self.skip -= skipped
+        if (not bases):
+            return
+
+        # code the L-mers that the piece finishes (the last L-1 bases kept start the first)
+        coded = len(self.kmerCodes)
+        self.buffer += bases
+        self.baseCodes += bases.translate(CODE_TABLE)
+        kmerCodes, valid = kmerCodeArray(self.buffer[coded:], self.LmerSize)
+        if (np is not None):
+            self.kmerCodes = np.concatenate((self.kmerCodes, kmerCodes))
+            self.valid = np.concatenate((self.valid, valid))
+        else:
+            self.kmerCodes = self.kmerCodes + kmerCodes
+
+        windowSize, step = self.windowSize, self.step
+        motifsPerWindow = windowSize - self.LmerSize + 1 # L-mers starting in a window
+        while (self.start + windowSize <= self.bufferStart + len(self.buffer)):
+            start = self.start - self.bufferStart # (within the bases kept)
+            if (self.total is None or step >= motifsPerWindow): # nothing to keep from the last window
+                self.counts[:] = 0 if (np is not None) else [0] * len(self.counts)
+                self.baseCounts[:] = 0 if (np is not None) else [0] * 5
+                self.total = self.addMotifs(start, start + motifsPerWindow, 1)
+                self.addBases(start, start + windowSize, 1)
+            else: # the first step of the last window leaves, the step after it enters
+                self.total += self.addMotifs(start - step, start, -1)
+                self.total += self.addMotifs(start - step + motifsPerWindow, start + motifsPerWindow, 1)
+                self.addBases(start - step, start, -1)
+                self.addBases(start - step + windowSize, start + windowSize, 1)
+
+            A, C, G, T = [int(count) for count in self.baseCounts[:4]]
+            yield WindowSignature(self.record, self.start, self.start + windowSize, self.total,
+                                  self.counts.copy() if (np is not None) else list(self.counts),
+                                  (G + C) / (A + C + G + T) if (A + C + G + T) else 0.0,
+                                  (G - C) / (G + C) if (G + C) else 0.0,
+                                  (A - T) / (A + T) if (A + T) else 0.0)
+            self.start += step
+        # end for each window
+
+        # only keep the bases from the first one the next window needs
+        keepFrom = self.start - step if (self.total is not None and step < motifsPerWindow) else self.start
+        dropped = keepFrom - self.bufferStart
+        if (dropped > len(self.buffer)): # the next window starts past the bases seen so far
+            self.skip = dropped - len(self.buffer)
+        if (dropped > 0):
+            self.buffer, self.baseCodes = self.buffer[dropped:], self.baseCodes[dropped:]
+            self.kmerCodes = self.kmerCodes[dropped:]
+            if (np is not None):
+                self.valid = self.valid[dropped:]
+            self.bufferStart = keepFrom
+
+    def addMotifs(self, first, last, sign):
+        """ Adds (or with a sign of -1 takes off) the L-mers starting in [first, last). """
+        if (np is not None):
+            entering = self.kmerCodes[first:last][self.valid[first:last]]
+            np.add.at(self.counts, entering, sign)
+            return sign * len(entering)
+        added = 0
+        for code in self.kmerCodes[first:last]:
+            if (code >= 0):
+                self.counts[code] += sign
+                added += sign
+        return added
+
+    def addBases(self, first, last, sign):
+        """ Adds (or with a sign of -1 takes off) the bases in [first, last). """
+        if (np is not None):
+            self.baseCounts[:] += sign * np.bincount(np.frombuffer(self.baseCodes[first:last], dtype=np.uint8),
+                                                     minlength=5)
+        else:
+            for base in self.baseCodes[first:last]:
+                self.baseCounts[base] += sign
+#-------------------(end of class SlidingSignatures)-----------------------
+
+#--------------------------------------------------------------------------
+def slidingSignatures(sequence, LmerSize, windowSize, step=None, record="", blockSize=1 << 16):
+    """ Generator of a WindowSignature for every window of windowSize bases of a
+    sequence (a string, bytes or a PackedSequence), one every step bases
+    (windowSize if None, i.e. windows side by side); a sequence shorter than a
+    window gives none. The sequence goes through SlidingSignatures blockSize
+    bases at a time.
+    -----------------------------------------------------------------------
+    """
+    sliding = SlidingSignatures(LmerSize, windowSize, step, record)
+    if (isinstance(sequence, PackedSequence)):
+        pieces = (bases for start, bases in sequence.chunks(blockSize))
+    else:
+        pieces = (sequence[start:start + blockSize] for start in range(0, len(sequence), blockSize))
+    for bases in pieces:
+        yield from sliding.add(bases)
+#-------------------(end of slidingSignatures())---------------------------
+
+#--------------------------------------------------------------------------
+def writeNpyHeader(OUTPUT, shape, descr="<f4"):
+    """ Writes (or rewrites) the header of a .npy file of little-endian float32
+    (or of another type descr, "<i8" for int64) with the given shape, padded to
+    NPY_HEADER_SIZE bytes so that the rows can be streamed after it before the
+    final shape is known. """
+    header = "{'descr': '%s', 'fortran_order': False, 'shape': %r, }" % (descr, tuple(shape))
+    header = header.ljust(NPY_HEADER_SIZE - 10 - 1) + "\n"
+    OUTPUT.seek(0)
+    OUTPUT.write(b"\x93NUMPY\x01\x00" + struct.pack("<H", len(header)) + header.encode("latin-1"))
+#-------------------(end of writeNpyHeader())------------------------------
+
+#--------------------------------------------------------------------------
+def writeSlidingSignatures(filename, LmerSize, windowSize, step=None, outputFilename="Signatures.npy"):
+    """ Writes the sliding-window signatures (see slidingSignatures()) of every
+    record of a FASTA file as a compact binary matrix: outputFilename is a .npy
+    file of float32 with one row per window holding the frequency of each of
+    the 4**L L-mers (in 2-bit code order: AA..A, AA..C, ... TT..T), and next to
+    it a CSV file (outputFilename less ".npy", plus "_windows.csv") says what
+    each row is: record, start, end, L-mers, GC content, GC and AT skew.
+
+    The rows are streamed to the file as the windows are made, so the matrix
+    never has to be in memory; numpy.load(outputFilename, mmap_mode="r") reads
+    it back. Returns the number of windows written.
+    -----------------------------------------------------------------------
+    """
+    return writeSlidingSignatureSizes(filename, [LmerSize], windowSize, step, [outputFilename])[0]
+#-------------------(end of writeSlidingSignatures())----------------------
+
+#--------------------------------------------------------------------------
+def writeSlidingSignatureSizes(filename, LmerSizes, windowSize, step=None, outputFilenames=None, blockSize=1 << 16):
+    """ Same as writeSlidingSignatures() for several L-mer sizes, the signatures
+    of each size written to the file of outputFilenames in the same place, in a
+    single read of the FASTA file: the records are streamed blockSize bases at a
+    time (see readFASTAwindows()) through one SlidingSignatures per size, so
+    neither a record nor the codes of its L-mers are ever held whole. Returns
+    the number of windows written (the same for every size).
+    -----------------------------------------------------------------------
+    """
+    if (outputFilenames is None):
+        outputFilenames = ["Signatures_L%i.npy" % LmerSize for LmerSize in LmerSizes]
+    littleEndian = struct.pack("=f", 1.0) == struct.pack("<f", 1.0)
+    rows = [0] * len(LmerSizes)
+    outputs = [] # (matrix file, windows file) of each size
+    try:
+        for outputFilename, LmerSize in zip(outputFilenames, LmerSizes):
+            OUTPUT = open(outputFilename, "wb")
+            WINDOWS = open(os.path.splitext(outputFilename)[0] + "_windows.csv", "w")
+            outputs.append((OUTPUT, WINDOWS))
+            writeNpyHeader(OUTPUT, (0, 4 ** LmerSize)) # (rewritten once the rows are counted)
+            WINDOWS.write("record,start,end,Lmers,GCcontent,GCskew,ATskew\n")
+
+        slidings = []
+        for header, start, bases in readFASTAwindows(filename, blockSize):
+            if (start == 0): # a new record
+                name = header.split()[0] if header.split() else ""
+                slidings = [SlidingSignatures(LmerSize, windowSize, step, name) for LmerSize in LmerSizes]
+            for size, (sliding, (OUTPUT, WINDOWS)) in enumerate(zip(slidings, outputs)):
+                for window in sliding.add(bases):
+                    if (np is not None):
+                        frequencies = window.counts.astype("<f4")
+                        if (window.total):
+                            frequencies /= window.total
+                    else:
+                        frequencies = array.array("f", [count / window.total if window.total else 0.0
+                                                        for count in window.counts])
+                        if (not littleEndian):
+                            frequencies.byteswap()
+                    OUTPUT.write(frequencies.tobytes())
+                    WINDOWS.write("%s,%i,%i,%i,%.6f,%.6f,%.6f\n" % (window.record, window.start, window.end,
+                                  window.total, window.GCcontent, window.GCskew, window.ATskew))
+                    rows[size] += 1
+        # end for each block of each record
+
+        for LmerSize, (OUTPUT, WINDOWS), count in zip(LmerSizes, outputs, rows):
+            writeNpyHeader(OUTPUT, (count, 4 ** LmerSize))
+    finally:
+        for OUTPUT, WINDOWS in outputs:
+            OUTPUT.close()
+            WINDOWS.close()
+    return rows
+#-------------------(end of writeSlidingSignatureSizes())------------------
+
+# ********* END OF FUNCTIONS THAT PROFILE GENOMIC SIGNATURES IN SLIDING WINDOWS **
+
+# ********* THESE FUNCTIONS COMPARE THE GENOMIC SIGNATURES OF MANY GENOMES *******
+
+SIGNATURE_METRICS = ("delta", "euclidean", "cosine", "jensenshannon") # see signatureDistances()
+
+#--------------------------------------------------------------------------
+def signatureVector(table, mode="frequency"):
+    """ Returns the genomic signature of a dense KmerTable as a vector of 4**L
+    numbers in 2-bit code order: the frequency of every L-mer (mode
+    "frequency"), or its relative abundance (mode "karlin"), the frequency over
+    the frequency expected from the base composition, f(xy) / (f(x) f(y)) for
+    dinucleotides as in Karlin's genomic signature. A NumPy array, or a list.
+
+    A canonical table gives one number per canonical L-mer (see canonicalCodes()),
+    the signature of both strands: the frequency of the L-mer and its reverse
+    complement together, or their relative abundance over the base composition
+    of both strands.
+    -----------------------------------------------------------------------
+    """
+    if (not table.isDense()):
+        raise ValueError("signatures need L-mers of at most %i bases" % DENSE_LMER_LIMIT)
+    if (mode not in ("frequency", "karlin")):
+        raise ValueError("mode must be frequency or karlin")
+    valid = sum(table.counts) if (np is None) else int(table.counts.sum())
+
+    if (table.canonical and mode == "karlin"):
+        # spread the counts of the canonical table over all 4**L L-mers of the two
+        # strands (a reverse palindrome is its own reverse complement and is seen
+        # twice), take the relative abundance of those and keep the canonical ones
+        codes, slots = canonicalCodes(table.LmerSize)
+        bothStrands = KmerTable(table.LmerSize)
+        if (np is not None):
+            counts = table.counts[slots]
+            counts[codes[np.bincount(slots) == 1]] *= 2 # (the slots of the palindromes are used once)
+            bothStrands.counts = counts
+            return signatureVector(bothStrands, mode)[codes]
+        members = Counter(slots)
+        bothStrands.counts = [table.counts[slot] * (2 if members[slot] == 1 else 1) for slot in slots]
+        abundance = signatureVector(bothStrands, mode)
+        return [abundance[code] for code in codes]
+    size = len(table.counts)
+
+    if (np is not None):
+        frequencies = table.counts / valid if valid else np.zeros(size)
+        if (mode == "frequency"):
+            return frequencies
+        bases = frequencies.reshape(4, -1).sum(axis=1) # frequency of the first base of the L-mers
+        expected = bases
+        for position in range(1, table.LmerSize):
+            expected = np.outer(expected, bases).ravel()
+        abundance = np.zeros(size)
+        np.divide(frequencies, expected, out=abundance, where=(expected > 0))
+        return abundance
+
+    frequencies = [count / valid if valid else 0.0 for count in table.counts]
+    if (mode == "frequency"):
+        return frequencies
+    quarter = size // 4
+    bases = [sum(frequencies[base * quarter:(base + 1) * quarter]) for base in range(4)]
+    abundance = []
+    for code, frequency in enumerate(frequencies):
+        expected = 1.0
+        for shift in range(table.LmerSize):
+            expected *= bases[(code >> (2 * shift)) & 3]
+        abundance.append(frequency / expected if expected > 0 else 0.0)
+    return abundance
+#-------------------(end of signatureVector())-----------------------------
+
+#--------------------------------------------------------------------------
+def signatureMatrix(inputPaths, LmerSize, mode="frequency", workers=1, canonical=False, cache=None):
+    """ Counts the L-mers of every FASTA file of inputPaths (directories and/or
+    files, see listFASTAfiles()) and returns (fileList, matrix), where each row
+    of the matrix is the signatureVector() of a file (a NumPy array, or a list
+    of lists). With more than one worker the files are counted in parallel;
+    with canonical set the rows are the signatures of both strands, and with a
+    KmerCache the counts of files seen before are read back from it.
+    -----------------------------------------------------------------------
+    """
+    fileList, matrices = signatureMatrices(inputPaths, [LmerSize], mode, workers, canonical, cache)
+    return fileList, matrices[LmerSize]
+#-------------------(end of signatureMatrix())-----------------------------
+
+#--------------------------------------------------------------------------
+def signatureMatrices(inputPaths, LmerSizes, mode="frequency", workers=1, canonical=False, cache=None):
+    """ Same as signatureMatrix() for several L-mer sizes, all counted in one
+    scan of each file; returns (fileList, matrices) where matrices is a
+    dictionary of the matrices keyed by L-mer size.
+    -----------------------------------------------------------------------
+    """
+    fileList = listFASTAfiles(inputPaths)
+    rows = {LmerSize: [] for LmerSize in LmerSizes}
+    for nextFile, tables in countFiles(fileList, LmerSizes, workers, canonical, cache):
+        for LmerSize in LmerSizes:
+            rows[LmerSize].append(signatureVector(tables[LmerSize], mode))
+    if (np is None):
+        return fileList, rows
+    matrices = {}
+    for LmerSize in LmerSizes:
+        columns = len(canonicalCodes(LmerSize)[0]) if canonical else 4 ** LmerSize
+        matrices[LmerSize] = np.array(rows[LmerSize]).reshape(len(fileList), columns)
+    return fileList, matrices
+#-------------------(end of signatureMatrices())---------------------------
+
+#--------------------------------------------------------------------------
+def signatureDistance(first, second, metric="delta"):
+    """ Returns the distance between two signature vectors (see signatureDistances()). """
+    size = len(first)
+    if (metric == "delta"):
+        return sum(abs(a - b) for a, b in zip(first, second)) / size
+    if (metric == "euclidean"):
+        return math.sqrt(sum((a - b) ** 2 for a, b in zip(first, second)))
+    if (metric == "cosine"):
+        norms = math.sqrt(sum(a * a for a in first)) * math.sqrt(sum(b * b for b in second))
+        return 1.0 - sum(a * b for a, b in zip(first, second)) / norms if norms else 1.0
+    if (metric == "jensenshannon"):
+        first = [a / sum(first) for a in first] if sum(first) else first
+        second = [b / sum(second) for b in second] if sum(second) else second
+        divergence = 0.0
+        for a, b in zip(first, second):
+            middle = (a + b) / 2
+            if (a > 0):
+                divergence += a * math.log2(a / middle) / 2
+            if (b > 0):
+                divergence += b * math.log2(b / middle) / 2
+        return math.sqrt(max(divergence, 0.0))
+    raise ValueError("metric must be one of " + ", ".join(SIGNATURE_METRICS))
+#-------------------(end of signatureDistance())---------------------------
+
+#--------------------------------------------------------------------------
+def distanceRows(matrix, metric="delta", blockSize=256):
+    """ Generator of the rows of the distance matrix between the signatures of
+    matrix (see signatureDistances()), blockSize rows at a time, as (first row,
+    block) pairs; only a block (blockSize x N) is ever in memory.
+
+    With NumPy each block is worked out with batched array operations: the
+    euclidean and cosine distances from one matrix product with all signatures
+    (|a|^2 + |b|^2 - 2ab and the product of the normalized rows), the delta and
+    Jensen-Shannon distances one signature of the block against all at once.
+    -----------------------------------------------------------------------
+    """
+    if (metric not in SIGNATURE_METRICS):
+        raise ValueError("metric must be one of " + ", ".join(SIGNATURE_METRICS))
+
+    if (np is None):
+        for first in range(0, len(matrix), blockSize):
+            yield first, [[signatureDistance(row, other, metric) for other in matrix]
+                          for row in matrix[first:first + blockSize]]
+        return
+
+    matrix = np.asarray(matrix, dtype=np.float64)
+    size = matrix.shape[1]
+    if (metric == "euclidean"):
+        squares = (matrix * matrix).sum(axis=1)
+    elif (metric == "cosine"):
+        norms = np.sqrt((matrix * matrix).sum(axis=1))
+        normalized = np.zeros_like(matrix)
+        np.divide(matrix, norms[:, None], out=normalized, where=(norms[:, None] > 0))
+    elif (metric == "jensenshannon"):
+        sums = matrix.sum(axis=1)
+        probabilities = np.zeros_like(matrix)
+        np.divide(matrix, sums[:, None], out=probabilities, where=(sums[:, None] > 0))
+        # sum of p log2 p of each row, so only the cross terms are left for each pair
+        # (log2 of at least 1e-300 keeps 0 log 0 at 0)
+        entropies = (probabilities * np.log2(np.maximum(probabilities, 1e-300))).sum(axis=1)
+    if (metric in ("delta", "jensenshannon")): # room reused for every row of a block
+        work, logs = np.empty_like(matrix), np.empty_like(matrix)
+
+    for first in range(0, len(matrix), blockSize):
+        block = matrix[first:first + blockSize]
+        if (metric == "euclidean"):
+            distances = squares[first:first + blockSize, None] + squares[None, :] - 2 * (block @ matrix.T)
+            distances = np.sqrt(np.maximum(distances, 0))
+            # (the rounding of the product can leave a little more than 0 on the diagonal)
+            distances[np.arange(len(block)), np.arange(first, first + len(block))] = 0.0
+        elif (metric == "cosine"):
+            distances = 1.0 - normalized[first:first + blockSize] @ normalized.T
+            zero = (norms[first:first + blockSize, None] == 0) | (norms[None, :] == 0)
+            distances[zero] = 1.0
+        elif (metric == "delta"):
+            distances = np.empty((len(block), len(matrix)))
+            for index, row in enumerate(block):
+                np.subtract(matrix, row, out=work)
+                np.abs(work, out=work)
+                distances[index] = work.sum(axis=1) / size
+        else: # jensenshannon: (sum p log p + sum q log q - sum (p+q) log((p+q)/2)) / 2
+            distances = np.empty((len(block), len(matrix)))
+            for index, row in enumerate(probabilities[first:first + blockSize]):
+                np.add(probabilities, row, out=work)
+                np.maximum(work, 1e-300, out=logs)
+                np.log2(logs, out=logs)
+                logs *= work
+                cross = logs.sum(axis=1) - work.sum(axis=1)
+                divergence = (entropies[first + index] + entropies - cross) / 2
+                distances[index] = np.sqrt(np.maximum(divergence, 0))
+        yield first, distances
+#-------------------(end of distanceRows())--------------------------------
+
+#--------------------------------------------------------------------------
+def signatureDistances(matrix, metric="delta", blockSize=256):
+    """ Returns the N x N matrix of distances between the N signatures (rows) of
+    matrix: "delta" (the mean absolute difference, Karlin's delta when the rows
+    are relative abundances), "euclidean", "cosine" (1 - cosine similarity) or
+    "jensenshannon" (the square root of the Jensen-Shannon divergence, in bits,
+    of the rows taken as distributions). For more genomes than fit in memory use
+    writeDistanceMatrix(), which never holds the whole matrix.
+    -----------------------------------------------------------------------
+    """
+    blocks = [block for first, block in distanceRows(matrix, metric, blockSize)]
+    if (np is not None):
+        return np.vstack(blocks) if blocks else np.zeros((0, 0))
+    return [row for block in blocks for row in block]
+#-------------------(end of signatureDistances())--------------------------
+
+#--------------------------------------------------------------------------
+def writeDistanceMatrix(matrix, metric="delta", outputFilename="Distances.npy", blockSize=256):
+    """ Writes the distance matrix between the signatures of matrix (see
+    signatureDistances()) to a .npy file of float32, a block of rows at a time,
+    so that the N x N matrix never has to be in memory (read it back with
+    numpy.load(outputFilename, mmap_mode="r")). Returns the number of rows.
+    -----------------------------------------------------------------------
+    """
+    littleEndian = struct.pack("=f", 1.0) == struct.pack("<f", 1.0)
+    with open(outputFilename, "wb") as OUTPUT:
+        writeNpyHeader(OUTPUT, (len(matrix), len(matrix)))
+        for first, block in distanceRows(matrix, metric, blockSize):
+            if (np is not None):
+                OUTPUT.write(block.astype("<f4").tobytes())
+            else:
+                for row in block:
+                    values = array.array("f", row)
+                    if (not littleEndian):
+                        values.byteswap()
+                    OUTPUT.write(values.tobytes())
+    return len(matrix)
+#-------------------(end of writeDistanceMatrix())-------------------------
+
+# ********* END OF FUNCTIONS THAT COMPARE THE GENOMIC SIGNATURES OF MANY GENOMES *
+
+# ********* THESE FUNCTIONS CACHE THE L-MER COUNTS OF GENOMES ON DISK ************
+
+KMER_CACHE_VERSION = 1 # entries written with another version are counted again
+
+#--------------------------------------------------------------------------
+def contentHash(filename):
+    """ Returns the SHA-1 (in hex) of the content of a file, read in blocks. """
+    digest = hashlib.sha1()
+    with open(filename, "rb") as INPUT:
+        for block in iter(lambda: INPUT.read(1 << 22), b""):
+            digest.update(block)
+    return digest.hexdigest()
+#-------------------(end of contentHash())---------------------------------
+
+#--------------------------------------------------------------------------
+def textHash(filename):
+    """ Returns the SHA-1 (in hex) of the text of a FASTA file as the readers
+    read it (uncompressed, see readFASTApieces()), read in blocks. """
+    digest = hashlib.sha1()
+    with openFASTA(filename, text=True) as INPUT:
+        for block in iter(lambda: INPUT.read(1 << 20), ""):
+            digest.update(block.encode("utf-8", "surrogatepass"))
+    return digest.hexdigest()
+#-------------------(end of textHash())------------------------------------
+
+#--------------------------------------------------------------------------
+def newDigest(digests, filename):
+    """ Returns a new SHA-1 digest for the text of a file, kept in the
+    dictionary of digests under its name, or None without a dictionary. """
+    if (digests is None):
+        return None
+    digests[filename] = hashlib.sha1()
+    return digests[filename]
+#-------------------(end of newDigest())-----------------------------------
+
+#--------------------------------------------------------------------------
+def readInt64Rows(filename):
+    """ Reads back a .npy matrix of little-endian int64 written with
+    writeNpyHeader(): a memory-mapped (copy-on-write) NumPy array, so only the
+    parts that are used are ever read, or a list of lists without NumPy. """
+    if (np is not None):
+        return np.load(filename, mmap_mode="c")
+    with open(filename, "rb") as INPUT:
+        INPUT.seek(8)
+        header = INPUT.read(struct.unpack("<H", INPUT.read(2))[0]).decode("latin-1")
+        rows, columns = map(int, re.search(r"'shape': \((\d+), (\d+)\)", header).groups())
+        values = array.array("q")
+        values.frombytes(INPUT.read())
+    if (struct.pack("=q", 1) != struct.pack("<q", 1)): # a big-endian machine
+        values.byteswap()
+    return [values[row * columns:(row + 1) * columns].tolist() for row in range(rows)]
+#-------------------(end of readInt64Rows())-------------------------------
+
+#--------------------------------------------------------------------------
+class KmerCache:
+    """ An on-disk cache of the KmerTables of FASTA files, so that a genome that
+    is analyzed again (with another number of top rankings, say) is not
+    counted again.
+
+    An entry is keyed by the SHA-1 of the content of the file, the L-mer size
+    and the strand mode (canonical or not), so a file that changes simply stops
+    matching its old entries, and a copy of a file matches the same ones. The
+    hash of each file is remembered with its size and modification time in
+    "hashes.json", which spares hashing files that have not changed. Each
+    entry is a .npy matrix of int64 (the counts and first positions of the
+    table; for L-mers larger than DENSE_LMER_LIMIT, the codes too) that is
+    read back memory-mapped, beside a .json of the rest of the table.
+
+    Reading an entry marks it as used (its modification time is set to now).
+    New entries are written as they come, but the hashes of new files are only
+    saved, and the cache only trimmed, by flush(): countFiles() calls it once
+    after each batch of files (close() does too). Trimming deletes the least
+    recently used entries until the cache holds at most maxBytes, as opening
+    the cache does.
+    -----------------------------------------------------------------------
+    """
+    __slots__ = ("directory", "maxBytes", "hashes", "unsaved", "stored")
+
+    def __init__(self, directory, maxBytes=1 << 30):
+        self.directory = directory
+        self.maxBytes = maxBytes
+        os.makedirs(directory, exist_ok=True)
+        try:
+            with open(os.path.join(directory, "hashes.json")) as HASHES:
+                self.hashes = json.load(HASHES) # path -> [size, modification time, hash]
+        except (OSError, ValueError):
+            self.hashes = {}
+        self.unsaved = False # are there hashes that are not in hashes.json yet?
+        self.stored = 0 # entries stored since the last flush()
+        self.evict() # (in case maxBytes is smaller than last time)
+
+    def fileHash(self, filename):
+        """ Returns the SHA-1 (in hex) of the content of a file. """
+        status = os.stat(filename)
+        path = os.path.abspath(filename)
+        known = self.hashes.get(path)
+        if (known and known[:2] == [status.st_size, status.st_mtime_ns]):
+            return known[2]
+
+        digest = contentHash(filename)
+        self.hashes[path] = [status.st_size, status.st_mtime_ns, digest]
+        self.unsaved = True # (saved by flush())
+        return digest
+
+    def entry(self, filename, LmerSize, canonical=False):
+        """ Returns the path (less ".npy" or ".json") of the entry of a table. """
+        return os.path.join(self.directory, "%s_L%i%s" % (self.fileHash(filename), LmerSize,
+                                                          "_canonical" if canonical else ""))
+
+    def load(self, filename, LmerSize, canonical=False):
+        """ Returns the cached KmerTable of a file, or None if there is none. """
+        stem = self.entry(filename, LmerSize, canonical)
+        try:
+            with open(stem + ".json") as ENTRY:
+                details = json.load(ENTRY)
+            rows = readInt64Rows(stem + ".npy")
+            os.utime(stem + ".npy")
+        except (OSError, ValueError):
+            return None
+        if (details.get("version") != KMER_CACHE_VERSION):
+            return None
+
+        table = KmerTable(LmerSize, canonical)
+        if (table.isDense()):
+            if (len(rows) != 2 or len(rows[0]) != len(table.counts)):
+                return None
+            table.counts, table.first = rows[0], rows[1]
+        else:
+            codes = rows[0].tolist() if (np is not None) else rows[0]
+            table.counts = dict(zip(codes, rows[1].tolist() if (np is not None) else rows[1]))
+            table.first = dict(zip(codes, rows[2].tolist() if (np is not None) else rows[2]))
+        table.total = details["total"]
+        table.other = details["other"]
+        return table
+
+    def store(self, filename, table):
+        """ Adds the KmerTable of a file to the cache (trimmed by flush()). """
+        stem = self.entry(filename, table.LmerSize, table.canonical)
+        if (table.isDense()):
+            rows = [table.counts, table.first]
+        else:
+            codes = sorted(table.counts)
+            rows = [codes, [table.counts[code] for code in codes], [table.first[code] for code in codes]]
+
+        littleEndian = struct.pack("=q", 1) == struct.pack("<q", 1)
+        temporary = ".%i" % os.getpid() # the files are written whole, then renamed
+        with open(stem + ".npy" + temporary, "wb") as OUTPUT:
+            writeNpyHeader(OUTPUT, (len(rows), len(rows[0])), "<i8")
+            for row in rows:
+                if (np is not None):
+                    OUTPUT.write(np.asarray(row, dtype="<i8").tobytes())
+                else:
+                    values = array.array("q", row)
+                    if (not littleEndian):
+                        values.byteswap()
+                    OUTPUT.write(values.tobytes())
+        with open(stem + ".json" + temporary, "w") as ENTRY:
+            json.dump({"version": KMER_CACHE_VERSION, "file": os.path.abspath(filename),
+                       "LmerSize": table.LmerSize, "canonical": table.canonical,
+                       "total": table.total, "other": table.other}, ENTRY)
+        os.replace(stem + ".json" + temporary, stem + ".json")
+        os.replace(stem + ".npy" + temporary, stem + ".npy")
+        self.stored += 1
+
+    def flush(self):
+        """ Saves the new hashes in hashes.json (dropping those of files that no
+        longer exist) and, when entries have been stored since the last flush,
+        trims the cache; returns the number of entries deleted. """
+        if (self.unsaved):
+            self.hashes = {known: value for known, value in self.hashes.items() if os.path.exists(known)}
+            temporaryFilename = os.path.join(self.directory, "hashes.json.%i" % os.getpid())
+            with open(temporaryFilename, "w") as HASHES:
+                json.dump(self.hashes, HASHES)
+            os.replace(temporaryFilename, os.path.join(self.directory, "hashes.json"))
+            self.unsaved = False
+        if (not self.stored):
+            return 0
+        self.stored = 0
+        return self.evict()
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exception):
+        self.close()
+
+    def evict(self):
+        """ Deletes the least recently used entries until the cache holds at
+        most maxBytes; returns the number of entries deleted. """
+        entries = []
+        for matrixFilename in glob.glob(os.path.join(glob.escape(self.directory), "*_L*.npy")):
+            stem = matrixFilename[:-len(".npy")]
+            try:
+                status = os.stat(matrixFilename)
+                size = status.st_size + os.path.getsize(stem + ".json")
+            except OSError: # (being written or deleted by another run)
+                continue
+            entries.append((status.st_mtime_ns, size, stem))
+        entries.sort()
+
+        totalSize = sum(size for used, size, stem in entries)
+        deleted = 0
+        for used, size, stem in entries:
+            if (totalSize <= self.maxBytes):
+                break
+            for extension in (".json", ".npy"):
+                try:
+                    os.remove(stem + extension)
+                except OSError:
+                    pass
+            totalSize -= size
+            deleted += 1
+        return deleted
+#-------------------(end of class KmerCache)-------------------------------
+
+#--------------------------------------------------------------------------
+def countFiles(fileList, LmerSizes, workers=1, canonical=False, cache=None, pipelineDepth=None, digests=None):
+    """ Generator of a (filename, tables) pair for each FASTA file of fileList,
+    in that order, where tables is a dictionary of KmerTables keyed by L-mer
+    size. The files are counted one after the other (through countPipeline(),
+    unless pipelineDepth is 0), or with more than one worker (None means one
+    per CPU) by countFilesInParallel(). With a KmerCache, a file whose tables
+    of every size are in the cache is read back from it and the tables of the
+    other files are stored in it once counted (it is flushed once, after the
+    last file). With a dictionary of digests, each file that is read is hashed
+    as it is read (see countFilesInParallel()); those read back from the cache
+    are not.
+    -----------------------------------------------------------------------
+    """
+    cachedTables = [] # the cached tables of each file, or None
+    for nextFile in fileList:
+        tables = None
+        if (cache is not None):
+            instrumentFile(nextFile)
+            with InstrumentedStage("cache"):
+                tables = {LmerSize: cache.load(nextFile, LmerSize, canonical) for LmerSize in LmerSizes}
+            if (None in tables.values()):
+                tables = None
+        cachedTables.append(tables)
+
+    missingFiles = [nextFile for nextFile, tables in zip(fileList, cachedTables) if tables is None]
+    if (pipelineDepth is None):
+        pipelineDepth = PIPELINE_DEPTH
+    if (workers == 1 and pipelineDepth and missingFiles):
+        countedFiles = countPipeline(missingFiles, LmerSizes, canonical, pipelineDepth, digests=digests)
+    elif (workers == 1):
+        countedFiles = ((nextFile, countFASTAkmerSizes(nextFile, LmerSizes, canonical=canonical,
+                                                       digest=newDigest(digests, nextFile)))
+                        for nextFile in missingFiles)
+    else:
+        countedFiles = countFilesInParallel(missingFiles, LmerSizes, workers, canonical=canonical, digests=digests)
+
+    try:
+        for nextFile, tables in zip(fileList, cachedTables):
+            instrumentFile(nextFile) # the stages that follow are those of this file
+            if (tables is None):
+                nextFile, tables = next(countedFiles)
+                if (cache is not None):
+                    with InstrumentedStage("cache"):
+                        for LmerSize in LmerSizes:
+                            cache.store(nextFile, tables[LmerSize])
+            yield nextFile, tables
+    finally: # the hashes are saved and the cache is trimmed once for the whole batch
+        if (cache is not None):
+            cache.flush()
+#-------------------(end of countFiles())----------------------------------
+
+# ********* END OF FUNCTIONS THAT CACHE THE L-MER COUNTS OF GENOMES ON DISK *****
+
+# ********* THESE FUNCTIONS ANALYZE AGAIN ONLY THE GENOMES THAT CHANGED **********
+
+RESULTS_MANIFEST_VERSION = 2 # manifests written with another version are started over
+
+# what the output needs of the KmerTable of a file whose rankings are in a manifest
+RankedTable = namedtuple("RankedTable", "LmerSize total")
+
+#--------------------------------------------------------------------------
+class ResultsManifest:
+    """ A manifest of the genomes behind an output file, kept next to it (with
+    "_manifest.json" in place of its extension), so that the output can be
+    written again after only the new or changed genomes are analyzed.
+
+    For each file, under its path relative to the directory of the manifest
+    (so the analysis can be run again from any directory, and the output and
+    its genomes moved together), it holds the size, modification time and
+    SHA-1 of the text it was analyzed with (see textHash(); breakIntoMotifs()
+    hashes it as the file is read), and its results: the number of L-mers and
+    the top ranked (motif, count) pairs of each L-mer size. These are all the
+    output is made of, so an output written from the manifest is the same as
+    one written after counting every genome again. A file whose size and
+    modification time have not changed is taken as it is; otherwise its hash
+    is checked, so a file that was only touched (or copied back) is not
+    analyzed again. The manifest holds the parameters of the analysis (L-mer
+    sizes, number of top rankings and strand mode) too: with other parameters,
+    or another version, every genome is analyzed again. Files that are no
+    longer analyzed are dropped from it by save().
+    -----------------------------------------------------------------------
+    """
+    __slots__ = ("filename", "directory", "parameters", "files")
+
+    def __init__(self, outputFilename, LmerSizes, numberOfTopRankings, canonical=False):
+        self.filename = os.path.splitext(outputFilename)[0] + "_manifest.json"
+        self.directory = os.path.dirname(os.path.abspath(self.filename))
+        self.parameters = {"LmerSizes": sorted(set(LmerSizes)), "numberOfTopRankings": numberOfTopRankings,
+                           "canonical": bool(canonical)}
+        try:
+            with open(self.filename) as MANIFEST:
+                manifest = json.load(MANIFEST)
+        except (OSError, ValueError):
+            manifest = {}
+        if (manifest.get("version") == RESULTS_MANIFEST_VERSION and manifest.get("parameters") == self.parameters):
+            self.files = manifest["files"] # relative path -> size, modification time, hash and results
+        else:
+            self.files = {}
+
+    def key(self, filename):
+        """ Returns the path of a file relative to the directory of the manifest
+        (its full path if there is none, e.g. on another drive). """
+        try:
+            return os.path.relpath(os.path.abspath(filename), self.directory)
+        except ValueError:
+            return os.path.abspath(filename)
+
+    def results(self, filename):
+        """ Returns the (tables, rankings) of a file that has not changed since
+        it was recorded, as breakIntoMotifs() writes them (the tables are
+        RankedTables), or None if the file is new or has changed. """
+        known = self.files.get(self.key(filename))
+        if (known is None):
+            return None
+        try:
+            status = os.stat(filename)
+            if ([status.st_size, status.st_mtime_ns] != [known["size"], known["mtime_ns"]]):
+                if (status.st_size != known["size"] or textHash(filename) != known["sha1"]):
+                    return None
+                known["mtime_ns"] = status.st_mtime_ns # (only touched)
+        except OSError:
+            return None
+
+        tables, rankings = {}, {}
+        for LmerSize in self.parameters["LmerSizes"]:
+            tables[LmerSize] = RankedTable(LmerSize, known["totals"][str(LmerSize)])
+            rankings[LmerSize] = [(motif, count) for motif, count in known["rankings"][str(LmerSize)]]
+        return tables, rankings
+
+    def record(self, filename, tables, rankings, digest=None):
+        """ Records the results of a file that was just analyzed (its tables and
+        rankings are dictionaries keyed by L-mer size); digest is the hashlib
+        digest of its text when it was hashed as it was read, otherwise the
+        file is read again to hash it. """
+        status = os.stat(filename)
+        self.files[self.key(filename)] = {
+            "size": status.st_size, "mtime_ns": status.st_mtime_ns,
+            "sha1": digest.hexdigest() if (digest is not None) else textHash(filename),
+            "totals": {str(LmerSize): tables[LmerSize].total for LmerSize in rankings},
+            "rankings": {str(LmerSize): ranked for LmerSize, ranked in rankings.items()}}
+
+    def save(self, fileList):
+        """ Writes the manifest of the files of fileList (those that are not in
+        it any more, such as deleted genomes, are dropped). """
+        keys = [self.key(nextFile) for nextFile in fileList]
+        self.files = {key: self.files[key] for key in keys if key in self.files}
+        temporaryFilename = self.filename + ".%i" % os.getpid() # written whole, then renamed
+        with open(temporaryFilename, "w") as MANIFEST:
+            json.dump({"version": RESULTS_MANIFEST_VERSION, "parameters": self.parameters,
+                       "files": self.files}, MANIFEST)
+        os.replace(temporaryFilename, self.filename)
+#-------------------(end of class ResultsManifest)-------------------------
+
+# ********* END OF FUNCTIONS THAT ANALYZE AGAIN ONLY THE GENOMES THAT CHANGED ****
+
+# ********* THESE FUNCTIONS WRITE THE RESULTS OF MANY GENOMES FOR LOADING ********
+
+TIDY_COLUMNS = ("genome", "L", "rank", "motif", "count", "proportion") # see TidyResultsWriter
+
+#--------------------------------------------------------------------------
+class TidyResultsWriter:
+    """ Writes the top ranked motifs of many genomes as one tidy CSV table in
+    long form: a header line of TIDY_COLUMNS, then one row per ranked motif
+    (genome file, L-mer size, rank, motif, count, proportion) with no blocks or
+    blank lines, so that the results of thousands of genomes load with a single
+    read (numpy.genfromtxt(filename, delimiter=",", names=True, dtype=None,
+    encoding=None), or pandas.read_csv(filename)). (The first column is not
+    called "file", as genfromtxt would rename it "file_".) The rows go through
+    a large output buffer, so only the rows of one table are in memory at a
+    time.
+    -----------------------------------------------------------------------
+    """
+    __slots__ = ("OUTPUT", "writer")
+
+    def __init__(self, outputFilename, bufferSize=1 << 20):
+        self.OUTPUT = open(outputFilename, "w", newline="", buffering=bufferSize)
+        self.writer = csv.writer(self.OUTPUT, lineterminator="\n")
+        self.writer.writerow(TIDY_COLUMNS)
+
+    def add(self, filename, table, numberOfTopRankings, ranked=None):
+        """ Writes the top ranked motifs of the KmerTable of a file (ranked, when
+        given, is its topRanked(numberOfTopRankings) found already). """
+        total = table.total
+        if (ranked is None):
+            ranked = table.topRanked(numberOfTopRankings)
+        self.writer.writerows((filename, table.LmerSize, rank, motif, count, count / total)
+                              for rank, (motif, count) in enumerate(ranked, 1))
+
+    def close(self):
+        self.OUTPUT.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exception):
+        self.close()
+#-------------------(end of class TidyResultsWriter)-----------------------
+
+#--------------------------------------------------------------------------
+class CountTableWriter:
+    """ Writes the full L-mer counts of many genomes in a columnar binary file,
+    one genome at a time.
+
+    When Arrow is installed the file is Parquet (outputFilename with a
+    ".parquet" extension) holding a long table with the columns genome, L,
+    motif and count (the first three as in TIDY_COLUMNS), of every L-mer
+    counted at least once; each genome is written as
+    its own row group. Otherwise it is a NumPy .npz (extension ".npz") that
+    holds "files" (the genomes, in order) and, for each L-mer size L,
+    "counts_L<L>" (a matrix of int64 with one row per genome and one column per
+    motif), "motifs_L<L>" (the motifs of the columns, in 2-bit code order) and
+    "total_L<L>" (the number of L-mers of each genome). The rows of each matrix
+    are streamed to a temporary .npy file and the files are zipped together on
+    close(). Both load with one call: pyarrow.parquet.read_table(filename) or
+    numpy.load(filename). The actual name of the file is kept in filename.
+
+    L-mers holding N's (and other symbols) are left out, and the .npz form
+    needs L-mers of at most DENSE_LMER_LIMIT bases.
+    -----------------------------------------------------------------------
+    """
+    __slots__ = ("filename", "parquet", "files", "matrices", "totals", "temporaryDirectory")
+
+    def __init__(self, outputFilename):
+        stem = os.path.splitext(outputFilename)[0]
+        self.filename = stem + (".parquet" if pyarrow is not None else ".npz")
+        self.parquet = None # the Parquet writer, opened with the first genome
+        self.files = []
+        self.matrices = {} # L-mer size -> [open .npy file, number of columns, motifs]
+        self.totals = {} # L-mer size -> total of each genome
+        self.temporaryDirectory = None if pyarrow is not None else tempfile.mkdtemp(
+            dir=os.path.dirname(os.path.abspath(self.filename)))
+
+    def add(self, filename, tables):
+        """ Writes the KmerTables (one per L-mer size) of a genome. """
+        self.files.append(filename)
+        if (pyarrow is not None):
+            fileColumn, sizeColumn, motifColumn, countColumn = [], [], [], []
+            for table in tables:
+                if (not table.isDense()):
+                    pairs = sorted(table.counts.items())
+                elif (np is not None):
+                    slots = np.flatnonzero(table.counts)
+                    pairs = zip(slots.tolist(), table.counts[slots].tolist())
+                else:
+                    pairs = [(slot, count) for slot, count in enumerate(table.counts) if count]
+                codes = canonicalCodes(table.LmerSize)[0] if (table.canonical and table.isDense()) else None
+                for slot, count in pairs:
+                    motifColumn.append(table.motif(slot if codes is None else int(codes[slot])))
+                    countColumn.append(count)
+                fileColumn += [filename] * (len(countColumn) - len(fileColumn))
+                sizeColumn += [table.LmerSize] * (len(countColumn) - len(sizeColumn))
+            rows = pyarrow.table({"genome": pyarrow.array(fileColumn, pyarrow.string()),
+                                  "L": pyarrow.array(sizeColumn, pyarrow.int32()),
+                                  "motif": pyarrow.array(motifColumn, pyarrow.string()),
+                                  "count": pyarrow.array(countColumn, pyarrow.int64())})
+            if (self.parquet is None):
+                self.parquet = pyarrow.parquet.ParquetWriter(self.filename, rows.schema)
+            self.parquet.write_table(rows)
+            return
+
+        littleEndian = struct.pack("=q", 1) == struct.pack("<q", 1)
+        for table in tables:
+            if (not table.isDense()):
+                raise ValueError(".npz count tables need L-mers of at most %i bases" % DENSE_LMER_LIMIT)
+            if (table.LmerSize not in self.matrices):
+                codes = canonicalCodes(table.LmerSize)[0] if table.canonical else range(4 ** table.LmerSize)
+                MATRIX = open(os.path.join(self.temporaryDirectory, "counts_L%i.npy" % table.LmerSize), "wb")
+                writeNpyHeader(MATRIX, (0, len(table.counts)), "<i8")
+                self.matrices[table.LmerSize] = [MATRIX, len(table.counts), [table.motif(int(code)) for code in codes]]
+                self.totals[table.LmerSize] = []
+            MATRIX = self.matrices[table.LmerSize][0]
+            if (np is not None):
+                MATRIX.write(np.asarray(table.counts, dtype="<i8").tobytes())
+            else:
+                values = array.array("q", table.counts)
+                if (not littleEndian):
+                    values.byteswap()
+                MATRIX.write(values.tobytes())
+            self.totals[table.LmerSize].append(table.total)
+
+    def close(self):
+        """ Finishes the file. """
+        if (pyarrow is not None):
+            if (self.parquet is None): # (no genome at all)
+                pyarrow.parquet.write_table(pyarrow.table({"genome": pyarrow.array([], pyarrow.string()),
+                                                           "L": pyarrow.array([], pyarrow.int32()),
+                                                           "motif": pyarrow.array([], pyarrow.string()),
+                                                           "count": pyarrow.array([], pyarrow.int64())}),
+                                            self.filename)
+            else:
+                self.parquet.close()
+            return
+
+        with zipfile.ZipFile(self.filename, "w", zipfile.ZIP_STORED, allowZip64=True) as ARCHIVE:
+            with ARCHIVE.open("files.npy", "w") as MEMBER:
+                MEMBER.write(npyArray(self.files, "<U%i" % max(map(len, self.files), default=1)))
+            for LmerSize, (MATRIX, columns, motifs) in sorted(self.matrices.items()):
+                writeNpyHeader(MATRIX, (len(self.files), columns), "<i8")
+                MATRIX.close()
+                ARCHIVE.write(MATRIX.name, "counts_L%i.npy" % LmerSize)
+                os.remove(MATRIX.name)
+                with ARCHIVE.open("motifs_L%i.npy" % LmerSize, "w") as MEMBER:
+                    MEMBER.write(npyArray(motifs, "<U%i" % LmerSize))
+                with ARCHIVE.open("total_L%i.npy" % LmerSize, "w") as MEMBER:
+                    MEMBER.write(npyArray(self.totals[LmerSize], "<i8"))
+        os.rmdir(self.temporaryDirectory)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exception):
+        self.close()
+#-------------------(end of class CountTableWriter)------------------------
+
+#--------------------------------------------------------------------------
+def npyArray(values, descr):
+    """ Returns the bytes of a .npy file of a one-dimensional array of int64
+    ("<i8") or of fixed-length unicode strings ("<U<length>"). """
+    header = "{'descr': '%s', 'fortran_order': False, 'shape': (%i,), }" % (descr, len(values))
+    header = header.ljust(NPY_HEADER_SIZE - 10 - 1) + "\n"
+    if (descr == "<i8"):
+        data = struct.pack("<%iq" % len(values), *values)
+    else: # UTF-32 holds each character in 4 bytes, as NumPy does
+        width = int(descr[2:])
+        data = b"".join(value.ljust(width, "\0").encode("utf-32-le") for value in values)
+    return b"\x93NUMPY\x01\x00" + struct.pack("<H", len(header)) + header.encode("latin-1") + data
+#-------------------(end of npyArray())------------------------------------
+
+# ********* END OF FUNCTIONS THAT WRITE THE RESULTS OF MANY GENOMES FOR LOADING **
+
+# ********* THESE FUNCTIONS INSTRUMENT THE STAGES OF AN ANALYSIS *****************
+
+INSTRUMENTATION = None # the Instrumentation in use, None when it is off (the default)
+INSTRUMENTED_STAGES = ("read", "extract", "count", "countWorkers", "cache", "rank", "write")
+
+#--------------------------------------------------------------------------
+class Instrumentation:
+    """ Opt-in timers for the stages of an analysis: reading the FASTA files
+    ("read"), extracting the L-mer codes ("extract"), counting them ("count";
+    without NumPy the two are one loop, timed as "count"), waiting for worker
+    processes ("countWorkers", as the workers themselves are not timed), the
+    count cache ("cache"), ranking the motifs ("rank") and writing the results
+    ("write"). For each file and stage it adds up the calls, the seconds, the
+    bases and bytes handled, and the peak memory (RSS) of the process at the
+    end of the stage; report() gives the breakdown as a dictionary and write()
+    as JSON.
+
+    With profileStage, every call of that stage runs under cProfile (the
+    statistics are dumped next to the JSON file, with ".prof" added to its
+    name); with traceStage, under tracemalloc (the peak Python memory of the
+    stage and the lines that allocated the most go into the report). cProfile
+    only sees the thread it is enabled in, so turn the pipeline off
+    (PIPELINE_DEPTH = 0) when profiling a stage that has a thread of its own.
+
+    Each stage is marked in the code by
+        with InstrumentedStage(stage, bases):
+            ...
+    (and the reading of a file by instrumentedReads()), so that when
+    INSTRUMENTATION is None the whole cost is a test of a global. Only a
+    program (such as morse_a5.py with --instrument) turns it on, with
+    enableInstrumentation(); importing BioDNA never does. Worker processes
+    start with it off (see disableInstrumentation()).
+    -----------------------------------------------------------------------
+    """
+    __slots__ = ("outputFilename", "profileStage", "traceStage", "profiler", "traced", "local", "lock", "stages")
+
+    def __init__(self, outputFilename=None, profileStage=None, traceStage=None):
+        self.outputFilename = outputFilename # None or "-" for the standard error
+        self.profileStage = profileStage
+        self.traceStage = traceStage
+        self.profiler = cProfile.Profile() if profileStage else None
+        self.traced = {"peakBytes": 0, "top": []} # what tracemalloc found in traceStage
+        self.local = threading.local() # the file whose stages each thread is timing
+        self.lock = threading.Lock() # (the stages of a pipeline are timed in several threads)
+        self.stages = {} # (file, stage) -> [calls, seconds, bases, bytes, peak RSS]
+
+    @property
+    def file(self):
+        return getattr(self.local, "file", "")
+
+    @file.setter
+    def file(self, filename):
+        self.local.file = filename
+
+    def start(self, stage):
+        """ Starts timing a stage; returns the (always true) start time. """
+        if (stage == self.profileStage):
+            self.profiler.enable()
+        if (stage == self.traceStage):
+            if (not tracemalloc.is_tracing()):
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+        return time.perf_counter() or 1e-9
+
+    def stop(self, stage, started, bases=0, nbytes=0):
+        """ Ends the timing of a stage started at "started". """
+        seconds = time.perf_counter() - started
+        if (stage == self.profileStage):
+            self.profiler.disable()
+        if (stage == self.traceStage):
+            self.traced["peakBytes"] = max(self.traced["peakBytes"], tracemalloc.get_traced_memory()[1])
+            self.traced["top"] = [{"where": str(statistic.traceback), "bytes": statistic.size,
+                                   "blocks": statistic.count}
+                                  for statistic in tracemalloc.take_snapshot().statistics("lineno")[:10]]
+        peak = peakMemory()
+        with self.lock:
+            record = self.stages.setdefault((self.file, stage), [0, 0.0, 0, 0, None])
+            record[0] += 1
+            record[1] += seconds
+            record[2] += bases
+            record[3] += nbytes
+            record[4] = peak
+
+    def timed(self, stage, iterable, measure=None, nbytes=0):
+        """ Generator that times each step of an iterable as a stage; measure
+        gives the bases of an item, and nbytes is added when it is done. """
+        iterator = iter(iterable)
+        while (True):
+            started = self.start(stage)
+            try:
+                item = next(iterator)
+            except StopIteration:
+                self.stop(stage, started, 0, nbytes)
+                return
+            self.stop(stage, started, measure(item) if measure else 0)
+            yield item
+
+    def report(self):
+        """ Returns the per-file, per-stage breakdown (and the totals per stage). """
+        files, totals = {}, {}
+        for (filename, stage), (calls, seconds, bases, nbytes, peak) in self.stages.items():
+            for breakdown in (files.setdefault(filename, {}), totals):
+                record = breakdown.setdefault(stage, {"calls": 0, "seconds": 0.0, "bases": 0, "bytes": 0,
+                                                      "peakRSS": None})
+                record["calls"] += calls
+                record["seconds"] += seconds
+                record["bases"] += bases
+                record["bytes"] += nbytes
+                record["peakRSS"] = max(record["peakRSS"] or 0, peak or 0) or None
+        for breakdown in list(files.values()) + [totals]:
+            for record in breakdown.values():
+                record["basesPerSecond"] = record["bases"] / record["seconds"] if (record["seconds"] and record["bases"]) else None
+
+        report = {"files": [{"file": filename, "stages": stages} for filename, stages in files.items()],
+                  "totals": totals, "peakRSS": peakMemory()}
+        if (self.traceStage):
+            report["tracemalloc"] = dict(self.traced, stage=self.traceStage)
+        if (self.profileStage):
+            report["profile"] = {"stage": self.profileStage, "file": self.profileFilename()}
+        return report
+
+    def profileFilename(self):
+        stem = self.outputFilename if self.outputFilename not in (None, "-") else "BioDNA"
+        return "%s.%s.prof" % (stem, self.profileStage)
+
+    def write(self):
+        """ Writes the report as JSON (and the cProfile statistics, if any). """
+        if (self.profiler is not None):
+            self.profiler.dump_stats(self.profileFilename())
+        if (self.outputFilename in (None, "-")):
+            json.dump(self.report(), sys.stderr, indent=1)
+            sys.stderr.write("\n")
+        else:
+            with open(self.outputFilename, "w") as OUTPUT:
+                json.dump(self.report(), OUTPUT, indent=1)
+#-------------------(end of class Instrumentation)-------------------------
+
+#--------------------------------------------------------------------------
+def peakMemory():
+    """ Returns the peak resident memory of this process in bytes (None where it
+    cannot be known). """
+    if (resource is None):
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if (sys.platform == "darwin") else peak * 1024 # (kilobytes on Linux)
+#-------------------(end of peakMemory())----------------------------------
+
+#--------------------------------------------------------------------------
+def enableInstrumentation(outputFilename=None, profileStage=None, traceStage=None):
+    """ Turns the instrumentation of the stages on (see Instrumentation); the
+    report is written to outputFilename (the standard error when it is None
+    or "-") when the program ends. Returns the Instrumentation.
+    -----------------------------------------------------------------------
+    """
+    global INSTRUMENTATION
+    INSTRUMENTATION = Instrumentation(outputFilename, profileStage, traceStage)
+    atexit.register(INSTRUMENTATION.write)
+    return INSTRUMENTATION
+#-------------------(end of enableInstrumentation())-----------------------
+
+#--------------------------------------------------------------------------
+def disableInstrumentation():
+    """ Turns the instrumentation of the stages off in this process. It is the
+    initializer of the worker processes: a forked worker would otherwise
+    inherit the Instrumentation of its parent and time its stages into a copy
+    that is never written.
+    -----------------------------------------------------------------------
+    """
+    global INSTRUMENTATION
+    INSTRUMENTATION = None
+#-------------------(end of disableInstrumentation())----------------------
+
+#--------------------------------------------------------------------------
+class InstrumentedStage:
+    """ Context manager that times the block it runs as a stage of the
+    Instrumentation in use (nothing is done when it is off); bases and nbytes
+    may be set on it inside the block.
+    -----------------------------------------------------------------------
+    """
+    __slots__ = ("stage", "bases", "nbytes", "started")
+
+    def __init__(self, stage, bases=0, nbytes=0):
+        self.stage = stage
+        self.bases = bases
+        self.nbytes = nbytes
+
+    def __enter__(self):
+        self.started = INSTRUMENTATION and INSTRUMENTATION.start(self.stage)
+        return self
+
+    def __exit__(self, *exception):
+        if (self.started and INSTRUMENTATION is not None):
+            INSTRUMENTATION.stop(self.stage, self.started, self.bases, self.nbytes)
+#-------------------(end of class InstrumentedStage)-----------------------
+
+#--------------------------------------------------------------------------
+def instrumentFile(filename):
+    """ Marks the stages that follow in this thread as those of a file. """
+    if (INSTRUMENTATION is not None):
+        INSTRUMENTATION.file = filename
+#-------------------(end of instrumentFile())------------------------------
+
+#--------------------------------------------------------------------------
+def instrumentedReads(filename, windows):
+    """ Returns the (position, window, starts) chunks read from a file (see
+    kmerChunks()), with the reading of each one timed as the "read" stage
+    when the instrumentation is on. """
+    if (INSTRUMENTATION is None):
+        return windows
+    return INSTRUMENTATION.timed("read", windows, lambda chunk: len(chunk[1]), os.path.getsize(filename))
+#-------------------(end of instrumentedReads())---------------------------
+
+# ********* END OF FUNCTIONS THAT INSTRUMENT THE STAGES OF AN ANALYSIS ***********
+
+# ********* THESE FUNCTIONS RUN THE STAGES OF A BATCH OF FILES AS A PIPELINE *****
+
+PIPELINE_DEPTH = 2 # items that may wait between two stages of a pipeline (0: no pipeline)
+
+#--------------------------------------------------------------------------
+def prefetch(iterable, depth=PIPELINE_DEPTH):
+    """ Generator that gives back the items of an iterable, which is run ahead
+    in a thread of its own: at most "depth" items are made before they are
+    asked for (a bounded queue, so a fast stage waits for a slow one and the
+    memory stays bounded). Chaining prefetch() over generators makes a
+    pipeline whose stages overlap, as reading files and most of NumPy work
+    outside the GIL. An exception in the iterable is raised again here, and
+    the thread stops when this generator is closed.
+    -----------------------------------------------------------------------
+    """
+    items = queue.Queue(depth)
+    stopped = threading.Event() # set when the items are no longer wanted
+
+    def put(item): # (waits for room, unless the items are no longer wanted)
+        while (not stopped.is_set()):
+            try:
+                items.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        try:
+            for item in iterable:
+                if (not put((True, item))):
+                    return
+            put((False, None)) # the end of the items
+        except BaseException as error: # given to the consumer
+            put((False, error))
+
+    thread = threading.Thread(target=produce, name="BioDNA prefetch", daemon=True)
+    thread.start()
+    try:
+        while (True):
+            isItem, item = items.get()
+            if (not isItem):
+                if (item is not None):
+                    raise item
+                return
+            yield item
+    finally:
+        stopped.set()
+#-------------------(end of prefetch())------------------------------------
+
+#--------------------------------------------------------------------------
+def countPipeline(fileList, LmerSizes, canonical=False, depth=PIPELINE_DEPTH, windowSize=1 << 22, digests=None):
+    """ Generator of a (filename, tables) pair for each FASTA file of fileList,
+    like countFASTAkmerSizes() on one file after the other, but run as a
+    pipeline of two threads: one reads (and parses) the windows of sequence of
+    the files (see kmerChunks()), running up to "depth" windows ahead, while
+    the other counts them, up to "depth" files ahead of the caller. So the
+    next file is read while this one is counted, and the disk (or network
+    file system) and the CPU are both kept busy. The tables are the same as
+    those of countFASTAkmerSizes(). digests is that of countFilesInParallel():
+    the hash of a file is whole by the time its tables are given back. Each
+    file is given back as soon as it is read, so an error in reading the next
+    one is raised after it, as it would be without the pipeline.
+    -----------------------------------------------------------------------
+    """
+    def readWindows(): # the reading stage
+        for fileIndex, nextFile in enumerate(fileList):
+            instrumentFile(nextFile)
+            chunks = kmerChunks(nextFile, max(LmerSizes), windowSize, newDigest(digests, nextFile))
+            for chunk in instrumentedReads(nextFile, chunks):
+                yield fileIndex, chunk
+            yield fileIndex, None # the end of the file
+
+    def countWindows(): # the counting stage
+        tables = {}
+        for fileIndex, chunk in prefetch(readWindows(), depth):
+            if (chunk is None): # every window of the file has been counted
+                for LmerSize in LmerSizes: # (a file without any sequence has empty tables)
+                    tables.setdefault(LmerSize, KmerTable(LmerSize, canonical))
+                yield fileList[fileIndex], tables
+                tables = {}
+                continue
+            position, window, starts = chunk
+            instrumentFile(fileList[fileIndex])
+            countKmerSizes(window, LmerSizes, position, tables, starts, canonical)
+
+    return prefetch(countWindows(), depth)
+#-------------------(end of countPipeline())-------------------------------
+
+# ********* END OF FUNCTIONS THAT RUN THE STAGES OF A BATCH OF FILES AS A PIPELINE
\ No newline at end of file
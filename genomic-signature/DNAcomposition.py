@@ -0,0 +1,282 @@
+"""DNAcomposition : the base composition of genomes, streamed from FASTA files
+
+A small module of its own (BioDNA imports it too) so that a program that only
+needs the counts of the bases, such as morse_a2.py, does not pay for importing
+all of BioDNA. NumPy is used when it is installed (it is imported the first
+time a sequence is counted), and the gzip, lzma and Zstandard libraries are
+only imported for compressed files.
+"""
+
+ # libraries for counting the symbols of genomes:
+import array
+from collections import Counter
+ # library for the Composition records:
+from collections import namedtuple
+
+# ********* THESE FUNCTIONS OPEN (COMPRESSED) FASTA FILES AS RAW BYTES ************
+
+GZIP_MAGIC = b"\x1f\x8b" # (BGZF files are gzip files too)
+XZ_MAGIC = b"\xfd7zXZ\x00"
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+#--------------------------------------------------------------------------
+def compressionOf(filename):
+    """ Returns how a file is compressed, from its first bytes: "bgzf" (bgzip),
+    "gzip", "xz", "zstd", or None for a plain file. """
+    with open(filename, "rb") as INPUT:
+        head = INPUT.read(16)
+    if (head.startswith(GZIP_MAGIC)):
+        # a BGZF block has extra fields (flag 4) of which the first is "BC"
+        return "bgzf" if (len(head) >= 14 and head[3] & 4 and head[12:14] == b"BC") else "gzip"
+    if (head.startswith(XZ_MAGIC)):
+        return "xz"
+    if (head.startswith(ZSTD_MAGIC)):
+        return "zstd"
+    return None
+#-------------------(end of compressionOf())-------------------------------
+
+#--------------------------------------------------------------------------
+def openCompressed(filename, compression):
+    """ Opens a file as binary, uncompressed as it is read; compression is what
+    compressionOf() found ("bgzf" and "gzip" files are both read with gzip;
+    Zstandard needs Python 3.14's compression.zstd or the zstandard package).
+    The library of each compression is only imported when it is needed.
+    -----------------------------------------------------------------------
+    """
+    if (compression is None):
+        return open(filename, "rb")
+    if (compression in ("bgzf", "gzip")):
+        import gzip
+        return gzip.open(filename, "rb")
+    if (compression == "xz"):
+        import lzma
+        return lzma.open(filename, "rb")
+
+    try:
+        from compression import zstd
+        return zstd.open(filename, "rb")
+    except ImportError:
+        pass
+    try:
+        import io, zstandard
+    except ImportError:
+        raise ValueError("%s is compressed with Zstandard: install the zstandard package to read it" % filename)
+    return io.BufferedReader(zstandard.ZstdDecompressor().stream_reader(open(filename, "rb"), closefd=True))
+#-------------------(end of openCompressed())------------------------------
+
+#--------------------------------------------------------------------------
+def headerLineSpans(block):
+    """ Returns the (start, end) spans of the header (">") and comment (";") lines
+    of a block of a FASTA file, given as a string or as bytes, in order. The lines
+    are found with find() calls on the (rare) marker characters rather than by
+    looking at every line, so a block of nothing but sequence costs almost nothing.
+    -----------------------------------------------------------------------
+    """
+    newline, markers = ("\n", (">", ";")) if isinstance(block, str) else (b"\n", (b">", b";"))
+    spans = []
+    for marker in markers:
+        index = block.find(marker)
+        while (index >= 0):
+            end = block.find(newline, index)
+            if (end < 0):
+                end = len(block)
+            if (index == 0 or block[index - 1:index] == newline): # the marker starts a line
+                spans.append((index, end))
+            index = block.find(marker, end)
+    # end for each marker
+    spans.sort()
+    return spans
+#-------------------(end of headerLineSpans())-----------------------------
+
+#--------------------------------------------------------------------------
+def readFASTAbytes(filename, blockSize=1 << 22, opener=None):
+    """ Generator that streams the sequence of all records of a FASTA file as
+    raw bytes, about blockSize at a time, with the header, comment and blank
+    lines and the line ends left out (case kept). Nothing is decoded, so this
+    is the cheapest way to look at every base of a file that doesn't fit in
+    memory when the records don't have to be told apart. The file is opened
+    with opener (by default openCompressed(), so compressed files are read as
+    they are; BioDNA passes its openFASTA(), which inflates BGZF with threads).
+    -----------------------------------------------------------------------
+    """
+    if (opener is None):
+        opener = lambda filename: openCompressed(filename, compressionOf(filename))
+    with opener(filename) as INPUT:
+        while (True):
+            block = INPUT.read(blockSize)
+            if (not block):
+                break
+            if (not block.endswith(b"\n")):
+                block += INPUT.readline() # finish the last line of the block
+
+            position = 0
+            for lineStart, lineEnd in headerLineSpans(block):
+                piece = block[position:lineStart].translate(None, b"\r\n \t")
+                if (piece):
+                    yield piece
+                position = lineEnd
+            piece = block[position:].translate(None, b"\r\n \t")
+            if (piece):
+                yield piece
+        # end while there are blocks to read
+#-------------------(end of readFASTAbytes())------------------------------
+
+# ********* END OF FUNCTIONS THAT OPEN (COMPRESSED) FASTA FILES AS RAW BYTES ******
+
+# ********* THESE FUNCTIONS MEASURE THE BASE COMPOSITION OF GENOMES **************
+
+# the composition of a sequence: its length, the count of every symbol in it
+# (upper case, IUPAC codes and anything else alike), its GC content and GC and
+# AT skews, and the GC content of each window of windowSize bases (an array of
+# floats, NaN for a window without any A, C, G or T; empty without windows)
+Composition = namedtuple("Composition", "length counts GCcontent GCskew ATskew windowSize windowGC")
+
+COMMON_SYMBOLS = b"ACGTNacgtn" # without NumPy counted one by one with bytes.count(); the rest with a Counter
+GC_FILTER = b"GCgc" # the bytes deleted to count G and C in a window
+ACGT_FILTER = b"ACGTacgt" # the bytes deleted to count A, C, G and T in a window
+
+np = None # NumPy once importNumPy() has imported it (False when it is not installed)
+GC_ARRAY = ACGT_ARRAY = None # 1 for G and C (for A, C, G and T), else 0, by byte
+
+#--------------------------------------------------------------------------
+def importNumPy():
+    """ Returns NumPy, or None when it is not installed. It is only imported
+    once a sequence is counted, so importing this module stays cheap.
+    """
+    global np, GC_ARRAY, ACGT_ARRAY
+    if (np is None):
+        try:
+            import numpy as np
+        except ImportError:
+            np = False
+        else:
+            GC_ARRAY = np.zeros(256, dtype=np.uint8)
+            GC_ARRAY[list(GC_FILTER)] = 1
+            ACGT_ARRAY = np.zeros(256, dtype=np.uint8)
+            ACGT_ARRAY[list(ACGT_FILTER)] = 1
+    return np or None
+#-------------------(end of importNumPy())---------------------------------
+
+#--------------------------------------------------------------------------
+class BaseComposition:
+    """ Counts the symbols of a sequence given a piece at a time (as bytes or
+    ASCII strings) with add(), then finish() gives back its Composition.
+
+    With NumPy each piece is counted in a single pass, a bincount of its bytes
+    added to a table of 256 counts. Without it, each piece is counted with one
+    bytes.count() per common symbol (A, C, G, T and N in both cases) and a
+    Counter of whatever is left once those are deleted (usually nothing). The
+    GC content of each window is the sum over the window of a lookup of its
+    G/C and A/C/G/T flags with NumPy, or without it the size of the window
+    less what is left after bytes.translate() deletes the G/C (the A/C/G/T)
+    bytes. Only the bases of an unfinished window are kept between pieces, so
+    a genome of any size can be streamed through.
+    -----------------------------------------------------------------------
+    """
+    __slots__ = ("windowSize", "numpy", "totals", "windowGC", "carry")
+
+    def __init__(self, windowSize=None):
+        self.windowSize = windowSize # bases in each window (None for no windows)
+        self.numpy = importNumPy()
+        # count of each byte (by byte value with NumPy)
+        self.totals = Counter() if (self.numpy is None) else np.zeros(256, dtype=np.int64)
+        self.windowGC = array.array("d") # GC content of each finished window
+        self.carry = b"" # bases of the window not yet finished
+
+    def add(self, bases):
+        """ Counts the next piece of the sequence. """
+        if (isinstance(bases, str)):
+            bases = bases.encode("latin-1")
+        if (self.numpy is not None):
+            self.totals += np.bincount(np.frombuffer(bases, dtype=np.uint8), minlength=256)
+        else:
+            totals = self.totals
+            for symbol in COMMON_SYMBOLS:
+                totals[symbol] += bases.count(symbol)
+            others = bases.translate(None, COMMON_SYMBOLS)
+            if (others):
+                totals.update(others)
+
+        if (self.windowSize):
+            bases = self.carry + bases if self.carry else bases
+            finished = len(bases) - len(bases) % self.windowSize # bases in finished windows
+            self.addWindows(bases[:finished])
+            self.carry = bases[finished:]
+
+    def addWindows(self, bases):
+        """ Adds the GC content of each window of bases (a multiple of windowSize). """
+        if (not bases):
+            return
+        if (self.numpy is not None):
+            codes = np.frombuffer(bases, dtype=np.uint8).reshape(-1, self.windowSize)
+            GC = GC_ARRAY[codes].sum(axis=1, dtype=np.int64)
+            ACGT = ACGT_ARRAY[codes].sum(axis=1, dtype=np.int64)
+            content = np.full(len(GC), np.nan)
+            np.divide(GC, ACGT, out=content, where=(ACGT > 0))
+            self.windowGC.frombytes(content.tobytes())
+        else:
+            for start in range(0, len(bases), self.windowSize):
+                window = bases[start:start + self.windowSize]
+                ACGT = len(window) - len(window.translate(None, ACGT_FILTER))
+                GC = len(window) - len(window.translate(None, GC_FILTER))
+                self.windowGC.append(GC / ACGT if ACGT else float("nan"))
+
+    def finish(self):
+        """ Returns the Composition of everything added (the last window may be short). """
+        if (self.carry):
+            self.addWindows(self.carry + b"\0" * (self.windowSize - len(self.carry))) # (NUL is not a base)
+            self.carry = b""
+
+        if (self.numpy is not None):
+            totals = [(byte, int(self.totals[byte])) for byte in np.flatnonzero(self.totals).tolist()]
+        else:
+            totals = sorted(self.totals.items())
+        counts = Counter() # the count of each symbol with both cases together
+        for byte, count in totals:
+            if (count):
+                counts[chr(byte).upper()] += count
+
+        A, C, G, T = counts["A"], counts["C"], counts["G"], counts["T"]
+        return Composition(sum(count for byte, count in totals), dict(counts),
+                           (G + C) / (A + C + G + T) if (A + C + G + T) else 0.0,
+                           (G - C) / (G + C) if (G + C) else 0.0,
+                           (A - T) / (A + T) if (A + T) else 0.0,
+                           self.windowSize, self.windowGC)
+#-------------------(end of class BaseComposition)-------------------------
+
+#--------------------------------------------------------------------------
+def sequenceComposition(sequence, windowSize=None, blockSize=1 << 22):
+    """ Returns the Composition of a sequence (a string or bytes): the count of
+    every symbol, GC content, GC skew (G-C)/(G+C), AT skew (A-T)/(A+T) and, if a
+    windowSize is given, the GC content of each window of that many bases.
+    A sequence with a chunks() method (a BioDNA.PackedSequence) is counted a
+    chunk of blockSize bases at a time.
+    -----------------------------------------------------------------------
+    """
+    composition = BaseComposition(windowSize)
+    if (hasattr(sequence, "chunks")):
+        for start, bases in sequence.chunks(blockSize):
+            composition.add(bases)
+    else:
+        composition.add(sequence)
+    return composition.finish()
+#-------------------(end of sequenceComposition())-------------------------
+
+#--------------------------------------------------------------------------
+def fastaComposition(filename, windowSize=None, blockSize=1 << 22, opener=None):
+    """ Same as sequenceComposition() for all records of a FASTA file taken as
+    one sequence (as getDNA() gives it back), streamed through in blocks of
+    about blockSize bytes so the file never has to fit in memory (opener is
+    that of readFASTAbytes()).
+
+    composition = DNAcomposition.fastaComposition("genome.fna", windowSize=1000)
+    print(composition.counts["N"], composition.GCskew, max(composition.windowGC))
+    -----------------------------------------------------------------------
+    """
+    composition = BaseComposition(windowSize)
+    for bases in readFASTAbytes(filename, blockSize, opener):
+        composition.add(bases)
+    return composition.finish()
+#-------------------(end of fastaComposition())----------------------------
+
+# ********* END OF FUNCTIONS THAT MEASURE THE BASE COMPOSITION OF GENOMES ********
@@ -0,0 +1,343 @@
+"""----------------------------------------------------------------------------
+SUMMARY: This program is the benchmark suite of BioDNA. It generates synthetic
+genomes from 10 kb up to 1 Gb with a seeded random number generator (so every
+run, on every machine, times exactly the same DNA), times the hot paths of
+BioDNA on each of them and keeps the results in a JSON history file, so that a
+change can be compared with an earlier run and slowdowns are caught.
+
+INPUT: The command line (python benchmark.py --help lists every option):
+1. "run" generates the genomes that are not there yet (in --data), runs every
+benchmark (or those named with --cases) on every genome size of --sizes (e.g.
+10k,1M,100M,1G) and adds the results to the history file (--history) under a
+--label (the date and time by default). Each benchmark runs in a fresh process,
+--repeat times, so that its peak memory is its own; the best time is kept.
+--baseline also marks the run as the baseline.
+2. "baseline" marks a run of the history (the last one by default) as the
+baseline that later runs are compared with.
+3. "compare" compares a run (the last one by default) with the baseline (or
+with the run given with --baseline) and flags every benchmark that became more
+than --threshold percent slower, or used that much more memory. The exit
+status is 1 when there is a regression, so it can be used in scripts.
+
+The benchmarks are getDNA, breakIntoMotifs at each L from 4 to 8, transcribe
+with translate, TATAboxAnalysis, the repeat finders of program assignment 4
+(on the whole genome), scanRepeats, and the Chargaff base counts
+(fastaComposition).
+
+OUTPUT: A table of the wall time, memory (what each benchmark adds to the peak
+RSS once its input is prepared) and throughput (bp/s) of every benchmark on
+every genome size, and the history file (JSON) that holds every run.
+-------------------------------------------------------------------------------
+"""
+import argparse, contextlib, io, json, os, platform, random, subprocess, sys, tempfile, time
+import BioDNA
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SIZE_SUFFIXES = {"k": 10 ** 3, "m": 10 ** 6, "g": 10 ** 9}
+
+#--------------------------------------------------------------------------
+def parseSize(text):
+    # this function turns a genome size such as "10k", "1M" or "1G" into bases
+    text = text.strip().lower().rstrip("b")
+    if (text[-1:] in SIZE_SUFFIXES):
+        return int(float(text[:-1]) * SIZE_SUFFIXES[text[-1]])
+    return int(text)
+#-----------------(end of parseSize())-------------------------------------
+
+#--------------------------------------------------------------------------
+def sizeName(size):
+    # this function turns a number of bases back into a short name such as "10k"
+    for suffix, factor in (("G", 10 ** 9), ("M", 10 ** 6), ("k", 10 ** 3)):
+        if (size >= factor and size % factor == 0):
+            return "%i%s" % (size // factor, suffix)
+    return str(size)
+#-----------------(end of sizeName())--------------------------------------
+
+#--------------------------------------------------------------------------
+def writeSyntheticGenome(filename, size, seed, lineWidth=80):
+    """ Writes a FASTA file of one record of "size" random bases made with a
+    seeded random number generator: the same seed always gives the same genome
+    (random.Random is the same on every platform, with or without NumPy). A
+    TATA-box is put in the middle so that TATAboxAnalysis() always finds one.
+    -----------------------------------------------------------------------
+    """
+    generator = random.Random("%i-%i" % (seed, size))
+    bases = bytes(b"ACGT"[byte & 3] for byte in range(256)) # a random byte -> a base
+    tataPosition = size // 2
+    blockSize = lineWidth * (1 << 14) # bases per block (whole lines)
+
+    temporaryFilename = filename + ".part" # written whole, then renamed
+    with open(temporaryFilename, "wb") as OUTPUT:
+        OUTPUT.write(b">synthetic_%s seed=%i\n" % (sizeName(size).encode("ascii"), seed))
+        for blockStart in range(0, size, blockSize):
+            block = bytearray(generator.randbytes(min(blockSize, size - blockStart)).translate(bases))
+            if (blockStart <= tataPosition < blockStart + len(block) - 8):
+                block[tataPosition - blockStart:tataPosition - blockStart + 8] = b"TATAAAAG"
+            OUTPUT.write(b"".join(block[start:start + lineWidth] + b"\n"
+                                  for start in range(0, len(block), lineWidth)))
+    os.replace(temporaryFilename, filename)
+#-----------------(end of writeSyntheticGenome())--------------------------
+
+#--------------------------------------------------------------------------
+def syntheticGenome(dataDirectory, size, seed):
+    # this function returns the FASTA file of a synthetic genome, writing it
+    # first if it is not in the data directory yet
+    filename = os.path.join(dataDirectory, "synthetic_%s_seed%i.fna" % (sizeName(size), seed))
+    if (not os.path.isfile(filename)):
+        os.makedirs(dataDirectory, exist_ok=True)
+        print("Writing the synthetic genome", filename, "...")
+        writeSyntheticGenome(filename, size, seed)
+    return filename
+#-----------------(end of syntheticGenome())-------------------------------
+
+# ********* THE BENCHMARKS ******************************************************
+
+# every benchmark is a pair of functions: the first prepares its input from the
+# FASTA file (not timed), the second is the work that is timed
+
+#--------------------------------------------------------------------------
+def readUpperDNA(filename):
+    return BioDNA.getDNA(filename).upper()
+
+def transcribeAndTranslate(DNA):
+    return BioDNA.translate(BioDNA.transcribe(DNA), BioDNA.makeAminoAcidTable())
+
+def findAllRepeats(DNA):
+    return [BioDNA.findDirectRepeats(DNA), BioDNA.findMirrorRepeats(DNA), BioDNA.findATRepeats(DNA)]
+
+def scanAllRepeats(filename):
+    return list(BioDNA.scanRepeats(filename)) # (a generator)
+
+def countMotifs(LmerSize):
+    def count(filename):
+        with tempfile.TemporaryDirectory() as outputDirectory:
+            BioDNA.breakIntoMotifs(filename, LmerSize, 10, 1, os.path.join(outputDirectory, "Results.csv"))
+    return count
+#-----------------(end of the benchmark functions)-------------------------
+
+BENCHMARKS = {"getDNA": (str, BioDNA.getDNA)}
+for LmerSize in range(4, 9):
+    BENCHMARKS["breakIntoMotifs-L%i" % LmerSize] = (str, countMotifs(LmerSize))
+BENCHMARKS.update({"transcribe+translate": (readUpperDNA, transcribeAndTranslate),
+                   "TATAboxAnalysis": (BioDNA.getDNA, BioDNA.TATAboxAnalysis),
+                   "repeatFinders": (BioDNA.getDNA, findAllRepeats),
+                   "scanRepeats": (str, scanAllRepeats),
+                   "chargaff": (str, BioDNA.fastaComposition)})
+
+# ********* END OF THE BENCHMARKS ***********************************************
+
+#--------------------------------------------------------------------------
+def resetPeakMemory():
+    # this function starts the peak memory of this process over from its memory
+    # now (on Linux; elsewhere the peak can't be reset and stays as it is)
+    try:
+        with open("/proc/self/clear_refs", "w") as CLEAR_REFS:
+            CLEAR_REFS.write("5")
+    except OSError:
+        pass
+#-----------------(end of resetPeakMemory())-------------------------------
+
+#--------------------------------------------------------------------------
+def runBenchmark(name, filename, repeat):
+    """ Runs one benchmark "repeat" times in this process and returns the best
+    wall time and the memory as a dictionary (this is what the fresh process
+    started by timeBenchmark() does): "memory" is what the benchmark added to
+    the memory of the process once its input was prepared (so reading a whole
+    genome with getDNA() to give it to TATAboxAnalysis doesn't count; where
+    the peak can't be reset, see resetPeakMemory(), it is what the benchmark
+    added to the peak of preparing its input), and "peakRSS" is the peak
+    memory of the process while the benchmark ran.
+    -----------------------------------------------------------------------
+    """
+    prepare, work = BENCHMARKS[name]
+    argument = prepare(filename)
+    resetPeakMemory() # (the peak of preparing the input is gone where it can be reset)
+    prepared = BioDNA.peakMemory() # the memory of the interpreter and of the input
+    times = []
+    with contextlib.redirect_stdout(io.StringIO()): # (the functions print progress)
+        for attempt in range(repeat):
+            start = time.perf_counter()
+            work(argument)
+            times.append(time.perf_counter() - start)
+    peak = BioDNA.peakMemory()
+    return {"seconds": min(times), "memory": None if peak is None else peak - prepared, "peakRSS": peak}
+#-----------------(end of runBenchmark())----------------------------------
+
+#--------------------------------------------------------------------------
+def timeBenchmark(name, filename, repeat):
+    # this function runs one benchmark in a fresh process, so that the peak
+    # memory measured is that of this benchmark alone
+    process = subprocess.run([sys.executable, os.path.abspath(__file__), "_benchmark", name, filename, str(repeat)],
+                             stdout=subprocess.PIPE, check=True, universal_newlines=True)
+    return json.loads(process.stdout.splitlines()[-1])
+#-----------------(end of timeBenchmark())---------------------------------
+
+#--------------------------------------------------------------------------
+def loadHistory(historyFilename):
+    # this function returns the history file as {"baseline": label, "runs": [...]}
+    if (not os.path.isfile(historyFilename)):
+        return {"baseline": None, "runs": []}
+    with open(historyFilename) as HISTORY:
+        return json.load(HISTORY)
+#-----------------(end of loadHistory())-----------------------------------
+
+#--------------------------------------------------------------------------
+def saveHistory(history, historyFilename):
+    temporaryFilename = historyFilename + ".part" # written whole, then renamed
+    with open(temporaryFilename, "w") as HISTORY:
+        json.dump(history, HISTORY, indent=1)
+    os.replace(temporaryFilename, historyFilename)
+#-----------------(end of saveHistory())-----------------------------------
+
+#--------------------------------------------------------------------------
+def findRun(history, label):
+    # this function returns the run of the history with the given label (the
+    # last run when label is None)
+    if (not history["runs"]):
+        sys.exit("The history file has no runs yet.")
+    if (label is None):
+        return history["runs"][-1]
+    for run in history["runs"]:
+        if (run["label"] == label):
+            return run
+    sys.exit("There is no run labelled %r in the history file." % label)
+#-----------------(end of findRun())--------------------------------------
+
+#--------------------------------------------------------------------------
+def formatMemory(peak):
+    return "-" if peak is None else "%.1f MB" % (peak / 2 ** 20)
+#-----------------(end of formatMemory())----------------------------------
+
+#--------------------------------------------------------------------------
+def runSuite(arguments):
+    # this function runs the benchmarks and adds the run to the history file
+    names = arguments.cases.split(",") if arguments.cases else list(BENCHMARKS)
+    for name in names:
+        if (name not in BENCHMARKS):
+            sys.exit("Unknown benchmark %r (the benchmarks are: %s)" % (name, ", ".join(BENCHMARKS)))
+    sizes = [parseSize(size) for size in arguments.sizes.split(",")]
+
+    run = {"label": arguments.label or time.strftime("%Y-%m-%d %H:%M:%S"),
+           "date": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+           "python": platform.python_version(),
+           "numpy": None if BioDNA.np is None else BioDNA.np.__version__,
+           "machine": "%s %s (%i CPUs)" % (platform.system(), platform.machine(), os.cpu_count() or 1),
+           "seed": arguments.seed, "repeat": arguments.repeat, "results": []}
+
+    print("%-22s %6s %12s %12s %14s" % ("Benchmark", "Size", "Seconds", "Memory", "bp/s"))
+    for size in sizes:
+        filename = syntheticGenome(arguments.data, size, arguments.seed)
+        for name in names:
+            result = timeBenchmark(name, filename, arguments.repeat)
+            result.update({"benchmark": name, "size": size,
+                           "bpPerSecond": size / result["seconds"] if result["seconds"] > 0 else None})
+            run["results"].append(result)
+            print("%-22s %6s %12.4f %12s %14.3g" % (name, sizeName(size), result["seconds"],
+                                                   formatMemory(result["memory"]), result["bpPerSecond"] or 0))
+        # end for each benchmark
+    # end for each genome size
+
+    history = loadHistory(arguments.history)
+    history["runs"].append(run)
+    if (arguments.baseline or history["baseline"] is None): # the first run is the baseline to begin with
+        history["baseline"] = run["label"]
+    saveHistory(history, arguments.history)
+    print("\nThe run", repr(run["label"]), "was added to", arguments.history)
+#-----------------(end of runSuite())--------------------------------------
+
+#--------------------------------------------------------------------------
+def compareRuns(arguments):
+    """ Compares a run of the history with the baseline and prints, for every
+    benchmark and genome size both have, the change in time and in peak
+    memory; a change of more than the threshold (in percent) is flagged.
+    Returns the number of regressions.
+    -----------------------------------------------------------------------
+    """
+    history = loadHistory(arguments.history)
+    run = findRun(history, arguments.run)
+    baseline = findRun(history, arguments.baseline or history["baseline"])
+    limit = 1 + arguments.threshold / 100
+
+    baseResults = {(result["benchmark"], result["size"]): result for result in baseline["results"]}
+    print("Comparing", repr(run["label"]), "with the baseline", repr(baseline["label"]), "\n")
+    print("%-22s %6s %12s %12s %9s %9s  %s" % ("Benchmark", "Size", "Baseline s", "Now s", "Time", "Memory", ""))
+    regressions = 0
+    for result in run["results"]:
+        base = baseResults.get((result["benchmark"], result["size"]))
+        if (base is None):
+            continue
+        timeRatio = result["seconds"] / base["seconds"] if base["seconds"] > 0 else 1.0
+        memoryRatio = 1.0
+        if (result.get("memory") and base.get("memory")): # (not in the runs of older versions)
+            memoryRatio = result["memory"] / base["memory"]
+
+        flags = []
+        if (timeRatio > limit):
+            flags.append("SLOWER")
+        elif (timeRatio < 1 / limit):
+            flags.append("faster")
+        if (memoryRatio > limit):
+            flags.append("MORE MEMORY")
+        if ("SLOWER" in flags or "MORE MEMORY" in flags):
+            regressions += 1
+        print("%-22s %6s %12.4f %12.4f %+8.1f%% %+8.1f%%  %s" % (result["benchmark"], sizeName(result["size"]),
+              base["seconds"], result["seconds"], 100 * (timeRatio - 1), 100 * (memoryRatio - 1), " ".join(flags)))
+    # end for each result
+
+    print("\n%i regression(s) beyond %g%%" % (regressions, arguments.threshold))
+    return regressions
+#-----------------(end of compareRuns())-----------------------------------
+
+#--------------------------------------------------------------------------
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark suite of BioDNA")
+    parser.add_argument("--history", default=os.path.join(HERE, "benchmarkHistory.json"),
+                        help="JSON file of the runs (default: benchmarkHistory.json next to this program)")
+    commands = parser.add_subparsers(dest="command")
+
+    runParser = commands.add_parser("run", help="run the benchmarks and add the results to the history")
+    runParser.add_argument("-s", "--sizes", default="10k,100k,1M,10M",
+                           help="genome sizes, e.g. 10k,1M,100M,1G (default: 10k,100k,1M,10M)")
+    runParser.add_argument("-c", "--cases", help="benchmarks to run, separated by commas (default: all of "
+                                                  "them: %s)" % ", ".join(BENCHMARKS))
+    runParser.add_argument("-r", "--repeat", type=int, default=3, help="runs of each benchmark; the best "
+                                                                       "time is kept (default 3)")
+    runParser.add_argument("--seed", type=int, default=1, help="seed of the synthetic genomes (default 1)")
+    runParser.add_argument("--label", help="name of the run (default: the date and time)")
+    runParser.add_argument("--data", default=os.path.join(HERE, "benchmarkData"),
+                           help="directory of the synthetic genomes (default: benchmarkData)")
+    runParser.add_argument("--baseline", action="store_true", help="mark this run as the baseline")
+
+    baselineParser = commands.add_parser("baseline", help="mark a run as the baseline")
+    baselineParser.add_argument("label", nargs="?", help="the run (default: the last one)")
+
+    compareParser = commands.add_parser("compare", help="compare a run with the baseline")
+    compareParser.add_argument("--run", help="the run to compare (default: the last one)")
+    compareParser.add_argument("--baseline", help="the run to compare with (default: the baseline)")
+    compareParser.add_argument("-t", "--threshold", type=float, default=10.0,
+                               help="percent of change that is flagged (default 10)")
+
+    if (sys.argv[1:2] == ["_benchmark"]): # (one benchmark, in the process started by timeBenchmark())
+        name, filename, repeat = sys.argv[2:5]
+        print(json.dumps(runBenchmark(name, filename, int(repeat))))
+        return
+
+    arguments = parser.parse_args()
+    if (arguments.command == "run"):
+        runSuite(arguments)
+    elif (arguments.command == "baseline"):
+        history = loadHistory(arguments.history)
+        history["baseline"] = findRun(history, arguments.label)["label"]
+        saveHistory(history, arguments.history)
+        print("The baseline is now", repr(history["baseline"]))
+    elif (arguments.command == "compare"):
+        sys.exit(1 if compareRuns(arguments) else 0)
+    else:
+        parser.print_help()
+# --- end main() ---------
+
+#---------------------------------------------------------
+# Python starts here ("call" the main() function at start
+if __name__ == '__main__':
+    main()
+#---------------------------------------------------------
@@ -14,13 +14,20 @@ the size of motifs that will be analyzed using the 2nd input mentioned below.
 This input should be an integer between 4 and 8 (inclusively) and if it is not, 
 the user will be prompted to enter an input again. The minimum and maximum size
 of the L-mer that can be entered can be changed by changing the variables that
-are in the main at the bottom of the program.
+are in the main at the bottom of the program. The prompt is skipped when the
+L-mer sizes are given with the --lmer (-l) command-line option.
 2. The second input is a file directory containing input files for analysis.
 This file directory should contain only FASTA formatted files of entire genomes
 or just individual genes. Any files that are not FASTA formatted in the directory
 will simply be ignored. The directory can contain as many files as the user wants.
-The directory name can be changed by changing the variable "inputFilesDirectory"
-in the main at the bottom of the program.
+The files may also be compressed (e.g. *.fna.gz). Other directories and/or FASTA
+files can be given on the command line instead of the default directory
+"inputFilesDirectory" set in the main at the bottom of the program.
+3. Optional command-line flags set the number of worker processes, the number
+of top rankings and the output file, and turn on the further analyses (sliding
+windows, distances between genomes, both strands, a cache of the counts, tidy
+and binary tables, timings of each stage and incremental runs); python
+morse_a5.py --help lists every option.
 
 OUTPUT: There are two forms of output for this program:
 1. The 1st output the user will notice is directly to the console. A title of
@@ -41,6 +48,7 @@ number of motifs (determined by the variable "numberOfTopRankings" in the main;
 the default is the top 10) with their according name, frequency, and proportion.
 -------------------------------------------------------------------------------
 """
+import argparse, os, tempfile
 import BioDNA
 
 #--------------------------------------------------------------------------
@@ -57,41 +65,171 @@ def PrintProgramTitle():
     print("==================================================================")
 #-----------------(end of PrintProgramTitle())-----------------------------
 
+#--------------------------------------------------------------------------
+def parseLmerSizes(text):
+    # this function turns an --lmer option such as "6", "4-8" or "4,6,8" (or a
+    # mix like "4-6,8") into a sorted list of L-mer sizes for argparse
+    LmerSizes = set()
+    try:
+        for part in text.split(","):
+            if ("-" in part): # a range of sizes
+                first, last = part.split("-")
+                LmerSizes.update(range(int(first), int(last) + 1))
+            else:
+                LmerSizes.add(int(part))
+    except ValueError:
+        raise argparse.ArgumentTypeError("%r is not an L-mer size, range or list" % text)
+    if (not LmerSizes or min(LmerSizes) < 1 or max(LmerSizes) > 31):
+        raise argparse.ArgumentTypeError("L-mer sizes must be between 1 and 31")
+    return sorted(LmerSizes)
+#-----------------(end of parseLmerSizes())--------------------------------
+
 def main():
     MIN_LmerSize = 4 # minimum Lmer size
     MAX_LmerSize = 8 # maximum Lmer size
-    inputFilesDirectory = "inputDirectory" # directory of input files
-    numberOfTopRankings = 10 # number of top rankings to display
+    inputFilesDirectory = "inputDirectory" # default directory of input files
+    numberOfTopRankings = 10 # default number of top rankings to display
+    outputFilename = "Results.csv" # default output file
+
+    # command-line options (python morse_a5.py --help lists them):
+    parser = argparse.ArgumentParser(description="Genomic Signature Analyzer")
+    parser.add_argument("inputs", nargs="*", default=[inputFilesDirectory],
+                        help="directories of FASTA files (*.fna) and/or FASTA files "
+                             "(default: %s)" % inputFilesDirectory)
+    parser.add_argument("-o", "--output", default=outputFilename,
+                        help="output file (default: %s)" % outputFilename)
+    parser.add_argument("-n", "--top", type=int, default=numberOfTopRankings,
+                        help="number of top ranking motifs per file (default: %i)" % numberOfTopRankings)
+    parser.add_argument("-l", "--lmer", type=parseLmerSizes,
+                        help="L-mer size(s), e.g. 6, 4-8 or 4,6,8; all of them are counted in "
+                             "one scan of each genome (asked for interactively if left out)")
+    parser.add_argument("-w", "--workers", type=int, default=1,
+                        help="number of processes counting the genomes in parallel "
+                             "(0 means one per CPU; default 1)")
+    parser.add_argument("-W", "--window", type=int,
+                        help="also write the L-mer frequencies of sliding windows of this many "
+                             "bases of each genome (one .npy matrix per genome and L-mer size)")
+    parser.add_argument("-s", "--step", type=int,
+                        help="bases between the starts of two sliding windows (default: the window size)")
+    parser.add_argument("-d", "--distance", choices=BioDNA.SIGNATURE_METRICS,
+                        help="also write the matrix of distances between the signatures of the genomes")
+    parser.add_argument("--karlin", action="store_true",
+                        help="compare relative abundances (Karlin's signature) instead of frequencies")
+    parser.add_argument("-c", "--canonical", action="store_true",
+                        help="count each motif together with its reverse complement (both strands)")
+    parser.add_argument("--cache",
+                        help="directory in which to keep the L-mer counts of the genomes between runs")
+    parser.add_argument("--cache-size", type=int, default=1024,
+                        help="most megabytes the cache may hold (default 1024)")
+    parser.add_argument("--tidy", action="store_true",
+                        help="write the output as a long table with one row per ranked motif")
+    parser.add_argument("--tables",
+                        help="also write the full counts of every genome to this file "
+                             "(.parquet if pyarrow is installed, otherwise .npz)")
+    parser.add_argument("--instrument", metavar="JSON",
+                        help="write the time, bases and peak memory of each stage for each genome "
+                             "to this JSON file (- for the standard error)")
+    parser.add_argument("--profile-stage", choices=BioDNA.INSTRUMENTED_STAGES,
+                        help="run this stage under cProfile (with --instrument)")
+    parser.add_argument("--trace-stage", choices=BioDNA.INSTRUMENTED_STAGES,
+                        help="run this stage under tracemalloc (with --instrument)")
+    parser.add_argument("--incremental", action="store_true",
+                        help="only analyze the genomes that are new or have changed since the last "
+                             "run (their results are kept in a manifest beside the output file)")
+    parser.add_argument("--pipeline-depth", type=int,
+                        help="items that may wait between two stages of the pipeline "
+                             "(0 turns it off; default %i)" % BioDNA.PIPELINE_DEPTH)
+    arguments = parser.parse_args()
+    if (arguments.pipeline_depth is not None and arguments.pipeline_depth < 0):
+        parser.error("--pipeline-depth must not be negative")
+    if (arguments.pipeline_depth is None and arguments.profile_stage): # (cProfile only sees one thread)
+        arguments.pipeline_depth = 0
+    if (arguments.window is not None and (arguments.window < 1 or (arguments.step or 1) < 1)):
+        parser.error("--window and --step must be positive")
+    if ((arguments.window or arguments.distance) and arguments.lmer and max(arguments.lmer) > BioDNA.DENSE_LMER_LIMIT):
+        parser.error("sliding windows and distances need L-mer sizes of at most %i" % BioDNA.DENSE_LMER_LIMIT)
+
     # variable prompt is for printing correct statement for user input based on LmerSize variables:
     prompt = "\nEnter an L-mer size between "+str(MIN_LmerSize)+" and "+str(MAX_LmerSize)+" (inclusively): "
     
     PrintProgramTitle() # call to function that prints title of program
     
-    """User input size of Lmer and check if it is an integer between the
-    MIN_LmerSize and MAX_LmerSize inclusively:
-    """
-    while (True): # keeping going through while loop until user input is valid
-        try: # if the user doesn't enter an integer type, immediately go to ValueError
-            LmerSize = int(input(prompt))
-            # check if LmerSize between min and max and if not, ask for user input again:
-            while (MIN_LmerSize > LmerSize or MAX_LmerSize < LmerSize):
-                print("You did not enter a valid L-mer length, try again!")
-                LmerSize = int(input(prompt))            
-        except ValueError: # print error if input is not an integer
-            print("The input you have entered is not an integer!")
-            continue # go back to try above
-        else: # break out of while loop once input is valid
-            break
-    
-    print("You successfully entered", LmerSize, "for the size of the L-mer.\n")
+    if (arguments.lmer is not None): # the L-mer sizes were given on the command line
+        LmerSizes = arguments.lmer
+        print("The L-mer sizes being used are:", ", ".join(map(str, LmerSizes)), "\n")
+    else:
+        """User input size of Lmer and check if it is an integer between the
+        MIN_LmerSize and MAX_LmerSize inclusively:
+        """
+        while (True): # keeping going through while loop until user input is valid
+            try: # if the user doesn't enter an integer type, immediately go to ValueError
+                LmerSize = int(input(prompt))
+                # check if LmerSize between min and max and if not, ask for user input again:
+                while (MIN_LmerSize > LmerSize or MAX_LmerSize < LmerSize):
+                    print("You did not enter a valid L-mer length, try again!")
+                    LmerSize = int(input(prompt))            
+            except ValueError: # print error if input is not an integer
+                print("The input you have entered is not an integer!")
+                continue # go back to try above
+            else: # break out of while loop once input is valid
+                break
+        
+        print("You successfully entered", LmerSize, "for the size of the L-mer.\n")
+        LmerSizes = [LmerSize]
     
-    # call to inputDirectoryLengths on argument that is the file path:
-    BioDNA.inputDirectoryLengths(inputFilesDirectory)
+    # call to inputDirectoryLengths on each argument that is a file path; the files
+    # it finds are kept so that the directories are only searched once:
+    genomes = []
+    for inputPath in arguments.inputs:
+        genomes += BioDNA.inputDirectoryLengths(inputPath)
     
-    """ call to breakIntoMotifs on arguments that include the file directory, L-mer size,
+    if (arguments.instrument): # time every stage of the analysis
+        BioDNA.enableInstrumentation(arguments.instrument, arguments.profile_stage, arguments.trace_stage)
+
+    cache = runCache = None
+    if (arguments.cache): # the counts of the genomes are kept between runs
+        cache = BioDNA.KmerCache(arguments.cache, arguments.cache_size << 20)
+    elif (arguments.distance): # the counts are kept for the run, so the distances don't count again
+        runCache = tempfile.TemporaryDirectory(prefix="morse_a5_")
+        cache = BioDNA.KmerCache(runCache.name, 1 << 62)
+
+    manifest = None
+    if (arguments.incremental): # the results of the genomes are kept between runs
+        manifest = BioDNA.ResultsManifest(arguments.output, LmerSizes, arguments.top, arguments.canonical)
+
+    """ call to breakIntoMotifs on arguments that include the input files, L-mer sizes,
     and the number of top rankings that you want to be written to the output file:
     """
-    BioDNA.breakIntoMotifs(inputFilesDirectory, LmerSize, numberOfTopRankings)
+    BioDNA.breakIntoMotifs([nextFile for nextFile, length in genomes], LmerSizes, arguments.top,
+                           arguments.workers or None, arguments.output, arguments.canonical, cache,
+                           arguments.tidy, arguments.tables, arguments.pipeline_depth, manifest)
+
+    if (arguments.window): # profile each genome in sliding windows too (every size in one read)
+        outputDirectory = os.path.dirname(arguments.output)
+        for nextFile, length in genomes:
+            signatureFilenames = [os.path.join(outputDirectory, "%s_L%i_W%i.npy" % (
+                os.path.splitext(os.path.basename(nextFile))[0], LmerSize, arguments.window))
+                for LmerSize in LmerSizes]
+            windows = BioDNA.writeSlidingSignatureSizes(nextFile, LmerSizes, arguments.window,
+                                                        arguments.step, signatureFilenames)
+            for signatureFilename, count in zip(signatureFilenames, windows):
+                print("Wrote the signatures of", count, "windows to", signatureFilename)
+
+    if (arguments.distance): # compare the signatures of every pair of genomes
+        outputStem = os.path.splitext(arguments.output)[0]
+        mode = "karlin" if arguments.karlin else "frequency"
+        with open(outputStem + "_genomes.txt", "w") as GENOMES:
+            GENOMES.writelines(nextFile + "\n" for nextFile, length in genomes)
+        # the counts of breakIntoMotifs() are read back from the cache
+        fileList, matrices = BioDNA.signatureMatrices([nextFile for nextFile, length in genomes], LmerSizes,
+                                                      mode, arguments.workers or None, arguments.canonical, cache)
+        for LmerSize in LmerSizes:
+            distanceFilename = "%s_%s_L%i.npy" % (outputStem, arguments.distance, LmerSize)
+            BioDNA.writeDistanceMatrix(matrices[LmerSize], arguments.distance, distanceFilename)
+            print("Wrote the", arguments.distance, "distances between", len(fileList), "genomes to", distanceFilename)
+
+    if (runCache is not None):
+        runCache.cleanup()
      
 # --- end main() ---------
 
@@ -0,0 +1,66 @@
+"""Shared fixtures of the BioDNA tests (run "python -m pytest -q tests" from the
+genomic-signature directory).
+
+The tests check each subsystem of BioDNA against a brute force version of what
+it computes (a Counter of every L-mer, a regex over the whole sequence, a slice
+of the whole record), on small seeded sequences and FASTA files written to a
+temporary directory. NumPy is optional in BioDNA, so the paths without it are
+checked by running the same code in a Python where "import numpy" fails.
+"""
+
+import os, sys
+import json
+import random
+import subprocess
+
+import pytest
+
+# BioDNA.py and DNAcomposition.py are in the directory above this one (put on the path
+# by the pytest options of pyproject.toml); the programs the tests run find them on
+# the PYTHONPATH of PROGRAM_ENVIRONMENT, as if they were installed
+GENOMIC_SIGNATURE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROGRAM_ENVIRONMENT = dict(os.environ, PYTHONPATH=os.pathsep.join(
+    [GENOMIC_SIGNATURE] + [path for path in [os.environ.get("PYTHONPATH")] if path]))
+
+#--------------------------------------------------------------------------
+def randomSequence(length, seed, symbols="ACGT"):
+    """ Returns a seeded random sequence of length symbols. """
+    generator = random.Random(seed)
+    return "".join(generator.choice(symbols) for i in range(length))
+#-------------------(end of randomSequence())------------------------------
+
+#--------------------------------------------------------------------------
+def writeFASTA(filename, records, lineWidth=60):
+    """ Writes (header, sequence) records as a FASTA file, lineWidth bases to a
+    line (a header of None writes the sequence without a header line), and
+    returns the file name as a string.
+    -----------------------------------------------------------------------
+    """
+    with open(filename, "w") as OUTPUT:
+        for header, sequence in records:
+            if (header is not None):
+                OUTPUT.write(">%s\n" % header)
+            for start in range(0, len(sequence), lineWidth):
+                OUTPUT.write(sequence[start:start + lineWidth] + "\n")
+    return str(filename)
+#-------------------(end of writeFASTA())----------------------------------
+
+#--------------------------------------------------------------------------
+@pytest.fixture
+def withoutNumPy():
+    """ Returns a function that runs Python source in a new interpreter where
+    NumPy can't be imported (BioDNA then takes its pure Python paths), with
+    the conftest helpers imported, and gives back what the source printed,
+    read as JSON.
+    -----------------------------------------------------------------------
+    """
+    def run(source):
+        prelude = ("import sys\n"
+                   "sys.modules['numpy'] = None\n"
+                   "sys.path[:0] = [%r, %r]\n"
+                   "from conftest import randomSequence, writeFASTA\n") % (GENOMIC_SIGNATURE, os.path.dirname(__file__))
+        completed = subprocess.run([sys.executable, "-c", prelude + source],
+                                   capture_output=True, text=True, check=True)
+        return json.loads(completed.stdout)
+    return run
+#-------------------(end of withoutNumPy())--------------------------------
@@ -0,0 +1,155 @@
+"""Tests of the on-disk L-mer count cache: KmerCache round trips of dense,
+sparse and canonical tables (with and without NumPy), the invalidation of the
+entries of a file that changes, the eviction of the least recently used
+entries, and countFiles() saving the hashes and trimming the cache once per
+batch.
+"""
+
+import os
+import json
+import shutil
+
+import pytest
+
+import BioDNA
+from conftest import randomSequence, writeFASTA
+
+SYMBOLS = "ACGT" * 6 + "acgt" * 2 + "N"
+
+#--------------------------------------------------------------------------
+def tableState(table):
+    """ Returns everything a KmerTable holds as plain values. """
+    if (table.isDense()):
+        counts, first = list(map(int, table.counts)), list(map(int, table.first))
+    else:
+        counts, first = dict(table.counts), dict(table.first)
+    return table.LmerSize, table.canonical, table.total, table.other, counts, first
+#-------------------(end of tableState())----------------------------------
+
+#--------------------------------------------------------------------------
+@pytest.fixture
+def genomes(tmp_path):
+    """ Three small FASTA files. """
+    directory = tmp_path / "genomes"
+    directory.mkdir()
+    return [writeFASTA(directory / ("genome%i.fna" % i), [("g%i" % i, randomSequence(2000 + 500 * i, i, SYMBOLS))])
+            for i in range(3)]
+#-------------------(end of genomes())-------------------------------------
+
+#--------------------------------------------------------------------------
+@pytest.mark.parametrize("LmerSize", [3, BioDNA.DENSE_LMER_LIMIT + 2])
+@pytest.mark.parametrize("canonical", [False, True])
+def test_storeAndLoad(tmp_path, genomes, LmerSize, canonical):
+    table = BioDNA.countFASTAkmerSizes(genomes[0], [LmerSize], canonical=canonical)[LmerSize]
+    cache = BioDNA.KmerCache(str(tmp_path / "cache"))
+    assert cache.load(genomes[0], LmerSize, canonical) is None
+    cache.store(genomes[0], table)
+    assert tableState(cache.load(genomes[0], LmerSize, canonical)) == tableState(table)
+    assert cache.load(genomes[0], LmerSize, not canonical) is None
+    assert cache.load(genomes[0], LmerSize + 1, canonical) is None
+
+    # a copy of the file has the same content, so the same entries; a new cache reads them too
+    copy = str(tmp_path / "copy.fna")
+    shutil.copyfile(genomes[0], copy)
+    cache.close()
+    assert tableState(BioDNA.KmerCache(str(tmp_path / "cache")).load(copy, LmerSize, canonical)) == tableState(table)
+#-------------------(end of test_storeAndLoad())---------------------------
+
+#--------------------------------------------------------------------------
+def test_sameEntriesWithoutNumPy(tmp_path, genomes, withoutNumPy):
+    # entries written with NumPy are read back without it, and the other way round
+    cache = BioDNA.KmerCache(str(tmp_path / "cache"))
+    tables = BioDNA.countFASTAkmerSizes(genomes[0], [4], canonical=True)
+    cache.store(genomes[0], tables[4])
+    cache.close()
+    source = ("import json, BioDNA\n"
+              "cache = BioDNA.KmerCache(%r)\n"
+              "cache.store(%r, BioDNA.countFASTAkmerSizes(%r, [4])[4])\n"
+              "cache.close()\n"
+              "table = cache.load(%r, 4, True)\n"
+              "print(json.dumps([BioDNA.np is None, table.total, list(table.counts)]))\n"
+              % (str(tmp_path / "cache"), genomes[1], genomes[1], genomes[0]))
+    assert withoutNumPy(source) == [True, tables[4].total, tables[4].counts.tolist()]
+    table = BioDNA.KmerCache(str(tmp_path / "cache")).load(genomes[1], 4)
+    assert tableState(table) == tableState(BioDNA.countFASTAkmerSizes(genomes[1], [4])[4])
+#-------------------(end of test_sameEntriesWithoutNumPy())----------------
+
+#--------------------------------------------------------------------------
+def test_invalidation(tmp_path, genomes, monkeypatch):
+    hashed = []
+    contentHash = BioDNA.contentHash
+    monkeypatch.setattr(BioDNA, "contentHash", lambda filename: hashed.append(filename) or contentHash(filename))
+    cache = BioDNA.KmerCache(str(tmp_path / "cache"))
+    cache.store(genomes[0], BioDNA.countFASTAkmerSizes(genomes[0], [3])[3])
+    assert cache.load(genomes[0], 3) is not None and len(hashed) == 1 # (hashed once)
+
+    # only touched: hashed again, and still the same entry
+    os.utime(genomes[0], (os.path.getmtime(genomes[0]) + 10,) * 2)
+    assert cache.load(genomes[0], 3) is not None and len(hashed) == 2
+
+    # changed: its old entry no longer matches
+    writeFASTA(genomes[0], [("g0", randomSequence(2000, 10, SYMBOLS))])
+    assert cache.load(genomes[0], 3) is None
+
+    # an entry of another version is counted again
+    cache.store(genomes[1], BioDNA.countFASTAkmerSizes(genomes[1], [3])[3])
+    stem = cache.entry(genomes[1], 3)
+    with open(stem + ".json") as ENTRY:
+        details = json.load(ENTRY)
+    with open(stem + ".json", "w") as ENTRY:
+        json.dump(dict(details, version=BioDNA.KMER_CACHE_VERSION + 1), ENTRY)
+    assert cache.load(genomes[1], 3) is None
+
+    # the hashes are kept between runs once saved, but not those of files that are gone
+    cache.close()
+    os.remove(genomes[2])
+    with open(tmp_path / "cache" / "hashes.json") as HASHES:
+        assert sorted(json.load(HASHES)) == sorted(map(os.path.abspath, genomes[:2]))
+    hashed.clear()
+    assert BioDNA.KmerCache(str(tmp_path / "cache")).load(genomes[0], 3) is None and hashed == []
+#-------------------(end of test_invalidation())---------------------------
+
+#--------------------------------------------------------------------------
+def test_leastRecentlyUsedEviction(tmp_path, genomes):
+    cache = BioDNA.KmerCache(str(tmp_path / "cache"))
+    for used, nextFile in enumerate(genomes):
+        cache.store(nextFile, BioDNA.countFASTAkmerSizes(nextFile, [4])[4])
+        stem = cache.entry(nextFile, 4)
+        os.utime(stem + ".npy", ns=(used * 10 ** 9, used * 10 ** 9)) # stored in the order of genomes
+    entrySize = os.path.getsize(stem + ".npy") + os.path.getsize(stem + ".json") # (about that of each entry)
+
+    cache.maxBytes = 2 * entrySize + entrySize // 2 # room for two entries
+    cache.load(genomes[0], 4) # the oldest entry is used again, so genome1 is now the least recently used
+    assert cache.flush() == 1
+    assert cache.flush() == 0 # (nothing stored since the last flush, so nothing to trim)
+    assert [cache.load(nextFile, 4) is not None for nextFile in genomes] == [True, False, True]
+
+    # a cache opened with a smaller size is trimmed at once
+    BioDNA.KmerCache(str(tmp_path / "cache"), entrySize + entrySize // 2)
+    assert sum(cache.load(nextFile, 4) is not None for nextFile in genomes) == 1
+#-------------------(end of test_leastRecentlyUsedEviction())--------------
+
+#--------------------------------------------------------------------------
+def test_countFilesFlushesOncePerBatch(tmp_path, genomes, monkeypatch):
+    evictions = []
+    evict = BioDNA.KmerCache.evict
+    monkeypatch.setattr(BioDNA.KmerCache, "evict", lambda cache: evictions.append(1) or evict(cache))
+    cache = BioDNA.KmerCache(str(tmp_path / "cache"))
+    evictions.clear()
+
+    counted = BioDNA.countFiles(genomes, [3, 5], cache=cache, pipelineDepth=0)
+    for nextFile, tables in counted:
+        # the entries are stored as the files are counted, but nothing is saved or trimmed yet
+        assert cache.load(nextFile, 5) is not None
+        assert not os.path.exists(tmp_path / "cache" / "hashes.json") and evictions == []
+    assert evictions == [1]
+    with open(tmp_path / "cache" / "hashes.json") as HASHES:
+        assert sorted(json.load(HASHES)) == sorted(map(os.path.abspath, genomes))
+
+    # a second batch reads every table back from the cache: nothing to save or trim
+    expected = {nextFile: {LmerSize: tableState(table) for LmerSize, table in tables.items()}
+                for nextFile, tables in BioDNA.countFiles(genomes, [3, 5], pipelineDepth=0)}
+    assert {nextFile: {LmerSize: tableState(table) for LmerSize, table in tables.items()}
+            for nextFile, tables in BioDNA.countFiles(genomes, [3, 5], cache=cache)} == expected
+    assert evictions == [1]
+#-------------------(end of test_countFilesFlushesOncePerBatch())----------
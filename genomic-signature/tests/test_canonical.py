@@ -0,0 +1,85 @@
+"""Tests of the canonical (both strands) L-mer counting: canonicalCodes() and
+canonicalMotif() against the reverse complement of every L-mer, and the
+canonical KmerTables of countKmerSizes(), packed sequences and FASTA files
+against a Counter of the smaller of each L-mer and its reverse complement,
+with and without NumPy.
+"""
+
+import itertools
+from collections import Counter
+
+import pytest
+
+import BioDNA
+from conftest import randomSequence, writeFASTA
+
+SYMBOLS = "ACGT" * 6 + "acgt" * 3 + "NNRY"
+COMPLEMENT = str.maketrans("ACGTNRY", "TGCANYR")
+
+#--------------------------------------------------------------------------
+def bruteForceCanonicalCounts(sequences, LmerSize):
+    """ Returns a Counter of the canonical form (the smaller of the upper-case
+    L-mer and its reverse complement) of every L-mer of each sequence in turn. """
+    counts = Counter()
+    for sequence in sequences:
+        sequence = sequence.upper()
+        for i in range(len(sequence) - LmerSize + 1):
+            motif = sequence[i:i + LmerSize]
+            counts[min(motif, motif.translate(COMPLEMENT)[::-1])] += 1
+    return counts
+#-------------------(end of bruteForceCanonicalCounts())-------------------
+
+#--------------------------------------------------------------------------
+@pytest.mark.parametrize("LmerSize", [1, 2, 3, 4, 5])
+def test_canonicalCodes(LmerSize):
+    motifs = ["".join(bases) for bases in itertools.product("ACGT", repeat=LmerSize)]
+    canonical = sorted({min(motif, motif.translate(COMPLEMENT)[::-1]) for motif in motifs})
+    codes, slots = BioDNA.canonicalCodes(LmerSize)
+    table = BioDNA.KmerTable(LmerSize)
+    assert [table.motif(int(code)) for code in codes] == canonical
+    assert len(canonical) == (4 ** LmerSize + (4 ** (LmerSize // 2) if LmerSize % 2 == 0 else 0)) // 2
+    for code, motif in enumerate(motifs):
+        assert canonical[int(slots[code])] == BioDNA.canonicalMotif(motif.lower())
+#-------------------(end of test_canonicalCodes())-------------------------
+
+#--------------------------------------------------------------------------
+@pytest.mark.parametrize("LmerSize", [1, 2, 4, 7, BioDNA.DENSE_LMER_LIMIT + 1])
+def test_canonicalRankingMatchesCounter(LmerSize):
+    sequence = randomSequence(5000, LmerSize, SYMBOLS)
+    counts = bruteForceCanonicalCounts([sequence], LmerSize)
+    table = BioDNA.countKmers(sequence, LmerSize, canonical=True)
+    assert table.canonical and table.total == len(sequence) - LmerSize + 1
+    assert table.topRanked(len(counts)) == counts.most_common()
+    assert table.topRanked(7) == counts.most_common(7)
+    # an L-mer and its reverse complement are counted together, whichever is asked for
+    for motif in list(counts)[:20]:
+        assert table.count(motif) == table.count(motif.translate(COMPLEMENT)[::-1].lower()) == counts[motif]
+
+    # the reverse complement of the sequence has the same canonical counts
+    reverse = BioDNA.countKmers(sequence.upper().translate(COMPLEMENT)[::-1], LmerSize, canonical=True)
+    assert sorted(reverse.topRanked(len(counts))) == sorted(counts.items())
+#-------------------(end of test_canonicalRankingMatchesCounter())---------
+
+#--------------------------------------------------------------------------
+def test_canonicalSizesOfFilesAndPackedSequences(tmp_path):
+    records = [("a", randomSequence(3000, 1, SYMBOLS)), ("b", randomSequence(1700, 2, SYMBOLS))]
+    filename = writeFASTA(tmp_path / "genome.fna", records)
+    tables = BioDNA.countFASTAkmerSizes(filename, [2, 5, 12], 256, canonical=True)
+    for LmerSize, table in tables.items():
+        assert table.topRanked(10 ** 6) == bruteForceCanonicalCounts([s for h, s in records], LmerSize).most_common()
+
+    with BioDNA.openPacked(filename, "b") as packed: # (counted in chunks, upper case)
+        tables = BioDNA.countKmerSizes(packed, [3, 6], canonical=True)
+    for LmerSize, table in tables.items():
+        assert table.topRanked(10 ** 6) == bruteForceCanonicalCounts([records[1][1]], LmerSize).most_common()
+#-------------------(end of test_canonicalSizesOfFilesAndPackedSequences())
+
+#--------------------------------------------------------------------------
+def test_sameCanonicalRankingsWithoutNumPy(withoutNumPy):
+    source = ("import json, BioDNA\n"
+              "tables = BioDNA.countKmerSizes(randomSequence(4000, 3, %r), [3, 6], canonical=True)\n"
+              "print(json.dumps([BioDNA.np is None] + [tables[size].topRanked(10 ** 6) for size in (3, 6)]))\n"
+              % SYMBOLS)
+    counts = [bruteForceCanonicalCounts([randomSequence(4000, 3, SYMBOLS)], size).most_common() for size in (3, 6)]
+    assert withoutNumPy(source) == [True] + [[list(pair) for pair in ranking] for ranking in counts]
+#-------------------(end of test_sameCanonicalRankingsWithoutNumPy())------
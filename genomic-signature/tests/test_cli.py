@@ -0,0 +1,84 @@
+"""Tests of the command line of morse_a5.py: parseLmerSizes() for sizes,
+ranges and lists (and what it turns down), and runs of the program with the
+L-mer sizes, inputs, top rankings and output file given as options, or the
+L-mer size asked for at the prompt, against breakIntoMotifs().
+"""
+
+import os, sys
+import argparse
+import subprocess
+
+import pytest
+
+import BioDNA
+import morse_a5
+from conftest import GENOMIC_SIGNATURE, PROGRAM_ENVIRONMENT, randomSequence, writeFASTA
+
+PROGRAM = os.path.join(GENOMIC_SIGNATURE, "morse_a5.py")
+
+#--------------------------------------------------------------------------
+@pytest.fixture
+def inputs(tmp_path):
+    """ A directory of two genomes (and a file that is not FASTA) and a FASTA
+    file outside of it. """
+    directory = tmp_path / "genomes"
+    directory.mkdir()
+    writeFASTA(directory / "beta.fna", [("beta", randomSequence(2000, 1, "ACGTacgtN"))])
+    writeFASTA(directory / "alpha.fna", [("alpha_1", randomSequence(1500, 2)), ("alpha_2", randomSequence(300, 3))])
+    (directory / "notes.txt").write_text("not a genome\n")
+    return [str(directory), writeFASTA(tmp_path / "single.fna", [("single", randomSequence(900, 4))])]
+#-------------------(end of inputs())--------------------------------------
+
+#--------------------------------------------------------------------------
+def readText(filename):
+    """ Returns the text of a file. """
+    with open(filename) as INPUT:
+        return INPUT.read()
+#-------------------(end of readText())------------------------------------
+
+#--------------------------------------------------------------------------
+@pytest.mark.parametrize("text, LmerSizes", [("6", [6]), ("4-8", [4, 5, 6, 7, 8]), ("8,4,6", [4, 6, 8]),
+                                             ("4-6,8,5", [4, 5, 6, 8]), ("31", [31])])
+def test_parseLmerSizes(text, LmerSizes):
+    assert morse_a5.parseLmerSizes(text) == LmerSizes
+#-------------------(end of test_parseLmerSizes())-------------------------
+
+#--------------------------------------------------------------------------
+@pytest.mark.parametrize("text", ["", "six", "4-", "4-6-8", "0", "32", "2-40", "4,,6"])
+def test_parseLmerSizesTurnsDown(text):
+    with pytest.raises(argparse.ArgumentTypeError):
+        morse_a5.parseLmerSizes(text)
+#-------------------(end of test_parseLmerSizesTurnsDown())----------------
+
+#--------------------------------------------------------------------------
+def test_optionsOnTheCommandLine(tmp_path, inputs):
+    outputFilename = str(tmp_path / "out.csv")
+    completed = subprocess.run([sys.executable, PROGRAM, "-l", "4-5,7", "-n", "3", "-o", outputFilename] + inputs,
+                               stdin=subprocess.DEVNULL, capture_output=True, text=True, check=True,
+                               env=PROGRAM_ENVIRONMENT)
+    assert "The L-mer sizes being used are: 4, 5, 7" in completed.stdout
+    BioDNA.breakIntoMotifs(BioDNA.listFASTAfiles(inputs), [4, 5, 7], 3, outputFilename=str(tmp_path / "expected.csv"))
+    assert readText(outputFilename) == readText(tmp_path / "expected.csv")
+    assert readText(outputFilename).count("L-mer size: ") == 3 * 3 # (three files, three sizes)
+#-------------------(end of test_optionsOnTheCommandLine())----------------
+
+#--------------------------------------------------------------------------
+def test_sizeAskedForAtThePrompt(tmp_path, inputs):
+    # a word and a size out of range are asked for again
+    completed = subprocess.run([sys.executable, PROGRAM, inputs[0]], input="six\n12\n5\n", cwd=tmp_path,
+                               capture_output=True, text=True, check=True, env=PROGRAM_ENVIRONMENT)
+    assert "The input you have entered is not an integer!" in completed.stdout
+    assert "You did not enter a valid L-mer length, try again!" in completed.stdout
+    assert "You successfully entered 5 for the size of the L-mer." in completed.stdout
+    BioDNA.breakIntoMotifs(inputs[0], 5, 10, outputFilename=str(tmp_path / "expected.csv"))
+    assert readText(tmp_path / "Results.csv") == readText(tmp_path / "expected.csv")
+    assert "L-mer size: " not in readText(tmp_path / "Results.csv") # (one size: the original blocks)
+#-------------------(end of test_sizeAskedForAtThePrompt())----------------
+
+#--------------------------------------------------------------------------
+def test_badLmerOption(tmp_path, inputs):
+    completed = subprocess.run([sys.executable, PROGRAM, "-l", "4-x", inputs[0]], cwd=tmp_path,
+                               capture_output=True, text=True, env=PROGRAM_ENVIRONMENT)
+    assert completed.returncode == 2 and "is not an L-mer size, range or list" in completed.stderr
+    assert not os.path.exists(tmp_path / "Results.csv")
+#-------------------(end of test_badLmerOption())--------------------------
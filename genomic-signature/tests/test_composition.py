@@ -0,0 +1,107 @@
+"""Tests of the base composition engine of DNAcomposition: sequenceComposition()
+and fastaComposition() against a Counter of the bases and the GC content of
+each window worked out by hand, with and without NumPy, and morse_a2.py.
+"""
+
+import os, sys
+import math
+import subprocess
+from collections import Counter
+
+import pytest
+
+import BioDNA
+import DNAcomposition
+from conftest import GENOMIC_SIGNATURE, PROGRAM_ENVIRONMENT, randomSequence, writeFASTA
+
+SYMBOLS = "ACGT" * 5 + "acgt" * 2 + "NnRYK-"
+
+#--------------------------------------------------------------------------
+def bruteForceComposition(sequence, windowSize=None):
+    """ Returns the Composition of a sequence from a Counter of its upper-case
+    symbols and a count of the G/C and A/C/G/T bases of each window. """
+    counts = Counter(sequence.upper())
+    A, C, G, T = counts["A"], counts["C"], counts["G"], counts["T"]
+    windowGC = []
+    if (windowSize):
+        for start in range(0, len(sequence), windowSize):
+            window = sequence[start:start + windowSize].upper()
+            ACGT = sum(window.count(base) for base in "ACGT")
+            windowGC.append((window.count("G") + window.count("C")) / ACGT if ACGT else math.nan)
+    return DNAcomposition.Composition(len(sequence), dict(counts), (G + C) / (A + C + G + T),
+                                      (G - C) / (G + C), (A - T) / (A + T), windowSize, windowGC)
+#-------------------(end of bruteForceComposition())-----------------------
+
+#--------------------------------------------------------------------------
+def assertSameComposition(composition, expected):
+    """ Compares two Compositions, the NaN windows included. """
+    assert composition[:6] == expected[:6]
+    assert [None if math.isnan(GC) else GC for GC in composition.windowGC] == \
+           [None if math.isnan(GC) else pytest.approx(GC) for GC in expected.windowGC]
+#-------------------(end of assertSameComposition())-----------------------
+
+#--------------------------------------------------------------------------
+@pytest.mark.parametrize("windowSize", [None, 1, 7, 100, 5000])
+def test_sequenceComposition(windowSize):
+    sequence = randomSequence(3000, 1, SYMBOLS) + "N" * 250 + randomSequence(333, 2, SYMBOLS)
+    expected = bruteForceComposition(sequence, windowSize)
+    assertSameComposition(DNAcomposition.sequenceComposition(sequence, windowSize), expected)
+    assertSameComposition(DNAcomposition.sequenceComposition(sequence.encode("ascii"), windowSize), expected)
+#-------------------(end of test_sequenceComposition())--------------------
+
+#--------------------------------------------------------------------------
+@pytest.mark.parametrize("blockSize", [10, 4096, 1 << 22])
+def test_fastaComposition(tmp_path, blockSize):
+    records = [("a", randomSequence(2000, 3, SYMBOLS)), ("b description", randomSequence(1234, 4, SYMBOLS))]
+    filename = writeFASTA(tmp_path / "genome.fna", records, 77)
+    expected = bruteForceComposition("".join(sequence for header, sequence in records), 100)
+    assertSameComposition(DNAcomposition.fastaComposition(filename, 100, blockSize), expected)
+    assertSameComposition(BioDNA.fastaComposition(filename, 100, blockSize), expected)
+#-------------------(end of test_fastaComposition())-----------------------
+
+#--------------------------------------------------------------------------
+def test_sameWindowsWithoutNumPy(withoutNumPy):
+    source = ("import json, math, DNAcomposition\n"
+              "composition = DNAcomposition.sequenceComposition(randomSequence(5000, 5, %r), 64)\n"
+              "print(json.dumps([DNAcomposition.importNumPy() is None, composition.counts,\n"
+              "                  [None if math.isnan(GC) else GC for GC in composition.windowGC]]))\n" % SYMBOLS)
+    composition = DNAcomposition.sequenceComposition(randomSequence(5000, 5, SYMBOLS), 64)
+    noNumPy, counts, windowGC = withoutNumPy(source)
+    assert noNumPy and counts == composition.counts
+    assert windowGC == [None if math.isnan(GC) else pytest.approx(GC) for GC in composition.windowGC]
+#-------------------(end of test_sameWindowsWithoutNumPy())----------------
+
+#--------------------------------------------------------------------------
+def test_piecesOfEveryByte(withoutNumPy):
+    # pieces of any size and any ASCII byte are counted as one sequence, by the bincount with
+    # NumPy and by a bytes.count() of each common symbol and a Counter of the rest without it
+    source = ("import json, random, DNAcomposition\n"
+              "sequence = bytes(range(128)) + randomSequence(3000, 6, %r).encode('ascii')\n"
+              "composition, start, generator = DNAcomposition.BaseComposition(), 0, random.Random(6)\n"
+              "while (start < len(sequence)):\n"
+              "    size = generator.randrange(700)\n"
+              "    composition.add(sequence[start:start + size])\n"
+              "    start += size\n"
+              "print(json.dumps([DNAcomposition.importNumPy() is None] + list(composition.finish()[:2])))\n" % SYMBOLS)
+    sequence = bytes(range(128)) + randomSequence(3000, 6, SYMBOLS).encode("ascii")
+    expected = [len(sequence), dict(Counter(sequence.decode("ascii").upper()))]
+    assert withoutNumPy(source) == [True] + expected
+
+    composition = DNAcomposition.BaseComposition()
+    for start in range(0, len(sequence), 333):
+        composition.add(sequence[start:start + 333])
+    assert list(composition.finish()[:2]) == expected
+#-------------------(end of test_piecesOfEveryByte())----------------------
+
+#--------------------------------------------------------------------------
+def test_morse_a2():
+    directory = os.path.join(GENOMIC_SIGNATURE, os.pardir, "megavirus_chiliensis")
+    counts = Counter(BioDNA.getDNA(os.path.join(directory, "megavirus_chiliensis.fna")).upper())
+    completed = subprocess.run([sys.executable, "morse_a2.py"], cwd=directory, env=PROGRAM_ENVIRONMENT,
+                               capture_output=True, text=True, check=True)
+    lines = completed.stdout.splitlines()
+    assert lines[0] == "Total length of DNA:\t %i bp" % sum(counts.values())
+    for line, base in zip(lines[2:6], "ACGT"):
+        assert line.endswith("\t{:5}".format(counts[base]))
+    assert lines[6].endswith("\t{:5}".format(sum(counts.values()) - sum(counts[base] for base in "ACGT")))
+#-------------------(end of test_morse_a2())-------------------------------
@@ -0,0 +1,119 @@
+"""Tests of compressed FASTA input: compressBGZF() and BgzfReader round trips
+(reads, .gzi seeks and fetch() of regions) against the plain file, and the
+readers of gzip, bgzip and xz files against those of the plain file.
+"""
+
+import gzip, lzma, zlib
+import random
+import struct
+
+import pytest
+
+import BioDNA
+import DNAcomposition
+from conftest import randomSequence, writeFASTA
+
+#--------------------------------------------------------------------------
+@pytest.fixture
+def genome(tmp_path):
+    """ A plain FASTA file of about 300 kb (several BGZF blocks) and its records. """
+    records = [("chr%i description" % i, randomSequence(size, i, "ACGTacgtN"))
+               for i, size in enumerate((150000, 7, 140000, 0, 9000))]
+    return writeFASTA(tmp_path / "genome.fna", records, 80), records
+#-------------------(end of genome())--------------------------------------
+
+#--------------------------------------------------------------------------
+def compressedCopies(filename):
+    """ Returns the names of gzip, bgzip and xz copies of a file. """
+    with open(filename, "rb") as INPUT:
+        text = INPUT.read()
+    with gzip.open(filename + ".gzip.gz", "wb") as OUTPUT:
+        OUTPUT.write(text)
+    with lzma.open(filename + ".xz", "wb") as OUTPUT:
+        OUTPUT.write(text)
+    return [filename + ".gzip.gz", BioDNA.compressBGZF(filename, threads=2), filename + ".xz"]
+#-------------------(end of compressedCopies())----------------------------
+
+#--------------------------------------------------------------------------
+@pytest.mark.parametrize("threads", [1, 4])
+def test_bgzfRoundTrip(genome, threads):
+    filename, records = genome
+    compressed = BioDNA.compressBGZF(filename, filename + ".%i.gz" % threads, threads=threads)
+    with open(filename, "rb") as INPUT:
+        text = INPUT.read()
+    assert DNAcomposition.compressionOf(compressed) == "bgzf"
+    with gzip.open(compressed, "rb") as INPUT: # (any gzip reader reads a BGZF file)
+        assert INPUT.read() == text
+    with BioDNA.openFASTA(compressed, threads=threads) as INPUT:
+        assert INPUT.read() == text
+    with BioDNA.openFASTA(compressed, text=True) as INPUT:
+        assert INPUT.readlines() == text.decode("ascii").splitlines(keepends=True)
+#-------------------(end of test_bgzfRoundTrip())--------------------------
+
+#--------------------------------------------------------------------------
+def test_gziIndexAndSeeks(genome):
+    filename, records = genome
+    compressed = BioDNA.compressBGZF(filename)
+    with open(filename, "rb") as INPUT:
+        text = INPUT.read()
+    compressedStarts, uncompressedStarts = BioDNA.buildGziIndex(compressed, compressed + ".test.gzi")
+    # every block holds BGZF_BLOCK_DATA bytes but the last one, before the empty end-of-file block
+    assert uncompressedStarts == list(range(0, len(text), BioDNA.BGZF_BLOCK_DATA)) + [len(text)]
+    with open(compressed + ".gzi", "rb") as INDEX, open(compressed + ".test.gzi", "rb") as TEST:
+        assert INDEX.read() == TEST.read()
+    assert BioDNA.loadGziIndex(compressed) == (compressedStarts, uncompressedStarts)
+    with open(compressed, "rb") as INPUT: # each block starts where the index says
+        for compressedStart in compressedStarts:
+            INPUT.seek(compressedStart)
+            assert INPUT.read(4) == b"\x1f\x8b\x08\x04"
+
+    generator = random.Random(1)
+    with BioDNA.openFASTA(compressed) as INPUT:
+        for offset in [0, len(text) - 1, len(text)] + uncompressedStarts + generator.sample(range(len(text)), 50):
+            INPUT.seek(offset)
+            assert INPUT.tell() == offset
+            assert INPUT.read(70000) == text[offset:offset + 70000]
+#-------------------(end of test_gziIndexAndSeeks())-----------------------
+
+#--------------------------------------------------------------------------
+def test_fetchFromBgzf(genome):
+    filename, records = genome
+    compressed = BioDNA.compressBGZF(filename)
+    assert BioDNA.buildFastaIndex(compressed) == BioDNA.buildFastaIndex(filename)
+    generator = random.Random(2)
+    for header, sequence in records:
+        name = header.split()[0]
+        for start in generator.sample(range(len(sequence) + 1), min(len(sequence) + 1, 20)):
+            end = start + generator.choice((1, 80, 5000, 100000))
+            assert BioDNA.fetch(compressed, name, start, end) == sequence[start:end]
+#-------------------(end of test_fetchFromBgzf())--------------------------
+
+#--------------------------------------------------------------------------
+def test_compressedFilesReadLikeThePlainFile(genome):
+    filename, records = genome
+    plainTables = BioDNA.countFASTAkmerSizes(filename, [3, 6], 1 << 16)
+    plainComposition = DNAcomposition.fastaComposition(filename, 1000)
+    for compressed, compression in zip(compressedCopies(filename), ("gzip", "bgzf", "xz")):
+        assert DNAcomposition.compressionOf(compressed) == compression
+        assert list(BioDNA.readFASTA(compressed)) == records
+        assert BioDNA.getDNA(compressed) == "".join(sequence for header, sequence in records).lower()
+        tables = BioDNA.countFASTAkmerSizes(compressed, [3, 6], 1 << 16)
+        for LmerSize in (3, 6):
+            assert tables[LmerSize].topRanked(10 ** 6) == plainTables[LmerSize].topRanked(10 ** 6)
+        assert DNAcomposition.fastaComposition(compressed, 1000) == plainComposition
+        assert BioDNA.fastaComposition(compressed, 1000) == plainComposition
+#-------------------(end of test_compressedFilesReadLikeThePlainFile())----
+
+#--------------------------------------------------------------------------
+def test_truncatedBgzf(genome, tmp_path):
+    filename, records = genome
+    compressed = BioDNA.compressBGZF(filename)
+    with open(compressed, "rb") as INPUT:
+        data = INPUT.read()
+    truncated = str(tmp_path / "truncated.fna.gz")
+    with open(truncated, "wb") as OUTPUT:
+        OUTPUT.write(data[:len(data) // 2])
+    with pytest.raises((EOFError, OSError, ValueError, struct.error, zlib.error)):
+        with BioDNA.openFASTA(truncated) as INPUT:
+            INPUT.read()
+#-------------------(end of test_truncatedBgzf())--------------------------
@@ -0,0 +1,155 @@
+"""Tests of the genomic signature distances: signatureVector() against the
+frequencies and relative abundances worked out from a Counter of the L-mers,
+signatureDistances() (in blocks of any size), signatureDistance() and
+writeDistanceMatrix() against each metric written out pair by pair, with and
+without NumPy, and signatureMatrix() of a directory.
+"""
+
+import itertools
+import math
+from collections import Counter
+
+import pytest
+
+import BioDNA
+from conftest import randomSequence, writeFASTA
+
+SYMBOLS = "ACGT" * 6 + "acgt" * 2 + "N"
+COMPLEMENT = str.maketrans("ACGTN", "TGCAN")
+
+#--------------------------------------------------------------------------
+def bruteForceSignature(sequence, LmerSize, mode):
+    """ Returns the frequency (or, for mode "karlin", the frequency over the
+    product of the frequencies of its bases) of every L-mer of A, C, G and T
+    of a sequence, in alphabetical order of the L-mers. """
+    upper = sequence.upper()
+    counts = Counter(upper[i:i + LmerSize] for i in range(len(upper) - LmerSize + 1))
+    motifs = ["".join(bases) for bases in itertools.product("ACGT", repeat=LmerSize)]
+    valid = sum(counts[motif] for motif in motifs)
+    frequencies = [counts[motif] / valid for motif in motifs]
+    if (mode == "frequency"):
+        return frequencies
+    # the frequency of each base, as the first base of the L-mers
+    bases = {base: sum(frequency for motif, frequency in zip(motifs, frequencies) if motif[0] == base)
+             for base in "ACGT"}
+    expected = [math.prod(bases[base] for base in motif) for motif in motifs]
+    return [frequency / product if product else 0.0 for frequency, product in zip(frequencies, expected)]
+#-------------------(end of bruteForceSignature())-------------------------
+
+#--------------------------------------------------------------------------
+def bruteForceDistance(first, second, metric):
+    """ Returns the distance between two signatures, written out from its
+    definition. """
+    if (metric == "delta"):
+        return sum(abs(a - b) for a, b in zip(first, second)) / len(first)
+    if (metric == "euclidean"):
+        return math.sqrt(sum((a - b) ** 2 for a, b in zip(first, second)))
+    if (metric == "cosine"):
+        product = sum(a * b for a, b in zip(first, second))
+        norms = math.sqrt(sum(a * a for a in first) * sum(b * b for b in second))
+        return 1.0 - product / norms if norms else 1.0
+    # jensenshannon: the square root of the mean Kullback-Leibler divergence from the middle
+    p = [a / sum(first) for a in first] if sum(first) else first
+    q = [b / sum(second) for b in second] if sum(second) else second
+    m = [(a + b) / 2 for a, b in zip(p, q)]
+    divergence = sum(a * math.log2(a / c) for a, c in zip(p, m) if a > 0) / 2 + \
+                 sum(b * math.log2(b / c) for b, c in zip(q, m) if b > 0) / 2
+    return math.sqrt(max(divergence, 0.0))
+#-------------------(end of bruteForceDistance())--------------------------
+
+#--------------------------------------------------------------------------
+def signatures():
+    """ The signatures of a few sequences, the last one all zero. """
+    rows = [bruteForceSignature(randomSequence(2000, seed, SYMBOLS), 3, "karlin") for seed in range(6)]
+    rows.insert(3, list(rows[1])) # (the same signature twice)
+    return rows + [[0.0] * 64]
+#-------------------(end of signatures())----------------------------------
+
+#--------------------------------------------------------------------------
+@pytest.mark.parametrize("LmerSize", [1, 2, 4])
+@pytest.mark.parametrize("mode", ["frequency", "karlin"])
+def test_signatureVector(LmerSize, mode):
+    sequence = randomSequence(4000, LmerSize, SYMBOLS)
+    vector = BioDNA.signatureVector(BioDNA.countKmers(sequence, LmerSize), mode)
+    assert list(vector) == pytest.approx(bruteForceSignature(sequence, LmerSize, mode))
+
+    # the canonical signature is that of both strands, one number per canonical L-mer: the
+    # frequency of the L-mer and its reverse complement together, or its relative abundance
+    motifs = ["".join(bases) for bases in itertools.product("ACGT", repeat=LmerSize)]
+    bothStrands = dict(zip(motifs, bruteForceSignature(sequence + "N" + sequence.upper().translate(COMPLEMENT)[::-1],
+                                                       LmerSize, mode)))
+    expected = []
+    for motif in sorted({BioDNA.canonicalMotif(motif) for motif in motifs}):
+        reverse = motif.translate(COMPLEMENT)[::-1]
+        if (mode == "frequency" and reverse != motif):
+            expected.append(bothStrands[motif] + bothStrands[reverse])
+        else:
+            expected.append(bothStrands[motif])
+    canonical = BioDNA.signatureVector(BioDNA.countKmers(sequence, LmerSize, canonical=True), mode)
+    assert list(canonical) == pytest.approx(expected)
+
+    with pytest.raises(ValueError):
+        BioDNA.signatureVector(BioDNA.countKmers(sequence, LmerSize), "other")
+#-------------------(end of test_signatureVector())------------------------
+
+#--------------------------------------------------------------------------
+@pytest.mark.parametrize("metric", BioDNA.SIGNATURE_METRICS)
+@pytest.mark.parametrize("blockSize", [1, 3, 256])
+def test_signatureDistances(metric, blockSize):
+    rows = signatures()
+    expected = [[bruteForceDistance(row, other, metric) for other in rows] for row in rows]
+    distances = BioDNA.signatureDistances(rows, metric, blockSize)
+    for row, expectedRow in zip(distances, expected):
+        assert list(row) == pytest.approx(expectedRow, abs=1e-6)
+    for first, second in itertools.combinations(range(len(rows)), 2):
+        assert BioDNA.signatureDistance(rows[first], rows[second], metric) == pytest.approx(expected[first][second])
+        assert distances[first][second] == pytest.approx(distances[second][first], abs=1e-9)
+    # a signature is at distance 0 from itself (and from its copy), unless it is all zero for cosine
+    assert distances[1][3] == pytest.approx(0.0, abs=1e-6)
+    assert [distances[i][i] for i in range(len(rows) - 1)] == pytest.approx([0.0] * (len(rows) - 1), abs=1e-6)
+
+    with pytest.raises(ValueError):
+        BioDNA.signatureDistances(rows, "manhattan")
+#-------------------(end of test_signatureDistances())---------------------
+
+#--------------------------------------------------------------------------
+def test_writeDistanceMatrix(tmp_path):
+    np = pytest.importorskip("numpy")
+    rows = signatures()
+    outputFilename = str(tmp_path / "distances.npy")
+    assert BioDNA.writeDistanceMatrix(rows, "jensenshannon", outputFilename, blockSize=2) == len(rows)
+    written = np.load(outputFilename, mmap_mode="r")
+    assert written.dtype == np.float32 and written.shape == (len(rows), len(rows))
+    assert np.allclose(written, BioDNA.signatureDistances(rows, "jensenshannon"), atol=1e-6)
+#-------------------(end of test_writeDistanceMatrix())--------------------
+
+#--------------------------------------------------------------------------
+def test_sameDistancesWithoutNumPy(tmp_path, withoutNumPy):
+    outputFilename = str(tmp_path / "distances.npy")
+    source = ("import json, BioDNA\n"
+              "rows = %r\n"
+              "BioDNA.writeDistanceMatrix(rows, 'cosine', %r, blockSize=3)\n"
+              "print(json.dumps([BioDNA.np is None] + [BioDNA.signatureDistances(rows, metric)\n"
+              "                                        for metric in BioDNA.SIGNATURE_METRICS]))\n"
+              % (signatures(), outputFilename))
+    results = withoutNumPy(source)
+    assert results[0]
+    for metric, distances in zip(BioDNA.SIGNATURE_METRICS, results[1:]):
+        for row, expectedRow in zip(distances, BioDNA.signatureDistances(signatures(), metric)):
+            assert row == pytest.approx(list(expectedRow), abs=1e-6)
+    np = pytest.importorskip("numpy")
+    assert np.allclose(np.load(outputFilename), BioDNA.signatureDistances(signatures(), "cosine"), atol=1e-6)
+#-------------------(end of test_sameDistancesWithoutNumPy())--------------
+
+#--------------------------------------------------------------------------
+def test_signatureMatrix(tmp_path):
+    directory = tmp_path / "genomes"
+    directory.mkdir()
+    sequences = [randomSequence(1500, seed, SYMBOLS) for seed in range(3)]
+    for seed, sequence in enumerate(sequences):
+        writeFASTA(directory / ("genome%i.fna" % seed), [("g%i" % seed, sequence)])
+    fileList, matrix = BioDNA.signatureMatrix(str(directory), 2, "karlin")
+    assert [name[-len("genome0.fna"):] for name in fileList] == ["genome0.fna", "genome1.fna", "genome2.fna"]
+    for row, sequence in zip(matrix, sequences):
+        assert list(row) == pytest.approx(bruteForceSignature(sequence, 2, "karlin"))
+#-------------------(end of test_signatureMatrix())------------------------
@@ -0,0 +1,138 @@
+"""Tests of the streaming FASTA reader: readFASTA() and readFASTApieces()
+against the records split line by line from the whole text of the file
+(several records, sequence before the first header, empty records, blank and
+comment lines, Windows line ends, blocks that end anywhere), readFASTAwindows()
+against slices of each record, and getDNA(); and the quick pass over the raw
+bytes for the lengths of the records (fastaRecordLengths()) and the single
+scan of the input directory (inputDirectoryLengths()), which parses no genome.
+"""
+
+import pytest
+
+import BioDNA
+from conftest import randomSequence, writeFASTA
+
+SYMBOLS = "ACGT" * 6 + "acgt" * 2 + "N"
+
+#--------------------------------------------------------------------------
+def bruteForceRecords(text):
+    """ Returns the (header, sequence) records of the text of a FASTA file, read
+    line by line: blank and ";" lines are skipped, a sequence before the first
+    header is a record without a header, and the case is kept. """
+    records = []
+    for line in text.splitlines():
+        if (line.startswith(">")):
+            records.append([line[1:].strip(), ""])
+        elif (line.strip() and not line.startswith(";")):
+            if (not records):
+                records.append(["", ""])
+            records[-1][1] += "".join(line.split())
+    return [tuple(record) for record in records]
+#-------------------(end of bruteForceRecords())---------------------------
+
+#--------------------------------------------------------------------------
+def untidyFASTA(filename, newline="\n"):
+    """ Writes a FASTA file with everything the reader must get past and
+    returns its name and text. """
+    lines = [randomSequence(45, 1, SYMBOLS), "; a comment", ">chr1 first record", ""]
+    sequence = randomSequence(2500, 2, SYMBOLS)
+    lines += [sequence[start:start + 61] for start in range(0, len(sequence), 61)]
+    lines += [">empty", ">", randomSequence(30, 3, SYMBOLS) + " \t" + randomSequence(20, 4, SYMBOLS), "",
+              ";another comment", "> chr3  ", randomSequence(70, 5, SYMBOLS), randomSequence(3, 6, SYMBOLS)]
+    text = newline.join(lines) + newline
+    with open(filename, "w", newline="") as OUTPUT:
+        OUTPUT.write(text)
+    return str(filename), text
+#-------------------(end of untidyFASTA())---------------------------------
+
+#--------------------------------------------------------------------------
+@pytest.mark.parametrize("newline", ["\n", "\r\n"])
+def test_readFASTA(tmp_path, newline):
+    filename, text = untidyFASTA(tmp_path / "genome.fna", newline)
+    expected = bruteForceRecords(text)
+    assert [header for header, sequence in expected] == ["", "chr1 first record", "empty", "", "chr3"]
+    assert list(BioDNA.readFASTA(filename)) == expected
+#-------------------(end of test_readFASTA())------------------------------
+
+#--------------------------------------------------------------------------
+@pytest.mark.parametrize("blockSize", [1, 7, 64, 1 << 20])
+def test_readFASTApiecesInBlocksOfAnySize(tmp_path, blockSize):
+    filename, text = untidyFASTA(tmp_path / "genome.fna", "\r\n")
+    records = []
+    for header, piece in BioDNA.readFASTApieces(filename, blockSize):
+        assert (header is None) != (piece is None) and piece != ""
+        if (header is not None or not records):
+            records.append([header or "", ""])
+        if (piece is not None):
+            records[-1][1] += piece
+    assert [tuple(record) for record in records] == bruteForceRecords(text)
+#-------------------(end of test_readFASTApiecesInBlocksOfAnySize())-------
+
+#--------------------------------------------------------------------------
+@pytest.mark.parametrize("windowSize, overlap", [(100, 0), (100, 7), (8, 7), (5000, 3)])
+def test_readFASTAwindows(tmp_path, windowSize, overlap):
+    records = [("a", randomSequence(1234, 7, SYMBOLS)), ("b", ""), ("c", randomSequence(99, 8, SYMBOLS)),
+               ("d", randomSequence(7, 9, SYMBOLS))]
+    filename = writeFASTA(tmp_path / "genome.fna", records, 50)
+    expected = []
+    for header, sequence in records:
+        step = windowSize - overlap
+        starts = list(range(0, max(len(sequence) - overlap, 1), step)) if sequence else []
+        expected += [(header, start, sequence[start:start + windowSize]) for start in starts]
+    windows = list(BioDNA.readFASTAwindows(filename, windowSize, overlap))
+    assert windows == expected
+    # every base is in a window, and every window but the last of a record is whole
+    for header, sequence in records:
+        ofRecord = [(start, window) for name, start, window in windows if name == header]
+        assert "".join(window[overlap if index else 0:] for index, (start, window) in enumerate(ofRecord)) == sequence
+        assert all(len(window) == windowSize for start, window in ofRecord[:-1])
+
+    with pytest.raises(ValueError):
+        list(BioDNA.readFASTAwindows(filename, 4, 4))
+#-------------------(end of test_readFASTAwindows())-----------------------
+
+#--------------------------------------------------------------------------
+def test_getDNA(tmp_path, capsys):
+    filename, text = untidyFASTA(tmp_path / "genome.fna")
+    # every record, one after another, in lower case
+    assert BioDNA.getDNA(filename) == "".join(sequence for header, sequence in bruteForceRecords(text)).lower()
+    assert BioDNA.getDNA(str(tmp_path / "missing.fna")) == ""
+    assert "No file found in current directory named: " in capsys.readouterr().out
+#-------------------(end of test_getDNA())---------------------------------
+
+#--------------------------------------------------------------------------
+@pytest.mark.parametrize("newline", ["\n", "\r\n"])
+@pytest.mark.parametrize("blockSize", [1, 50, 1 << 20])
+def test_fastaRecordLengths(tmp_path, newline, blockSize):
+    filename, text = untidyFASTA(tmp_path / "genome.fna", newline)
+    expected = [(header.split()[0] if header.split() else "", len(sequence)) for header, sequence in bruteForceRecords(text)]
+    assert BioDNA.fastaRecordLengths(filename, blockSize) == expected
+    assert BioDNA.fastaLength(filename) == sum(length for name, length in expected)
+
+    # with an up-to-date index, the lengths are read from it
+    tidy = writeFASTA(tmp_path / "tidy.fna", [("a x", randomSequence(500, 10, SYMBOLS)), ("b", "ACGT")])
+    BioDNA.buildFastaIndex(tidy)
+    assert BioDNA.fastaRecordLengths(tidy, blockSize) == [("a", 500), ("b", 4)]
+#-------------------(end of test_fastaRecordLengths())---------------------
+
+#--------------------------------------------------------------------------
+def test_inputDirectoryLengthsParsesNoGenome(tmp_path, monkeypatch, capsys):
+    directory = tmp_path / "genomes"
+    directory.mkdir()
+    genomes = [writeFASTA(directory / "b.fna", [("b", randomSequence(700, 11, SYMBOLS))]),
+               writeFASTA(directory / "a.fna", [("a1", randomSequence(300, 12, SYMBOLS)), ("a2", "ACG")])]
+    (directory / "notes.txt").write_text("not a genome\n")
+    def parsed(*arguments): # (the lengths must come from the quick pass)
+        raise AssertionError("a genome was parsed")
+    monkeypatch.setattr(BioDNA, "readFASTA", parsed)
+    monkeypatch.setattr(BioDNA, "readFASTApieces", parsed)
+
+    assert BioDNA.inputDirectoryLengths(str(directory)) == [(genomes[1], 303), (genomes[0], 700)]
+    assert BioDNA.inputDirectoryLengths(genomes[0]) == [(genomes[0], 700)]
+    assert BioDNA.inputDirectoryLengths(str(tmp_path / "missing")) == []
+    (tmp_path / "empty").mkdir()
+    assert BioDNA.inputDirectoryLengths(str(tmp_path / "empty")) == []
+    printed = capsys.readouterr().out
+    assert "%s with DNA length: 303 bp." % genomes[1] in printed and "does not exist!" in printed
+    assert "The directory does not contain any FASTA formatted files!" in printed
+#-------------------(end of test_inputDirectoryLengthsParsesNoGenome())----
@@ -0,0 +1,130 @@
+"""Tests of the incremental re-analysis: breakIntoMotifs() with a
+ResultsManifest writes the same output as a full run after genomes are
+added, changed, touched, removed or moved, while only counting the genomes
+that are new or have changed; and morse_a5.py --incremental.
+"""
+
+import os, sys
+import shutil
+import subprocess
+
+import pytest
+
+import BioDNA
+from conftest import GENOMIC_SIGNATURE, randomSequence, writeFASTA
+
+# the options of the runs: (L-mer sizes, number of top rankings, other options of breakIntoMotifs())
+RUNS = [(4, 10, {}), ([3, 5], 7, {"workers": 2}), (6, 5, {"pipelineDepth": 0}),
+        ([2, 4], 8, {"canonical": True, "tidy": True})]
+
+#--------------------------------------------------------------------------
+def writeGenome(directory, name, seed, size=3000):
+    """ Writes a genome of two records into directory as name.fna. """
+    return writeFASTA(directory / (name + ".fna"), [(name + "_1", randomSequence(size, seed, "ACGTacgtN")),
+                                                    (name + "_2", randomSequence(size // 3, seed + 100))])
+#-------------------(end of writeGenome())---------------------------------
+
+#--------------------------------------------------------------------------
+def readText(filename):
+    """ Returns the text of a file. """
+    with open(filename) as INPUT:
+        return INPUT.read()
+#-------------------(end of readText())------------------------------------
+
+#--------------------------------------------------------------------------
+@pytest.fixture
+def countedFiles(monkeypatch):
+    """ The lists of files that breakIntoMotifs() has counted, one per run. """
+    calls = []
+    countFiles = BioDNA.countFiles
+    def countAndRecord(fileList, *arguments, **options):
+        calls.append(sorted(os.path.basename(nextFile) for nextFile in fileList))
+        return countFiles(fileList, *arguments, **options)
+    monkeypatch.setattr(BioDNA, "countFiles", countAndRecord)
+    return calls
+#-------------------(end of countedFiles())--------------------------------
+
+#--------------------------------------------------------------------------
+@pytest.mark.parametrize("LmerSize, numberOfTopRankings, options", RUNS)
+def test_incrementalOutputEqualsFullOutput(tmp_path, countedFiles, LmerSize, numberOfTopRankings, options):
+    directory = tmp_path / "genomes"
+    directory.mkdir()
+    for seed, name in enumerate(("alpha", "beta", "gamma", "delta")):
+        writeGenome(directory, name, seed)
+
+    def runBoth(): # an incremental run and a full one; gives back both outputs
+        sizes = [LmerSize] if isinstance(LmerSize, int) else LmerSize
+        manifest = BioDNA.ResultsManifest(str(tmp_path / "Results.csv"), sizes, numberOfTopRankings,
+                                          options.get("canonical", False))
+        BioDNA.breakIntoMotifs(str(directory), LmerSize, numberOfTopRankings,
+                               outputFilename=str(tmp_path / "Results.csv"), manifest=manifest, **options)
+        BioDNA.breakIntoMotifs(str(directory), LmerSize, numberOfTopRankings,
+                               outputFilename=str(tmp_path / "Full.csv"), **options)
+        return readText(tmp_path / "Results.csv"), readText(tmp_path / "Full.csv")
+
+    incremental, full = runBoth() # the first run counts every genome
+    assert incremental == full
+    assert countedFiles[-2] == ["alpha.fna", "beta.fna", "delta.fna", "gamma.fna"]
+
+    incremental, full = runBoth() # nothing has changed
+    assert incremental == full and countedFiles[-2] == []
+
+    # beta changes, gamma is only touched, delta goes and epsilon comes
+    writeGenome(directory, "beta", 10)
+    os.utime(directory / "gamma.fna", (os.path.getmtime(directory / "gamma.fna") + 100,) * 2)
+    os.remove(directory / "delta.fna")
+    writeGenome(directory, "epsilon", 11, 1000)
+    incremental, full = runBoth()
+    assert incremental == full
+    assert countedFiles[-2] == ["beta.fna", "epsilon.fna"]
+    assert "delta.fna" not in incremental
+
+    # a change of size is always seen, even with the same modification time
+    modified = os.path.getmtime(directory / "alpha.fna")
+    writeGenome(directory, "alpha", 12, 2000)
+    os.utime(directory / "alpha.fna", (modified, modified))
+    incremental, full = runBoth()
+    assert incremental == full and countedFiles[-2] == ["alpha.fna"]
+#-------------------(end of test_incrementalOutputEqualsFullOutput())------
+
+#--------------------------------------------------------------------------
+def test_otherParametersCountEveryGenome(tmp_path, countedFiles):
+    directory = tmp_path / "genomes"
+    directory.mkdir()
+    writeGenome(directory, "alpha", 1)
+    writeGenome(directory, "beta", 2)
+    outputFilename = str(tmp_path / "Results.csv")
+    for numberOfTopRankings in (5, 5, 6):
+        BioDNA.breakIntoMotifs(str(directory), 4, numberOfTopRankings, outputFilename=outputFilename,
+                               manifest=BioDNA.ResultsManifest(outputFilename, [4], numberOfTopRankings))
+    assert countedFiles == [["alpha.fna", "beta.fna"], [], ["alpha.fna", "beta.fna"]]
+#-------------------(end of test_otherParametersCountEveryGenome())--------
+
+#--------------------------------------------------------------------------
+def test_morse_a5_incremental(tmp_path):
+    project = tmp_path / "project"
+    directory = project / "genomes"
+    directory.mkdir(parents=True)
+    for seed, name in enumerate(("alpha", "beta", "gamma")):
+        writeGenome(directory, name, seed)
+    program = os.path.join(GENOMIC_SIGNATURE, "morse_a5.py")
+
+    def run(*arguments): # runs morse_a5.py from the project directory, gives back its output file
+        completed = subprocess.run([sys.executable, program, "-l", "3,5", "-n", "6", "genomes"] + list(arguments),
+                                   cwd=project, capture_output=True, text=True, check=True)
+        return completed.stdout, readText(project / arguments[-1])
+
+    run("--incremental", "-o", "Results.csv")
+    writeGenome(directory, "beta", 7)
+    messages, incremental = run("--incremental", "-o", "Results.csv")
+    assert "1 of 3 files are new or have changed" in messages
+    assert incremental == run("-o", "Full.csv")[1]
+
+    # the genomes and the output moved together are still known to the manifest
+    moved = tmp_path / "moved"
+    shutil.copytree(project, moved)
+    project = moved
+    messages, incremental = run("--incremental", "-o", "Results.csv")
+    assert "0 of 3 files are new or have changed" in messages
+    assert incremental == run("-o", "Full.csv")[1]
+#-------------------(end of test_morse_a5_incremental())-------------------
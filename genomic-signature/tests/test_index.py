@@ -0,0 +1,86 @@
+"""Tests of the FASTA index: buildFastaIndex() against the samtools .fai lines
+worked out from how the file was written, loadFastaIndex() reading them back,
+and fetch() / fetchRegion() against slices of the whole records.
+"""
+
+import os
+
+import pytest
+
+import BioDNA
+from conftest import randomSequence
+
+RECORDS = [("chrI first record", randomSequence(1000, 1, "ACGTacgtN")), ("chrII", randomSequence(61, 2)),
+           ("chrIII", randomSequence(60, 3)), ("empty", ""), ("chrIV", randomSequence(2345, 4))]
+
+#--------------------------------------------------------------------------
+def writeIndexedFASTA(filename, lineWidth, newline):
+    """ Writes RECORDS to a FASTA file lineWidth bases to a line, and returns
+    the .fai lines samtools would write for it. """
+    lines = []
+    with open(filename, "wb") as OUTPUT:
+        for header, sequence in RECORDS:
+            OUTPUT.write((">%s%s" % (header, newline)).encode("ascii"))
+            lines.append("%s\t%i\t%i\t%i\t%i\n" % (header.split()[0], len(sequence), OUTPUT.tell(),
+                                                  min(lineWidth, len(sequence)) if sequence else 0,
+                                                  min(lineWidth, len(sequence)) + len(newline) if sequence else 0))
+            for start in range(0, len(sequence), lineWidth):
+                OUTPUT.write((sequence[start:start + lineWidth] + newline).encode("ascii"))
+    return lines
+#-------------------(end of writeIndexedFASTA())---------------------------
+
+#--------------------------------------------------------------------------
+@pytest.mark.parametrize("lineWidth, newline", [(60, "\n"), (70, "\r\n"), (1, "\n")])
+def test_indexRoundTrip(tmp_path, lineWidth, newline):
+    filename = str(tmp_path / "genome.fna")
+    lines = writeIndexedFASTA(filename, lineWidth, newline)
+    index = BioDNA.buildFastaIndex(filename)
+    with open(filename + ".fai") as INPUT:
+        assert INPUT.readlines() == lines
+    assert list(index) == [header.split()[0] for header, sequence in RECORDS]
+    assert BioDNA.isIndexCurrent(filename)
+    assert BioDNA.loadFastaIndex(filename) == index
+
+    for header, sequence in RECORDS:
+        name = header.split()[0]
+        for start in list(range(0, len(sequence) + 3, 53)) + [len(sequence) - 1]:
+            for end in (start, start + 1, start + lineWidth, start + 3 * lineWidth + 7, None):
+                assert BioDNA.fetch(filename, name, start, end, index) == sequence[start:end]
+    assert BioDNA.fetch(filename) == RECORDS[0][1]
+    with pytest.raises(KeyError):
+        BioDNA.fetch(filename, "chrV")
+#-------------------(end of test_indexRoundTrip())-------------------------
+
+#--------------------------------------------------------------------------
+def test_indexBuiltAgainWhenTheFileChanges(tmp_path):
+    filename = str(tmp_path / "genome.fna")
+    writeIndexedFASTA(filename, 60, "\n")
+    BioDNA.loadFastaIndex(filename)
+    with open(filename, "a") as OUTPUT:
+        OUTPUT.write(">chrV\nACGTTGCA\n")
+    os.utime(filename, (os.path.getmtime(filename + ".fai") + 10,) * 2)
+    assert not BioDNA.isIndexCurrent(filename)
+    assert BioDNA.fetch(filename, "chrV", 2, 6) == "GTTG"
+#-------------------(end of test_indexBuiltAgainWhenTheFileChanges())------
+
+#--------------------------------------------------------------------------
+def test_fetchRegion(tmp_path):
+    filename = str(tmp_path / "genome.fna")
+    writeIndexedFASTA(filename, 60, "\n")
+    sequence = RECORDS[4][1]
+    assert BioDNA.parseRegion("chrIV:1,001-2,000") == ("chrIV", 1000, 2000)
+    assert BioDNA.parseRegion("HLA:A*01") == ("HLA:A*01", 0, None)
+    assert BioDNA.fetchRegion(filename, "chrIV:11-20") == sequence[10:20]
+    assert BioDNA.fetchRegion(filename, "chrIV:2000") == sequence[1999:]
+    assert BioDNA.fetchRegion(filename, "chrII") == RECORDS[1][1]
+    assert BioDNA.fetchRegion(filename, "chrIV:101-300", packed=True) == sequence[100:300].upper()
+#-------------------(end of test_fetchRegion())----------------------------
+
+#--------------------------------------------------------------------------
+def test_linesOfDifferentLengths(tmp_path):
+    filename = str(tmp_path / "ragged.fna")
+    with open(filename, "w") as OUTPUT:
+        OUTPUT.write(">a\nACGT\nAC\nACGT\n")
+    with pytest.raises(ValueError):
+        BioDNA.buildFastaIndex(filename)
+#-------------------(end of test_linesOfDifferentLengths())----------------
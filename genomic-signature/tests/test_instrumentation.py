@@ -0,0 +1,99 @@
+"""Tests of the instrumentation of the stages: off unless a program turns it on,
+the per-file, per-stage breakdown of a run of breakIntoMotifs() (calls, bases
+and bytes read, against the genomes) with the same output as without it, the
+cProfile statistics and tracemalloc peak of a chosen stage, and morse_a5.py
+--instrument.
+"""
+
+import os, sys
+import json
+import pstats
+import subprocess
+import tracemalloc
+
+import pytest
+
+import BioDNA
+from conftest import GENOMIC_SIGNATURE, PROGRAM_ENVIRONMENT, randomSequence, writeFASTA
+
+SYMBOLS = "ACGT" * 6 + "acgt" * 2 + "N"
+
+#--------------------------------------------------------------------------
+@pytest.fixture
+def genomes(tmp_path):
+    """ Two genomes in a directory; gives back their file names. """
+    directory = tmp_path / "genomes"
+    directory.mkdir()
+    return [writeFASTA(directory / "alpha.fna", [("a1", randomSequence(3000, 1, SYMBOLS)), ("a2", randomSequence(500, 2, SYMBOLS))]),
+            writeFASTA(directory / "beta.fna", [("b1", randomSequence(1200, 3, SYMBOLS))])]
+#-------------------(end of genomes())-------------------------------------
+
+#--------------------------------------------------------------------------
+def readText(filename):
+    """ Returns the text of a file. """
+    with open(filename) as INPUT:
+        return INPUT.read()
+#-------------------(end of readText())------------------------------------
+
+#--------------------------------------------------------------------------
+def test_offByDefault(tmp_path):
+    completed = subprocess.run([sys.executable, "-c", "import BioDNA; print(BioDNA.INSTRUMENTATION is None)"],
+                               cwd=GENOMIC_SIGNATURE, capture_output=True, text=True, check=True, env=PROGRAM_ENVIRONMENT)
+    assert completed.stdout == "True\n"
+    assert BioDNA.INSTRUMENTATION is None
+    with BioDNA.InstrumentedStage("count", 100) as stage: # (nothing is timed)
+        pass
+    assert not stage.started
+    windows = iter([(0, "ACGT", 4)])
+    assert BioDNA.instrumentedReads(str(tmp_path / "any.fna"), windows) is windows
+#-------------------(end of test_offByDefault())---------------------------
+
+#--------------------------------------------------------------------------
+def test_stagesOfEachFile(tmp_path, genomes, monkeypatch):
+    BioDNA.breakIntoMotifs(str(tmp_path / "genomes"), [3, 6], 5, outputFilename=str(tmp_path / "plain.csv"))
+    instrumentation = BioDNA.Instrumentation(str(tmp_path / "stages.json"), profileStage="count", traceStage="rank")
+    monkeypatch.setattr(BioDNA, "INSTRUMENTATION", instrumentation)
+    monkeypatch.setattr(BioDNA, "PIPELINE_DEPTH", 0) # (cProfile only sees its own thread)
+    try:
+        BioDNA.breakIntoMotifs(str(tmp_path / "genomes"), [3, 6], 5, outputFilename=str(tmp_path / "timed.csv"))
+        instrumentation.write()
+    finally:
+        tracemalloc.stop()
+    assert readText(tmp_path / "timed.csv") == readText(tmp_path / "plain.csv")
+
+    report = json.loads(readText(tmp_path / "stages.json"))
+    stages = {entry["file"]: entry["stages"] for entry in report["files"]}
+    assert set(stages) == set(genomes)
+    for nextFile, length in zip(genomes, (3500, 1200)):
+        assert {"read", "count", "rank", "write"} <= set(stages[nextFile])
+        assert stages[nextFile]["read"]["bases"] == length
+        assert stages[nextFile]["read"]["bytes"] == os.path.getsize(nextFile)
+        assert stages[nextFile]["rank"]["calls"] == 1
+        for record in stages[nextFile].values():
+            assert record["calls"] > 0 and record["seconds"] >= 0 and record["peakRSS"] > 0
+    for stage, total in report["totals"].items():
+        assert total["calls"] == sum(stages[nextFile][stage]["calls"] for nextFile in genomes if stage in stages[nextFile])
+        assert total["bases"] == sum(stages[nextFile][stage]["bases"] for nextFile in genomes if stage in stages[nextFile])
+
+    # the chosen stages under cProfile and tracemalloc
+    assert report["profile"] == {"stage": "count", "file": str(tmp_path / "stages.json.count.prof")}
+    profiled = {function for filename, line, function in pstats.Stats(report["profile"]["file"]).stats}
+    assert "addCodes" in profiled # (the counting itself, not the stages around it)
+    assert not profiled & {"topRanked", "readFASTApieces", "kmerChunks"}
+    assert report["tracemalloc"]["stage"] == "rank" and report["tracemalloc"]["peakBytes"] > 0
+    assert report["tracemalloc"]["top"]
+#-------------------(end of test_stagesOfEachFile())-----------------------
+
+#--------------------------------------------------------------------------
+def test_morse_a5_instrument(tmp_path, genomes):
+    program = os.path.join(GENOMIC_SIGNATURE, "morse_a5.py")
+    subprocess.run([sys.executable, program, "-l", "4", "-o", str(tmp_path / "Results.csv"), "--instrument",
+                    str(tmp_path / "stages.json"), "--profile-stage", "rank", str(tmp_path / "genomes")],
+                   stdin=subprocess.DEVNULL, capture_output=True, text=True, check=True, env=PROGRAM_ENVIRONMENT)
+    report = json.loads(readText(tmp_path / "stages.json"))
+    assert sorted(entry["file"] for entry in report["files"]) == sorted(genomes)
+    assert report["totals"]["read"]["bases"] == 3500 + 1200
+    assert os.path.isfile(str(tmp_path / "stages.json.rank.prof"))
+    BioDNA.breakIntoMotifs(str(tmp_path / "genomes"), 4, 10, outputFilename=str(tmp_path / "expected.csv"))
+    assert readText(tmp_path / "Results.csv") == readText(tmp_path / "expected.csv")
+#-------------------(end of test_morse_a5_instrument())--------------------
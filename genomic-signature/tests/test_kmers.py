@@ -0,0 +1,112 @@
+"""Tests of the L-mer counting engine: countKmers(), countKmerSizes(),
+countFASTAkmerSizes() and KmerTable.topRanked() against a Counter of every
+L-mer ranked with most_common(), the way breakIntoMotifs() first ranked them,
+with and without NumPy.
+"""
+
+from collections import Counter
+
+import pytest
+
+import BioDNA
+from conftest import randomSequence, writeFASTA
+
+# upper and lower case, N's and a few other IUPAC codes
+SYMBOLS = "ACGT" * 6 + "acgt" * 3 + "NNRY"
+
+#--------------------------------------------------------------------------
+def bruteForceCounts(sequences, LmerSize):
+    """ Returns a Counter of every upper-case L-mer of each sequence in turn
+    (so that equal counts keep the order the L-mers were first seen in). """
+    counts = Counter()
+    for sequence in sequences:
+        sequence = sequence.upper()
+        counts.update(sequence[i:i + LmerSize] for i in range(len(sequence) - LmerSize + 1))
+    return counts
+#-------------------(end of bruteForceCounts())----------------------------
+
+#--------------------------------------------------------------------------
+@pytest.mark.parametrize("LmerSize", [1, 2, 4, 6, 8, BioDNA.DENSE_LMER_LIMIT + 1])
+def test_rankingMatchesCounter(LmerSize):
+    sequence = randomSequence(5000, LmerSize, SYMBOLS)
+    counts = bruteForceCounts([sequence], LmerSize)
+    table = BioDNA.countKmers(sequence, LmerSize)
+
+    assert table.total == len(sequence) - LmerSize + 1
+    assert table.topRanked(len(counts)) == counts.most_common()
+    for numberOfTopRankings in (0, 1, 5, 50): # (cut through L-mers of the same count)
+        assert table.topRanked(numberOfTopRankings) == counts.most_common(numberOfTopRankings)
+    for motif in list(counts)[:20] + ["ACGTACGTACGTA"[:LmerSize]]:
+        assert table.count(motif.lower()) == counts[motif]
+#-------------------(end of test_rankingMatchesCounter())------------------
+
+#--------------------------------------------------------------------------
+def test_severalSizesInOnePass():
+    sequence = randomSequence(3000, 7, SYMBOLS)
+    tables = BioDNA.countKmerSizes(sequence, [2, 5, 8])
+    for LmerSize, table in tables.items():
+        assert table.topRanked(10 ** 6) == BioDNA.countKmers(sequence, LmerSize).topRanked(10 ** 6)
+#-------------------(end of test_severalSizesInOnePass())------------------
+
+#--------------------------------------------------------------------------
+def test_overlappingChunksCountEveryLmerOnce():
+    sequence = randomSequence(4000, 11, SYMBOLS)
+    LmerSize, chunkSize = 6, 700
+    tables = {}
+    for start in range(0, len(sequence), chunkSize): # chunks overlapping by L-1 bases
+        chunk = sequence[start:start + chunkSize + LmerSize - 1]
+        BioDNA.countKmerSizes(chunk, [LmerSize], start, tables, starts=min(chunkSize, len(chunk) - LmerSize + 1))
+    assert tables[LmerSize].topRanked(10 ** 6) == bruteForceCounts([sequence], LmerSize).most_common()
+#-------------------(end of test_overlappingChunksCountEveryLmerOnce())----
+
+#--------------------------------------------------------------------------
+@pytest.mark.parametrize("windowSize", [64, 1 << 22])
+def test_fileCountsEachRecord(tmp_path, windowSize):
+    records = [("record%i description" % i, randomSequence(900 + 50 * i, i, SYMBOLS)) for i in range(4)]
+    filename = writeFASTA(tmp_path / "genome.fna", records)
+    for LmerSize in (3, 7):
+        counts = bruteForceCounts([sequence for header, sequence in records], LmerSize)
+        tables = BioDNA.countFASTAkmerSizes(filename, [LmerSize], windowSize)
+        assert tables[LmerSize].total == sum(counts.values())
+        assert tables[LmerSize].topRanked(10 ** 6) == counts.most_common()
+#-------------------(end of test_fileCountsEachRecord())-------------------
+
+#--------------------------------------------------------------------------
+def test_breakIntoMotifsWritesTheBaselineOutput(tmp_path):
+    # the output of the original breakIntoMotifs(), built from the brute force counts
+    directory = tmp_path / "genomes"
+    directory.mkdir()
+    filenames = [writeFASTA(directory / ("genome%i.fna" % i), [("genome%i" % i, randomSequence(2000, i, "ACGTacgt"))])
+                 for i in range(3)]
+    LmerSize, numberOfTopRankings = 4, 12
+    expected = []
+    for filename in sorted(filenames):
+        sequence = BioDNA.getDNA(filename)
+        numberOfmotifs = len(sequence) - (LmerSize - 1)
+        expected.append("FILE: %s\nNumber of motifs: %i\nRank:,Motif:,Frequency:,Proportion:\n" % (filename, numberOfmotifs))
+        for rank, (motif, count) in enumerate(bruteForceCounts([sequence], LmerSize).most_common(numberOfTopRankings), 1):
+            expected.append("%i,%s,%i,%f\n" % (rank, motif, count, count / numberOfmotifs))
+        expected.append("\n")
+
+    outputFilename = str(tmp_path / "Results.csv")
+    BioDNA.breakIntoMotifs(str(directory), LmerSize, numberOfTopRankings, outputFilename=outputFilename)
+    with open(outputFilename) as INPUT:
+        assert INPUT.read() == "".join(expected)
+#-------------------(end of test_breakIntoMotifsWritesTheBaselineOutput())-
+
+#--------------------------------------------------------------------------
+def test_sameRankingsWithoutNumPy(tmp_path, withoutNumPy):
+    filename = writeFASTA(tmp_path / "genome.fna", [("a", randomSequence(3000, 1, SYMBOLS)),
+                                                      ("b", randomSequence(2000, 2, SYMBOLS))])
+    source = ("import json, BioDNA\n"
+              "sequence = randomSequence(4000, 3, %r)\n"
+              "print(json.dumps([BioDNA.np is None] +\n"
+              "                 [BioDNA.countKmers(sequence, L).topRanked(100) for L in (1, 4, 8, 11)] +\n"
+              "                 [BioDNA.countFASTAkmerSizes(%r, [3, 6], 256)[L].topRanked(100) for L in (3, 6)]))\n"
+              % (SYMBOLS, filename))
+    sequence = randomSequence(4000, 3, SYMBOLS)
+    expected = ([True] + [[list(pair) for pair in BioDNA.countKmers(sequence, L).topRanked(100)] for L in (1, 4, 8, 11)] +
+                [[list(pair) for pair in BioDNA.countFASTAkmerSizes(filename, [3, 6], 256)[L].topRanked(100)]
+                 for L in (3, 6)])
+    assert withoutNumPy(source) == expected
+#-------------------(end of test_sameRankingsWithoutNumPy())---------------
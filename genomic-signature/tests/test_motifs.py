@@ -0,0 +1,120 @@
+"""Tests of the IUPAC motif scanner: MotifScanner.scan() against a comparison
+of every plain motif at every position of both strands, the NumPy lookup of
+the motifs against the Aho-Corasick automaton (and without NumPy), the
+automaton built only when walked, the limit on the expansion of IUPAC motifs,
+and scanMotifs() of FASTA files, headerless ones too.
+"""
+
+import random
+
+import pytest
+
+import BioDNA
+from conftest import randomSequence, writeFASTA
+
+SYMBOLS = "ACGT" * 8 + "acgt" * 4 + "N"
+MOTIFS = {"TATA-box": "TATAWAWR", "CAAT-box": "GGCCAATCT", "GC-box": "GGGCGG", "short": "CG",
+          "palindrome": "GAATTC", "ambiguous": "ANNT"}
+LONG_MOTIFS = {"long": "TATAWAWRNNNGCS", "GC-box": "GGGCGG"} # (longer than DENSE_LMER_LIMIT)
+
+#--------------------------------------------------------------------------
+def bruteForceHits(sequence, motifs, record=""):
+    """ Returns the set of MotifHits of a sequence, from a comparison of every
+    plain motif each motif stands for with every position of both strands. """
+    upper = sequence.upper()
+    hits = set()
+    for name, motif in motifs.items():
+        for plain in BioDNA.expandIUPAC(motif):
+            for strand, site in (("+", plain), ("-", plain.translate(BioDNA.IUPAC_COMPLEMENT)[::-1])):
+                for start in range(len(sequence) - len(plain) + 1):
+                    if (upper[start:start + len(plain)] == site):
+                        found = sequence[start:start + len(plain)]
+                        if (strand == "-"):
+                            found = found.translate(BioDNA.IUPAC_COMPLEMENT)[::-1]
+                        hits.add(BioDNA.MotifHit(record, name, strand, start, start + len(plain), found))
+    return hits
+#-------------------(end of bruteForceHits())------------------------------
+
+#--------------------------------------------------------------------------
+def automatonHits(motifs, sequence, **options):
+    """ Returns the hits of a MotifScanner made to walk its automaton. """
+    scanner = BioDNA.MotifScanner(motifs)
+    scanner.codeHits = scanner.prefixHits = None
+    return list(scanner.scan(sequence, **options))
+#-------------------(end of automatonHits())-------------------------------
+
+#--------------------------------------------------------------------------
+@pytest.mark.parametrize("motifs", [MOTIFS, LONG_MOTIFS, {"one base": "A"}])
+def test_scanMatchesEveryPosition(motifs):
+    sequence = randomSequence(4000, len(motifs), SYMBOLS) + "TATAAATAGGGCGGAATTC"
+    hits = list(BioDNA.MotifScanner(motifs).scan(sequence, "chr", 0))
+    assert hits and set(hits) == bruteForceHits(sequence, motifs, "chr")
+    assert len(hits) == len(set(hits))
+    # by end, then longest first
+    assert [(hit.end, hit.start) for hit in hits] == sorted((hit.end, hit.start) for hit in hits)
+    # the NumPy lookup gives back the same hits as the automaton, in the same order
+    assert hits == automatonHits(motifs, sequence, record="chr")
+#-------------------(end of test_scanMatchesEveryPosition())---------------
+
+#--------------------------------------------------------------------------
+def test_scanPieces():
+    sequence = randomSequence(6000, 1, SYMBOLS)
+    generator = random.Random(2)
+    cuts = sorted(generator.sample(range(1, len(sequence)), 300))
+    pieces = [sequence[start:end] for start, end in zip([0] + cuts, cuts + [len(sequence)])]
+    scanner = BioDNA.MotifScanner(MOTIFS)
+    expected = list(scanner.scan(sequence, "chr", 1000))
+    assert list(scanner.scan(iter(pieces), "chr", 1000)) == expected
+    assert list(scanner.scan([piece.encode("ascii") for piece in pieces], "chr", 1000)) == expected
+    assert automatonHits(MOTIFS, iter(pieces), record="chr", offset=1000) == expected
+#-------------------(end of test_scanPieces())-----------------------------
+
+#--------------------------------------------------------------------------
+def test_scanMotifs(tmp_path):
+    records = [(None, randomSequence(700, 3, SYMBOLS)), ("chrA description", randomSequence(1500, 4, SYMBOLS)),
+               ("chrB", ""), ("chrC", randomSequence(900, 5, SYMBOLS))]
+    filename = writeFASTA(tmp_path / "genome.fna", records, 50)
+    expected = []
+    for header, sequence in records:
+        expected += BioDNA.MotifScanner(MOTIFS).scan(sequence, header.split()[0] if header else "")
+    hits = list(BioDNA.scanMotifs(filename, MOTIFS))
+    assert hits == expected
+    assert {hit.record for hit in hits} == {"", "chrA", "chrC"}
+
+    # a file without any header is one record without a name
+    headerless = writeFASTA(tmp_path / "headerless.fna", [(None, records[1][1])], 50)
+    assert list(BioDNA.scanMotifs(headerless, MOTIFS)) == list(BioDNA.MotifScanner(MOTIFS).scan(records[1][1]))
+#-------------------(end of test_scanMotifs())-----------------------------
+
+#--------------------------------------------------------------------------
+def test_sameHitsWithoutNumPy(tmp_path, withoutNumPy):
+    filename = writeFASTA(tmp_path / "genome.fna", [(None, randomSequence(800, 6, SYMBOLS)),
+                                                      ("chrA", randomSequence(3000, 7, SYMBOLS))])
+    source = ("import json, BioDNA\n"
+              "print(json.dumps([BioDNA.np is None] + list(BioDNA.scanMotifs(%r, %r))))\n" % (filename, MOTIFS))
+    assert withoutNumPy(source) == [True] + [list(hit) for hit in BioDNA.scanMotifs(filename, MOTIFS)]
+#-------------------(end of test_sameHitsWithoutNumPy())-------------------
+
+#--------------------------------------------------------------------------
+def test_automatonBuiltWhenWalked():
+    pytest.importorskip("numpy")
+    sequence = randomSequence(2000, 8, SYMBOLS)
+    scanner = BioDNA.MotifScanner(MOTIFS)
+    hits = list(scanner.scan(sequence))
+    assert scanner.transitions is None and scanner.outputs is None # (the NumPy lookup needs no automaton)
+    scanner.codeHits = scanner.prefixHits = None
+    assert list(scanner.scan(sequence)) == hits
+    assert scanner.transitions is not None
+#-------------------(end of test_automatonBuiltWhenWalked())---------------
+
+#--------------------------------------------------------------------------
+def test_IUPACexpansionLimit():
+    assert len(BioDNA.expandIUPAC("N" * 8)) == BioDNA.IUPAC_EXPANSION_LIMIT
+    assert len(BioDNA.expandIUPAC("RYN", limit=16)) == 16
+    with pytest.raises(ValueError, match="NNNNNNNNN stands for 262144 motifs"):
+        BioDNA.MotifScanner({"too many": "NNNNNNNNN"})
+    with pytest.raises(ValueError):
+        BioDNA.expandIUPAC("RYNN", limit=16)
+    with pytest.raises(ValueError, match="X is not an IUPAC symbol"):
+        BioDNA.expandIUPAC("TATAX")
+#-------------------(end of test_IUPACexpansionLimit())--------------------
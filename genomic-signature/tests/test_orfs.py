@@ -0,0 +1,83 @@
+"""Tests of the open reading frame finder: findORFs() against a walk over the
+codons of each of the six frames, with and without NumPy, the ORFs that run
+off the end of the sequence, and scanORFs() of a FASTA file.
+"""
+
+import pytest
+
+import BioDNA
+from conftest import randomSequence, writeFASTA
+
+SYMBOLS = "ACGT" * 6 + "acgt" * 2 + "N"
+COMPLEMENT = str.maketrans("ACGTN", "TGCAN")
+
+#--------------------------------------------------------------------------
+def bruteForceORFs(sequence, minLength, startCodons=("ATG",), record="", partial=False):
+    """ Returns the ORF records of a sequence, found codon by codon on each
+    frame of both strands and sorted by (start, end, strand). """
+    upper = sequence.upper()
+    ORFs = []
+    for strand, bases in (("+", upper), ("-", upper.translate(COMPLEMENT)[::-1])):
+        for frame in range(3):
+            codons = [bases[start:start + 3] for start in range(frame, len(bases) - 2, 3)]
+            openStart = None
+            for number, codon in enumerate(codons + [None]): # (None for the end of the frame)
+                if (codon in BioDNA.STOP_CODONS or (codon is None and partial)):
+                    if (openStart is not None and number - openStart >= minLength):
+                        start, end = frame + 3 * openStart, frame + 3 * number + (3 if codon else 0)
+                        if (strand == "-"):
+                            start, end = len(bases) - end, len(bases) - start
+                        ORFs.append(BioDNA.ORF(record, strand, frame, start, end, number - openStart,
+                                               codons[openStart], codon or ""))
+                    openStart = None
+                elif (openStart is None and codon in startCodons):
+                    openStart = number
+    return sorted(ORFs, key=lambda orf: (orf.start, orf.end, orf.strand))
+#-------------------(end of bruteForceORFs())------------------------------
+
+#--------------------------------------------------------------------------
+@pytest.mark.parametrize("length", [0, 5, 1000, 20000, 20001, 20002])
+@pytest.mark.parametrize("minLength, startCodons", [(0, ("ATG",)), (30, ("ATG",)), (20, ("ATG", "GTG", "TTG"))])
+@pytest.mark.parametrize("partial", [False, True])
+def test_findORFs(length, minLength, startCodons, partial):
+    sequence = randomSequence(length, length + minLength, SYMBOLS)
+    expected = bruteForceORFs(sequence, minLength, startCodons, "chr", partial)
+    assert list(BioDNA.findORFs(sequence, minLength, startCodons, "chr", partial)) == expected
+    assert list(BioDNA.findORFs(sequence.encode("ascii"), minLength, startCodons, "chr", partial)) == expected
+#-------------------(end of test_findORFs())-------------------------------
+
+#--------------------------------------------------------------------------
+def test_ORFsThatRunOffTheEnd():
+    # a Met-to-stop ORF on the forward strand, and one on each strand without a stop
+    sequence = "CCC" + "ATG" + "GCC" * 10 + "TAA" + "ATG" + "GCC" * 5 + "GG"
+    assert [(orf.strand, orf.start, orf.end, orf.length, orf.stopCodon)
+            for orf in BioDNA.findORFs(sequence, 3)] == [("+", 3, 39, 11, "TAA")]
+    assert [(orf.strand, orf.start, orf.end, orf.length, orf.stopCodon)
+            for orf in BioDNA.findORFs(sequence, 3, partial=True)] == [("+", 3, 39, 11, "TAA"),
+                                                                         ("+", 39, 57, 6, "")]
+    reverse = sequence.translate(COMPLEMENT)[::-1]
+    ORFs = list(BioDNA.findORFs(reverse, 3, partial=True))
+    assert [(orf.strand, orf.start, orf.end, orf.length, orf.stopCodon) for orf in ORFs] == \
+           [("-", 2, 20, 6, ""), ("-", 20, 56, 11, "TAA")]
+    assert [orf.startCodon for orf in ORFs] == ["ATG", "ATG"]
+#-------------------(end of test_ORFsThatRunOffTheEnd())-------------------
+
+#--------------------------------------------------------------------------
+def test_sameORFsWithoutNumPy(withoutNumPy):
+    source = ("import json, BioDNA\n"
+              "ORFs = BioDNA.findORFs(randomSequence(30000, 1, %r), 25, partial=True)\n"
+              "print(json.dumps([BioDNA.np is None] + [list(orf) for orf in ORFs]))\n" % SYMBOLS)
+    expected = BioDNA.findORFs(randomSequence(30000, 1, SYMBOLS), 25, partial=True)
+    assert withoutNumPy(source) == [True] + [list(orf) for orf in expected]
+#-------------------(end of test_sameORFsWithoutNumPy())-------------------
+
+#--------------------------------------------------------------------------
+def test_scanORFs(tmp_path):
+    records = [("chrA description", randomSequence(9000, 2, SYMBOLS)), ("chrB", ""),
+               ("chrC", randomSequence(5000, 3, SYMBOLS))]
+    filename = writeFASTA(tmp_path / "genome.fna", records)
+    expected = []
+    for header, sequence in records:
+        expected += bruteForceORFs(sequence, 40, record=header.split()[0], partial=True)
+    assert list(BioDNA.scanORFs(filename, 40, partial=True)) == expected
+#-------------------(end of test_scanORFs())-------------------------------
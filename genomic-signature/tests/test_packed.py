@@ -0,0 +1,118 @@
+"""Tests of the packed 2-bit sequence store: packFASTA(), openPacked() and
+PackedSequence against slices of the record it was packed from, and the
+analyses that take a PackedSequence against the same analyses of the string.
+"""
+
+import os
+
+import pytest
+
+import BioDNA
+import DNAcomposition
+from conftest import randomSequence, writeFASTA
+
+#--------------------------------------------------------------------------
+def recordWithRuns(length, seed):
+    """ Returns a random record in both cases with runs of N's and of other
+    IUPAC codes in it, at its start and end too. """
+    sequence = list(randomSequence(length, seed, "ACGTacgt"))
+    for start, run in ((0, "NNN"), (97, "N" * 40), (500, "R"), (501, "YY"), (length - 5, "nnnnn")):
+        sequence[start:start + len(run)] = run
+    return "".join(sequence)
+#-------------------(end of recordWithRuns())------------------------------
+
+#--------------------------------------------------------------------------
+@pytest.fixture
+def genome(tmp_path):
+    """ A FASTA file of three records and the records, upper-cased. """
+    records = [("chrA first", recordWithRuns(1003, 1)), ("chrB", recordWithRuns(2000, 2)), ("chrC", "ACGT")]
+    return writeFASTA(tmp_path / "genome.fna", records, 70), [(header.split()[0], sequence.upper())
+                                                               for header, sequence in records]
+#-------------------(end of genome())--------------------------------------
+
+#--------------------------------------------------------------------------
+def test_roundTrip(genome):
+    filename, records = genome
+    for name, sequence in records:
+        with BioDNA.openPacked(filename, name) as packed:
+            assert packed.name == name
+            assert len(packed) == len(sequence)
+            assert str(packed) == sequence
+            assert packed.reverseComplement(10, 300) == sequence[10:300].translate(BioDNA.IUPAC_COMPLEMENT)[::-1]
+            for start in range(0, len(sequence), 37):
+                for end in (start, start + 1, start + 5, start + 131, len(sequence) + 10):
+                    assert packed[start:end] == sequence[start:end]
+            assert packed[-1] == sequence[-1] and packed[3] == sequence[3]
+            assert packed[::7] == sequence[::7] and packed[len(sequence) // 2:5:-3] == sequence[len(sequence) // 2:5:-3]
+            with pytest.raises(IndexError):
+                packed[len(sequence)]
+#-------------------(end of test_roundTrip())------------------------------
+
+#--------------------------------------------------------------------------
+def test_firstRecordAndChunks(genome):
+    filename, records = genome
+    name, sequence = records[0]
+    with BioDNA.openPacked(filename) as packed:
+        assert packed.name == name and str(packed) == sequence
+        chunks = list(packed.chunks(256, 16))
+        assert [start for start, bases in chunks] == list(range(0, len(sequence) - 16, 240))
+        assert all(bases == sequence[start:start + 256] for start, bases in chunks)
+        with pytest.raises(ValueError):
+            next(packed.chunks(16, 16))
+#-------------------(end of test_firstRecordAndChunks())-------------------
+
+#--------------------------------------------------------------------------
+def test_packedAgainWhenTheFileChanges(tmp_path):
+    filename = writeFASTA(tmp_path / "genome.fna", [("a", "ACGTACGTAC")])
+    with BioDNA.openPacked(filename) as packed:
+        assert str(packed) == "ACGTACGTAC"
+    writeFASTA(filename, [("a", "TTTTGGGG")])
+    os.utime(filename, (os.path.getmtime(filename) + 10,) * 2)
+    with BioDNA.openPacked(filename) as packed:
+        assert str(packed) == "TTTTGGGG"
+#-------------------(end of test_packedAgainWhenTheFileChanges())----------
+
+#--------------------------------------------------------------------------
+def test_readOnlyDirectoryUsesTheCache(tmp_path, monkeypatch):
+    directory = tmp_path / "readOnly"
+    directory.mkdir()
+    filename = writeFASTA(directory / "genome.fna", [("a", "ACGTNNACGT")])
+    cache = tmp_path / "cache"
+    monkeypatch.setattr(BioDNA, "PACKED_CACHE", str(cache))
+    monkeypatch.setattr(BioDNA.os, "access", lambda path, mode: os.path.abspath(path) != str(directory))
+    with BioDNA.openPacked(filename) as packed:
+        assert str(packed) == "ACGTNNACGT"
+        assert os.path.dirname(packed.filename) == str(cache)
+    assert os.listdir(directory) == ["genome.fna"]
+#-------------------(end of test_readOnlyDirectoryUsesTheCache())----------
+
+#--------------------------------------------------------------------------
+def test_analysesTakeAPackedSequence(genome, monkeypatch):
+    filename, records = genome
+    name, sequence = records[1]
+    monkeypatch.setattr(BioDNA, "PACKED_CHUNK_SIZE", 300) # many chunks
+    with BioDNA.openPacked(filename, name) as packed:
+        for LmerSize in (3, 8):
+            assert (BioDNA.countKmers(packed, LmerSize).topRanked(10 ** 6) ==
+                    BioDNA.countKmers(sequence, LmerSize).topRanked(10 ** 6))
+        assert (DNAcomposition.sequenceComposition(packed, 100, blockSize=128) ==
+                DNAcomposition.sequenceComposition(sequence, 100))
+        assert BioDNA.TATAboxAnalysis(packed) == BioDNA.TATAboxAnalysis(sequence.lower())
+        assert (list(BioDNA.scanTATAboxes(packed, 20, 30, windowSize=200)) ==
+                list(BioDNA.findTATAboxes(sequence, 20, 30, record=name)))
+#-------------------(end of test_analysesTakeAPackedSequence())------------
+
+#--------------------------------------------------------------------------
+def test_sameBasesWithoutNumPy(genome, withoutNumPy):
+    filename, records = genome
+    packedFilename = filename + ".withoutNumPy.pk2"
+    source = ("import json, BioDNA\n"
+              "sequences = []\n"
+              "for name in %r:\n"
+              "    BioDNA.packFASTA(%r, %r, name)\n"
+              "    with BioDNA.PackedSequence(%r) as packed:\n"
+              "        sequences.append(str(packed))\n"
+              "print(json.dumps([BioDNA.np is None] + sequences))\n"
+              % ([name for name, sequence in records], filename, packedFilename, packedFilename))
+    assert withoutNumPy(source) == [True] + [sequence for name, sequence in records]
+#-------------------(end of test_sameBasesWithoutNumPy())------------------
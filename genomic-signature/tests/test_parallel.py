@@ -0,0 +1,63 @@
+"""Tests of the multi-process batch mode: countFilesInParallel() against
+countFASTAkmerSizes() of each file, for any number of workers and any chunk
+size (so large genomes are split between workers), in the order of the file
+list and with each file hashed as it is read; and breakIntoMotifs() writing
+the same output file for any number of workers.
+"""
+
+import pytest
+
+import BioDNA
+from conftest import randomSequence, writeFASTA
+
+SYMBOLS = "ACGT" * 6 + "acgt" * 2 + "N"
+
+#--------------------------------------------------------------------------
+def tableState(table):
+    """ Returns everything a KmerTable holds as plain values. """
+    if (table.isDense()):
+        counts, first = list(map(int, table.counts)), list(map(int, table.first))
+    else:
+        counts, first = dict(table.counts), dict(table.first)
+    return table.LmerSize, table.canonical, table.total, table.other, counts, first
+#-------------------(end of tableState())----------------------------------
+
+#--------------------------------------------------------------------------
+@pytest.fixture
+def genomes(tmp_path):
+    """ Four FASTA files in a directory: one of several records, one without
+    any sequence, a tiny one and a larger one. """
+    directory = tmp_path / "genomes"
+    directory.mkdir()
+    records = [[("a1", randomSequence(1500, 1, SYMBOLS)), ("a2", ""), ("a3", randomSequence(600, 2, SYMBOLS))],
+               [], [("c1", randomSequence(5, 3, SYMBOLS))], [("d1", randomSequence(6000, 4, SYMBOLS))]]
+    return [writeFASTA(directory / ("genome%i.fna" % i), fileRecords) for i, fileRecords in enumerate(records)]
+#-------------------(end of genomes())-------------------------------------
+
+#--------------------------------------------------------------------------
+@pytest.mark.parametrize("workers", [1, 3])
+@pytest.mark.parametrize("chunkSize", [50, 1000, 1 << 22])
+@pytest.mark.parametrize("canonical", [False, True])
+def test_countFilesInParallel(genomes, workers, chunkSize, canonical):
+    expected = [(nextFile, {LmerSize: tableState(table) for LmerSize, table in
+                            BioDNA.countFASTAkmerSizes(nextFile, [3, 6], canonical=canonical).items()})
+                for nextFile in genomes]
+    digests = {}
+    counted = BioDNA.countFilesInParallel(genomes, [3, 6], workers, chunkSize, canonical, digests)
+    assert [(nextFile, {LmerSize: tableState(table) for LmerSize, table in tables.items()})
+            for nextFile, tables in counted] == expected
+    assert {nextFile: digest.hexdigest() for nextFile, digest in digests.items()} == \
+           {nextFile: BioDNA.textHash(nextFile) for nextFile in genomes}
+#-------------------(end of test_countFilesInParallel())-------------------
+
+#--------------------------------------------------------------------------
+def test_sameOutputForAnyNumberOfWorkers(tmp_path, genomes):
+    outputs = []
+    for workers in (1, 2, 4):
+        outputFilename = str(tmp_path / ("Results%i.csv" % workers))
+        BioDNA.breakIntoMotifs(str(tmp_path / "genomes"), [4, 7], 10, workers, outputFilename)
+        with open(outputFilename) as OUTPUT:
+            outputs.append(OUTPUT.read())
+    assert outputs[0] == outputs[1] == outputs[2]
+    assert outputs[0].count("FILE: ") == 2 * len(genomes)
+#-------------------(end of test_sameOutputForAnyNumberOfWorkers())--------
@@ -0,0 +1,148 @@
+"""Tests of the pipeline of a batch of files: prefetch() giving back the items
+in order, running at most "depth" items ahead, raising the exception of its
+iterable where it happened and stopping its thread once closed; and
+countPipeline(), countFiles() and breakIntoMotifs() giving the same results
+in the same order at every depth, with the errors of the reading and the
+counting stages raised to the caller.
+"""
+
+import time
+import threading
+
+import pytest
+
+import BioDNA
+from conftest import randomSequence, writeFASTA
+
+SYMBOLS = "ACGT" * 6 + "acgt" * 2 + "N"
+
+#--------------------------------------------------------------------------
+def tableState(table):
+    """ Returns everything a KmerTable holds as plain values. """
+    if (table.isDense()):
+        counts, first = list(map(int, table.counts)), list(map(int, table.first))
+    else:
+        counts, first = dict(table.counts), dict(table.first)
+    return table.LmerSize, table.canonical, table.total, table.other, counts, first
+#-------------------(end of tableState())----------------------------------
+
+#--------------------------------------------------------------------------
+@pytest.fixture
+def genomes(tmp_path):
+    """ Five FASTA files in a directory, one of them empty and one of several
+    records. """
+    directory = tmp_path / "genomes"
+    directory.mkdir()
+    records = [[("g0", randomSequence(3000, 0, SYMBOLS))], [],
+               [("g2a", randomSequence(2500, 2, SYMBOLS)), ("g2b", ""), ("g2c", randomSequence(900, 3, SYMBOLS))],
+               [("g3", randomSequence(40, 4, SYMBOLS))], [("g4", randomSequence(5000, 5, SYMBOLS))]]
+    return [writeFASTA(directory / ("genome%i.fna" % i), fileRecords) for i, fileRecords in enumerate(records)]
+#-------------------(end of genomes())-------------------------------------
+
+#--------------------------------------------------------------------------
+@pytest.mark.parametrize("depth", [1, 2, 5])
+def test_prefetchOrderAndDepth(depth):
+    made = []
+    def items():
+        for item in range(50):
+            made.append(item)
+            yield item
+
+    prefetched = BioDNA.prefetch(items(), depth)
+    assert next(prefetched) == 0
+    time.sleep(0.2) # (time for the thread to run ahead as far as it may)
+    # the item given back, those waiting in the queue and the one waiting to be put
+    assert len(made) <= depth + 2
+    assert list(prefetched) == list(range(1, 50))
+#-------------------(end of test_prefetchOrderAndDepth())------------------
+
+#--------------------------------------------------------------------------
+def test_prefetchRaisesWhereTheIterableFailed():
+    error = ValueError("bad record")
+    def items():
+        yield from range(3)
+        raise error
+
+    given = []
+    with pytest.raises(ValueError) as raised:
+        for item in BioDNA.prefetch(items(), 1):
+            given.append(item)
+    assert given == [0, 1, 2] and raised.value is error
+#-------------------(end of test_prefetchRaisesWhereTheIterableFailed())---
+
+#--------------------------------------------------------------------------
+def test_prefetchStopsWhenClosed():
+    def endless():
+        item = 0
+        while (True):
+            yield item
+            item += 1
+
+    prefetched = BioDNA.prefetch(endless(), 2)
+    assert [next(prefetched) for i in range(3)] == [0, 1, 2]
+    prefetched.close()
+    for thread in threading.enumerate():
+        if (thread.name == "BioDNA prefetch"):
+            thread.join(2)
+            assert not thread.is_alive()
+#-------------------(end of test_prefetchStopsWhenClosed())----------------
+
+#--------------------------------------------------------------------------
+@pytest.mark.parametrize("depth", [1, 3])
+@pytest.mark.parametrize("windowSize", [64, 1 << 22])
+@pytest.mark.parametrize("canonical", [False, True])
+def test_countPipeline(genomes, depth, windowSize, canonical):
+    expected = [(nextFile, {LmerSize: tableState(table) for LmerSize, table in
+                            BioDNA.countFASTAkmerSizes(nextFile, [2, 5], canonical=canonical).items()})
+                for nextFile in genomes]
+    counted = BioDNA.countPipeline(genomes, [2, 5], canonical, depth, windowSize)
+    assert [(nextFile, {LmerSize: tableState(table) for LmerSize, table in tables.items()})
+            for nextFile, tables in counted] == expected
+#-------------------(end of test_countPipeline())--------------------------
+
+#--------------------------------------------------------------------------
+@pytest.mark.parametrize("pipelineDepth", [0, 1, 2])
+def test_readingErrorsReachTheCaller(genomes, pipelineDepth):
+    # the files before the missing one are given back, then its error is raised
+    fileList = genomes[:2] + [genomes[0] + ".missing"] + genomes[2:]
+    counted = BioDNA.countFiles(fileList, [3], pipelineDepth=pipelineDepth)
+    assert [next(counted)[0] for i in range(2)] == genomes[:2]
+    with pytest.raises(FileNotFoundError):
+        next(counted)
+#-------------------(end of test_readingErrorsReachTheCaller())------------
+
+#--------------------------------------------------------------------------
+@pytest.mark.parametrize("pipelineDepth", [0, 2])
+def test_countingErrorsReachTheCaller(tmp_path, genomes, monkeypatch, pipelineDepth):
+    countKmerSizes = BioDNA.countKmerSizes
+    def failingCount(window, *arguments, **options): # (fails on the 5000 bases of genome4)
+        if (len(window) == 5000):
+            raise MemoryError("no room for the tables")
+        return countKmerSizes(window, *arguments, **options)
+    monkeypatch.setattr(BioDNA, "countKmerSizes", failingCount)
+
+    with pytest.raises(MemoryError):
+        BioDNA.breakIntoMotifs(str(tmp_path / "genomes"), 3, 5, outputFilename=str(tmp_path / "Results.csv"),
+                               pipelineDepth=pipelineDepth)
+    given = []
+    with pytest.raises(MemoryError):
+        for nextFile, tables in BioDNA.countFiles(genomes, [3], pipelineDepth=pipelineDepth):
+            given.append(nextFile)
+    assert given == genomes[:4]
+#-------------------(end of test_countingErrorsReachTheCaller())-----------
+
+#--------------------------------------------------------------------------
+@pytest.mark.parametrize("tidy", [False, True])
+def test_breakIntoMotifsSameOutputAtEveryDepth(tmp_path, genomes, tidy):
+    outputs = []
+    for pipelineDepth in (0, 1, 4):
+        outputFilename = str(tmp_path / ("Results%i.csv" % pipelineDepth))
+        BioDNA.breakIntoMotifs(str(tmp_path / "genomes"), [2, 4], 6, outputFilename=outputFilename,
+                               tidy=tidy, pipelineDepth=pipelineDepth)
+        with open(outputFilename) as OUTPUT:
+            outputs.append(OUTPUT.read())
+    assert outputs[0] == outputs[1] == outputs[2]
+    # the files are written in the order of the file list
+    written = [genome for genome in map(str, sorted((tmp_path / "genomes").iterdir())) if genome in outputs[0]]
+    assert [outputs[0].index(genome) for genome in written] == sorted(outputs[0].index(genome) for genome in written)
+#-------------------(end of test_breakIntoMotifsSameOutputAtEveryDepth())--
@@ -0,0 +1,138 @@
+"""Tests of the position weight matrices: scorePWM() against the log-odds score
+of every window of both strands added up base by base, with and without NumPy,
+with the TATA-box prefilter (applied only to a matrix it fits), and
+readJASPAR() and scanPWM() of files.
+"""
+
+import random
+
+import pytest
+
+import BioDNA
+from conftest import randomSequence, writeFASTA
+
+SYMBOLS = "ACGT" * 6 + "acgt" * 2 + "N"
+COMPLEMENT = str.maketrans("ACGTacgtN", "TGCAtgcaN")
+TATA_SITES = ["TATAAAAG", "TATAAAAG", "TATATAAG", "TATAAATA", "TATAAAAA", "TATATATG", "TATAAAAG", "CATAAAAG"]
+
+#--------------------------------------------------------------------------
+def bruteForceHits(sequence, matrix, threshold, strands="+-", record=""):
+    """ Returns the PWMHits of a sequence: the score of every window of A, C, G
+    and T read on each strand, added up position by position. """
+    hits = []
+    for start in range(len(sequence) - matrix.length + 1):
+        for strand in "+-":
+            site = sequence[start:start + matrix.length]
+            if (strand == "-"):
+                site = site.translate(COMPLEMENT)[::-1]
+            if (strand not in strands or not set(site.upper()) <= set("ACGT")):
+                continue
+            score = sum(matrix.logOdds[position]["ACGT".index(base)] for position, base in enumerate(site.upper()))
+            if (score >= threshold):
+                hits.append(BioDNA.PWMHit(record, strand, start, start + matrix.length, score, site))
+    return hits
+#-------------------(end of bruteForceHits())------------------------------
+
+#--------------------------------------------------------------------------
+def sameHits(found, expected):
+    """ Whether two lists of PWMHits are the same, but for rounding of the scores. """
+    return ([hit._replace(score=0) for hit in found] == [hit._replace(score=0) for hit in expected] and
+            [hit.score for hit in found] == pytest.approx([hit.score for hit in expected]))
+#-------------------(end of sameHits())------------------------------------
+
+#--------------------------------------------------------------------------
+def promoterSequence(length, seed):
+    """ A random sequence with TATA-boxes on both strands. """
+    pieces = list(randomSequence(length, seed, SYMBOLS))
+    generator = random.Random(seed)
+    for site in TATA_SITES * 3:
+        start = generator.randrange(length - 8)
+        pieces[start:start + 8] = site if generator.random() < 0.5 else site.translate(COMPLEMENT)[::-1]
+    return "".join(pieces)
+#-------------------(end of promoterSequence())----------------------------
+
+#--------------------------------------------------------------------------
+def randomMatrix(length, seed):
+    """ A PositionWeightMatrix of random counts. """
+    generator = random.Random(seed)
+    return BioDNA.PositionWeightMatrix([[generator.randrange(20) for i in range(length)] for base in "ACGT"])
+#-------------------(end of randomMatrix())--------------------------------
+
+#--------------------------------------------------------------------------
+@pytest.mark.parametrize("length, seed", [(1, 1), (6, 2), (12, 3)])
+@pytest.mark.parametrize("strands", ["+-", "+", "-"])
+def test_scorePWM(length, seed, strands):
+    matrix = randomMatrix(length, seed)
+    sequence = promoterSequence(3000, seed)
+    threshold = matrix.minScore + 0.7 * (matrix.maxScore - matrix.minScore)
+    expected = bruteForceHits(sequence, matrix, threshold, strands, "chr")
+    assert len(expected) > 5
+    assert sameHits(BioDNA.scorePWM(sequence, matrix, strands=strands, relativeThreshold=0.7, record="chr"), expected)
+    assert sameHits(BioDNA.scorePWM(sequence.encode("ascii"), matrix, threshold, strands=strands, record="chr"),
+                    expected)
+    assert BioDNA.scorePWM(sequence[:length - 1], matrix) == []
+#-------------------(end of test_scorePWM())-------------------------------
+
+#--------------------------------------------------------------------------
+def test_TATAprefilter():
+    matrix = BioDNA.PositionWeightMatrix.fromSites(TATA_SITES, "TATA")
+    assert matrix.consensus() == "TATAAAAG" and matrix.score("TATAAAAG") == pytest.approx(matrix.maxScore)
+    sequence = promoterSequence(5000, 4)
+    threshold = matrix.minScore + 0.6 * (matrix.maxScore - matrix.minScore)
+    allHits = bruteForceHits(sequence, matrix, threshold)
+
+    # only the windows where the TATA-box regex matches, on their own strand, are scored
+    lower = sequence.lower()
+    expected = [hit for hit in allHits if BioDNA.TATA_PREFILTER[hit.strand].match(lower, hit.start)]
+    assert 0 < len(expected) < len(allHits)
+    assert sameHits(BioDNA.scorePWM(sequence, matrix, threshold, prefilter=BioDNA.TATA_PREFILTER), expected)
+
+    # a matrix the prefilter doesn't fit (shorter, or not a TATA-box) has every window scored
+    for other in (BioDNA.PositionWeightMatrix.fromSites([site[:6] for site in TATA_SITES]), randomMatrix(8, 5)):
+        threshold = other.minScore + 0.75 * (other.maxScore - other.minScore)
+        assert sameHits(BioDNA.scorePWM(sequence, other, threshold, prefilter=BioDNA.TATA_PREFILTER),
+                        bruteForceHits(sequence, other, threshold))
+#-------------------(end of test_TATAprefilter())--------------------------
+
+#--------------------------------------------------------------------------
+def test_sameHitsWithoutNumPy(withoutNumPy):
+    source = ("import json, random, BioDNA\n"
+              "generator = random.Random(6)\n"
+              "matrix = BioDNA.PositionWeightMatrix([[generator.randrange(20) for i in range(10)] for base in 'ACGT'])\n"
+              "TATA = BioDNA.PositionWeightMatrix.fromSites(%r)\n"
+              "sequence = randomSequence(6000, 7, %r) + 'TATAAAAG' + 'CTTTTATA'\n"
+              "print(json.dumps([BioDNA.np is None, BioDNA.scorePWM(sequence, matrix, relativeThreshold=0.7),\n"
+              "                  BioDNA.scorePWM(sequence, TATA, relativeThreshold=0.5, prefilter=BioDNA.TATA_PREFILTER)]))\n"
+              % (TATA_SITES, SYMBOLS))
+    results = withoutNumPy(source)
+    sequence = randomSequence(6000, 7, SYMBOLS) + "TATAAAAG" + "CTTTTATA"
+    TATA = BioDNA.PositionWeightMatrix.fromSites(TATA_SITES)
+    assert results[0]
+    assert sameHits([BioDNA.PWMHit(*hit) for hit in results[1]],
+                    BioDNA.scorePWM(sequence, randomMatrix(10, 6), relativeThreshold=0.7))
+    assert sameHits([BioDNA.PWMHit(*hit) for hit in results[2]],
+                    BioDNA.scorePWM(sequence, TATA, relativeThreshold=0.5, prefilter=BioDNA.TATA_PREFILTER))
+#-------------------(end of test_sameHitsWithoutNumPy())-------------------
+
+#--------------------------------------------------------------------------
+def test_readJASPARandScanPWM(tmp_path):
+    counts = [[61, 16, 352, 3, 354, 268, 360, 222], [145, 46, 3, 10, 0, 0, 3, 2],
+              [152, 18, 2, 2, 5, 0, 10, 44], [31, 309, 32, 374, 30, 121, 6, 121]]
+    with open(tmp_path / "matrices.jaspar", "w") as OUTPUT:
+        OUTPUT.write(">MA0108.2 TBP\n")
+        for base, row in zip("ACGT", counts):
+            OUTPUT.write("%s [ %s ]\n" % (base, " ".join("%4i" % count for count in row)))
+        for row in counts: # the plain form, with no header
+            OUTPUT.write("\t".join(map(str, row)) + "\n")
+    first, second = BioDNA.readJASPAR(str(tmp_path / "matrices.jaspar"))
+    assert (first.name, second.name) == ("MA0108.2 TBP", "")
+    assert first.logOdds == second.logOdds == BioDNA.PositionWeightMatrix(counts).logOdds
+
+    records = [("chrA description", promoterSequence(2000, 8)), ("chrB", promoterSequence(900, 9))]
+    filename = writeFASTA(tmp_path / "genome.fna", records)
+    threshold = first.minScore + 0.8 * (first.maxScore - first.minScore)
+    expected = []
+    for header, sequence in records:
+        expected += bruteForceHits(sequence, first, threshold, record=header.split()[0])
+    assert sameHits(list(BioDNA.scanPWM(filename, first)), expected)
+#-------------------(end of test_readJASPARandScanPWM())-------------------
@@ -0,0 +1,125 @@
+"""Tests of the whole-genome repeat searches: findTandemRepeats() against the
+maximal runs of each period found position by position, findSymmetricRepeats()
+against the arm of every center grown base by base (and the mirror repeats
+of the original regex), with and without NumPy, and scanRepeats() of a FASTA
+file.
+"""
+
+import re
+
+import pytest
+
+import BioDNA
+from conftest import randomSequence, writeFASTA
+
+# few symbols, so that repeats are common; some lower case and N's
+SYMBOLS = "AAACGTTTacN"
+COMPLEMENT = {"A": "T", "C": "G", "G": "C", "T": "A"}
+
+#--------------------------------------------------------------------------
+def bruteForceTandemRepeats(sequence, minPeriod, maxPeriod, minCopies, record=""):
+    """ Returns the TandemRepeats of a sequence: for each period, every stretch
+    where each base equals the base one period further on that can't be made
+    longer on either side, whose unit is not itself made of a shorter unit. """
+    upper = sequence.upper()
+    same = lambda i, period: (0 <= i and i + period < len(upper) and upper[i] in "ACGT" and
+                              upper[i] == upper[i + period])
+    repeats = []
+    for period in range(minPeriod, maxPeriod + 1):
+        for start in range(len(upper)):
+            if (same(start - 1, period) or not same(start, period)):
+                continue
+            end = start
+            while (same(end, period)):
+                end += 1
+            unit = upper[start:start + period]
+            primitive = all(unit != unit[:size] * (period // size) for size in range(1, period) if period % size == 0)
+            if (end - start >= (minCopies - 1) * period and primitive):
+                repeats.append(BioDNA.TandemRepeat(record, start, end + period, period,
+                                                   sequence[start:start + period], (end - start + period) // period))
+    return sorted(repeats, key=lambda repeat: (repeat.start, repeat.period))
+#-------------------(end of bruteForceTandemRepeats())---------------------
+
+#--------------------------------------------------------------------------
+def bruteForceSymmetricRepeats(sequence, minArm, maxArm, kind, record=""):
+    """ Returns the SymmetricRepeats of a sequence: the arm of every center grown
+    while the bases on each side are A, C, G or T and equal (for a mirror) or
+    complementary (for a palindrome). """
+    upper = sequence.upper()
+    repeats = []
+    for center in range(1, len(upper)):
+        arm = 0
+        while (arm < maxArm and center - 1 - arm >= 0 and center + arm < len(upper)):
+            left, right = upper[center - 1 - arm], upper[center + arm]
+            if (left not in COMPLEMENT or right != (left if kind == "mirror" else COMPLEMENT[left])):
+                break
+            arm += 1
+        if (arm >= minArm):
+            repeats.append(BioDNA.SymmetricRepeat(record, center - arm, center + arm, arm, kind))
+    return repeats
+#-------------------(end of bruteForceSymmetricRepeats())------------------
+
+#--------------------------------------------------------------------------
+@pytest.mark.parametrize("minPeriod, maxPeriod, minCopies", [(2, 6, 2), (1, 4, 3), (3, 8, 2)])
+def test_findTandemRepeats(minPeriod, maxPeriod, minCopies):
+    sequence = randomSequence(3000, maxPeriod, SYMBOLS) + "ACGACGACGAC" + "at" * 9 + "N" + "CAGT" * 3
+    expected = bruteForceTandemRepeats(sequence, minPeriod, maxPeriod, minCopies, "chr")
+    assert len(expected) > 10
+    assert BioDNA.findTandemRepeats(sequence, minPeriod, maxPeriod, minCopies, "chr") == expected
+    assert BioDNA.findTandemRepeats(sequence.encode("ascii"), minPeriod, maxPeriod, minCopies, "chr") == expected
+#-------------------(end of test_findTandemRepeats())----------------------
+
+#--------------------------------------------------------------------------
+def test_tandemRepeatUnits():
+    repeats = BioDNA.findTandemRepeats("GG" + "ACGACGACGAC" + "TT", 2, 6)
+    assert [(repeat.start, repeat.end, repeat.period, repeat.unit, repeat.copies) for repeat in repeats] == \
+           [(1, 13, 3, "GAC", 4)] # (the G before the first ACG starts the repeat)
+    # only the shortest period of a repeat is reported
+    assert [(repeat.period, repeat.unit) for repeat in BioDNA.findTandemRepeats("CATATATATG")] == [(2, "AT")]
+#-------------------(end of test_tandemRepeatUnits())----------------------
+
+#--------------------------------------------------------------------------
+@pytest.mark.parametrize("kind", ["mirror", "palindrome"])
+@pytest.mark.parametrize("minArm, maxArm", [(3, 10), (1, 2), (4, 6)])
+def test_findSymmetricRepeats(kind, minArm, maxArm):
+    sequence = randomSequence(3000, minArm + maxArm, SYMBOLS) + "GAATTC" + "ACGGCA"
+    expected = bruteForceSymmetricRepeats(sequence, minArm, maxArm, kind, "chr")
+    assert len(expected) > 10
+    assert BioDNA.findSymmetricRepeats(sequence, minArm, maxArm, kind, "chr") == expected
+    assert BioDNA.findSymmetricRepeats(sequence.encode("ascii"), minArm, maxArm, kind, "chr") == expected
+#-------------------(end of test_findSymmetricRepeats())-------------------
+
+#--------------------------------------------------------------------------
+def test_mirrorRepeatsOfTheOriginalRegex():
+    # every (overlapping) match of the mirror repeat regex of the TATA-box analysis is the
+    # center of a mirror repeat with an arm of at least 3
+    sequence = randomSequence(5000, 1, "ACGT")
+    centers = {match.start() + 3 for match in re.finditer(r"(?=(.)(.)(.)\3\2\1)", sequence)}
+    assert {repeat.start + repeat.arm for repeat in BioDNA.findSymmetricRepeats(sequence)} == centers
+    with pytest.raises(ValueError):
+        BioDNA.findSymmetricRepeats(sequence, kind="hairpin")
+#-------------------(end of test_mirrorRepeatsOfTheOriginalRegex())--------
+
+#--------------------------------------------------------------------------
+def test_sameRepeatsWithoutNumPy(withoutNumPy):
+    source = ("import json, BioDNA\n"
+              "sequence = randomSequence(2000, 2, %r)\n"
+              "print(json.dumps([BioDNA.np is None, BioDNA.findTandemRepeats(sequence, 1, 6),\n"
+              "                  BioDNA.findSymmetricRepeats(sequence, 2, 8, 'palindrome')]))\n" % SYMBOLS)
+    sequence = randomSequence(2000, 2, SYMBOLS)
+    assert withoutNumPy(source) == [True, [list(repeat) for repeat in BioDNA.findTandemRepeats(sequence, 1, 6)],
+                                    [list(repeat) for repeat in BioDNA.findSymmetricRepeats(sequence, 2, 8, "palindrome")]]
+#-------------------(end of test_sameRepeatsWithoutNumPy())----------------
+
+#--------------------------------------------------------------------------
+def test_scanRepeats(tmp_path):
+    records = [("chrA description", randomSequence(1500, 3, SYMBOLS)), ("chrB", randomSequence(800, 4, SYMBOLS))]
+    filename = writeFASTA(tmp_path / "genome.fna", records)
+    expected = []
+    for header, sequence in records:
+        name = header.split()[0]
+        expected += bruteForceTandemRepeats(sequence, 2, 6, 2, name)
+        expected += bruteForceSymmetricRepeats(sequence, 3, 10, "mirror", name)
+        expected += bruteForceSymmetricRepeats(sequence, 3, 10, "palindrome", name)
+    assert list(BioDNA.scanRepeats(filename, kinds=("tandem", "mirror", "palindrome"))) == expected
+#-------------------(end of test_scanRepeats())----------------------------
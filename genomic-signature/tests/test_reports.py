@@ -0,0 +1,174 @@
+"""Tests of the records of the analysis functions: TATAboxAnalysis(), the
+repeat searches and readingFrameChecks() against the regular expressions run
+by hand, printing nothing and safe to call from many threads; formatReport()
+against the printout of the original (print-only) programs; and
+writeReportCSV() and reportToJSON() read back.
+"""
+
+import csv, io
+import json
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import BioDNA
+from conftest import randomSequence
+
+REGION = "gaattcgaattcagcaattatatataaaagcc"
+
+# what the original TATAboxAnalysis() printed for REGION
+ORIGINAL_PRINTOUT = """
+The size of the region being searched is 32 bp
+=========================================================
+gaattcgaattcagcaatTATATATAaaagcc
+12345678901234567890123456789012
+
+Upstream:   [ 1 : 18 ]
+TATA-box:   [ 19 : 26 ]
+Downstream: [ 27 : 32 ]
+---------------------------------------------------------
+
+
+UPSTREAM of TATA-box
+---------------------------------------------------------
+gaattcgaattcagcaat
+123456789012345678
+
+The size of the upstream region is 18 bp
+The percentage of upstream region is: 56.2%
+---------------------------------------------------------
+-Searching for Direct Repeats (DR) in the upstream region-
+
+Found DR: gaattcgaattc
+     at upstream location: [ 1 : 12 ]
+
+
+Percent of DR's in the upstream region is: 66.7%
+---------------------------------------------------------
+---------------------------------------------------------
+-Searching for Mirror Repeats (MR) in the upstream region-
+
+
+
+Percent of MR's in the upstream region is:  0.0%
+---------------------------------------------------------
+---------------------------------------------------------
+-Searching for AT/TA/AA/TT runs in the upstream region-
+
+Found favorite motif: aatt
+     at upstream location: [ 2 : 5 ]
+Found favorite motif: aatt
+     at upstream location: [ 8 : 11 ]
+Found favorite motif: aa
+     at upstream location: [ 16 : 17 ]
+
+
+Percent of AT/TA/AA/TT runs in the upstream region is: 55.6%
+---------------------------------------------------------
+"""
+
+#--------------------------------------------------------------------------
+def bruteForceRepeats(upstream, kind, pattern):
+    """ Returns the RepeatReport of a region from the regular expression of the
+    repeats, run by hand. """
+    matches = [BioDNA.RepeatMatch(match.group(), match.start(), match.end()) for match in re.finditer(pattern, upstream)]
+    covered = sum(len(match.motif) for match in matches)
+    return BioDNA.RepeatReport(kind, matches, covered / len(upstream) * 100 if upstream else 0.0)
+#-------------------(end of bruteForceRepeats())---------------------------
+
+#--------------------------------------------------------------------------
+def bruteForceReport(region):
+    """ Returns the TATAreport of a region: its first TATA-box and the repeats
+    of the region upstream of it. """
+    if (region == ""):
+        return None
+    box = re.search(r"tata[at]a[at][ag]", region)
+    if (box is None):
+        return BioDNA.TATAreport(region, None, None, None, ())
+    if (box.start() == 0):
+        return BioDNA.TATAreport(region, 0, box.end(), None, ())
+    upstream = region[:box.start()]
+    repeats = (bruteForceRepeats(upstream, "DR", r"(.{2,6})\1"), bruteForceRepeats(upstream, "MR", r"(.)(.)(.)\3\2\1"),
+               bruteForceRepeats(upstream, "AT", r"([at][at]){1,8}"))
+    return BioDNA.TATAreport(region, box.start(), box.end(), box.start() / len(region) * 100, repeats)
+#-------------------(end of bruteForceReport())----------------------------
+
+#--------------------------------------------------------------------------
+@pytest.mark.parametrize("region", [REGION, "", "gcgcgcgc", "tataaaagcc", randomSequence(400, 1, "aaattttcg")])
+def test_TATAboxAnalysis(region, capsys):
+    report = BioDNA.TATAboxAnalysis(region)
+    assert report == bruteForceReport(region)
+    if (report is not None and report.repeats):
+        upstream = region[:report.start]
+        assert report.repeats == (BioDNA.findDirectRepeats(upstream), BioDNA.findMirrorRepeats(upstream),
+                                  BioDNA.findATRepeats(upstream))
+    assert capsys.readouterr().out == "" # (nothing is printed)
+#-------------------(end of test_TATAboxAnalysis())------------------------
+
+#--------------------------------------------------------------------------
+def test_TATAboxAnalysisFromManyThreads():
+    regions = [randomSequence(2000, seed, "aaattttcgc") for seed in range(16)]
+    with ThreadPoolExecutor(8) as executor:
+        reports = list(executor.map(BioDNA.TATAboxAnalysis, regions * 4))
+    assert reports == [bruteForceReport(region) for region in regions] * 4
+#-------------------(end of test_TATAboxAnalysisFromManyThreads())---------
+
+#--------------------------------------------------------------------------
+@pytest.mark.parametrize("proteins, checks", [("MetAla***", (True, True, False, False)),
+                                              ("MetAla***GlyMet***", (True, True, True, True)),
+                                              ("AlaMet***Gly", (False, False, True, True)), ("", (False, False, False, False))])
+def test_readingFrameChecks(proteins, checks):
+    report = BioDNA.readingFrameChecks(proteins)
+    assert report == BioDNA.FrameReport(*checks)
+    assert BioDNA.formatReport(report) == "".join(BioDNA.FRAME_TEXT[i][0 if check else 1] + "\n"
+                                                  for i, check in enumerate(checks))
+#-------------------(end of test_readingFrameChecks())---------------------
+
+#--------------------------------------------------------------------------
+def test_formatReportAsTheOriginalPrintout():
+    assert BioDNA.formatReport(BioDNA.TATAboxAnalysis(REGION)) == ORIGINAL_PRINTOUT
+    assert BioDNA.formatReport(BioDNA.TATAboxAnalysis("gcgcgcgc")) == "There is no TATA box to locate.\n"
+    assert BioDNA.formatReport(None) == ""
+    assert BioDNA.formatReport(BioDNA.readingFrameChecks("MetAla***GlyMet***")) == (
+        "There is a Met at the start site.\nThere is a stop at the end.\n"
+        "There is at least one Met somewhere other than start.\nThere is at least one STOP interrupting the gene.\n")
+#-------------------(end of test_formatReportAsTheOriginalPrintout())------
+
+#--------------------------------------------------------------------------
+def test_writeReportCSV():
+    report = BioDNA.TATAboxAnalysis(REGION)
+    OUTPUT = io.StringIO()
+    BioDNA.writeReportCSV(report, OUTPUT)
+    rows = list(csv.reader(io.StringIO(OUTPUT.getvalue())))
+    assert rows[0] == ["kind", "motif", "start", "end"]
+    assert rows[1:] == [["TATA", "tatatata", "18", "26"], ["DR", "gaattcgaattc", "0", "12"], ["AT", "aatt", "1", "5"],
+                        ["AT", "aatt", "7", "11"], ["AT", "aa", "15", "17"]]
+
+    OUTPUT = io.StringIO()
+    BioDNA.writeReportCSV(report.repeats[2], OUTPUT)
+    assert OUTPUT.getvalue().splitlines() == ["kind,motif,start,end", "AT,aatt,1,5", "AT,aatt,7,11", "AT,aa,15,17"]
+    OUTPUT = io.StringIO()
+    BioDNA.writeReportCSV(BioDNA.readingFrameChecks("MetAla***"), OUTPUT)
+    assert OUTPUT.getvalue() == "startMet,endStop,innerMet,interruptingStop\nTrue,True,False,False\n"
+    OUTPUT = io.StringIO()
+    BioDNA.writeReportCSV(None, OUTPUT)
+    assert OUTPUT.getvalue() == "kind,motif,start,end\n"
+#-------------------(end of test_writeReportCSV())-------------------------
+
+#--------------------------------------------------------------------------
+def test_reportToJSON():
+    report = BioDNA.TATAboxAnalysis(REGION)
+    loaded = json.loads(BioDNA.reportToJSON(report, indent=2))
+    assert loaded == BioDNA.reportAsDict(report)
+    assert (loaded["start"], loaded["end"], loaded["sequence"]) == (18, 26, REGION)
+    assert [repeats["kind"] for repeats in loaded["repeats"]] == ["DR", "MR", "AT"]
+    assert loaded["repeats"][0]["matches"] == [{"motif": "gaattcgaattc", "start": 0, "end": 12}]
+    assert BioDNA.TATAreport(**dict(loaded, repeats=tuple(
+        BioDNA.RepeatReport(repeats["kind"], [BioDNA.RepeatMatch(**match) for match in repeats["matches"]],
+                            repeats["percentage"]) for repeats in loaded["repeats"]))) == report
+
+    # a list of reports, and no report
+    assert json.loads(BioDNA.reportToJSON([BioDNA.readingFrameChecks("Met***"), None])) == \
+           [{"startMet": True, "endStop": True, "innerMet": False, "interruptingStop": False}, None]
+#-------------------(end of test_reportToJSON())---------------------------
@@ -0,0 +1,102 @@
+"""Tests of the sliding-window signatures: slidingSignatures() (streamed in
+blocks of any size) against the L-mers and bases of each window counted
+from scratch, with and without NumPy, writeSlidingSignatureSizes() against
+the same counts, and signatureMatrices() against one matrix per size.
+"""
+
+import pytest
+
+import BioDNA
+from conftest import randomSequence, writeFASTA
+
+SYMBOLS = "ACGT" * 6 + "acgt" * 2 + "NR"
+
+#--------------------------------------------------------------------------
+def bruteForceWindows(sequence, LmerSize, windowSize, step, record=""):
+    """ Returns the (record, start, end, total, counts, GC content, GC skew, AT
+    skew) of every window of a sequence, counted from scratch. """
+    windows = []
+    for start in range(0, len(sequence) - windowSize + 1, step):
+        window = sequence[start:start + windowSize].upper()
+        counts = [0] * (4 ** LmerSize)
+        for i in range(windowSize - LmerSize + 1):
+            motif = window[i:i + LmerSize]
+            if (not set(motif) - set("ACGT")):
+                counts[int(motif.translate(str.maketrans("ACGT", "0123")), 4)] += 1
+        A, C, G, T = [window.count(base) for base in "ACGT"]
+        windows.append((record, start, start + windowSize, sum(counts), counts,
+                        (G + C) / (A + C + G + T) if (A + C + G + T) else 0.0,
+                        (G - C) / (G + C) if (G + C) else 0.0, (A - T) / (A + T) if (A + T) else 0.0))
+    return windows
+#-------------------(end of bruteForceWindows())---------------------------
+
+#--------------------------------------------------------------------------
+def asTuples(windows):
+    """ Returns WindowSignatures as plain tuples, their counts as lists. """
+    return [tuple(window[:4]) + (list(map(int, window.counts)),) + tuple(window[5:]) for window in windows]
+#-------------------(end of asTuples())------------------------------------
+
+#--------------------------------------------------------------------------
+@pytest.mark.parametrize("LmerSize, windowSize, step", [(2, 100, None), (3, 100, 7), (1, 50, 1),
+                                                        (4, 60, 59), (3, 40, 90), (5, 5, 3)])
+@pytest.mark.parametrize("blockSize", [1, 13, 1 << 16])
+def test_slidingSignatures(LmerSize, windowSize, step, blockSize):
+    sequence = randomSequence(1200, LmerSize, SYMBOLS)
+    expected = bruteForceWindows(sequence, LmerSize, windowSize, step or windowSize, "chr")
+    windows = list(BioDNA.slidingSignatures(sequence, LmerSize, windowSize, step, "chr", blockSize))
+    assert asTuples(windows) == expected
+    assert asTuples(BioDNA.slidingSignatures(sequence.encode("ascii"), LmerSize, windowSize, step, "chr")) == expected
+#-------------------(end of test_slidingSignatures())----------------------
+
+#--------------------------------------------------------------------------
+def test_shorterThanAWindow():
+    assert list(BioDNA.slidingSignatures("ACGTACGT", 2, 9)) == []
+    with pytest.raises(ValueError):
+        BioDNA.SlidingSignatures(BioDNA.DENSE_LMER_LIMIT + 1, 100)
+#-------------------(end of test_shorterThanAWindow())---------------------
+
+#--------------------------------------------------------------------------
+def test_sameWindowsWithoutNumPy(withoutNumPy):
+    source = ("import json, BioDNA\n"
+              "windows = BioDNA.slidingSignatures(randomSequence(900, 1, %r), 3, 80, 11, 'chr', 17)\n"
+              "print(json.dumps([BioDNA.np is None] + [list(window) for window in windows]))\n" % SYMBOLS)
+    windows = BioDNA.slidingSignatures(randomSequence(900, 1, SYMBOLS), 3, 80, 11, "chr", 17)
+    assert withoutNumPy(source) == [True] + [list(window) for window in asTuples(windows)]
+#-------------------(end of test_sameWindowsWithoutNumPy())----------------
+
+#--------------------------------------------------------------------------
+def test_writeSlidingSignatureSizes(tmp_path):
+    np = pytest.importorskip("numpy")
+    records = [("chrA description", randomSequence(1500, 2, SYMBOLS)), ("chrB", randomSequence(90, 3, SYMBOLS)),
+               ("chrC", randomSequence(777, 4, SYMBOLS))]
+    filename = writeFASTA(tmp_path / "genome.fna", records)
+    LmerSizes, windowSize, step = [2, 4], 100, 30
+    outputFilenames = [str(tmp_path / ("signatures_L%i.npy" % LmerSize)) for LmerSize in LmerSizes]
+    rows = BioDNA.writeSlidingSignatureSizes(filename, LmerSizes, windowSize, step, outputFilenames, blockSize=64)
+
+    for LmerSize, outputFilename, count in zip(LmerSizes, outputFilenames, rows):
+        expected = []
+        for header, sequence in records:
+            expected += bruteForceWindows(sequence, LmerSize, windowSize, step, header.split()[0])
+        assert count == len(expected)
+        matrix = np.load(outputFilename)
+        assert matrix.shape == (len(expected), 4 ** LmerSize) and matrix.dtype == np.float32
+        for row, window in zip(matrix, expected):
+            assert row.tolist() == pytest.approx([count / window[3] for count in window[4]])
+        with open(outputFilename[:-len(".npy")] + "_windows.csv") as WINDOWS:
+            assert WINDOWS.read().splitlines() == ["record,start,end,Lmers,GCcontent,GCskew,ATskew"] + \
+                ["%s,%i,%i,%i,%.6f,%.6f,%.6f" % (window[:4] + window[5:]) for window in expected]
+#-------------------(end of test_writeSlidingSignatureSizes())-------------
+
+#--------------------------------------------------------------------------
+def test_signatureMatrices(tmp_path):
+    np = pytest.importorskip("numpy")
+    filenames = [writeFASTA(tmp_path / ("genome%i.fna" % i), [("g%i" % i, randomSequence(3000, i, SYMBOLS))])
+                 for i in range(3)]
+    cache = BioDNA.KmerCache(str(tmp_path / "cache"))
+    fileList, matrices = BioDNA.signatureMatrices(filenames, [2, 3], "karlin", cache=cache)
+    for LmerSize in (2, 3):
+        single = BioDNA.signatureMatrix(filenames, LmerSize, "karlin")
+        assert fileList == single[0]
+        assert np.array_equal(matrices[LmerSize], single[1])
+#-------------------(end of test_signatureMatrices())----------------------
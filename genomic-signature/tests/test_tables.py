@@ -0,0 +1,148 @@
+"""Tests of the outputs of many genomes for loading: the tidy CSV of
+TidyResultsWriter read back with numpy.genfromtxt() against the rankings of
+each genome, and the count tables of CountTableWriter (the .npz form, with and
+without NumPy, and the Parquet form when pyarrow is installed) against a
+Counter of the L-mers of each genome, on one strand and on both.
+"""
+
+import itertools
+from collections import Counter
+
+import pytest
+
+import BioDNA
+from conftest import randomSequence, writeFASTA
+
+SYMBOLS = "ACGT" * 6 + "acgt" * 2 + "N"
+COMPLEMENT = str.maketrans("ACGTN", "TGCAN")
+
+#--------------------------------------------------------------------------
+def bruteForceCounts(records, LmerSize, canonical=False):
+    """ Returns a Counter of the L-mers of A, C, G and T of the records of a
+    genome (for canonical, of the smaller of each L-mer and its reverse
+    complement). """
+    counts = Counter()
+    for header, sequence in records:
+        upper = sequence.upper()
+        for i in range(len(upper) - LmerSize + 1):
+            motif = upper[i:i + LmerSize]
+            if (set(motif) <= set("ACGT")):
+                counts[min(motif, motif.translate(COMPLEMENT)[::-1]) if canonical else motif] += 1
+    return counts
+#-------------------(end of bruteForceCounts())----------------------------
+
+#--------------------------------------------------------------------------
+@pytest.fixture
+def genomes(tmp_path):
+    """ Three genomes of (header, sequence) records, written to a directory;
+    gives back the records of each file by file name. """
+    directory = tmp_path / "genomes"
+    directory.mkdir()
+    records = [[("a1", randomSequence(2000, 1, SYMBOLS)), ("a2", randomSequence(700, 2, SYMBOLS))],
+               [("b1", randomSequence(30, 3, SYMBOLS))],
+               [("c1", randomSequence(4000, 4, SYMBOLS))]]
+    return {writeFASTA(directory / ("genome%i.fna" % i), fileRecords): fileRecords
+            for i, fileRecords in enumerate(records)}
+#-------------------(end of genomes())-------------------------------------
+
+#--------------------------------------------------------------------------
+def writeTables(filename, genomes, LmerSizes, canonical):
+    """ Writes the count tables of the genomes with a CountTableWriter and
+    returns the name of the file written. """
+    with BioDNA.CountTableWriter(filename) as writer:
+        for nextFile in genomes:
+            tables = BioDNA.countFASTAkmerSizes(nextFile, LmerSizes, canonical=canonical)
+            writer.add(nextFile, [tables[LmerSize] for LmerSize in LmerSizes])
+    return writer.filename
+#-------------------(end of writeTables())---------------------------------
+
+#--------------------------------------------------------------------------
+@pytest.mark.parametrize("canonical", [False, True])
+def test_tidyResultsLoadWithGenfromtxt(tmp_path, genomes, canonical):
+    np = pytest.importorskip("numpy")
+    outputFilename = str(tmp_path / "Results.csv")
+    BioDNA.breakIntoMotifs(str(tmp_path / "genomes"), [2, 4], 6, outputFilename=outputFilename,
+                           canonical=canonical, tidy=True)
+    rows = np.genfromtxt(outputFilename, delimiter=",", names=True, dtype=None, encoding=None)
+    assert rows.dtype.names == BioDNA.TIDY_COLUMNS
+
+    expected = []
+    for nextFile in sorted(genomes):
+        tables = BioDNA.countFASTAkmerSizes(nextFile, [2, 4], canonical=canonical)
+        for LmerSize in (2, 4):
+            for rank, (motif, count) in enumerate(tables[LmerSize].topRanked(6), 1):
+                expected.append((nextFile, LmerSize, rank, motif, count, count / tables[LmerSize].total))
+    assert [tuple(row)[:5] for row in rows.tolist()] == [row[:5] for row in expected]
+    assert rows["proportion"].tolist() == pytest.approx([row[5] for row in expected])
+#-------------------(end of test_tidyResultsLoadWithGenfromtxt())----------
+
+#--------------------------------------------------------------------------
+@pytest.mark.parametrize("canonical", [False, True])
+def test_npzCountTables(tmp_path, genomes, monkeypatch, canonical):
+    np = pytest.importorskip("numpy")
+    monkeypatch.setattr(BioDNA, "pyarrow", None) # (the .npz form even where pyarrow is installed)
+    filename = writeTables(str(tmp_path / "tables.parquet"), genomes, [1, 3, 6], canonical)
+    assert filename == str(tmp_path / "tables.npz")
+    with np.load(filename) as loaded:
+        assert loaded["files"].tolist() == list(genomes)
+        for LmerSize in (1, 3, 6):
+            motifs = loaded["motifs_L%i" % LmerSize].tolist()
+            everyMotif = ["".join(bases) for bases in itertools.product("ACGT", repeat=LmerSize)]
+            assert motifs == sorted({min(motif, motif.translate(COMPLEMENT)[::-1]) for motif in everyMotif}
+                                    if canonical else everyMotif)
+            for row, total, records in zip(loaded["counts_L%i" % LmerSize], loaded["total_L%i" % LmerSize],
+                                           genomes.values()):
+                counts = bruteForceCounts(records, LmerSize, canonical)
+                assert dict(zip(motifs, row.tolist())) == {motif: counts[motif] for motif in motifs}
+                assert total == sum(max(len(sequence) - LmerSize + 1, 0) for header, sequence in records)
+
+    # the .npz form needs dense tables
+    with pytest.raises(ValueError):
+        writeTables(str(tmp_path / "sparse.npz"), genomes, [BioDNA.DENSE_LMER_LIMIT + 1], canonical)
+#-------------------(end of test_npzCountTables())-------------------------
+
+#--------------------------------------------------------------------------
+def test_sameNpzCountTablesWithoutNumPy(tmp_path, genomes, monkeypatch, withoutNumPy):
+    np = pytest.importorskip("numpy")
+    source = ("import sys, json\n"
+              "sys.modules['pyarrow'] = None\n"
+              "import BioDNA\n"
+              "writer = BioDNA.CountTableWriter(%r)\n"
+              "for nextFile in %r:\n"
+              "    tables = BioDNA.countFASTAkmerSizes(nextFile, [2, 4], canonical=True)\n"
+              "    writer.add(nextFile, [tables[2], tables[4]])\n"
+              "writer.close()\n"
+              "print(json.dumps([BioDNA.np is None, writer.filename]))\n" % (str(tmp_path / "bare.npz"), list(genomes)))
+    monkeypatch.setattr(BioDNA, "pyarrow", None)
+    withNumPy = writeTables(str(tmp_path / "tables.npz"), genomes, [2, 4], True)
+    assert withoutNumPy(source) == [True, str(tmp_path / "bare.npz")]
+    with np.load(str(tmp_path / "bare.npz")) as bare, np.load(withNumPy) as expected:
+        assert sorted(bare.files) == sorted(expected.files)
+        for name in expected.files:
+            assert bare[name].dtype == expected[name].dtype
+            assert bare[name].tolist() == expected[name].tolist()
+#-------------------(end of test_sameNpzCountTablesWithoutNumPy())---------
+
+#--------------------------------------------------------------------------
+@pytest.mark.parametrize("canonical", [False, True])
+def test_parquetCountTables(tmp_path, genomes, canonical):
+    parquet = pytest.importorskip("pyarrow.parquet")
+    LmerSizes = [2, 5, BioDNA.DENSE_LMER_LIMIT + 1] # (dense and sparse tables)
+    filename = writeTables(str(tmp_path / "tables.npz"), genomes, LmerSizes, canonical)
+    assert filename == str(tmp_path / "tables.parquet")
+    table = parquet.read_table(filename)
+    assert table.column_names == list(BioDNA.TIDY_COLUMNS[:2]) + ["motif", "count"]
+    assert parquet.ParquetFile(filename).num_row_groups == len(genomes) # (a row group per genome)
+
+    written = {}
+    for genome, LmerSize, motif, count in zip(*(table.column(name).to_pylist() for name in table.column_names)):
+        written.setdefault((genome, LmerSize), {})[motif] = count
+    for nextFile, records in genomes.items():
+        for LmerSize in LmerSizes:
+            assert written.get((nextFile, LmerSize), {}) == dict(bruteForceCounts(records, LmerSize, canonical))
+
+    # a file without any genome still has the columns
+    empty = BioDNA.CountTableWriter(str(tmp_path / "empty.parquet"))
+    empty.close()
+    assert parquet.read_table(empty.filename).column_names == table.column_names
+#-------------------(end of test_parquetCountTables())---------------------
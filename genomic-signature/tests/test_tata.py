@@ -0,0 +1,121 @@
+"""Tests of the genome-wide TATA-box scan: findTATAboxes() and scanTATAboxes()
+against a test of every position of both strands, writeReportCSV() of the
+boxes, and morse_a4.py --all and its errors.
+"""
+
+import os, sys
+import csv, io
+import re
+import subprocess
+
+import pytest
+
+import BioDNA
+from conftest import GENOMIC_SIGNATURE, PROGRAM_ENVIRONMENT, randomSequence, writeFASTA
+
+TATA_BOX = re.compile(r"tata[at]a[at][ag]")
+SYMBOLS = "AAATTTTCGatn" # (rich in TATA-boxes)
+COMPLEMENT = str.maketrans("acgt", "tgca")
+
+#--------------------------------------------------------------------------
+def bruteForceBoxes(sequence, upstreamSize, downstreamSize, record=""):
+    """ Returns the TATAbox of every position of a sequence where a TATA-box
+    starts on either strand, the windows clipped at the ends of the sequence. """
+    sequence = sequence.lower()
+    reverse = sequence.translate(COMPLEMENT)[::-1] # (the reverse strand, read 5' to 3')
+    boxes = []
+    for start in range(len(sequence) - BioDNA.TATA_LENGTH + 1):
+        end = start + BioDNA.TATA_LENGTH
+        if (TATA_BOX.fullmatch(sequence[start:end])):
+            boxes.append(BioDNA.TATAbox(record, "+", start, end, sequence[start:end],
+                                        sequence[max(start - upstreamSize, 0):start], sequence[end:end + downstreamSize]))
+        reverseStart = len(sequence) - end
+        if (TATA_BOX.fullmatch(reverse[reverseStart:reverseStart + BioDNA.TATA_LENGTH])):
+            boxes.append(BioDNA.TATAbox(record, "-", start, end, reverse[reverseStart:reverseStart + BioDNA.TATA_LENGTH],
+                                        reverse[max(reverseStart - upstreamSize, 0):reverseStart],
+                                        reverse[reverseStart + BioDNA.TATA_LENGTH:
+                                                reverseStart + BioDNA.TATA_LENGTH + downstreamSize]))
+    return boxes
+#-------------------(end of bruteForceBoxes())-----------------------------
+
+#--------------------------------------------------------------------------
+@pytest.mark.parametrize("upstreamSize, downstreamSize", [(100, 100), (7, 0), (0, 25)])
+def test_findTATAboxes(upstreamSize, downstreamSize):
+    sequence = randomSequence(3000, upstreamSize, SYMBOLS)
+    boxes = list(BioDNA.findTATAboxes(sequence, upstreamSize, downstreamSize))
+    assert len(boxes) > 5
+    assert boxes == bruteForceBoxes(sequence, upstreamSize, downstreamSize)
+    assert (list(BioDNA.findTATAboxes(sequence, upstreamSize, downstreamSize, strands="-")) ==
+            [box for box in boxes if box.strand == "-"])
+#-------------------(end of test_findTATAboxes())--------------------------
+
+#--------------------------------------------------------------------------
+@pytest.mark.parametrize("windowSize", [16, 300, 1 << 20])
+def test_scanTATAboxesFindsEachBoxOnce(tmp_path, windowSize):
+    records = [("chr%i some description" % i, randomSequence(1500 + 300 * i, i, SYMBOLS)) for i in range(3)]
+    filename = writeFASTA(tmp_path / "genome.fna", records, 61)
+    expected = []
+    for header, sequence in records:
+        expected += bruteForceBoxes(sequence, 40, 30, header.split()[0])
+    assert list(BioDNA.scanTATAboxes(filename, 40, 30, windowSize=windowSize)) == expected
+#-------------------(end of test_scanTATAboxesFindsEachBoxOnce())----------
+
+#--------------------------------------------------------------------------
+def test_writeReportCSVstreamsTheBoxes():
+    sequence = randomSequence(2000, 5, SYMBOLS)
+    boxes = bruteForceBoxes(sequence, 10, 10, "chr")
+    OUTPUT = io.StringIO()
+    BioDNA.writeReportCSV(iter(boxes), OUTPUT)
+    rows = list(csv.reader(io.StringIO(OUTPUT.getvalue())))
+    assert rows[0] == list(BioDNA.TATAbox._fields)
+    assert rows[1:] == [[str(field) for field in box] for box in boxes]
+
+    OUTPUT = io.StringIO()
+    BioDNA.writeReportCSV(boxes[0], OUTPUT)
+    assert OUTPUT.getvalue().splitlines() == [",".join(BioDNA.TATAbox._fields), ",".join(map(str, boxes[0]))]
+
+    # a record name with a comma in it is quoted, not split over two columns
+    OUTPUT = io.StringIO()
+    BioDNA.writeReportCSV(boxes[0]._replace(record="chr1, assembly 2"), OUTPUT)
+    assert list(csv.reader(io.StringIO(OUTPUT.getvalue())))[1][:2] == ["chr1, assembly 2", boxes[0].strand]
+#-------------------(end of test_writeReportCSVstreamsTheBoxes())----------
+
+#--------------------------------------------------------------------------
+def test_morse_a4_all(tmp_path):
+    records = [("chrA", randomSequence(2500, 8, SYMBOLS)), ("chrB", randomSequence(900, 9, SYMBOLS))]
+    filename = writeFASTA(tmp_path / "genome.fna", records)
+    program = os.path.join(GENOMIC_SIGNATURE, os.pardir, "TATA-box", "morse_a4.py")
+    expected = io.StringIO()
+    BioDNA.writeReportCSV(bruteForceBoxes(records[0][1], 50, 20, "chrA") + bruteForceBoxes(records[1][1], 50, 20, "chrB"),
+                          expected)
+
+    completed = subprocess.run([sys.executable, program, "--all", "--upstream", "50", "--downstream", "20", filename],
+                               env=PROGRAM_ENVIRONMENT, capture_output=True, text=True, check=True)
+    assert completed.stdout == expected.getvalue()
+
+    outputFilename = str(tmp_path / "boxes.csv")
+    subprocess.run([sys.executable, program, "--all", "-o", outputFilename, filename + " chrB:101-400"],
+                   env=PROGRAM_ENVIRONMENT, capture_output=True, text=True, check=True)
+    region = io.StringIO()
+    BioDNA.writeReportCSV([box._replace(start=box.start + 100, end=box.end + 100)
+                           for box in bruteForceBoxes(records[1][1][100:400], 100, 100, "chrB")], region)
+    with open(outputFilename) as INPUT:
+        assert INPUT.read() == region.getvalue()
+#-------------------(end of test_morse_a4_all())---------------------------
+
+#--------------------------------------------------------------------------
+@pytest.mark.parametrize("options", [["--all"], ["--all", "--packed"], [], ["--packed"]])
+def test_morse_a4_errors(tmp_path, options):
+    filename = writeFASTA(tmp_path / "genome.fna", [("chrA", randomSequence(500, 10, SYMBOLS))])
+    program = os.path.join(GENOMIC_SIGNATURE, os.pardir, "TATA-box", "morse_a4.py")
+    for inputFile, message in ((str(tmp_path / "nofile.fna"), "No file found"),
+                               (filename + " chrZ:1-10", "no record named chrZ")):
+        completed = subprocess.run([sys.executable, program] + options + [inputFile], env=PROGRAM_ENVIRONMENT,
+                                   capture_output=True, text=True)
+        if ("--all" not in options and message == "No file found"): # (the analysis prints it and goes on)
+            assert message in completed.stdout
+            continue
+        assert completed.returncode != 0 and "Traceback" not in completed.stderr
+        assert message in completed.stdout + completed.stderr
+    assert not list(tmp_path.glob("*.pk2")) # no packed file is left for the missing record
+#-------------------(end of test_morse_a4_errors())-------------------------
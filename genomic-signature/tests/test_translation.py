@@ -0,0 +1,60 @@
+"""Tests of the six reading frames: translateSixFrames() and translateSequence()
+against translate() of the transcribed mRNA of each frame with the amino acid
+table of the original program, with and without NumPy, and morse_a3main.py.
+"""
+
+import os, sys
+import subprocess
+
+import pytest
+
+import BioDNA
+from conftest import GENOMIC_SIGNATURE, PROGRAM_ENVIRONMENT, randomSequence
+
+SYMBOLS = "ACGT" * 6 + "acgt" * 2 + "NR"
+COMPLEMENT = str.maketrans("ACGTNR", "TGCANY")
+
+#--------------------------------------------------------------------------
+def bruteForceFrames(sequence, threeLetter=False):
+    """ Returns the (strand, frame, protein) of the six reading frames of a
+    sequence, each codon looked up in makeAminoAcidTable(). """
+    AAtable = BioDNA.makeAminoAcidTable()
+    frames = []
+    for strand, bases in (("+", sequence.upper()), ("-", sequence.upper().translate(COMPLEMENT)[::-1])):
+        mRNA = bases.replace("T", "U")
+        for frame in range(3):
+            codons = [AAtable.get(mRNA[start:start + 3], "X|Xaa") for start in range(frame, len(mRNA) - 2, 3)]
+            frames.append((strand, frame, "".join(codon[2:] if threeLetter else codon[0] for codon in codons)))
+    return frames
+#-------------------(end of bruteForceFrames())----------------------------
+
+#--------------------------------------------------------------------------
+@pytest.mark.parametrize("length", [0, 2, 3, 4, 5, 999, 1000, 1001])
+@pytest.mark.parametrize("threeLetter", [False, True])
+def test_translateSixFrames(length, threeLetter):
+    sequence = randomSequence(length, length, SYMBOLS)
+    expected = bruteForceFrames(sequence, threeLetter)
+    assert [tuple(frame) for frame in BioDNA.translateSixFrames(sequence, threeLetter)] == expected
+    assert [tuple(frame) for frame in BioDNA.translateSixFrames(sequence.encode("ascii"), threeLetter)] == expected
+    for strand, frame, protein in expected:
+        assert BioDNA.translateSequence(sequence, frame, threeLetter, strand == "-") == protein
+#-------------------(end of test_translateSixFrames())---------------------
+
+#--------------------------------------------------------------------------
+def test_sameFramesWithoutNumPy(withoutNumPy):
+    source = ("import json, BioDNA\n"
+              "frames = BioDNA.translateSixFrames(randomSequence(2000, 1, %r), True)\n"
+              "print(json.dumps([BioDNA.np is None] + [list(frame) for frame in frames]))\n" % SYMBOLS)
+    expected = bruteForceFrames(randomSequence(2000, 1, SYMBOLS), True)
+    assert withoutNumPy(source) == [True] + [list(frame) for frame in expected]
+#-------------------(end of test_sameFramesWithoutNumPy())-----------------
+
+#--------------------------------------------------------------------------
+def test_morse_a3main():
+    directory = os.path.join(GENOMIC_SIGNATURE, os.pardir, "reading_frames")
+    completed = subprocess.run([sys.executable, "morse_a3main.py"], cwd=directory, env=PROGRAM_ENVIRONMENT,
+                               capture_output=True, text=True, check=True)
+    proteins = [line.split(None, 1)[1].strip() for line in completed.stdout.splitlines()
+                if line.strip().startswith("Protein:")]
+    assert proteins == [protein for strand, frame, protein in bruteForceFrames("ATGTGTACGCAAATGATATCGTATTAG", True)]
+#-------------------(end of test_morse_a3main())---------------------------
@@ -1,6 +1,11 @@
 import os
 from math import exp, log
 
+# the streaming base composition (fastaComposition) lives in DNAcomposition.py of the
+# genomic-signature project, a small module of its own so that this program does not
+# have to import all of BioDNA (install it once with "pip install -e ../genomic-signature"):
+from DNAcomposition import fastaComposition
+
 """----------------------------------------------------------------------------
 SUMMARY: This python program reads a FASTA formatted input file filled with DNA
 from a given organism and prints a neat summary of "Chargaff's numbers", which 
@@ -19,48 +24,6 @@ DNA equal to 100,000 bp.
 -------------------------------------------------------------------------------
 """
 
- #------- Do NOT change this Python function--------------------------------
-
-def getDNA( filename ):
-    """ Open a FASTA file of DNA read it, and return the DNA as one string.
-    
-    Function to open a FASTA formatted file of DNA sequence, remove
-    first (header) line and newline characters, and return as one (long) string.
-    
-    Argument:  one(1) string with the name of a FASTA-formtted file of DNA.
-    Returns:   entire sequence of DNA as one string
- 
-    A sample of how you might "call" this funciton from your program
-    to 'get' the DNA for chromosome III of the worm, C.elegans.
- 
-    sequence = getDNA("worm_III.fna")
-
-    Note: This function (sometimes called a subroutine) is ready for you
-    to use in your program. Think of this routine as a "button on your
-    calculator" ... this is ready for to use. When you "use" this
-    routine, we say "your program is CALLING" for the use of that routine.
-    -----------------------------------------------------------------------
-    
-    """
-    # make sure there really *is* a filename with this name
-    if (not os.path.isfile(filename)):
-        print ("No file found in current directory named: ", filename)
-        return ""
-    else:
-        DNA = ""
-        with open(filename) as INPUT:
-            next(INPUT)  # skip the header line
-            # now read all the other lines in the file
-            for nextLine in INPUT: 
-                nextLine = nextLine.strip()  # remove the newline
-                DNA = DNA + nextLine
-            # end for each line
-                
-            return DNA
-    # end else
-    
-# end getDNA()
-# ------------------------------------------------------------------------
     
     
 def main():    
@@ -69,30 +32,29 @@ def main():
     # or
     # inputGenomeFile = "Nanoarchaeum_equitans_Kin4_M.fna"
     
-    # get the DNA sequence from a file and store in a Python string
-    sequence = getDNA(inputGenomeFile)
-     
-    # don't run this next line if you have a huge genome!
-    # print ("\nDNA: ", sequence, "\n") # prints the DNA sequence
+    # make sure there really *is* a file with this name
+    if (not os.path.isfile(inputGenomeFile)):
+        print("No file found in current directory named: ", inputGenomeFile)
+        return
+
+    # count every symbol of the DNA in one streaming pass over the file (the
+    # DNA is never held in memory, so this works for huge genomes too)
+    composition = fastaComposition(inputGenomeFile)
     
-    DNA = sequence.upper() # makes sure the sequence is capitalized
-    DNAlength = len(DNA) # the length of the DNA sequence
+    DNAlength = composition.length # the length of the DNA sequence
     print("Total length of DNA:\t", DNAlength, "bp") # prints DNAlength
     print("-------------------------------------------------------------------------")
     #-----------------------------------------
     
     # COUNT NUCLEOTIDES:    
-    # first store the count of each nucleotide in a variable
-    adenineCount = DNA.count("A") # number of adenine nucleotides
-    cytosineCount = DNA.count("C") # number of cytosine nucleotides
-    guanineCount = DNA.count("G") # number of guanine nucleotides
-    thymineCount = DNA.count("T") # number of thymine nucleotides
+    # first store the count of each nucleotide in a variable (the counts are upper case)
+    adenineCount = composition.counts.get("A", 0) # number of adenine nucleotides
+    cytosineCount = composition.counts.get("C", 0) # number of cytosine nucleotides
+    guanineCount = composition.counts.get("G", 0) # number of guanine nucleotides
+    thymineCount = composition.counts.get("T", 0) # number of thymine nucleotides
     
     # total number of nucleotides that aren't A, C, G, or T
-    otherCount = 0 # used to keep track of nucleotides that are not A, C, G, or T
-    for i in DNA: # for all the characters in DNA:
-        if (i != "A" and i != "C" and i != "G" and i != "T"):
-            otherCount += 1 # advance otherCount by 1 if there is something other than A, C, G, or T
+    otherCount = DNAlength - (adenineCount + cytosineCount + guanineCount + thymineCount)
     
     # now print out the formatted number of each nucleotide (stored in the dedicated variables)
     print("The number of Adenine (A) nucleotides in the file of DNA:\t{:5}".format(adenineCount))
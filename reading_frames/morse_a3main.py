@@ -1,4 +1,6 @@
-import BioDNA # allows for use of defined functions within BioDNA.py
+# allows for use of defined functions within BioDNA.py of the genomic-signature project
+# (installed once with "pip install -e ../genomic-signature"):
+import BioDNA
 
 def main():
     
@@ -25,62 +27,34 @@ def main():
     print ("mRNA: 5'", mRNA, "3'") # prints the mRNA
       
 
-    print ("\n==============================================================")
-    print ("Reading Frame #1")
-    # --------- TRANSLATE Reading Frame #1 --------------------------
-    
-    proteins = BioDNA.translate(mRNA, AAtable) # translates mRNA to proteins
-    numberOfconnectors = int((len(proteins)) / 3) # generates num of match lines
-
-    print ("RNA length:", RNAlength, "bp") # prints length of mRNA
-    print ("      RNA:        ", mRNA) # prints the mRNA
-    print ("                  ", numberOfconnectors * " | ") # prints connectors
-    print ("      Protein:    ", proteins, "\n") # prints protein chain
-    
-    BioDNA.readingFrameChecks(proteins) # prints information about amino acids
-    
-    print ("==============================================================\n")
-    
-    
-    print ("\n==============================================================")
-    print ("Reading Frame #2")
-    # --------- TRANSLATE Reading Frame #2 --------------------------
+    # --------- TRANSLATE all six Reading Frames --------------------------
     """
-    reading frame #2 does exactly as the previous reading frame except it starts
-    the analysis of the mRNA 1 position further
+    the first three reading frames translate the mRNA starting 0, 1 and 2
+    positions further; the last three do the same with the mRNA of the anti-sense
+    strand (the reverse complement of the DNA), so genes on either strand are seen.
+    translateSixFrames() translates all six at once from the DNA
     """
-    proteins = BioDNA.translate(mRNA[1:], AAtable)
-    numberOfconnectors = int((len(proteins)) / 3)
+    antiSenseRNA = BioDNA.transcribe(BioDNA.complementDNA_to_DNA(DNA)[::-1]) # mRNA of the anti-sense strand
 
-    print ("RNA length:", RNAlength - 1, "bp") # subtract 1 from length
-    print ("      RNA:        ", mRNA[1:])
-    print ("                  ", numberOfconnectors * " | ")
-    print ("      Protein:    ", proteins, "\n")
-    
-    BioDNA.readingFrameChecks(proteins)
-    
-    print ("==============================================================\n")
-    
-    
-    print ("\n==============================================================")
-    print ("Reading Frame #3")
-    # --------- TRANSLATE Reading Frame #3 --------------------------
-    """
-    reading frame #3 does exactly as the previous reading frame except it starts
-    the analysis of the mRNA 1 position further
-    """
- 
-    proteins = BioDNA.translate(mRNA[2:], AAtable)
-    numberOfconnectors = int((len(proteins)) / 3)
+    for frameNumber, (strand, frame, proteins) in enumerate(BioDNA.translateSixFrames(DNA, threeLetter=True), 1):
+        strandRNA = mRNA if (strand == "+") else antiSenseRNA # mRNA this frame is read from
+        numberOfconnectors = int((len(proteins)) / 3) # generates num of match lines
 
-    print ("RNA length:", RNAlength - 2, "bp") # subtract 2 from length
-    print ("      RNA:        ", mRNA[2:])
-    print ("                  ", numberOfconnectors * " | ")
-    print ("      Protein:    ", proteins, "\n")
-    
-    BioDNA.readingFrameChecks(proteins) 
-    
-    print ("==============================================================\n")
+        print ("\n==============================================================")
+        if (strand == "+"):
+            print ("Reading Frame #%i" % frameNumber)
+        else:
+            print ("Reading Frame #%i (anti-sense strand)" % frameNumber)
+        print ("RNA length:", RNAlength - frame, "bp") # prints length of mRNA (less the skipped bases)
+        print ("      RNA:        ", strandRNA[frame:]) # prints the mRNA
+        print ("                  ", numberOfconnectors * " | ") # prints connectors
+        print ("      Protein:    ", proteins, "\n") # prints protein chain
+
+        # prints information about amino acids
+        print (BioDNA.formatReport(BioDNA.readingFrameChecks(proteins)), end="")
+
+        print ("==============================================================\n")
+    # end for each reading frame
 
 # --- end main() ---------
 